@@ -8,8 +8,10 @@ Security scaffold is established here, before any routes are registered:
 - SEC-15: debug=False hardcoded — never from environment
 - SEC-21: Rate limiting via Flask-Limiter (in-memory, per-route)
 """
+import atexit
 import logging
 import os
+from pathlib import Path
 
 from flask import Flask
 from flask_limiter import Limiter
@@ -39,6 +41,7 @@ def create_app(config_override: dict | None = None) -> Flask:
     # --- Security scaffold (all applied BEFORE routes are registered) ---
 
     from .config import Config
+    from .enrichment.priority import parse_priority_overrides
 
     config = Config()
 
@@ -54,6 +57,14 @@ def create_app(config_override: dict | None = None) -> Flask:
     app.config["WTF_CSRF_ENABLED"] = config.WTF_CSRF_ENABLED  # SEC-10
     app.config["ALLOWED_API_HOSTS"] = config.ALLOWED_API_HOSTS
     app.config["SESSION_COOKIE_SAMESITE"] = config.SESSION_COOKIE_SAMESITE  # SEC-19
+    app.config["CACHE_MAINTENANCE_INTERVAL"] = config.CACHE_MAINTENANCE_INTERVAL
+    app.config["ENRICHMENT_MAX_WORKERS"] = config.ENRICHMENT_MAX_WORKERS
+    app.config["ENRICHMENT_ENGINE"] = config.ENRICHMENT_ENGINE
+    app.config["ENRICHMENT_HEDGING"] = config.ENRICHMENT_HEDGING
+    app.config["JOB_STORE"] = config.JOB_STORE
+    app.config["JOB_STORE_PATH"] = config.JOB_STORE_PATH
+    app.config["JOB_LEASE_SECONDS"] = config.JOB_LEASE_SECONDS
+    app.config["PROVIDER_PRIORITY"] = parse_priority_overrides(config.PROVIDER_PRIORITY)
 
     # Apply optional test/environment overrides AFTER security defaults are set.
     if config_override:
@@ -76,12 +87,35 @@ def create_app(config_override: dict | None = None) -> Flask:
     # Create shared CacheStore and HistoryStore once at startup.  Route handlers
     # read current_app.cache_store / current_app.history_store instead of
     # re-instantiating per-request (avoids SQLite connection churn + PRAGMA overhead).
+    # The cache runs in write-behind mode so enrichment workers never wait on a
+    # commit; _run_enrichment_and_save flushes it before saving history.
     from .cache.store import CacheStore
     from .enrichment.history_store import HistoryStore
 
-    app.cache_store = CacheStore()
+    app.cache_store = CacheStore(write_behind=True)
     app.history_store = HistoryStore()
 
+    # Enrichment job state lives in the orchestrator; the SQLite job store also
+    # shares it with every worker process, so any of them can answer a status
+    # poll.  Without one no store is attached: the orchestrator's own lists
+    # already hold everything a process-local store would.
+    app.job_store = None
+    if app.config["JOB_STORE"] == "sqlite":
+        from .enrichment.job_store import SQLiteJobStore
+
+        path = app.config["JOB_STORE_PATH"]
+        app.job_store = SQLiteJobStore(Path(path) if path else None)
+
+    # Background cache maintenance (TTL purge, LRU size budget, vacuum) runs
+    # off the request path; the settings page reads its status.
+    from .cache.maintenance import CacheMaintenance
+
+    app.cache_maintenance = CacheMaintenance(
+        app.cache_store, interval_seconds=app.config["CACHE_MAINTENANCE_INTERVAL"]
+    )
+    if app.config["CACHE_MAINTENANCE_INTERVAL"] > 0:
+        app.cache_maintenance.start()
+
     # Registry is built once at startup and cached on the app.  Rebuilt only
     # when settings are saved (settings_post route invalidates it).
     from .enrichment.config_store import ConfigStore
@@ -91,6 +125,32 @@ def create_app(config_override: dict | None = None) -> Flask:
     allowed_hosts = app.config.get("ALLOWED_API_HOSTS", [])
     app.registry = build_registry(allowed_hosts=allowed_hosts, config_store=config_store)
 
+    # One set of per-provider token buckets shared by every job, so concurrent
+    # analyses pace against the same VT/AbuseIPDB quotas.
+    from .enrichment.rate_limit import RateLimiter
+
+    app.rate_limiter = RateLimiter.from_config(config_store)
+
+    # One globally capped worker pool for all enrichment lookups, scheduled
+    # round-robin between jobs (replaces a ThreadPoolExecutor per job).
+    from .enrichment.executor import FairExecutor
+
+    app.enrichment_executor = FairExecutor(max_workers=app.config["ENRICHMENT_MAX_WORKERS"])
+
+    # Keep-alive pool sizes and latency hedging are process-wide, shared with
+    # any other app in the process (see _configure_shared_http).
+    _configure_shared_http(app)
+
+    # The async engine shares one event-loop thread (started on first use);
+    # its bridge pool for blocking adapters gets the same global cap.
+    app.enrichment_loop = None
+    if app.config["ENRICHMENT_ENGINE"] == "async":
+        from .enrichment.async_engine import EventLoopThread
+
+        app.enrichment_loop = EventLoopThread(
+            bridge_workers=app.config["ENRICHMENT_MAX_WORKERS"]
+        )
+
     # Static asset cache-control (24 hours) — avoids re-downloading ~568KB
     # of fonts/JS/CSS on every page navigation.
     app.config["SEND_FILE_MAX_AGE_DEFAULT"] = 86400
@@ -102,6 +162,25 @@ def create_app(config_override: dict | None = None) -> Flask:
     app.register_blueprint(bp_api)
     csrf.exempt(bp_api)  # API routes are stateless JSON — no CSRF tokens
 
+    # With a durable job store, resume jobs a stopped process left unfinished
+    # (now, then whenever another process's lease expires) and keep this
+    # process's leases fresh; a clean shutdown hands its jobs back.
+    app.job_leases = None
+    if app.job_store is not None and app.job_store.durable:
+        from .enrichment.job_store import JobLeases
+        from .routes._helpers import _resume_jobs
+
+        def resume(claimed: dict[str, dict]) -> None:
+            with app.app_context():
+                _resume_jobs(claimed)
+
+        app.job_leases = JobLeases(
+            app.job_store, resume, lease_seconds=app.config["JOB_LEASE_SECONDS"]
+        )
+        app.job_leases.run_once()
+        app.job_leases.start()
+        atexit.register(app.job_leases.stop)
+
     # SEC-09: Security headers on every response
     @app.after_request
     def set_security_headers(response):  # type: ignore[return]
@@ -139,3 +218,40 @@ def create_app(config_override: dict | None = None) -> Flask:
     # - Pipeline is stateless per request; no raw text stored (SEC-14)
 
     return app
+
+
+def _configure_shared_http(app: Flask) -> None:
+    """Apply app's settings to the process-wide HTTP state adapters share.
+
+    Keep-alive pools (http_pool.HTTP_POOLS) are shared by every adapter
+    session and outlive registry rebuilds; each provider's pool holds as many
+    connections as it can have lookups in flight (its semaphore cap, or every
+    worker if uncapped).  Latency samples (http_safety.PROVIDER_LATENCY) are
+    shared by both engines; hedging of zero-auth GETs is opt-in.
+
+    Both are module globals, so they belong to the process, not to one app:
+    applying the same settings again is a no-op, and an app that asks for
+    different ones replaces them for every app in the process, with a
+    warning.  The settings applied are recorded in
+    app.extensions["sentinelx.http"].
+    """
+    from .enrichment.http_pool import HTTP_POOLS
+    from .enrichment.http_safety import PROVIDER_LATENCY
+    from .enrichment.orchestrator import EnrichmentOrchestrator
+
+    caps = EnrichmentOrchestrator.concurrency_limits(app.registry.all())
+    settings = {
+        "pool_sizes": {
+            provider.name: caps.get(provider.name, app.config["ENRICHMENT_MAX_WORKERS"])
+            for provider in app.registry.all()
+        },
+        "hedging": bool(app.config["ENRICHMENT_HEDGING"]),
+    }
+    replaced = HTTP_POOLS.configure(settings["pool_sizes"])
+    replaced = PROVIDER_LATENCY.configure(hedging=settings["hedging"]) or replaced
+    if replaced:
+        logger.warning(
+            "Process-wide HTTP settings (pool sizes, hedging) changed by a later app; "
+            "every app in this process now uses the new ones"
+        )
+    app.extensions["sentinelx.http"] = settings
@@ -0,0 +1,156 @@
+"""Pluggable payload codecs for cached and historical result JSON.
+
+Both CacheStore (enrichment_cache.result_json) and HistoryStore
+(analysis_history.iocs_json / results_json) store their payloads through
+encode_payload()/decode_payload() instead of raw json.dumps() text.
+
+Encoded payloads are BLOBs framed with a two-byte header:
+
+    byte 0  format version (_FORMAT_VERSION)
+    byte 1  codec id (see Codec.codec_id)
+    byte 2+ codec-specific body (UTF-8 JSON, optionally compressed)
+
+Legacy rows written before the codec layer are plain TEXT JSON; SQLite hands
+them back as str, which decode_payload() recognizes and parses as-is, so no
+migration is needed.
+
+Payloads smaller than _COMPRESS_MIN_BYTES are stored uncompressed ("raw"):
+most verdict-only results are a few hundred bytes and compressing them costs
+CPU without saving space.
+
+Codecs:
+    raw   — UTF-8 JSON, framed but uncompressed (id 0)
+    zlib  — zlib-compressed JSON, stdlib (id 1, default)
+    zstd  — zstandard-compressed JSON (id 2), registered only when the
+            optional ``zstandard`` package is installed
+"""
+from __future__ import annotations
+
+import json
+import zlib
+from dataclasses import dataclass
+from typing import Any, Callable
+
+try:  # Optional dependency — faster and denser than zlib when available.
+    import zstandard
+except ImportError:  # pragma: no cover - depends on environment
+    zstandard = None
+
+_FORMAT_VERSION = 1
+_COMPRESS_MIN_BYTES = 256
+_ZLIB_LEVEL = 6
+
+DEFAULT_CODEC = "zlib"
+
+
+@dataclass(frozen=True)
+class Codec:
+    """A named byte-level transform applied to UTF-8 JSON payloads.
+
+    Attributes:
+        name:     Identifier used by store constructors (e.g. "zlib").
+        codec_id: Byte written into the payload header; must never be reused.
+        encode:   bytes -> bytes compressor.
+        decode:   bytes -> bytes decompressor.
+    """
+
+    name: str
+    codec_id: int
+    encode: Callable[[bytes], bytes]
+    decode: Callable[[bytes], bytes]
+
+
+def _identity(data: bytes) -> bytes:
+    return data
+
+
+CODECS: dict[str, Codec] = {
+    "raw": Codec("raw", 0, _identity, _identity),
+    "zlib": Codec(
+        "zlib", 1, lambda data: zlib.compress(data, _ZLIB_LEVEL), zlib.decompress
+    ),
+}
+
+if zstandard is not None:  # pragma: no cover - depends on environment
+    CODECS["zstd"] = Codec(
+        "zstd",
+        2,
+        zstandard.ZstdCompressor(level=3).compress,
+        zstandard.ZstdDecompressor().decompress,
+    )
+
+_CODECS_BY_ID: dict[int, Codec] = {codec.codec_id: codec for codec in CODECS.values()}
+
+
+def get_codec(name: str) -> Codec:
+    """Return the registered codec called *name*.
+
+    Raises:
+        ValueError: If no codec with that name is registered (e.g. "zstd"
+                    without the zstandard package installed).
+    """
+    try:
+        return CODECS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown payload codec {name!r}. Available: {sorted(CODECS)!r}"
+        ) from None
+
+
+def dumps_json(obj: Any) -> bytes:
+    """Serialize *obj* to compact UTF-8 JSON bytes."""
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def frame_json(data: bytes, codec: str = DEFAULT_CODEC) -> bytes:
+    """Frame already-serialized JSON bytes with the given codec.
+
+    Lets callers that also need the JSON bytes (e.g. for size accounting)
+    serialize once.  Payloads under _COMPRESS_MIN_BYTES use the raw codec.
+    """
+    chosen = get_codec(codec)
+    if len(data) < _COMPRESS_MIN_BYTES:
+        chosen = CODECS["raw"]
+    return bytes((_FORMAT_VERSION, chosen.codec_id)) + chosen.encode(data)
+
+
+def encode_payload(obj: Any, codec: str = DEFAULT_CODEC) -> bytes:
+    """Serialize *obj* to JSON and frame it with the given codec."""
+    return frame_json(dumps_json(obj), codec)
+
+
+def decode_payload(value: str | bytes) -> Any:
+    """Decode a stored payload written by encode_payload() or a legacy TEXT row.
+
+    Raises:
+        ValueError: If the header names an unknown format version or codec.
+    """
+    return decode_payload_sized(value)[0]
+
+
+def decode_payload_sized(value: str | bytes) -> tuple[Any, int]:
+    """Like decode_payload(), but also return the decoded JSON length in bytes.
+
+    The length is what the payload occupies once decompressed, which is what
+    memory-tier byte budgets should be charged.
+    """
+    data = unframe_json(value)
+    return json.loads(data), len(data)
+
+
+def unframe_json(value: str | bytes) -> bytes:
+    """Return the JSON bytes inside a stored payload, without parsing them.
+
+    The inverse of frame_json(); legacy TEXT rows come back UTF-8 encoded.
+
+    Raises:
+        ValueError: If the header names an unknown format version or codec.
+    """
+    if isinstance(value, str):
+        return value.encode()
+    if len(value) < 2 or value[0] != _FORMAT_VERSION:
+        raise ValueError("Unrecognized payload format header")
+    codec = _CODECS_BY_ID.get(value[1])
+    if codec is None:
+        raise ValueError(f"Payload written with unavailable codec id {value[1]}")
+    return codec.decode(value[2:])
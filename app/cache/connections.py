@@ -0,0 +1,103 @@
+"""SQLite connection pool: one shared writer plus per-thread read-only readers.
+
+WAL journal mode lets any number of readers run concurrently with a single
+writer, but only if they use separate connections.  Sharing one connection
+behind a mutex (the original CacheStore/HistoryStore design) serializes every
+status poll, detail-page render and enrichment worker on that mutex.
+
+ConnectionPool hands each thread its own read-only connection (opened lazily
+on first use, reused for the thread's lifetime) and keeps one writer
+connection that callers guard with their own lock.
+
+Usage:
+    pool = ConnectionPool(db_path)
+    pool.writer.execute("INSERT ...")      # caller holds its write lock
+    rows = pool.reader().execute("SELECT ...").fetchall()
+"""
+from __future__ import annotations
+
+import sqlite3
+import threading
+import weakref
+from pathlib import Path
+
+# PRAGMAs applied to every connection.  journal_mode is persistent in the
+# database file, so it is only set once on the writer.
+_COMMON_PRAGMAS = (
+    "PRAGMA busy_timeout=5000",   # retry on lock instead of instant error
+    "PRAGMA cache_size=-8000",    # 8MB page cache
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+class _ReaderConnection(sqlite3.Connection):
+    """sqlite3.Connection subclass — exists only so readers can be weak-referenced."""
+
+
+class ConnectionPool:
+    """A dedicated writer connection plus thread-local read-only connections.
+
+    The writer is opened with check_same_thread=False and must be guarded by
+    the owning store's lock.  Readers are opened with ``mode=ro`` so a bug in
+    a read path can never write, and are never shared between threads, so no
+    lock is needed around reads.  Readers also disable check_same_thread, but
+    only so close() can release them from the shutting-down thread.
+
+    Args:
+        db_path:     Path to the SQLite database file. The parent directory must
+                     already exist.
+        incremental_vacuum: Request ``auto_vacuum=INCREMENTAL`` so freed pages can
+                     later be returned to the filesystem with
+                     ``PRAGMA incremental_vacuum``.  SQLite only honours this on
+                     a database with no tables yet, and only before WAL mode is
+                     enabled, so it is applied first and ignored for existing
+                     files.
+    """
+
+    def __init__(self, db_path: Path, *, incremental_vacuum: bool = False) -> None:
+        self._db_path = db_path
+        self._local = threading.local()
+        self._readers: weakref.WeakSet[_ReaderConnection] = weakref.WeakSet()
+        self._readers_lock = threading.Lock()
+        self.writer = sqlite3.connect(str(db_path), check_same_thread=False)
+        if incremental_vacuum:
+            self.writer.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self.writer.execute("PRAGMA journal_mode=WAL")
+        self.writer.execute("PRAGMA synchronous=NORMAL")  # safe with WAL; avoids fsync per commit
+        for pragma in _COMMON_PRAGMAS:
+            self.writer.execute(pragma)
+
+    def reader(self) -> sqlite3.Connection:
+        """Return the calling thread's read-only connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            uri = self._db_path.resolve().as_uri() + "?mode=ro"
+            conn = sqlite3.connect(
+                uri, uri=True, factory=_ReaderConnection, check_same_thread=False
+            )
+            for pragma in _COMMON_PRAGMAS:
+                conn.execute(pragma)
+            self._local.conn = conn
+            with self._readers_lock:
+                self._readers.add(conn)
+        return conn
+
+    def reader_count(self) -> int:
+        """Return the number of live reader connections (one per reading thread)."""
+        with self._readers_lock:
+            return len(self._readers)
+
+    def close(self) -> None:
+        """Close the writer and every reader connection still alive.
+
+        Readers owned by other threads are closed too; those threads will get
+        sqlite3.ProgrammingError if they read afterwards, so only call this at
+        shutdown.
+        """
+        with self._readers_lock:
+            readers = list(self._readers)
+            self._readers.clear()
+        for conn in readers:
+            conn.close()
+        self._local = threading.local()
+        self.writer.close()
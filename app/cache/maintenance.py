@@ -0,0 +1,155 @@
+"""Background cache maintenance: TTL purge, LRU size budget and compaction.
+
+CacheMaintenance runs on a daemon thread started by create_app().  Every
+interval it:
+
+    1. purges rows older than the configured TTL (CacheStore.purge_expired,
+       batched) and expired negative-cache rows,
+    2. evicts least recently used rows until the configured row-count and
+       size budgets are met (CacheStore.evict_lru),
+    3. returns freed pages to the filesystem and truncates the WAL
+       (CacheStore.compact).
+
+None of this runs on the request path.  TTL and budgets are re-read from
+ConfigStore on every run, so changes on the settings page take effect at the
+next run without a restart.  The first run happens one interval after
+start(), keeping app startup fast.
+
+Usage:
+    maintenance = CacheMaintenance(cache_store, interval_seconds=900)
+    maintenance.start()
+    maintenance.status()   # -> {"last_run": ..., "rows_evicted": ..., ...}
+"""
+from __future__ import annotations
+
+import datetime
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Callable
+
+from app.cache.store import CacheStore
+
+if TYPE_CHECKING:
+    from app.enrichment.config_store import ConfigStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL_SECONDS = 15 * 60
+
+
+def _default_config_store() -> ConfigStore:
+    from app.enrichment.config_store import ConfigStore
+
+    return ConfigStore()
+
+
+class CacheMaintenance:
+    """Periodic purge/evict/compact task for one CacheStore.
+
+    Args:
+        cache:                CacheStore to maintain.
+        interval_seconds:     Seconds between runs.
+        config_store_factory: Returns a fresh ConfigStore per run (TTL and
+                              budgets are read from it). Defaults to the
+                              user's ~/.sentinelx/config.ini.
+    """
+
+    def __init__(
+        self,
+        cache: CacheStore,
+        interval_seconds: float = DEFAULT_INTERVAL_SECONDS,
+        config_store_factory: Callable[[], ConfigStore] | None = None,
+    ) -> None:
+        self._cache = cache
+        self._interval = interval_seconds
+        self._config_store_factory = config_store_factory or _default_config_store
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._run_lock = threading.Lock()     # serializes runs
+        self._status_lock = threading.Lock()  # never held while a run is working
+        self._status: dict = {
+            "runs": 0,
+            "last_run": None,
+            "last_duration_ms": None,
+            "rows_purged": 0,
+            "rows_evicted": 0,
+            "total_rows_evicted": 0,
+            "db_size_bytes": None,
+            "last_error": None,
+        }
+
+    def start(self) -> None:
+        """Start the background thread (idempotent)."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, name="cache-maintenance", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Signal the thread to exit and wait for it."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self._interval):
+            self.run_once()
+
+    def run_once(self) -> dict:
+        """Run one purge/evict/compact pass and return the updated status.
+
+        Errors are logged and recorded in status()["last_error"]; they never
+        propagate, so one bad run does not kill the maintenance thread.
+        """
+        with self._run_lock:
+            started = time.perf_counter()
+            purged = evicted = 0
+            error: str | None = None
+            try:
+                config = self._config_store_factory()
+                purged = self._cache.purge_expired(ttl_seconds=config.get_cache_ttl() * 3600)
+                purged += self._cache.purge_negative_expired()
+                evicted = self._cache.evict_lru(
+                    max_rows=config.get_cache_max_rows(),
+                    max_bytes=config.get_cache_max_mb() * 1024 * 1024,
+                )
+                self._cache.compact()
+            except Exception as exc:  # noqa: BLE001 — keep the thread alive
+                logger.warning("Cache maintenance run failed", exc_info=True)
+                error = str(exc)
+
+            db_size = self._cache.db_size_bytes()
+            with self._status_lock:
+                self._status.update({
+                    "runs": self._status["runs"] + 1,
+                    "last_run": datetime.datetime.now(tz=datetime.timezone.utc).isoformat(),
+                    "last_duration_ms": round((time.perf_counter() - started) * 1000, 1),
+                    "rows_purged": purged,
+                    "rows_evicted": evicted,
+                    "total_rows_evicted": self._status["total_rows_evicted"] + evicted,
+                    "db_size_bytes": db_size,
+                    "last_error": error,
+                })
+                snapshot = dict(self._status)
+            if purged or evicted:
+                logger.info("Cache maintenance purged %d and evicted %d rows", purged, evicted)
+            return snapshot
+
+    def status(self) -> dict:
+        """Return a snapshot of the last run's results.
+
+        Keys: 'runs', 'last_run' (ISO string or None), 'last_duration_ms',
+        'rows_purged', 'rows_evicted' (last run), 'total_rows_evicted',
+        'db_size_bytes', 'last_error' and 'running'.  'db_size_bytes' is
+        refreshed on every call.
+        """
+        with self._status_lock:
+            snapshot = dict(self._status)
+        snapshot["db_size_bytes"] = self._cache.db_size_bytes()
+        snapshot["running"] = self._thread is not None
+        return snapshot
@@ -1,12 +1,49 @@
 """SQLite enrichment result cache.
 
 Caches enrichment results per (ioc_value, ioc_type, provider) with
-configurable TTL. Thread-safe via threading.Lock on write operations.
+configurable TTL. Writes go through one writer connection guarded by a
+threading.Lock; reads use per-thread read-only connections (ConnectionPool)
+so concurrent readers never serialize on that lock under WAL.
+
+Optional write-behind mode (write_behind=True) hands put() calls to a
+background writer thread that drains a bounded queue and commits rows in one
+executemany() transaction every flush_rows rows or flush_interval_ms
+milliseconds.  Call flush() to block until every queued put is committed.
+
+A bounded in-process memory tier (L1) sits in front of SQLite (L2).  It holds
+decoded result dicts keyed by (ioc_value, ioc_type, provider), evicts least
+recently used entries once its byte budget is exceeded, and is kept coherent
+by put(), clear() and purge_expired().  Hot IOCs are therefore served without
+a query or a decode.  stats() reports hit/miss counts per tier.
+
+Payloads are stored through the codec layer (app/cache/codec.py): compressed
+BLOBs with a version/codec header.  Legacy plain-JSON TEXT rows are still
+read transparently.
+
+Freshness is tracked in the integer cached_at_epoch column (Unix seconds),
+so TTL checks run inside the WHERE clause and expired rows are never read or
+decoded.  The ISO cached_at column is kept for display.  Databases created
+before cached_at_epoch existed are migrated online at construction time.
+
+Size budget support for background maintenance (app/cache/maintenance.py):
+cache hits record the key's access time in an in-memory buffer that
+flush_access_times() writes to the last_accessed_epoch column in batches, so
+reads never take the write lock.  evict_lru() deletes least recently used
+rows until a row-count and/or byte budget is met, and compact() runs
+incremental_vacuum and a truncating WAL checkpoint.  New databases are
+created with auto_vacuum=INCREMENTAL; older files keep their existing mode
+and only shrink on a manual VACUUM.
+
+A separate negative tier (negative_cache table) remembers deterministic
+provider errors — see app/enrichment/negative_cache.py for which errors and
+for how long.  Each row carries its own expires_at_epoch, so providers and
+error classes can use different TTLs independent of the main cache TTL.
 
 Usage:
     cache = CacheStore()
     cache.put("1.2.3.4", "ipv4", "VirusTotal", {"verdict": "malicious", ...})
     result = cache.get("1.2.3.4", "ipv4", "VirusTotal", ttl_seconds=86400)
+    hits = cache.get_many([("1.2.3.4", "ipv4", "VirusTotal")], ttl_seconds=86400)
 
 For tests, pass a tmp_path-based db_path to isolate from the real filesystem.
 """
@@ -14,12 +51,71 @@ from __future__ import annotations
 
 import datetime
 import json
+import logging
+import math
+import queue
 import sqlite3
 import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
 
+from app.cache.codec import (
+    DEFAULT_CODEC,
+    decode_payload,
+    dumps_json,
+    frame_json,
+    get_codec,
+    unframe_json,
+)
+from app.cache.connections import ConnectionPool
+
+logger = logging.getLogger(__name__)
+
 DEFAULT_DB_PATH = Path.home() / ".sentinelx" / "cache.db"
 
+# Keys resolved per get_many() statement.  Each key binds 3 parameters, so 300
+# keys stay well under SQLite's historical 999 host-parameter limit.
+_GET_MANY_CHUNK = 300
+
+CacheKey = tuple[str, str, str]  # (ioc_value, ioc_type, provider)
+
+# Write-behind defaults: commit every 200 rows or 250 ms, whichever comes first.
+# The queue bound applies backpressure to put() if the writer falls behind.
+_WRITE_BEHIND_FLUSH_ROWS = 200
+_WRITE_BEHIND_FLUSH_INTERVAL_MS = 250
+_WRITE_BEHIND_MAX_QUEUE = 10_000
+
+# Memory tier byte budget (sum of encoded result sizes).  0 disables the tier.
+_MEMORY_TIER_MAX_BYTES = 16 * 1024 * 1024
+
+# Rows deleted per purge_expired() transaction and rows backfilled per
+# migration transaction — keeps each hold of the write lock short.
+_PURGE_BATCH_ROWS = 5000
+_MIGRATION_BATCH_ROWS = 5000
+
+# Rows deleted per evict_lru() transaction, and rows updated per
+# flush_access_times() transaction.
+_EVICT_BATCH_ROWS = 5000
+_TOUCH_BATCH_ROWS = 5000
+
+# Distinct keys whose access time is buffered between flushes.  Touches past
+# this bound are dropped: LRU order is approximate by design.
+_MAX_PENDING_TOUCHES = 100_000
+
+_INSERT_SQL = (
+    "INSERT OR REPLACE INTO enrichment_cache "
+    "(ioc_value, ioc_type, provider, result_json, cached_at, cached_at_epoch, "
+    " last_accessed_epoch) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+
+_TOUCH_SQL = (
+    "UPDATE enrichment_cache SET last_accessed_epoch = ? "
+    "WHERE ioc_value = ? AND ioc_type = ? AND provider = ? "
+    "AND last_accessed_epoch < ?"
+)
+
 _CREATE_TABLE = """
 CREATE TABLE IF NOT EXISTS enrichment_cache (
     ioc_value   TEXT NOT NULL,
@@ -27,41 +123,248 @@ CREATE TABLE IF NOT EXISTS enrichment_cache (
     provider    TEXT NOT NULL,
     result_json TEXT NOT NULL,
     cached_at   TEXT NOT NULL,
+    cached_at_epoch INTEGER NOT NULL DEFAULT 0,
+    last_accessed_epoch INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (ioc_value, ioc_type, provider)
+)
+"""
+
+
+_CREATE_NEGATIVE_TABLE = """
+CREATE TABLE IF NOT EXISTS negative_cache (
+    ioc_value   TEXT NOT NULL,
+    ioc_type    TEXT NOT NULL,
+    provider    TEXT NOT NULL,
+    error       TEXT NOT NULL,
+    error_class TEXT NOT NULL,
+    cached_at   TEXT NOT NULL,
+    expires_at_epoch INTEGER NOT NULL,
     PRIMARY KEY (ioc_value, ioc_type, provider)
 )
 """
 
 
+def _ratio(hits: int, misses: int) -> float:
+    """Return hits / (hits + misses) rounded to 4 places, or 0.0 with no lookups."""
+    total = hits + misses
+    return round(hits / total, 4) if total else 0.0
+
+
+class _MemoryTier:
+    """Byte-bounded LRU of cache entries with per-lookup TTL checks.
+
+    Each entry is (json_bytes, cached_at_iso, cached_at_epoch).  Entries stay
+    encoded so every get() parses a fresh dict: callers can mutate nested
+    raw_stats without corrupting the cached copy or each other.  Size is the
+    JSON length, which tracks real memory use far better than an entry count
+    given how much raw_stats varies between providers.
+    Thread-safe via its own lock; never touches SQLite.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[CacheKey, tuple[bytes, str, int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: CacheKey, cutoff_epoch: int) -> dict | None:
+        """Return a new decoded dict with 'cached_at' added, or None if absent/expired.
+
+        An entry is fresh when its cached_at_epoch is greater than cutoff_epoch
+        (the same rule the SQL tier applies).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[2] <= cutoff_epoch:
+                return None
+            self._entries.move_to_end(key)
+        result = json.loads(entry[0])
+        result["cached_at"] = entry[1]
+        return result
+
+    def set(
+        self, key: CacheKey, data: bytes, cached_at: str, cached_at_epoch: int
+    ) -> None:
+        """Insert or replace an entry (JSON bytes), evicting LRU entries to stay within budget."""
+        size = len(data)
+        if size > self._max_bytes:
+            self.discard(key)
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[0])
+            self._entries[key] = (data, cached_at, cached_at_epoch)
+            self._bytes += size
+            while self._bytes > self._max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted[0])
+
+    def discard(self, key: CacheKey) -> None:
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[0])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def purge_older_than(self, cutoff_epoch: int) -> None:
+        """Drop every entry that is expired relative to cutoff_epoch."""
+        with self._lock:
+            expired = [k for k, e in self._entries.items() if e[2] <= cutoff_epoch]
+            for key in expired:
+                self._bytes -= len(self._entries.pop(key)[0])
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    def usage(self) -> tuple[int, int]:
+        """Return (entry_count, bytes_used)."""
+        with self._lock:
+            return len(self._entries), self._bytes
+
+
 class CacheStore:
     """SQLite-backed enrichment result cache with TTL.
 
-    Uses a persistent connection opened at construction time and WAL journal
-    mode to allow concurrent readers without blocking writers.
+    Uses a persistent writer connection opened at construction time plus
+    lazily-opened per-thread read-only connections, with WAL journal mode so
+    readers run concurrently with each other and with the writer.
 
     Args:
-        db_path: Path to the SQLite database file.
-                 Defaults to ~/.sentinelx/cache.db.
+        db_path:           Path to the SQLite database file.
+                           Defaults to ~/.sentinelx/cache.db.
+        write_behind:      When True, put() enqueues rows for a background writer
+                           thread instead of committing inline. Reads may not see
+                           a queued row until the next flush.
+        flush_rows:        Write-behind batch size that triggers a commit.
+        flush_interval_ms: Maximum time a queued row waits before being committed.
+        max_queue:         Bound on queued rows; put() blocks when it is full.
+        memory_max_bytes:  Byte budget of the in-process memory tier; 0 disables it.
+        codec:             Payload codec name for new rows (see app/cache/codec.py).
     """
 
-    def __init__(self, db_path: Path | None = None) -> None:
+    def __init__(
+        self,
+        db_path: Path | None = None,
+        *,
+        write_behind: bool = False,
+        flush_rows: int = _WRITE_BEHIND_FLUSH_ROWS,
+        flush_interval_ms: int = _WRITE_BEHIND_FLUSH_INTERVAL_MS,
+        max_queue: int = _WRITE_BEHIND_MAX_QUEUE,
+        memory_max_bytes: int = _MEMORY_TIER_MAX_BYTES,
+        codec: str = DEFAULT_CODEC,
+    ) -> None:
+        self._codec = get_codec(codec).name  # fail fast on unknown codec names
         self._db_path = db_path if db_path is not None else DEFAULT_DB_PATH
         self._lock = threading.Lock()
         self._db_path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
-        self._conn = self._connect()
-        self._conn.execute("PRAGMA journal_mode=WAL")
-        self._conn.execute("PRAGMA synchronous=NORMAL")  # safe with WAL; avoids fsync per commit
-        self._conn.execute("PRAGMA busy_timeout=5000")    # retry on lock instead of instant error
-        self._conn.execute("PRAGMA cache_size=-8000")     # 8MB page cache
-        self._conn.execute("PRAGMA temp_store=MEMORY")
+        self._pool = ConnectionPool(self._db_path, incremental_vacuum=True)
+        self._conn = self._pool.writer  # guarded by _lock
         self._conn.execute(_CREATE_TABLE)
+        self._migrate_epoch_column()
+        self._migrate_access_column()
+        self._conn.execute("DROP INDEX IF EXISTS idx_cache_cached_at")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_cache_cached_at_epoch "
+            "ON enrichment_cache (cached_at_epoch)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_cache_last_accessed "
+            "ON enrichment_cache (last_accessed_epoch, cached_at_epoch)"
+        )
+        self._conn.execute(_CREATE_NEGATIVE_TABLE)
         self._conn.execute(
-            "CREATE INDEX IF NOT EXISTS idx_cache_cached_at "
-            "ON enrichment_cache (cached_at)"
+            "CREATE INDEX IF NOT EXISTS idx_negative_expires "
+            "ON negative_cache (expires_at_epoch)"
         )
         self._conn.commit()
 
-    def _connect(self) -> sqlite3.Connection:
-        return sqlite3.connect(str(self._db_path), check_same_thread=False)
+        self._touch_lock = threading.Lock()
+        self._touches: dict[CacheKey, int] = {}
+
+        self._write_behind = write_behind
+        self._flush_rows = flush_rows
+        self._flush_interval = flush_interval_ms / 1000
+        self._queue: queue.Queue[tuple | threading.Event | None] = queue.Queue(
+            maxsize=max_queue
+        )
+        self._flush_count = 0
+        self._last_flush_ms = 0.0
+        self._max_flush_ms = 0.0
+        self._last_flush_rows = 0
+        self._memory = _MemoryTier(memory_max_bytes) if memory_max_bytes > 0 else None
+        self._stats_lock = threading.Lock()
+        self._memory_hits = 0
+        self._memory_misses = 0
+        self._sqlite_hits = 0
+        self._sqlite_misses = 0
+        self._negative_hits = 0
+
+        self._writer: threading.Thread | None = None
+        if write_behind:
+            self._writer = threading.Thread(
+                target=self._writer_loop, name="cache-writer", daemon=True
+            )
+            self._writer.start()
+
+    def _migrate_epoch_column(self) -> None:
+        """Add and backfill cached_at_epoch on databases created before it existed.
+
+        ADD COLUMN is a constant-time schema change in SQLite.  The backfill
+        converts the ISO cached_at text with strftime('%s') in batches of
+        _MIGRATION_BATCH_ROWS, committing between batches so the write lock is
+        never held for the whole table.  Rows not yet backfilled have epoch 0
+        and therefore read as expired, never as stale-but-fresh.
+
+        Runs in __init__ before any other thread can reach the store.
+        """
+        columns = {
+            row[1] for row in self._conn.execute("PRAGMA table_info(enrichment_cache)")
+        }
+        if "cached_at_epoch" not in columns:
+            self._conn.execute(
+                "ALTER TABLE enrichment_cache "
+                "ADD COLUMN cached_at_epoch INTEGER NOT NULL DEFAULT 0"
+            )
+            self._conn.commit()
+
+        while True:
+            cursor = self._conn.execute(
+                "UPDATE enrichment_cache "
+                "SET cached_at_epoch = CAST(strftime('%s', cached_at) AS INTEGER) "
+                "WHERE rowid IN ("
+                "  SELECT rowid FROM enrichment_cache "
+                "  WHERE cached_at_epoch = 0 AND CAST(strftime('%s', cached_at) AS INTEGER) > 0 "
+                "  LIMIT ?"
+                ")",
+                (_MIGRATION_BATCH_ROWS,),
+            )
+            self._conn.commit()
+            if cursor.rowcount < _MIGRATION_BATCH_ROWS:
+                break
+
+    def _migrate_access_column(self) -> None:
+        """Add last_accessed_epoch to databases created before LRU eviction.
+
+        Not backfilled: existing rows keep 0 and evict_lru() breaks ties on
+        cached_at_epoch, so untouched legacy rows are evicted oldest-first.
+        """
+        columns = {
+            row[1] for row in self._conn.execute("PRAGMA table_info(enrichment_cache)")
+        }
+        if "last_accessed_epoch" not in columns:
+            self._conn.execute(
+                "ALTER TABLE enrichment_cache "
+                "ADD COLUMN last_accessed_epoch INTEGER NOT NULL DEFAULT 0"
+            )
+            self._conn.commit()
 
     def get(
         self,
@@ -75,27 +378,120 @@ class CacheStore:
         Returns the result dict with an added 'cached_at' key, or None
         if not found or expired.
         """
-        with self._lock:
-            row = self._conn.execute(
-                "SELECT result_json, cached_at FROM enrichment_cache "
-                "WHERE ioc_value = ? AND ioc_type = ? AND provider = ?",
-                (ioc_value, ioc_type, provider),
-            ).fetchone()
+        key = (ioc_value, ioc_type, provider)
+        return self.get_many([key], ttl_seconds).get(key)
 
-        if row is None:
-            return None
+    def get_many(
+        self,
+        keys: list[CacheKey],
+        ttl_seconds: int,
+    ) -> dict[CacheKey, dict]:
+        """Resolve many cache keys with set-based queries instead of point lookups.
 
-        result_json, cached_at_str = row
-        cached_at = datetime.datetime.fromisoformat(cached_at_str)
-        now = datetime.datetime.now(tz=datetime.timezone.utc)
-        age_seconds = (now - cached_at).total_seconds()
+        Keys are first looked up in the memory tier; the remainder are matched
+        in SQLite in chunks of _GET_MANY_CHUNK using a row-value
+        ``IN (VALUES ...)`` clause, so a 2,000-IOC job costs a handful of
+        statements rather than one per key.  The TTL is part of the WHERE
+        clause, so expired rows are never returned or decoded.  SQLite hits are
+        promoted into the memory tier.
 
-        if age_seconds > ttl_seconds:
-            return None
+        Args:
+            keys:        (ioc_value, ioc_type, provider) tuples. Duplicates are
+                         collapsed.
+            ttl_seconds: Maximum age in seconds; older entries are treated as
+                         misses.
 
-        result: dict = json.loads(result_json)
-        result["cached_at"] = cached_at_str
-        return result
+        Returns:
+            Dict mapping each hit key to its result dict (with an added
+            'cached_at' key). Misses, expired entries and rows that cannot
+            be decoded (e.g. written with a codec this process lacks) are
+            absent.
+        """
+        unique_keys = list(dict.fromkeys(keys))
+        hits: dict[CacheKey, dict] = {}
+        now_epoch = int(time.time())
+        cutoff = now_epoch - ttl_seconds
+
+        remaining = unique_keys
+        if self._memory is not None:
+            remaining = []
+            for key in unique_keys:
+                entry = self._memory.get(key, cutoff)
+                if entry is None:
+                    remaining.append(key)
+                else:
+                    hits[key] = entry
+
+        reader = self._pool.reader() if remaining else None
+        rows: list[tuple[str, str, str, str, str, int]] = []
+        for start in range(0, len(remaining), _GET_MANY_CHUNK):
+            chunk = remaining[start:start + _GET_MANY_CHUNK]
+            placeholders = ", ".join(["(?, ?, ?)"] * len(chunk))
+            params = [part for key in chunk for part in key]
+            params.append(cutoff)
+            rows.extend(reader.execute(  # type: ignore[union-attr]
+                "SELECT ioc_value, ioc_type, provider, result_json, cached_at, "
+                "       cached_at_epoch "
+                "FROM enrichment_cache "
+                f"WHERE (ioc_value, ioc_type, provider) IN (VALUES {placeholders}) "  # noqa: S608
+                "AND cached_at_epoch > ?",
+                params,
+            ).fetchall())
+
+        sqlite_hits = 0
+        undecodable = 0
+        for ioc_value, ioc_type, provider, payload, cached_at_str, cached_at_epoch in rows:
+            key = (ioc_value, ioc_type, provider)
+            try:
+                data = unframe_json(payload)
+            except ValueError:
+                # E.g. written with a codec this process lacks: a miss, not a failed job.
+                undecodable += 1
+                continue
+            if self._memory is not None:
+                self._memory.set(key, data, cached_at_str, cached_at_epoch)
+            result = json.loads(data)
+            result["cached_at"] = cached_at_str
+            hits[key] = result
+            sqlite_hits += 1
+        if undecodable:
+            logger.warning("Treated %d undecodable cache rows as misses", undecodable)
+
+        memory_hits = len(unique_keys) - len(remaining)
+        with self._stats_lock:
+            if self._memory is not None:
+                self._memory_hits += memory_hits
+                self._memory_misses += len(remaining)
+            self._sqlite_hits += sqlite_hits
+            self._sqlite_misses += len(remaining) - sqlite_hits
+        if hits:
+            self._record_touches(hits, now_epoch)
+        return hits
+
+    def _record_touches(self, keys: dict[CacheKey, dict], epoch: int) -> None:
+        """Buffer access times for hit keys; flush_access_times() persists them."""
+        with self._touch_lock:
+            for key in keys:
+                if key in self._touches or len(self._touches) < _MAX_PENDING_TOUCHES:
+                    self._touches[key] = epoch
+
+    def flush_access_times(self) -> int:
+        """Write buffered access times to last_accessed_epoch.
+
+        Updates run in batches of _TOUCH_BATCH_ROWS, releasing the write lock
+        between batches.  Called by the maintenance task and by evict_lru().
+
+        Returns:
+            Number of buffered keys flushed.
+        """
+        with self._touch_lock:
+            touches, self._touches = self._touches, {}
+        params = [(epoch, *key, epoch) for key, epoch in touches.items()]
+        for start in range(0, len(params), _TOUCH_BATCH_ROWS):
+            with self._lock:
+                self._conn.executemany(_TOUCH_SQL, params[start:start + _TOUCH_BATCH_ROWS])
+                self._conn.commit()
+        return len(params)
 
     def put(
         self,
@@ -104,23 +500,183 @@ class CacheStore:
         provider: str,
         result_dict: dict,
     ) -> None:
-        """Store or update a cached enrichment result."""
-        now = datetime.datetime.now(tz=datetime.timezone.utc).isoformat()
-        result_json = json.dumps(result_dict)
+        """Store or update a cached enrichment result.
+
+        In write-behind mode the row is queued for the background writer and
+        this call returns immediately (blocking only if the queue is full).
+        """
+        now_dt = datetime.datetime.now(tz=datetime.timezone.utc)
+        now = now_dt.isoformat()
+        now_epoch = int(now_dt.timestamp())
+        data = dumps_json(result_dict)
+        row = (
+            ioc_value, ioc_type, provider, frame_json(data, self._codec),
+            now, now_epoch, now_epoch,
+        )
+        if self._memory is not None:
+            self._memory.set((ioc_value, ioc_type, provider), data, now, now_epoch)
+        if self._write_behind:
+            self._queue.put(row)
+            return
+        with self._lock:
+            self._conn.execute(_INSERT_SQL, row)
+            self._conn.commit()
+
+    def put_negative(
+        self,
+        ioc_value: str,
+        ioc_type: str,
+        provider: str,
+        error: str,
+        error_class: str,
+        ttl_seconds: int,
+    ) -> None:
+        """Remember a deterministic provider error until ttl_seconds from now.
+
+        Always written synchronously: errors are rare compared to results and
+        must be visible to the next get_negative_many() immediately.
+        """
+        now_dt = datetime.datetime.now(tz=datetime.timezone.utc)
         with self._lock:
             self._conn.execute(
-                "INSERT OR REPLACE INTO enrichment_cache "
-                "(ioc_value, ioc_type, provider, result_json, cached_at) "
-                "VALUES (?, ?, ?, ?, ?)",
-                (ioc_value, ioc_type, provider, result_json, now),
+                "INSERT OR REPLACE INTO negative_cache "
+                "(ioc_value, ioc_type, provider, error, error_class, cached_at, "
+                " expires_at_epoch) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    ioc_value, ioc_type, provider, error, error_class,
+                    now_dt.isoformat(), int(now_dt.timestamp()) + ttl_seconds,
+                ),
             )
             self._conn.commit()
 
+    def get_negative_many(self, keys: list[CacheKey]) -> dict[CacheKey, dict]:
+        """Return unexpired negative-cache entries for keys.
+
+        Returns:
+            Dict mapping each hit key to {'error', 'error_class', 'cached_at'}.
+            Missing and expired keys are absent.
+        """
+        unique_keys = list(dict.fromkeys(keys))
+        if not unique_keys:
+            return {}
+        now_epoch = int(time.time())
+        reader = self._pool.reader()
+        hits: dict[CacheKey, dict] = {}
+        for start in range(0, len(unique_keys), _GET_MANY_CHUNK):
+            chunk = unique_keys[start:start + _GET_MANY_CHUNK]
+            placeholders = ", ".join(["(?, ?, ?)"] * len(chunk))
+            params = [part for key in chunk for part in key]
+            params.append(now_epoch)
+            for ioc_value, ioc_type, provider, error, error_class, cached_at in reader.execute(
+                "SELECT ioc_value, ioc_type, provider, error, error_class, cached_at "
+                "FROM negative_cache "
+                f"WHERE (ioc_value, ioc_type, provider) IN (VALUES {placeholders}) "  # noqa: S608
+                "AND expires_at_epoch > ?",
+                params,
+            ):
+                hits[(ioc_value, ioc_type, provider)] = {
+                    "error": error,
+                    "error_class": error_class,
+                    "cached_at": cached_at,
+                }
+        if hits:
+            with self._stats_lock:
+                self._negative_hits += len(hits)
+        return hits
+
+    def purge_negative_expired(self) -> int:
+        """Delete expired negative-cache rows; return the number deleted."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM negative_cache WHERE expires_at_epoch <= ?",
+                (int(time.time()),),
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Block until every put() queued before this call is committed.
+
+        No-op in synchronous mode.
+
+        Args:
+            timeout: Maximum seconds to wait, or None to wait indefinitely.
+
+        Returns:
+            True if the queue was drained, False if the timeout elapsed first.
+        """
+        if not self._write_behind:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self) -> None:
+        """Flush pending writes, stop the writer thread and close all connections."""
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+        with self._lock:
+            self._pool.close()
+
+    def _writer_loop(self) -> None:
+        """Drain the write-behind queue, committing rows in batches.
+
+        A batch is committed when it reaches flush_rows, when flush_interval
+        elapses since its first row, or when a flush()/close() marker arrives.
+        """
+        batch: list[tuple] = []
+        deadline = 0.0
+        while True:
+            timeout = max(deadline - time.monotonic(), 0) if batch else None
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = ()  # interval elapsed — flush the partial batch
+
+            if isinstance(item, tuple) and item:
+                if not batch:
+                    deadline = time.monotonic() + self._flush_interval
+                batch.append(item)
+                if len(batch) < self._flush_rows and time.monotonic() < deadline:
+                    continue
+
+            if batch:
+                self._write_batch(batch)
+                batch = []
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is None:
+                return
+
+    def _write_batch(self, batch: list[tuple]) -> None:
+        """Commit a batch of rows in one executemany() transaction."""
+        started = time.perf_counter()
+        try:
+            with self._lock:
+                self._conn.executemany(_INSERT_SQL, batch)
+                self._conn.commit()
+        except sqlite3.Error:
+            logger.warning("Cache write-behind flush of %d rows failed", len(batch), exc_info=True)
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self._flush_count += 1
+        self._last_flush_ms = elapsed_ms
+        self._last_flush_rows = len(batch)
+        self._max_flush_ms = max(self._max_flush_ms, elapsed_ms)
+
     def clear(self) -> None:
-        """Remove all cached entries."""
+        """Remove all cached entries, including puts still queued for write-behind."""
+        self.flush()
         with self._lock:
             self._conn.execute("DELETE FROM enrichment_cache")
+            self._conn.execute("DELETE FROM negative_cache")
             self._conn.commit()
+        if self._memory is not None:
+            self._memory.clear()
+        with self._touch_lock:
+            self._touches.clear()
 
     def get_all_for_ioc(self, ioc_value: str, ioc_type: str) -> list[dict]:
         """Return all cached results for one IOC across all providers.
@@ -130,16 +686,19 @@ class CacheStore:
         Returns:
             List of dicts, each with provider, cached_at, and all result fields.
         """
-        with self._lock:
-            rows = self._conn.execute(
-                "SELECT provider, result_json, cached_at FROM enrichment_cache "
-                "WHERE ioc_value = ? AND ioc_type = ?",
-                (ioc_value, ioc_type),
-            ).fetchall()
+        rows = self._pool.reader().execute(
+            "SELECT provider, result_json, cached_at FROM enrichment_cache "
+            "WHERE ioc_value = ? AND ioc_type = ?",
+            (ioc_value, ioc_type),
+        ).fetchall()
 
         results: list[dict] = []
-        for provider, result_json, cached_at in rows:
-            entry: dict = json.loads(result_json)
+        for provider, payload, cached_at in rows:
+            try:
+                entry: dict = decode_payload(payload)
+            except ValueError:
+                logger.warning("Skipped undecodable cache row for %s (%s)", ioc_value, provider)
+                continue
             entry["provider"] = provider
             entry["cached_at"] = cached_at
             results.append(entry)
@@ -150,37 +709,193 @@ class CacheStore:
         """Return cache statistics.
 
         Returns:
-            Dict with 'total_entries' (int) and 'oldest' (ISO string or None).
+            Dict with 'total_entries' (int), 'oldest' (ISO string or None) and
+            write-behind metrics: 'write_behind' (bool), 'queue_depth' (rows
+            waiting to be committed), 'flushes', 'last_flush_rows',
+            'last_flush_ms' and 'max_flush_ms'.  Per-tier lookup counters
+            'memory_hits', 'memory_misses', 'memory_hit_ratio', 'sqlite_hits',
+            'sqlite_misses', 'sqlite_hit_ratio' (the SQLite tier only sees
+            memory-tier misses), plus 'memory_entries', 'memory_bytes' and
+            'memory_max_bytes' for sizing the memory tier.  'negative_entries'
+            and 'negative_hits' describe the negative tier.
         """
-        with self._lock:
-            count = self._conn.execute(
-                "SELECT COUNT(*) FROM enrichment_cache"
-            ).fetchone()[0]
-            oldest_row = self._conn.execute(
-                "SELECT MIN(cached_at) FROM enrichment_cache"
-            ).fetchone()
+        reader = self._pool.reader()
+        count = reader.execute(
+            "SELECT COUNT(*) FROM enrichment_cache"
+        ).fetchone()[0]
+        negative_count = reader.execute(
+            "SELECT COUNT(*) FROM negative_cache WHERE expires_at_epoch > ?",
+            (int(time.time()),),
+        ).fetchone()[0]
+        oldest_row = reader.execute(
+            "SELECT cached_at FROM enrichment_cache ORDER BY cached_at_epoch LIMIT 1"
+        ).fetchone()
 
         oldest = oldest_row[0] if oldest_row else None
-        return {"total_entries": count, "oldest": oldest}
+        memory_entries, memory_bytes = (
+            self._memory.usage() if self._memory is not None else (0, 0)
+        )
+        with self._stats_lock:
+            tiers = {
+                "memory_hits": self._memory_hits,
+                "memory_misses": self._memory_misses,
+                "memory_hit_ratio": _ratio(self._memory_hits, self._memory_misses),
+                "sqlite_hits": self._sqlite_hits,
+                "sqlite_misses": self._sqlite_misses,
+                "sqlite_hit_ratio": _ratio(self._sqlite_hits, self._sqlite_misses),
+                "negative_hits": self._negative_hits,
+            }
+        return {
+            "total_entries": count,
+            "oldest": oldest,
+            "write_behind": self._write_behind,
+            "queue_depth": self._queue.qsize(),
+            "flushes": self._flush_count,
+            "last_flush_rows": self._last_flush_rows,
+            "last_flush_ms": round(self._last_flush_ms, 3),
+            "max_flush_ms": round(self._max_flush_ms, 3),
+            **tiers,
+            "memory_entries": memory_entries,
+            "memory_bytes": memory_bytes,
+            "memory_max_bytes": self._memory.max_bytes if self._memory is not None else 0,
+            "negative_entries": negative_count,
+        }
 
-    def purge_expired(self, ttl_seconds: int) -> int:
+    def purge_expired(self, ttl_seconds: int, batch_rows: int = _PURGE_BATCH_ROWS) -> int:
         """Delete cache entries older than ttl_seconds.
 
+        Uses the cached_at_epoch index and deletes in batches of batch_rows,
+        committing and releasing the write lock between batches so concurrent
+        puts are never blocked for the duration of a large purge.
+
         Args:
             ttl_seconds: Maximum age in seconds. Entries older than this
                          are deleted.
+            batch_rows:  Maximum rows deleted per transaction.
 
         Returns:
             Number of rows deleted.
         """
-        cutoff = (
-            datetime.datetime.now(tz=datetime.timezone.utc)
-            - datetime.timedelta(seconds=ttl_seconds)
-        ).isoformat()
+        cutoff = int(time.time()) - ttl_seconds
+        if self._memory is not None:
+            self._memory.purge_older_than(cutoff)
+        deleted = 0
+        while True:
+            with self._lock:
+                cursor = self._conn.execute(
+                    "DELETE FROM enrichment_cache WHERE rowid IN ("
+                    "  SELECT rowid FROM enrichment_cache "
+                    "  WHERE cached_at_epoch <= ? LIMIT ?"
+                    ")",
+                    (cutoff, batch_rows),
+                )
+                self._conn.commit()
+            deleted += cursor.rowcount
+            if cursor.rowcount < batch_rows:
+                return deleted
+
+    def evict_lru(
+        self,
+        max_rows: int = 0,
+        max_bytes: int = 0,
+        batch_rows: int = _EVICT_BATCH_ROWS,
+    ) -> int:
+        """Evict least recently used entries until the cache fits its budget.
+
+        Pending write-behind rows and buffered access times are flushed first
+        so recency is current.  Rows are deleted in batches of at most
+        batch_rows, releasing the write lock between batches.
+
+        The byte budget is compared against the pages SQLite is actually
+        using (page_count minus freelist_count), so freed space counts as
+        reclaimed even before compact() returns it to the filesystem.
+
+        Args:
+            max_rows:   Maximum number of rows to keep; 0 means unlimited.
+            max_bytes:  Maximum bytes of used database pages; 0 means unlimited.
+            batch_rows: Maximum rows deleted per transaction.
+
+        Returns:
+            Number of rows evicted.
+        """
+        self.flush()
+        self.flush_access_times()
+        evicted = 0
+
+        if max_rows > 0:
+            excess = self._row_count() - max_rows
+            while excess > 0:
+                deleted = self._delete_lru(min(excess, batch_rows))
+                if not deleted:
+                    break
+                evicted += deleted
+                excess -= deleted
+
+        if max_bytes > 0:
+            while True:
+                used = self._used_bytes()
+                if used <= max_bytes:
+                    break
+                # Estimate the rows holding the overshoot from the mean row size.
+                rows = self._row_count()
+                if rows == 0:
+                    break
+                wanted = math.ceil(rows * (used - max_bytes) / used)
+                deleted = self._delete_lru(min(max(wanted, 1), batch_rows))
+                if not deleted:
+                    break
+                evicted += deleted
+
+        return evicted
+
+    def _row_count(self) -> int:
         with self._lock:
-            cursor = self._conn.execute(
-                "DELETE FROM enrichment_cache WHERE cached_at < ?",
-                (cutoff,),
-            )
+            return self._conn.execute("SELECT COUNT(*) FROM enrichment_cache").fetchone()[0]
+
+    def _used_bytes(self) -> int:
+        """Return bytes of in-use (non-free) pages in the main database file."""
+        with self._lock:
+            page_count = self._conn.execute("PRAGMA page_count").fetchone()[0]
+            free_pages = self._conn.execute("PRAGMA freelist_count").fetchone()[0]
+            page_size = self._conn.execute("PRAGMA page_size").fetchone()[0]
+        return (page_count - free_pages) * page_size
+
+    def _delete_lru(self, limit: int) -> int:
+        """Delete up to limit least recently used rows; return the number deleted."""
+        with self._lock:
+            keys = self._conn.execute(
+                "DELETE FROM enrichment_cache WHERE rowid IN ("
+                "  SELECT rowid FROM enrichment_cache "
+                "  ORDER BY last_accessed_epoch, cached_at_epoch LIMIT ?"
+                ") RETURNING ioc_value, ioc_type, provider",
+                (limit,),
+            ).fetchall()
             self._conn.commit()
-            return cursor.rowcount
+        if self._memory is not None:
+            for key in keys:
+                self._memory.discard(tuple(key))  # type: ignore[arg-type]
+        return len(keys)
+
+    def compact(self) -> None:
+        """Return free pages to the filesystem and truncate the WAL.
+
+        Runs ``PRAGMA incremental_vacuum`` (a no-op on databases created before
+        auto_vacuum=INCREMENTAL was enabled) and
+        ``PRAGMA wal_checkpoint(TRUNCATE)``.  Both hold the write lock, so call
+        this from a background task, not a request handler.
+        """
+        with self._lock:
+            # executescript() steps the pragma to completion; execute() would
+            # free a single page per call.
+            self._conn.executescript("PRAGMA incremental_vacuum;")
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+
+    def db_size_bytes(self) -> int:
+        """Return the on-disk size of the database file plus its WAL."""
+        total = 0
+        for path in (self._db_path, self._db_path.with_name(self._db_path.name + "-wal")):
+            try:
+                total += path.stat().st_size
+            except FileNotFoundError:
+                pass
+        return total
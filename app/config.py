@@ -29,6 +29,34 @@ class Config:
     # SEC-19: SameSite cookie attribute for CSRF defense-in-depth
     SESSION_COOKIE_SAMESITE: str = "Lax"
 
+    # Seconds between background cache maintenance runs (purge, LRU eviction,
+    # incremental vacuum).  0 disables the maintenance thread.
+    CACHE_MAINTENANCE_INTERVAL: int = 15 * 60
+
+    # Global cap on enrichment worker threads, shared fairly by all jobs.
+    ENRICHMENT_MAX_WORKERS: int = 32
+
+    # Enrichment engine: "thread" (lookups on ENRICHMENT_MAX_WORKERS threads) or
+    # "async" (one event-loop thread; blocking adapters bridged to a thread pool).
+    ENRICHMENT_ENGINE: str = os.environ.get("SENTINELX_ENRICHMENT_ENGINE", "thread")
+
+    # Hedged requests: re-send a slow idempotent GET to a zero-auth provider once
+    # it has outlived that provider's p95 latency, and take the first answer.
+    ENRICHMENT_HEDGING: bool = os.environ.get("SENTINELX_ENRICHMENT_HEDGING", "") == "1"
+
+    # Enrichment job state: "memory" (per process) or "sqlite" (one database
+    # shared by every worker process; status can be served by any worker and
+    # jobs interrupted by a restart are resumed).  JOB_STORE_PATH defaults to
+    # ~/.sentinelx/jobs.db.  A job whose owner has not renewed its lease for
+    # JOB_LEASE_SECONDS is taken over by another process.
+    JOB_STORE: str = os.environ.get("SENTINELX_JOB_STORE", "memory")
+    JOB_STORE_PATH: str = os.environ.get("SENTINELX_JOB_STORE_PATH", "")
+    JOB_LEASE_SECONDS: float = 30.0
+
+    # Dispatch priority overrides, "Provider Name=priority,..." (lower runs
+    # first), on top of the defaults in app/enrichment/priority.py.
+    PROVIDER_PRIORITY: str = os.environ.get("SENTINELX_PROVIDER_PRIORITY", "")
+
     # SSRF prevention: allowlist of permitted outbound API hostnames (SEC-16)
     # Phase 2: VirusTotal; Phase 3: MalwareBazaar and ThreatFox (abuse.ch) added.
     # Phase 25: Shodan InternetDB (zero-auth)
@@ -36,6 +64,7 @@ class Config:
     # v6.0 Phase 01-01: CIRCL Hashlookup NSRL (zero-auth)
     # v6.0 Phase 02-03: crt.sh Certificate Transparency (zero-auth)
     # v6.0 Phase 03-01: ThreatMiner passive DNS (zero-auth)
+    # Team Cymru bulk whois (port 43, not HTTP) for batched ASN lookups
     ALLOWED_API_HOSTS: list[str] = [
         "www.virustotal.com",
         "mb-api.abuse.ch",
@@ -49,6 +78,7 @@ class Config:
         "hashlookup.circl.lu",     # v6.0 Phase 01-01: CIRCL Hashlookup NSRL (zero-auth)
         "crt.sh",                  # v6.0 Phase 02-03: crt.sh Certificate Transparency (zero-auth)
         "api.threatminer.org",     # v6.0 Phase 03-01: ThreatMiner passive DNS (zero-auth)
+        "whois.cymru.com",         # Team Cymru bulk whois, port 43 (ASN Intel batches)
     ]
 
     def validate(self) -> None:
@@ -3,7 +3,7 @@ from __future__ import annotations
 
 import logging
 
-from app.enrichment.adapters.base import BaseHTTPAdapter
+from app.enrichment.adapters.async_base import AsyncBaseHTTPAdapter
 from app.enrichment.models import EnrichmentError, EnrichmentResult
 from app.pipeline.models import IOC, IOCType
 
@@ -12,7 +12,7 @@ logger = logging.getLogger(__name__)
 ABUSEIPDB_BASE = "https://api.abuseipdb.com/api/v2/check"
 
 
-class AbuseIPDBAdapter(BaseHTTPAdapter):
+class AbuseIPDBAdapter(AsyncBaseHTTPAdapter):
     """AbuseIPDB check endpoint — see BaseHTTPAdapter for the template pattern."""
 
     supported_types: frozenset[IOCType] = frozenset({IOCType.IPV4, IOCType.IPV6})
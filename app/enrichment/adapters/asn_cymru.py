@@ -1,13 +1,30 @@
-"""Team Cymru DNS-based IP-to-ASN lookup adapter (port 53, not HTTP — no SSRF surface)."""
+"""Team Cymru IP-to-ASN lookup adapter: DNS TXT queries per IP, bulk whois per batch.
+
+Single lookups query Cymru's DNS zones (port 53, not HTTP).  Batches of IPs
+(lookup_batch, see provider.BatchProvider) go to Team Cymru's bulk whois
+service instead, which Cymru recommends over per-IP DNS queries for many
+addresses: one TCP connection to whois.cymru.com:43 answers the whole batch.
+That connection is outbound traffic to a fixed host, so like every HTTP
+adapter it only goes ahead when the host is on the SSRF allowlist
+(ALLOWED_API_HOSTS, SEC-16); without it the adapter does not batch.
+
+If the service is unreachable (port 43 is often firewalled) lookup_batch
+raises BatchUnavailable, so the orchestrator spreads the batch's IPs over
+its workers as single DNS lookups, and batching stays off for
+_WHOIS_COOLDOWN seconds instead of every batch paying the connect timeout.
+"""
 from __future__ import annotations
 
 import ipaddress
 import logging
+import socket
+import time
 
 import dns.exception
 import dns.resolver
 
 from app.enrichment.models import EnrichmentError, EnrichmentResult
+from app.enrichment.provider import BatchUnavailable
 from app.pipeline.models import IOC, IOCType
 
 logger = logging.getLogger(__name__)
@@ -21,6 +38,15 @@ _IPV6_SUFFIX = ".ip6.arpa"
 _CYMRU_ZONE_V4 = ".origin.asn.cymru.com"
 _CYMRU_ZONE_V6 = ".origin6.asn.cymru.com"
 
+# Bulk whois service (fixed host, never derived from IOC data; must be allowlisted).
+_WHOIS_HOST = "whois.cymru.com"
+_WHOIS_PORT = 43
+_WHOIS_TIMEOUT: float = 10.0
+_WHOIS_MAX_BYTES = 1 * 1024 * 1024
+_WHOIS_COOLDOWN: float = 300.0  # seconds without batching after the service failed
+
+_IP_TYPES: frozenset[IOCType] = frozenset({IOCType.IPV4, IOCType.IPV6})
+
 
 class CymruASNAdapter:
     """Team Cymru IP-to-ASN lookup via DNS TXT queries — verdict always no_data."""
@@ -28,11 +54,20 @@ class CymruASNAdapter:
     name = "ASN Intel"
     supported_types: frozenset[IOCType] = frozenset({IOCType.IPV4, IOCType.IPV6})
     requires_api_key = False
+    max_batch_size = 500
 
     def __init__(self, allowed_hosts: list[str]) -> None:
-        # Accepted for API compatibility with Provider protocol; intentionally unused.
-        # DNS uses port 53 directly — no HTTP, no SSRF surface.
-        pass
+        # DNS lookups (port 53) need no allowlist entry; the bulk whois
+        # connection of lookup_batch() is made only if _WHOIS_HOST is on it.
+        self._allowed_hosts = allowed_hosts
+        self._whois_retry_at = 0.0  # time.monotonic() before which bulk whois is skipped
+
+    @property
+    def batch_types(self) -> frozenset[IOCType]:
+        """IP types while bulk whois is usable; none (no batching) otherwise."""
+        if _WHOIS_HOST not in self._allowed_hosts or time.monotonic() < self._whois_retry_at:
+            return frozenset()
+        return _IP_TYPES
 
     def is_configured(self) -> bool:
         return True
@@ -96,6 +131,106 @@ class CymruASNAdapter:
                 error="Unexpected error",
             )
 
+    def lookup_batch(self, iocs: list[IOC]) -> list[EnrichmentResult | EnrichmentError]:
+        """Look up many IPs with one bulk whois query.
+
+        Returns the same results lookup() would: no_data with ASN context in
+        raw_stats, or no_data with empty raw_stats for unrouted IPs.
+
+        Raises:
+            BatchUnavailable: Bulk whois is not allowlisted, cooling down
+                              after a failure, or just failed.
+        """
+        if not self.batch_types:
+            raise BatchUnavailable(f"{_WHOIS_HOST} bulk whois unavailable")
+        addresses: list[str | None] = []  # normalised IP per IOC, None if invalid
+        for ioc in iocs:
+            try:
+                addresses.append(str(ipaddress.ip_address(ioc.value)))
+            except ValueError:
+                addresses.append(None)
+
+        records: dict[str, list[str]] = {}
+        wanted = list(dict.fromkeys(ip for ip in addresses if ip is not None))
+        if wanted:
+            try:
+                records = _query_bulk_whois(wanted, self._allowed_hosts)
+            except (OSError, ValueError) as exc:
+                self._whois_retry_at = time.monotonic() + _WHOIS_COOLDOWN
+                logger.warning(
+                    "Cymru bulk whois failed (%s); using DNS lookups for %.0f s",
+                    exc, _WHOIS_COOLDOWN,
+                )
+                raise BatchUnavailable(str(exc)) from exc
+
+        results: list[EnrichmentResult | EnrichmentError] = []
+        for ioc, ip in zip(iocs, addresses):
+            parts = records.get(ip) if ip is not None else None
+            if ip is None or ioc.type not in self.supported_types:
+                results.append(self.lookup(ioc))  # the same error a single lookup gives
+            elif parts is None or parts[0] == "NA":
+                # Not announced — same as an NXDOMAIN from the DNS interface.
+                results.append(EnrichmentResult(
+                    ioc=ioc,
+                    provider=self.name,
+                    verdict="no_data",
+                    detection_count=0,
+                    total_engines=0,
+                    scan_date=None,
+                    raw_stats={},
+                ))
+            else:
+                # Verbose columns: AS | IP | BGP Prefix | CC | Registry | Allocated | AS Name
+                txt = " | ".join([parts[0], *parts[2:6]])
+                results.append(_parse_response(ioc, txt, self.name))
+        return results
+
+
+def _query_bulk_whois(addresses: list[str], allowed_hosts: list[str]) -> dict[str, list[str]]:
+    """Send one bulk query to whois.cymru.com; return the reply columns keyed by IP.
+
+    Raises:
+        OSError:    On connection failure or timeout.
+        ValueError: If _WHOIS_HOST is not in allowed_hosts (SEC-16), or the
+                    reply exceeds _WHOIS_MAX_BYTES.
+    """
+    if _WHOIS_HOST not in allowed_hosts:
+        raise ValueError(
+            f"Bulk whois host {_WHOIS_HOST!r} not in allowed_hosts (SSRF allowlist SEC-16)"
+        )
+    query = "begin\nverbose\n" + "\n".join(addresses) + "\nend\n"
+    chunks: list[bytes] = []
+    total = 0
+    with socket.create_connection((_WHOIS_HOST, _WHOIS_PORT), timeout=_WHOIS_TIMEOUT) as sock:
+        sock.sendall(query.encode("ascii"))
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            total += len(chunk)
+            if total > _WHOIS_MAX_BYTES:
+                raise ValueError(f"Bulk whois reply exceeded {_WHOIS_MAX_BYTES} bytes")
+            chunks.append(chunk)
+    return _parse_bulk_reply(b"".join(chunks).decode("utf-8", errors="replace"))
+
+
+def _parse_bulk_reply(reply: str) -> dict[str, list[str]]:
+    """Split a verbose bulk whois reply into columns, keyed by the normalised IP column.
+
+    The banner ("Bulk mode; ...") and column header lines are skipped.
+    """
+    records: dict[str, list[str]] = {}
+    for line in reply.splitlines():
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) < 3:
+            continue
+        try:
+            ip = str(ipaddress.ip_address(parts[1]))
+        except ValueError:
+            continue  # header line
+        records[ip] = parts
+    return records
+
 
 def _parse_response(ioc: IOC, txt: str, provider_name: str) -> EnrichmentResult:
     """Parse a pipe-delimited Cymru TXT record: "ASN | prefix | cc | rir | allocated"."""
@@ -0,0 +1,84 @@
+"""Asyncio counterpart of BaseHTTPAdapter for the async enrichment engine.
+
+AsyncBaseHTTPAdapter keeps BaseHTTPAdapter's whole contract — the same
+_build_url / _parse_response / _make_pre_raise_hook / _build_request_body
+hooks and the same synchronous lookup() — and adds alookup(), which runs the
+identical template-method pipeline through async_safe_request() instead of
+safe_request().  Adapters that only fill in the hooks can switch their base
+class and work unchanged on both engines.
+
+The request headers are taken from the adapter's requests.Session, so
+_auth_headers() applies to both paths.  Pre-raise hooks receive an
+AsyncResponse, which exposes status_code, reason and headers like a
+requests.Response.
+
+Adapters that override lookup() itself (DNS, WHOIS, VirusTotal, crt.sh, ...)
+stay on BaseHTTPAdapter; the async engine bridges them to a thread pool.
+"""
+from __future__ import annotations
+
+from app.enrichment.adapters.base import BaseHTTPAdapter
+from app.enrichment.async_http import AsyncHTTPClient, async_safe_request
+from app.enrichment.models import EnrichmentError, EnrichmentResult
+from app.pipeline.models import IOC
+
+
+class AsyncBaseHTTPAdapter(BaseHTTPAdapter):
+    """BaseHTTPAdapter with an additional coroutine lookup, alookup().
+
+    Args:
+        allowed_hosts: SSRF allowlist (SEC-16).
+        api_key:       Optional API key (keyword-only, default empty string).
+    """
+
+    def __init__(self, allowed_hosts: list[str], *, api_key: str = "") -> None:
+        super().__init__(allowed_hosts, api_key=api_key)
+        self._async_client: AsyncHTTPClient | None = None
+
+    async def alookup(
+        self, ioc: IOC, client: AsyncHTTPClient | None = None
+    ) -> EnrichmentResult | EnrichmentError:
+        """Enrich a single IOC on the running event loop.
+
+        Same steps as lookup(), with async_safe_request() as the transport.
+
+        Args:
+            ioc:    The IOC to look up.
+            client: Shared AsyncHTTPClient (the engine's). Defaults to one
+                    owned by this adapter.
+
+        Returns:
+            EnrichmentResult on success, EnrichmentError on failure.
+        """
+        if ioc.type not in self.supported_types:
+            return EnrichmentError(
+                ioc=ioc, provider=self.name, error="Unsupported type",
+            )
+
+        if client is None:
+            if self._async_client is None:
+                self._async_client = AsyncHTTPClient()
+            client = self._async_client
+
+        url = self._build_url(ioc)
+        hook = self._make_pre_raise_hook(ioc)
+        data, json_payload = self._build_request_body(ioc)
+
+        result = await async_safe_request(
+            client,
+            url,
+            self._allowed_hosts,
+            ioc,
+            self.name,
+            method=self._http_method,
+            headers=dict(self._session.headers),
+            data=data,
+            json_payload=json_payload,
+            pre_raise_hook=hook,
+            hedge=self._hedgeable(),
+        )
+
+        if not isinstance(result, dict):
+            return result
+
+        return self._parse_response(ioc, result)
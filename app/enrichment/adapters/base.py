@@ -1,7 +1,9 @@
 """Abstract base class for HTTP-based enrichment adapters.
 
 Provides the shared skeleton that all HTTP adapters follow:
-  - Session creation with auth headers
+  - Session creation with auth headers, mounted on the process-wide
+    connection pools (http_pool.HTTP_POOLS) so keep-alive connections
+    survive registry rebuilds
   - is_configured() logic (api_key-gated or always-on)
   - Template-method lookup(): type guard → build URL → safe_request → parse
 
@@ -15,6 +17,8 @@ Optional overrides:
   - _make_pre_raise_hook(ioc) → callable | None (default: None)
   - _http_method: str class var (default: "GET")
   - _build_request_body(ioc) → (data, json_payload) tuple (default: (None, None))
+  - hedge_requests: bool class var (default: True) — allow hedged requests;
+    only ever applied to zero-auth GET adapters (see _hedgeable())
 
 Does NOT inherit from Provider — structural duck typing satisfies the protocol.
 Does NOT import any adapter-specific module.
@@ -26,6 +30,7 @@ import logging
 
 import requests
 
+from app.enrichment.http_pool import HTTP_POOLS
 from app.enrichment.http_safety import safe_request
 from app.enrichment.models import EnrichmentError, EnrichmentResult
 from app.pipeline.models import IOC, IOCType
@@ -58,12 +63,14 @@ class BaseHTTPAdapter(abc.ABC):
 
     # --- Override points with sensible defaults --------------------------------
     _http_method: str = "GET"
+    hedge_requests: bool = True
 
     def __init__(self, allowed_hosts: list[str], *, api_key: str = "") -> None:
         self._allowed_hosts = allowed_hosts
         self._api_key = api_key
         self._session = requests.Session()
         self._session.headers.update(self._auth_headers())
+        HTTP_POOLS.mount(self._session, self.name)
 
     # --- Template method: the adapter contract ---------------------------------
 
@@ -114,6 +121,7 @@ class BaseHTTPAdapter(abc.ABC):
             data=data,
             json_payload=json_payload,
             pre_raise_hook=hook,
+            hedge=self._hedgeable(),
         )
 
         if not isinstance(result, dict):
@@ -121,6 +129,14 @@ class BaseHTTPAdapter(abc.ABC):
 
         return self._parse_response(ioc, result)
 
+    def _hedgeable(self) -> bool:
+        """Return True if a slow request may be duplicated (hedged).
+
+        Only idempotent GETs to zero-auth providers qualify, so a hedge never
+        spends API quota or repeats a side-effecting POST.
+        """
+        return self.hedge_requests and not self.requires_api_key and self._http_method == "GET"
+
     # --- Abstract methods subclasses MUST implement ----------------------------
 
     @abc.abstractmethod
@@ -1,10 +1,20 @@
-"""crt.sh certificate transparency adapter."""
+"""crt.sh certificate transparency adapter.
+
+crt.sh answers with every certificate ever logged for the name — close to the
+1 MB cap for popular domains — but only _SUBDOMAIN_CAP subdomains are kept.
+The response is parsed element by element (iter_json_array) and reading stops
+once that many unique subdomains have been seen; raw_stats["truncated"] then
+marks cert_count and the date range as covering only the certificates read.
+"""
 from __future__ import annotations
 
+import contextlib
 import logging
 
+import requests
+
 from app.enrichment.adapters.base import BaseHTTPAdapter
-from app.enrichment.http_safety import safe_request
+from app.enrichment.http_safety import iter_json_array, safe_request
 from app.enrichment.models import EnrichmentError, EnrichmentResult
 from app.pipeline.models import IOC, IOCType
 
@@ -32,10 +42,12 @@ class CrtShAdapter(BaseHTTPAdapter):
         url = self._build_url(ioc)
         result = safe_request(
             self._session, url, self._allowed_hosts, ioc, self.name,
+            hedge=self._hedgeable(), reader=_read_certs,
         )
         if isinstance(result, EnrichmentError):
             return result
-        return _parse_response(ioc, result, self.name)
+        certs, truncated = result
+        return _parse_response(ioc, certs, self.name, truncated=truncated)
 
     def _build_url(self, ioc: IOC) -> str:
         return f"{CRTSH_BASE}/?q={ioc.value}&output=json"
@@ -45,7 +57,34 @@ class CrtShAdapter(BaseHTTPAdapter):
         return _parse_response(ioc, body, self.name)  # type: ignore[arg-type]
 
 
-def _parse_response(ioc: IOC, body: list, provider_name: str) -> EnrichmentResult:
+def _read_certs(resp: requests.Response) -> tuple[list, bool]:
+    """Read certificates until _SUBDOMAIN_CAP unique subdomains are known.
+
+    Returns (certificates read, whether the rest of the response was skipped).
+    """
+    certs: list = []
+    seen: set[str] = set()
+    with contextlib.closing(iter_json_array(resp)) as entries:
+        for entry in entries:
+            certs.append(entry)
+            seen.update(_names(entry))
+            if len(seen) >= _SUBDOMAIN_CAP:
+                return certs, next(entries, None) is not None
+    return certs, False
+
+
+def _names(entry: dict) -> list[str]:
+    """Normalized names of one certificate's name_value (SANs)."""
+    name_value = entry.get("name_value")
+    if not name_value:
+        return []
+    names = (raw_name.strip().lstrip("*.").lower() for raw_name in name_value.split("\n"))
+    return [name for name in names if name]
+
+
+def _parse_response(
+    ioc: IOC, body: list, provider_name: str, truncated: bool = False
+) -> EnrichmentResult:
     # Empty response: no certificates found
     if not body:
         return EnrichmentResult(
@@ -72,17 +111,19 @@ def _parse_response(ioc: IOC, body: list, provider_name: str) -> EnrichmentResul
     # Collect subdomains from name_value (SANs), normalizing each entry
     subdomain_set: set[str] = set()
     for entry in body:
-        name_value = entry.get("name_value")
-        if not name_value:
-            continue
-        for raw_name in name_value.split("\n"):
-            cleaned = raw_name.strip().lstrip("*.").lower()
-            if cleaned:
-                subdomain_set.add(cleaned)
+        subdomain_set.update(_names(entry))
 
     # Sort alphabetically, cap at _SUBDOMAIN_CAP
     subdomains: list[str] = sorted(subdomain_set)[:_SUBDOMAIN_CAP]
 
+    raw_stats = {
+        "cert_count": cert_count,
+        "earliest": earliest,
+        "latest": latest,
+        "subdomains": subdomains,
+    }
+    if truncated:
+        raw_stats["truncated"] = True
     return EnrichmentResult(
         ioc=ioc,
         provider=provider_name,
@@ -90,10 +131,5 @@ def _parse_response(ioc: IOC, body: list, provider_name: str) -> EnrichmentResul
         detection_count=0,
         total_engines=0,
         scan_date=None,
-        raw_stats={
-            "cert_count": cert_count,
-            "earliest": earliest,
-            "latest": latest,
-            "subdomains": subdomains,
-        },
+        raw_stats=raw_stats,
     )
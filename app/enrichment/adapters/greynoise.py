@@ -3,7 +3,7 @@ from __future__ import annotations
 
 import logging
 
-from app.enrichment.adapters.base import BaseHTTPAdapter
+from app.enrichment.adapters.async_base import AsyncBaseHTTPAdapter
 from app.enrichment.models import EnrichmentError, EnrichmentResult
 from app.pipeline.models import IOC, IOCType
 
@@ -12,7 +12,7 @@ logger = logging.getLogger(__name__)
 GREYNOISE_BASE = "https://api.greynoise.io/v3/community"
 
 
-class GreyNoiseAdapter(BaseHTTPAdapter):
+class GreyNoiseAdapter(AsyncBaseHTTPAdapter):
     """GreyNoise Community endpoint — see BaseHTTPAdapter for the template pattern."""
 
     supported_types: frozenset[IOCType] = frozenset({IOCType.IPV4, IOCType.IPV6})
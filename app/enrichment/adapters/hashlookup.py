@@ -1,10 +1,17 @@
-"""CIRCL Hashlookup NSRL adapter."""
+"""CIRCL Hashlookup NSRL adapter.
+
+MD5 and SHA-1 lookups can also be sent in bulk (lookup_batch, see
+provider.BatchProvider): one POST to /bulk/<type> answers up to
+max_batch_size hashes.  There is no bulk endpoint for SHA-256.
+"""
 from __future__ import annotations
 
+import dataclasses
 import logging
 
-from app.enrichment.adapters.base import BaseHTTPAdapter
-from app.enrichment.models import EnrichmentResult
+from app.enrichment.adapters.async_base import AsyncBaseHTTPAdapter
+from app.enrichment.http_safety import safe_request
+from app.enrichment.models import EnrichmentError, EnrichmentResult
 from app.pipeline.models import IOC, IOCType
 
 logger = logging.getLogger(__name__)
@@ -18,13 +25,21 @@ _HASH_TYPE_PATH: dict[IOCType, str] = {
     IOCType.SHA256: "sha256",
 }
 
+# Key holding the queried hash in each record of a bulk response
+_BULK_HASH_KEY: dict[IOCType, str] = {
+    IOCType.MD5: "MD5",
+    IOCType.SHA1: "SHA-1",
+}
+
 
-class HashlookupAdapter(BaseHTTPAdapter):
+class HashlookupAdapter(AsyncBaseHTTPAdapter):
     """CIRCL Hashlookup NSRL endpoint — see BaseHTTPAdapter for the template pattern."""
 
     supported_types: frozenset[IOCType] = frozenset({IOCType.MD5, IOCType.SHA1, IOCType.SHA256})
     name = "CIRCL Hashlookup"
     requires_api_key = False
+    max_batch_size = 100
+    batch_types: frozenset[IOCType] = frozenset(_BULK_HASH_KEY)
 
     def _build_url(self, ioc: IOC) -> str:
         hash_path = _HASH_TYPE_PATH[ioc.type]
@@ -33,21 +48,80 @@ class HashlookupAdapter(BaseHTTPAdapter):
     def _make_pre_raise_hook(self, ioc: IOC):
         def _404_hook(resp):
             if resp.status_code == 404:
-                return EnrichmentResult(
-                    ioc=ioc,
-                    provider=self.name,
-                    verdict="no_data",
-                    detection_count=0,
-                    total_engines=0,
-                    scan_date=None,
-                    raw_stats={},
-                )
+                return _no_data(ioc, self.name)
             return None
         return _404_hook
 
     def _parse_response(self, ioc: IOC, body: dict) -> EnrichmentResult:
         return _parse_response(ioc, body, self.name)
 
+    def lookup_batch(self, iocs: list[IOC]) -> list[EnrichmentResult | EnrichmentError]:
+        """Look up MD5 / SHA-1 hashes with one POST per hash type.
+
+        Hashes found in the response are known_good; hashes missing from it
+        are no_data, as a 404 is for a single lookup.  Other IOC types fall
+        back to lookup().
+        """
+        results: list[EnrichmentResult | EnrichmentError | None] = [None] * len(iocs)
+        for ioc_type, key in _BULK_HASH_KEY.items():
+            indices = [i for i, ioc in enumerate(iocs) if ioc.type == ioc_type]
+            if not indices:
+                continue
+            found = self._bulk_query(ioc_type, key, [iocs[i] for i in indices])
+            for i in indices:
+                ioc = iocs[i]
+                if isinstance(found, EnrichmentError):
+                    results[i] = dataclasses.replace(found, ioc=ioc)
+                elif ioc.value.lower() in found:
+                    results[i] = _parse_response(ioc, found[ioc.value.lower()], self.name)
+                else:
+                    results[i] = _no_data(ioc, self.name)
+        return [
+            result if result is not None else self.lookup(ioc)
+            for ioc, result in zip(iocs, results)
+        ]
+
+    def _bulk_query(
+        self, ioc_type: IOCType, key: str, iocs: list[IOC]
+    ) -> dict[str, dict] | EnrichmentError:
+        """POST one bulk request; return found records keyed by lower-case hash."""
+        body = safe_request(
+            self._session,
+            f"{HASHLOOKUP_BASE}/bulk/{_HASH_TYPE_PATH[ioc_type]}",
+            self._allowed_hosts,
+            iocs[0],
+            self.name,
+            method="POST",
+            json_payload={"hashes": [ioc.value for ioc in iocs]},
+            pre_raise_hook=self._make_pre_raise_hook(iocs[0]),
+        )
+        if isinstance(body, EnrichmentResult):
+            return {}  # 404: none of the hashes is known
+        if isinstance(body, EnrichmentError):
+            return body
+        if not isinstance(body, list):
+            return EnrichmentError(
+                ioc=iocs[0], provider=self.name, error="Unexpected bulk response"
+            )
+        return {
+            record[key].lower(): record
+            for record in body
+            if isinstance(record, dict) and isinstance(record.get(key), str)
+        }
+
+
+def _no_data(ioc: IOC, provider_name: str) -> EnrichmentResult:
+    # Hash not in NSRL: absence of evidence, not a clean verdict
+    return EnrichmentResult(
+        ioc=ioc,
+        provider=provider_name,
+        verdict="no_data",
+        detection_count=0,
+        total_engines=0,
+        scan_date=None,
+        raw_stats={},
+    )
+
 
 def _parse_response(ioc: IOC, body: dict, provider_name: str) -> EnrichmentResult:
     # 200 always means known_good (hash found in NSRL)
@@ -3,7 +3,7 @@ from __future__ import annotations
 
 import logging
 
-from app.enrichment.adapters.base import BaseHTTPAdapter
+from app.enrichment.adapters.async_base import AsyncBaseHTTPAdapter
 from app.enrichment.models import EnrichmentResult
 from app.pipeline.models import IOC, IOCType
 
@@ -12,7 +12,7 @@ logger = logging.getLogger(__name__)
 IPINFO_BASE = "https://ipinfo.io"
 
 
-class IPApiAdapter(BaseHTTPAdapter):
+class IPApiAdapter(AsyncBaseHTTPAdapter):
     """ipinfo.io GeoIP/rDNS — see _make_pre_raise_hook for private-IP handling."""
 
     supported_types: frozenset[IOCType] = frozenset({IOCType.IPV4, IOCType.IPV6})
@@ -3,7 +3,7 @@ from __future__ import annotations
 
 import logging
 
-from app.enrichment.adapters.base import BaseHTTPAdapter
+from app.enrichment.adapters.async_base import AsyncBaseHTTPAdapter
 from app.enrichment.models import EnrichmentResult
 from app.pipeline.models import IOC, IOCType
 
@@ -12,7 +12,7 @@ logger = logging.getLogger(__name__)
 MB_BASE = "https://mb-api.abuse.ch/api/v1/"
 
 
-class MBAdapter(BaseHTTPAdapter):
+class MBAdapter(AsyncBaseHTTPAdapter):
     """MalwareBazaar hash lookup — see BaseHTTPAdapter for the template pattern."""
 
     # Only hash types are supported — MalwareBazaar has no IP/domain/URL endpoint
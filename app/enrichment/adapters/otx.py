@@ -3,7 +3,7 @@ from __future__ import annotations
 
 import logging
 
-from app.enrichment.adapters.base import BaseHTTPAdapter
+from app.enrichment.adapters.async_base import AsyncBaseHTTPAdapter
 from app.enrichment.models import EnrichmentResult
 from app.pipeline.models import IOC, IOCType
 
@@ -29,7 +29,7 @@ _MALICIOUS_THRESHOLD = 5  # pulse_info.count >= this -> malicious
 _SUSPICIOUS_MIN = 1       # pulse_info.count >= this -> suspicious (below malicious threshold)
 
 
-class OTXAdapter(BaseHTTPAdapter):
+class OTXAdapter(AsyncBaseHTTPAdapter):
     """OTX AlienVault v1 endpoint — see BaseHTTPAdapter for the template pattern."""
 
     supported_types: frozenset[IOCType] = frozenset({
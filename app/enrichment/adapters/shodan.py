@@ -3,7 +3,7 @@ from __future__ import annotations
 
 import logging
 
-from app.enrichment.adapters.base import BaseHTTPAdapter
+from app.enrichment.adapters.async_base import AsyncBaseHTTPAdapter
 from app.enrichment.models import EnrichmentResult
 from app.pipeline.models import IOC, IOCType
 
@@ -13,7 +13,7 @@ SHODAN_INTERNETDB_BASE = "https://internetdb.shodan.io"
 _MALICIOUS_TAGS = frozenset({"malware", "compromised", "doublepulsar"})
 
 
-class ShodanAdapter(BaseHTTPAdapter):
+class ShodanAdapter(AsyncBaseHTTPAdapter):
     """Shodan InternetDB endpoint — see BaseHTTPAdapter for the template pattern."""
 
     supported_types: frozenset[IOCType] = frozenset({IOCType.IPV4, IOCType.IPV6})
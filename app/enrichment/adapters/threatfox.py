@@ -3,7 +3,7 @@ from __future__ import annotations
 
 import logging
 
-from app.enrichment.adapters.base import BaseHTTPAdapter
+from app.enrichment.adapters.async_base import AsyncBaseHTTPAdapter
 from app.enrichment.models import EnrichmentResult
 from app.pipeline.models import IOC, IOCType
 
@@ -59,7 +59,7 @@ def _parse_response(ioc: IOC, body: dict) -> EnrichmentResult:
     )
 
 
-class TFAdapter(BaseHTTPAdapter):
+class TFAdapter(AsyncBaseHTTPAdapter):
     """ThreatFox (abuse.ch) POST endpoint — see BaseHTTPAdapter for the template pattern."""
 
     supported_types: frozenset[IOCType] = frozenset({
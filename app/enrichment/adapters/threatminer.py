@@ -60,7 +60,9 @@ class ThreatMinerAdapter(BaseHTTPAdapter):
 
     def _call(self, ioc: IOC, base_url: str, rt: str) -> dict | EnrichmentError:
         url = f"{base_url}?q={ioc.value}&rt={rt}"
-        return safe_request(self._session, url, self._allowed_hosts, ioc, self.name)
+        return safe_request(
+            self._session, url, self._allowed_hosts, ioc, self.name, hedge=self._hedgeable(),
+        )
 
     def _lookup_ip(self, ioc: IOC) -> EnrichmentResult | EnrichmentError:
         body_or_err = self._call(ioc, THREATMINER_BASE_IP, "2")
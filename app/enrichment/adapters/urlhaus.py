@@ -3,7 +3,7 @@ from __future__ import annotations
 
 import logging
 
-from app.enrichment.adapters.base import BaseHTTPAdapter
+from app.enrichment.adapters.async_base import AsyncBaseHTTPAdapter
 from app.enrichment.models import EnrichmentResult
 from app.pipeline.models import IOC, IOCType
 
@@ -22,7 +22,7 @@ _ENDPOINT_MAP: dict[IOCType, tuple[str, str]] = {
 }
 
 
-class URLhausAdapter(BaseHTTPAdapter):
+class URLhausAdapter(AsyncBaseHTTPAdapter):
     """URLhaus multi-endpoint lookup — see BaseHTTPAdapter for the template pattern."""
 
     supported_types: frozenset[IOCType] = frozenset({
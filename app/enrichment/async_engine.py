@@ -0,0 +1,370 @@
+"""Asyncio enrichment engine, an alternative to the thread-per-lookup orchestrator.
+
+EnrichmentOrchestrator holds one worker thread for every lookup in flight,
+because the whole adapter path (BaseHTTPAdapter.lookup → safe_request →
+requests.Session) blocks.  AsyncEnrichmentOrchestrator runs the same job
+model on a single event-loop thread instead:
+
+    - adapters built on AsyncBaseHTTPAdapter are awaited through alookup()
+      and the shared AsyncHTTPClient — no thread per request,
+    - every other adapter (DNS, WHOIS, Cymru ASN, VirusTotal, crt.sh, ...)
+      is bridged with loop.run_in_executor() onto a bounded thread pool,
+    - cache pre-pass, negative caching, single-flight, token-bucket pacing,
+      per-provider concurrency caps and the 429/1s retry policy are the same
+      as the thread engine's; retry delays, token waits and semaphores become
+      their asyncio equivalents so waiting lookups cost a coroutine, not a
+      thread.
+
+EventLoopThread owns the loop, the HTTP client, the bridge pool and the
+single-flight registry, and is shared by every AsyncEnrichmentOrchestrator
+of the app.  enrich_all() keeps its blocking signature: the calling
+(coordinator) thread submits the job's coroutine to the loop and waits.
+
+The engine is selected with the ENRICHMENT_ENGINE config value ("thread",
+the default, or "async").  tools/bench_async_engine.py compares the two.
+
+Usage:
+    loop_thread = EventLoopThread()
+    orchestrator = AsyncEnrichmentOrchestrator(adapters, loop_thread=loop_thread)
+    orchestrator.enrich_all(job_id, iocs)
+"""
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Coroutine
+
+from app.enrichment.async_http import DEFAULT_MAX_PER_HOST, AsyncHTTPClient
+from app.enrichment.circuit_breaker import CIRCUIT_OPEN_ERROR
+from app.enrichment.models import EnrichmentError, EnrichmentResult
+from app.enrichment.orchestrator import BUDGET_EXHAUSTED_ERROR, EnrichmentOrchestrator
+from app.enrichment.policy import (
+    CURRENT_GUARD,
+    REASON_DEADLINE,
+    REASON_MALICIOUS,
+    JobGuard,
+    LookupCancelled,
+    ioc_key,
+)
+from app.enrichment.singleflight import AsyncSingleFlight
+from app.pipeline.models import IOC
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BRIDGE_WORKERS = 32
+
+
+class EventLoopThread:
+    """An asyncio event loop running forever on a daemon thread.
+
+    Args:
+        name:           Thread name (the bridge pool's threads use it as prefix).
+        bridge_workers: Threads available to run_in_executor() for adapters
+                        without alookup().
+        max_per_host:   Passed to the shared AsyncHTTPClient.
+    """
+
+    def __init__(
+        self,
+        name: str = "enrich-loop",
+        bridge_workers: int = DEFAULT_BRIDGE_WORKERS,
+        max_per_host: int = DEFAULT_MAX_PER_HOST,
+    ) -> None:
+        self._name = name
+        self._bridge_workers = bridge_workers
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._bridge: ThreadPoolExecutor | None = None
+        self.http_client = AsyncHTTPClient(max_per_host=max_per_host)
+        self.flights = AsyncSingleFlight()
+
+    def start(self) -> None:
+        """Start the loop thread (idempotent; submit() calls it lazily)."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            loop = asyncio.new_event_loop()
+            self._bridge = ThreadPoolExecutor(
+                max_workers=self._bridge_workers, thread_name_prefix=f"{self._name}-bridge"
+            )
+            loop.set_default_executor(self._bridge)
+            ready = threading.Event()
+
+            def run() -> None:
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            self._loop = loop
+            self._thread = threading.Thread(target=run, name=self._name, daemon=True)
+            self._thread.start()
+            ready.wait()
+
+    def submit(self, coro: Coroutine[Any, Any, Any]) -> Future:
+        """Schedule coro on the loop from any other thread; return its Future."""
+        self.start()
+        assert self._loop is not None  # noqa: S101 — set by start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Close pooled connections, stop the loop and join its thread."""
+        with self._lock:
+            loop, thread, bridge = self._loop, self._thread, self._bridge
+            self._loop = self._thread = self._bridge = None
+        if loop is None or thread is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self.http_client.close(), loop).result(timeout)
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout)
+            loop.close()
+            if bridge is not None:
+                bridge.shutdown(wait=False)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+
+class AsyncEnrichmentOrchestrator(EnrichmentOrchestrator):
+    """EnrichmentOrchestrator whose lookups run as coroutines on an EventLoopThread.
+
+    Accepts every EnrichmentOrchestrator argument; ``executor`` and
+    ``singleflight`` are unused (bridged lookups run on the loop's bridge
+    pool and deduplication uses the loop's AsyncSingleFlight).
+
+    Args:
+        loop_thread: Shared EventLoopThread (app.enrichment_loop). Without one,
+                     enrich_all runs on a private loop thread for the call.
+    """
+
+    def __init__(
+        self,
+        adapters: list[Any],
+        *,
+        loop_thread: EventLoopThread | None = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(adapters, **kwargs)
+        self._loop_thread = loop_thread
+
+    def _run_pending(
+        self, job_id: str, pending_pairs: list[tuple[Any, IOC]], guard: JobGuard | None = None
+    ) -> None:
+        loop_thread = self._loop_thread or EventLoopThread(bridge_workers=self._max_workers)
+        try:
+            loop_thread.submit(
+                self._arun_pending(job_id, pending_pairs, loop_thread, guard)
+            ).result()
+        finally:
+            if loop_thread is not self._loop_thread:
+                loop_thread.stop()
+
+    async def _arun_pending(
+        self,
+        job_id: str,
+        pending_pairs: list[tuple[Any, IOC]],
+        loop_thread: EventLoopThread,
+        guard: JobGuard | None,
+    ) -> None:
+        # asyncio primitives bind to the running loop, so they are built per run.
+        semaphores = {
+            name: asyncio.Semaphore(limit) for name, limit in self._provider_limits.items()
+        }
+        finished: asyncio.Queue[asyncio.Task] = asyncio.Queue()
+        tasks: dict[asyncio.Task, tuple[Any, IOC]] = {}
+        for adapter, ioc in pending_pairs:
+            task = asyncio.ensure_future(
+                self._aguarded_lookup(job_id, guard, adapter, ioc, loop_thread, semaphores)
+            )
+            task.add_done_callback(finished.put_nowait)
+            tasks[task] = (adapter, ioc)
+
+        remaining = len(tasks)
+        while remaining:
+            try:
+                task = await asyncio.wait_for(
+                    finished.get(), guard.remaining() if guard else None
+                )
+            except asyncio.TimeoutError:
+                for task, (adapter, ioc) in tasks.items():
+                    if not task.done():
+                        task.cancel()
+                        self._record_result(job_id, LookupCancelled(
+                            ioc, getattr(adapter, "name", ""), REASON_DEADLINE
+                        ))
+                return
+            remaining -= 1
+            adapter, ioc = tasks[task]
+            if task.cancelled():
+                # Only stop_on_first_malicious cancels tasks before the deadline.
+                self._record_result(
+                    job_id, LookupCancelled(ioc, getattr(adapter, "name", ""), REASON_MALICIOUS)
+                )
+                continue
+            result = task.result()
+            self._record_result(job_id, result)
+            if guard is not None and guard.stopped(ioc):
+                key = ioc_key(ioc)
+                for other, (_, other_ioc) in tasks.items():
+                    if not other.done() and ioc_key(other_ioc) == key:
+                        other.cancel()
+
+    async def _aguarded_lookup(
+        self,
+        job_id: str,
+        guard: JobGuard | None,
+        adapter: Any,
+        ioc: IOC,
+        loop_thread: EventLoopThread,
+        semaphores: dict[str, asyncio.Semaphore],
+    ) -> EnrichmentResult | EnrichmentError | LookupCancelled:
+        # Each task runs in its own context copy, so this does not leak to other jobs.
+        CURRENT_GUARD.set(guard)
+        result = await self._alookup_shared(job_id, adapter, ioc, loop_thread, semaphores)
+        if guard is not None:
+            guard.observe(result)
+        return result
+
+    async def _alookup_shared(
+        self,
+        job_id: str,
+        adapter: Any,
+        ioc: IOC,
+        loop_thread: EventLoopThread,
+        semaphores: dict[str, asyncio.Semaphore],
+    ) -> EnrichmentResult | EnrichmentError | LookupCancelled:
+        """Single-flight-deduplicated _ado_lookup (via AsyncSingleFlight)."""
+        provider_name = getattr(adapter, "name", "")
+        if not provider_name:
+            return await self._ado_lookup(adapter, ioc, loop_thread, semaphores)
+
+        flight = await loop_thread.flights.do(
+            (provider_name, ioc.type.value, ioc.value),
+            lambda: self._ado_lookup(adapter, ioc, loop_thread, semaphores),
+        )
+        result = flight.value
+        if not flight.shared:
+            return result
+        if isinstance(result, LookupCancelled):
+            # the leader's job policy, not ours
+            return await self._ado_lookup(adapter, ioc, loop_thread, semaphores)
+        if result.ioc is not ioc:
+            result = dataclasses.replace(result, ioc=ioc)  # keep this job's raw_match
+        if isinstance(result, EnrichmentResult):
+            self._mark_cached(job_id, {ioc.value + "|" + provider_name: flight.finished_at})
+        return result
+
+    async def _ado_lookup(
+        self,
+        adapter: Any,
+        ioc: IOC,
+        loop_thread: EventLoopThread,
+        semaphores: dict[str, asyncio.Semaphore],
+    ) -> EnrichmentResult | EnrichmentError | LookupCancelled:
+        """Async counterpart of the thread engine's attempt loop: same retry policy.
+
+        Delays are awaited on the loop, so a lookup waiting for its retry
+        costs a coroutine, not a thread.
+        """
+        provider_name = getattr(adapter, "name", "")
+        sem = semaphores.get(provider_name)
+
+        result = await self._aattempt(adapter, ioc, provider_name, sem, loop_thread)
+        rate_limited = self._is_rate_limit_error(result)
+        retries = 0
+        while True:
+            delay = self._retry_delay(provider_name, ioc, result, retries, rate_limited)
+            if delay is None:
+                return result
+            retries += 1
+            if delay > 0:
+                await asyncio.sleep(delay)
+            result = await self._aattempt(adapter, ioc, provider_name, sem, loop_thread)
+
+    async def _aattempt(
+        self,
+        adapter: Any,
+        ioc: IOC,
+        provider_name: str,
+        sem: asyncio.Semaphore | None,
+        loop_thread: EventLoopThread,
+    ) -> EnrichmentResult | EnrichmentError | LookupCancelled:
+        """Async counterpart of _attempt: token, policy, breaker, then the guarded lookup.
+
+        The same order as _attempt, so both engines claim a half-open
+        breaker's probe only once the token is in hand.  The token is awaited
+        on the loop instead of rescheduled; a refused attempt gives it back.
+        """
+        limiter = self._rate_limiter if provider_name else None
+        has_token = await self._atake_token(provider_name) if limiter is not None else True
+
+        cancelled = self._policy_check(adapter, ioc, provider_name)
+        if cancelled is not None:
+            if limiter is not None and has_token:
+                limiter.refund(provider_name)
+            return cancelled
+
+        breaker = self._breakers.get(provider_name) if provider_name else None
+        if breaker is not None and not breaker.allow():
+            if limiter is not None and has_token:
+                limiter.refund(provider_name)
+            self._refund_quota(adapter, CURRENT_GUARD.get())
+            return EnrichmentError(ioc=ioc, provider=provider_name, error=CIRCUIT_OPEN_ERROR)
+
+        if not has_token:
+            if breaker is not None:
+                breaker.abandon()
+            self._refund_quota(adapter, CURRENT_GUARD.get())
+            return EnrichmentError(ioc=ioc, provider=provider_name, error=BUDGET_EXHAUSTED_ERROR)
+
+        try:
+            if sem is not None:
+                async with sem:
+                    result = await self._asingle_attempt(adapter, ioc, provider_name, loop_thread)
+            else:
+                result = await self._asingle_attempt(adapter, ioc, provider_name, loop_thread)
+        except BaseException:  # includes cancellation by a job policy
+            if breaker is not None:
+                breaker.abandon()
+            raise
+        if breaker is not None:
+            breaker.record(result)
+
+        if limiter is not None and self._is_rate_limit_error(result):
+            limiter.penalize(provider_name)
+        return result
+
+    async def _atake_token(self, provider_name: str) -> bool:
+        """Take a rate-limit token, sleeping on the loop until one is due."""
+        bucket = self._rate_limiter.bucket(provider_name) if self._rate_limiter else None
+        if bucket is None:
+            return True
+        while True:
+            wait = bucket.try_acquire()
+            if wait is None:
+                return False
+            if wait == 0.0:
+                return True
+            await asyncio.sleep(wait)
+
+    async def _asingle_attempt(
+        self, adapter: Any, ioc: IOC, provider_name: str, loop_thread: EventLoopThread
+    ) -> EnrichmentResult | EnrichmentError:
+        """Run one lookup (native or bridged) and store its outcome off the loop."""
+        loop = asyncio.get_running_loop()
+        alookup = getattr(adapter, "alookup", None)
+        if alookup is not None and asyncio.iscoroutinefunction(alookup):
+            result = await alookup(ioc, loop_thread.http_client)
+        else:
+            result = await loop.run_in_executor(None, adapter.lookup, ioc)
+
+        if self._cache is not None:
+            # CacheStore calls may touch SQLite; keep them off the loop thread.
+            await loop.run_in_executor(None, self._store_outcome, ioc, provider_name, result)
+        return result
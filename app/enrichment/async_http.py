@@ -0,0 +1,541 @@
+"""Asyncio HTTP client with the same safety guarantees as safe_request().
+
+The thread engine sends every lookup through requests, so each in-flight
+request holds a thread.  AsyncHTTPClient is a small HTTP/1.1 client built on
+asyncio streams (no third-party dependency) used by AsyncBaseHTTPAdapter on
+the async enrichment engine, where thousands of lookups can be in flight on
+one event-loop thread.
+
+async_safe_request() mirrors safe_request() exactly:
+  - SEC-04: connect/read timeouts from http_safety.TIMEOUT, adapted per
+            provider by PROVIDER_LATENCY
+  - SEC-05: streaming body read with the MAX_RESPONSE_BYTES cap
+  - SEC-16: validate_endpoint() before every network call
+  - redirects are never followed
+  - the same EnrichmentError messages for every failure class
+  - the same latency recording and optional hedging (hedge=True)
+
+Connections are kept alive and reused per (scheme, host, port), with at most
+max_per_host open at once.  Response bodies are requested uncompressed
+(Accept-Encoding: identity) so the byte cap applies to what is parsed.
+
+Usage:
+    client = AsyncHTTPClient()
+    body = await async_safe_request(client, url, allowed_hosts, ioc, "Shodan")
+    await client.close()
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import ssl
+import time
+from typing import Any, Awaitable, Callable
+from urllib.parse import urlencode, urlsplit
+
+from requests.utils import requote_uri
+
+from app.enrichment.http_safety import (
+    MAX_RESPONSE_BYTES,
+    PROVIDER_LATENCY,
+    TIMEOUT,
+    validate_endpoint,
+    with_retry_after,
+)
+from app.enrichment.models import EnrichmentError, IOC
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_PER_HOST = 32
+_MAX_HEADER_BYTES = 64 * 1024
+_CHUNK_SIZE = 8192
+_NO_BODY_STATUSES = frozenset({204, 304})
+
+
+class AsyncHTTPStatusError(Exception):
+    """Raised for 4xx/5xx responses (the async raise_for_status())."""
+
+    def __init__(self, status_code: int, retry_after: str | None = None) -> None:
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.retry_after = retry_after  # raw Retry-After header, if any
+
+
+class _Connection:
+    __slots__ = ("reader", "writer", "reused")
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.reused = False
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class AsyncResponse:
+    """Status line and headers of a response whose body has not been read yet.
+
+    Pre-raise hooks receive this object in place of a requests.Response; it
+    exposes the attributes they use (status_code, reason, headers, url).
+    Header names are lowercased.
+    """
+
+    def __init__(
+        self,
+        client: AsyncHTTPClient,
+        key: tuple[str, str, int],
+        conn: _Connection,
+        url: str,
+        status_code: int,
+        reason: str,
+        headers: dict[str, str],
+        keep_alive: bool,
+        read_timeout: float,
+    ) -> None:
+        self._client = client
+        self._key = key
+        self._conn: _Connection | None = conn
+        self.url = url
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers
+        self._keep_alive = keep_alive
+        self._read_timeout = read_timeout
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise AsyncHTTPStatusError(self.status_code, self.headers.get("retry-after"))
+
+    async def read(self, max_bytes: int = MAX_RESPONSE_BYTES) -> bytes:
+        """Read the whole body, raising ValueError past max_bytes (SEC-05).
+
+        The connection returns to the pool only if the body was read to its
+        framed end; any failure closes it.
+        """
+        conn = self._conn
+        if conn is None:
+            raise RuntimeError("response body already consumed")
+        self._conn = None
+        try:
+            body, reusable = await self._read_body(conn.reader, max_bytes)
+        except BaseException:
+            conn.close()
+            raise
+        if reusable and self._keep_alive:
+            self._client._release(self._key, conn)
+        else:
+            conn.close()
+        return body
+
+    async def json(self, max_bytes: int = MAX_RESPONSE_BYTES) -> Any:
+        return json.loads(await self.read(max_bytes))
+
+    def close(self) -> None:
+        """Discard the connection without reading the body."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    async def _read_body(
+        self, reader: asyncio.StreamReader, max_bytes: int
+    ) -> tuple[bytes, bool]:
+        timeout = self._read_timeout
+        if self.status_code in _NO_BODY_STATUSES or 100 <= self.status_code < 200:
+            return b"", True
+
+        if "chunked" in self.headers.get("transfer-encoding", "").lower():
+            chunks: list[bytes] = []
+            total = 0
+            while True:
+                size_line = await asyncio.wait_for(reader.readline(), timeout)
+                if not size_line:
+                    raise asyncio.IncompleteReadError(b"", None)
+                size = int(size_line.split(b";", 1)[0].strip(), 16)
+                if size == 0:
+                    break
+                total += size
+                if total > max_bytes:
+                    raise ValueError(
+                        f"Response exceeded size limit of {max_bytes} bytes (SEC-05)"
+                    )
+                chunk = await asyncio.wait_for(reader.readexactly(size + 2), timeout)
+                chunks.append(chunk[:-2])
+            while (await asyncio.wait_for(reader.readline(), timeout)).strip():
+                pass  # trailers
+            return b"".join(chunks), True
+
+        length = self.headers.get("content-length")
+        if length is not None:
+            size = int(length)
+            if size > max_bytes:
+                raise ValueError(
+                    f"Response exceeded size limit of {max_bytes} bytes (SEC-05)"
+                )
+            return await asyncio.wait_for(reader.readexactly(size), timeout), True
+
+        # Close-delimited body: read to EOF, counting as we go.
+        buffer = bytearray()
+        while True:
+            chunk = await asyncio.wait_for(reader.read(_CHUNK_SIZE), timeout)
+            if not chunk:
+                return bytes(buffer), False
+            buffer += chunk
+            if len(buffer) > max_bytes:
+                raise ValueError(
+                    f"Response exceeded size limit of {max_bytes} bytes (SEC-05)"
+                )
+
+
+class AsyncHTTPClient:
+    """Keep-alive HTTP/1.1 client bound to one event loop.
+
+    Args:
+        max_per_host: Maximum requests in flight per (scheme, host, port);
+                      idle pooled connections are capped at the same number.
+        timeout:      (connect, read) seconds. Defaults to http_safety.TIMEOUT.
+        ssl_context:  TLS context for https URLs. Defaults to
+                      ssl.create_default_context() (certificate verification on).
+    """
+
+    def __init__(
+        self,
+        max_per_host: int = DEFAULT_MAX_PER_HOST,
+        timeout: tuple[float, float] = TIMEOUT,
+        ssl_context: ssl.SSLContext | None = None,
+    ) -> None:
+        self._max_per_host = max_per_host
+        self._timeout = timeout
+        self._ssl_context = ssl_context
+        self._idle: dict[tuple[str, str, int], list[_Connection]] = {}
+        self._slots: dict[tuple[str, str, int], asyncio.Semaphore] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _bind_loop(self) -> None:
+        """Drop connections and slots created on a different event loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._idle = {}  # transports of another loop cannot be used or closed here
+            self._slots = {}
+            self._loop = loop
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: dict[str, str] | None = None,
+        data: dict[str, Any] | None = None,
+        json_payload: dict[str, Any] | None = None,
+        timeout: tuple[float, float] | None = None,
+    ) -> AsyncResponse:
+        """Send a request and return once the status line and headers arrive.
+
+        The caller must read() or close() the returned response.  A request
+        on a reused keep-alive connection that the server already closed is
+        retried once on a fresh connection.  timeout overrides the client's
+        (connect, read) timeout for this request.
+        """
+        timeout = timeout or self._timeout
+        self._bind_loop()
+        # Requote before splitting, as requests does: urlsplit() would silently
+        # drop CR/LF and tabs that requests percent-encodes.
+        parts = urlsplit(requote_uri(url))
+        scheme = parts.scheme.lower()
+        if scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Unsupported URL {url!r}")
+        host = parts.hostname
+        port = parts.port or (443 if scheme == "https" else 80)
+        key = (scheme, host, port)
+        payload = _encode_request(method, parts, host, port, headers, data, json_payload)
+
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._slots[key] = asyncio.Semaphore(self._max_per_host)
+        async with slot:
+            conn = await self._acquire(key, timeout[0])
+            try:
+                return await self._exchange(key, conn, url, method, payload, timeout[1])
+            except (ConnectionError, asyncio.IncompleteReadError):
+                if not conn.reused:
+                    raise
+            conn = await self._connect(key, timeout[0])
+            return await self._exchange(key, conn, url, method, payload, timeout[1])
+
+    async def _exchange(
+        self,
+        key: tuple[str, str, int],
+        conn: _Connection,
+        url: str,
+        method: str,
+        payload: bytes,
+        read_timeout: float,
+    ) -> AsyncResponse:
+        try:
+            conn.writer.write(payload)
+            await asyncio.wait_for(conn.writer.drain(), read_timeout)
+            status_line = await asyncio.wait_for(conn.reader.readline(), read_timeout)
+            if not status_line:
+                raise asyncio.IncompleteReadError(b"", None)
+            version, status_code, reason = _parse_status_line(status_line)
+            headers = await self._read_headers(conn.reader, read_timeout)
+        except BaseException:
+            conn.close()
+            raise
+
+        connection = headers.get("connection", "").lower()
+        keep_alive = version == "HTTP/1.1" and connection != "close"
+        if method.upper() == "HEAD":
+            headers = dict(headers, **{"content-length": "0"})
+        return AsyncResponse(
+            self, key, conn, url, status_code, reason, headers, keep_alive, read_timeout
+        )
+
+    @staticmethod
+    async def _read_headers(
+        reader: asyncio.StreamReader, timeout: float
+    ) -> dict[str, str]:
+        headers: dict[str, str] = {}
+        size = 0
+        while True:
+            line = await asyncio.wait_for(reader.readline(), timeout)
+            if not line:
+                raise asyncio.IncompleteReadError(b"", None)
+            size += len(line)
+            if size > _MAX_HEADER_BYTES:
+                raise ValueError("Response headers too large")
+            if line in (b"\r\n", b"\n"):
+                return headers
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+    async def _acquire(
+        self, key: tuple[str, str, int], connect_timeout: float
+    ) -> _Connection:
+        idle = self._idle.get(key)
+        while idle:
+            conn = idle.pop()
+            if conn.reader.at_eof() or conn.writer.is_closing():
+                conn.close()
+                continue
+            conn.reused = True
+            return conn
+        return await self._connect(key, connect_timeout)
+
+    async def _connect(
+        self, key: tuple[str, str, int], connect_timeout: float
+    ) -> _Connection:
+        scheme, host, port = key
+        context = None
+        if scheme == "https":
+            if self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+            context = self._ssl_context
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(
+                host, port, ssl=context, server_hostname=host if context else None,
+                limit=2 * _CHUNK_SIZE,
+            ),
+            connect_timeout,
+        )
+        return _Connection(reader, writer)
+
+    def _release(self, key: tuple[str, str, int], conn: _Connection) -> None:
+        idle = self._idle.setdefault(key, [])
+        if len(idle) < self._max_per_host and asyncio.get_running_loop() is self._loop:
+            idle.append(conn)
+        else:
+            conn.close()
+
+    async def close(self) -> None:
+        """Close every idle pooled connection."""
+        for conns in self._idle.values():
+            for conn in conns:
+                conn.close()
+        self._idle = {}
+
+    def idle_connections(self) -> int:
+        return sum(len(conns) for conns in self._idle.values())
+
+
+def _encode_request(
+    method: str,
+    parts: Any,
+    host: str,
+    port: int,
+    headers: dict[str, str] | None,
+    data: dict[str, Any] | None,
+    json_payload: dict[str, Any] | None,
+) -> bytes:
+    body = b""
+    merged: dict[str, str] = {}
+    for name, value in (headers or {}).items():
+        merged[name.lower()] = str(value)
+    if json_payload is not None:
+        body = json.dumps(json_payload).encode()
+        merged["content-type"] = "application/json"
+    elif data is not None:
+        body = urlencode(data).encode()
+        merged["content-type"] = "application/x-www-form-urlencoded"
+    default_port = 443 if parts.scheme.lower() == "https" else 80
+    merged["host"] = host if port == default_port else f"{host}:{port}"
+    merged["accept-encoding"] = "identity"
+    merged["connection"] = "keep-alive"
+    merged.setdefault("accept", "*/*")
+    if body or method.upper() in ("POST", "PUT", "PATCH"):
+        merged["content-length"] = str(len(body))
+
+    lines = [f"{method.upper()} {_request_target(parts)} HTTP/1.1"]
+    lines.extend(f"{name}: {value}" for name, value in merged.items())
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+
+def _request_target(parts: Any) -> str:
+    """Return the request line's target from an already requoted URL.
+
+    Adapters interpolate IOC values into URLs unescaped; request() requotes
+    the URL like requests does for the thread engine, so a unicode URL IOC
+    is percent-encoded rather than failing to encode, and spaces or CR/LF
+    cannot split the request line.  Anything still unsafe is refused.
+
+    Raises:
+        ValueError: If the target contains whitespace or control characters.
+    """
+    target = parts.path or "/"
+    if parts.query:
+        target += "?" + parts.query
+    if any(ch <= " " or ch >= "\x7f" for ch in target):
+        raise ValueError(f"Invalid characters in request target {target!r}")
+    return target
+
+
+def _parse_status_line(line: bytes) -> tuple[str, int, str]:
+    parts = line.decode("latin-1").rstrip("\r\n").split(" ", 2)
+    if len(parts) < 2 or not parts[0].startswith("HTTP/"):
+        raise ValueError(f"Malformed HTTP status line {line[:64]!r}")
+    return parts[0], int(parts[1]), parts[2] if len(parts) > 2 else ""
+
+
+async def async_safe_request(
+    client: AsyncHTTPClient,
+    url: str,
+    allowed_hosts: list[str],
+    ioc: IOC,
+    provider: str,
+    *,
+    method: str = "GET",
+    headers: dict[str, str] | None = None,
+    data: dict[str, Any] | None = None,
+    json_payload: dict[str, Any] | None = None,
+    pre_raise_hook: Callable[[AsyncResponse], Any | None] | None = None,
+    hedge: bool = False,
+) -> dict | EnrichmentError:
+    """Async counterpart of http_safety.safe_request().
+
+    Same arguments (plus the request headers, which safe_request takes from
+    the session) and the same return contract: the parsed JSON body, the
+    pre-raise hook's non-None result, or an EnrichmentError.
+
+    With hedge=True (idempotent GETs to zero-auth providers only), a second
+    attempt starts once the first has outlived the provider's p95; the first
+    usable response wins and the other attempt is cancelled.
+    """
+    def attempt() -> Awaitable[dict | EnrichmentError]:
+        return _arequest_once(
+            client, url, allowed_hosts, ioc, provider, method, headers, data,
+            json_payload, pre_raise_hook,
+        )
+
+    delay = PROVIDER_LATENCY.hedge_delay(provider) if hedge and method.upper() == "GET" else None
+    if delay is None:
+        return await attempt()
+
+    first = asyncio.ensure_future(attempt())
+    done, _ = await asyncio.wait({first}, timeout=delay)
+    if done:
+        return first.result()
+    PROVIDER_LATENCY.record_hedge(provider)
+    pending = {first, asyncio.ensure_future(attempt())}
+    error: EnrichmentError | None = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                result = task.result()
+                if not isinstance(result, EnrichmentError):
+                    return result
+                if error is None:
+                    error = result
+        return error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def _arequest_once(
+    client: AsyncHTTPClient,
+    url: str,
+    allowed_hosts: list[str],
+    ioc: IOC,
+    provider: str,
+    method: str,
+    headers: dict[str, str] | None,
+    data: dict[str, Any] | None,
+    json_payload: dict[str, Any] | None,
+    pre_raise_hook: Callable[[AsyncResponse], Any | None] | None,
+) -> dict | EnrichmentError:
+    """One attempt of async_safe_request(); records the provider's response time.
+
+    Exception handler ordering is a correctness constraint — ssl.SSLError
+    MUST be caught before OSError and ValueError (certificate failures
+    subclass both).
+    """
+    started = time.monotonic()
+    try:
+        validate_endpoint(url, allowed_hosts)
+
+        resp = await client.request(
+            method, url, headers=headers, data=data, json_payload=json_payload,
+            timeout=PROVIDER_LATENCY.adapted_timeout(provider),  # else the client's
+        )
+        try:
+            if pre_raise_hook is not None:
+                hook_result = pre_raise_hook(resp)
+                if hook_result is not None:
+                    PROVIDER_LATENCY.record(provider, time.monotonic() - started)
+                    return with_retry_after(
+                        hook_result, resp.status_code, resp.headers.get("retry-after")
+                    )
+
+            resp.raise_for_status()
+            body = await resp.json()
+            PROVIDER_LATENCY.record(provider, time.monotonic() - started)
+            return body
+        finally:
+            resp.close()
+
+    except asyncio.TimeoutError:
+        # Censored sample: the provider took at least this long.
+        PROVIDER_LATENCY.record(provider, time.monotonic() - started)
+        return EnrichmentError(ioc=ioc, provider=provider, error="Request timed out")
+    except AsyncHTTPStatusError as exc:
+        PROVIDER_LATENCY.record(provider, time.monotonic() - started)
+        return with_retry_after(
+            EnrichmentError(ioc=ioc, provider=provider, error=f"HTTP {exc.status_code}"),
+            exc.status_code, exc.retry_after,
+        )
+    except ssl.SSLError:
+        return EnrichmentError(ioc=ioc, provider=provider, error="SSL/TLS error")
+    except (OSError, asyncio.IncompleteReadError):
+        return EnrichmentError(ioc=ioc, provider=provider, error="Connection failed")
+    except ValueError as exc:
+        return EnrichmentError(
+            ioc=ioc, provider=provider, error=str(exc) or "Endpoint validation failed"
+        )
+    except Exception as exc:
+        logger.warning(
+            "async_safe_request unexpected error provider=%s ioc=%s: %s",
+            provider, ioc.value, exc,
+        )
+        return EnrichmentError(ioc=ioc, provider=provider, error=f"Unexpected error: {exc}")
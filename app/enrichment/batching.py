@@ -0,0 +1,98 @@
+"""Size- or time-bounded batching of lookups for bulk-capable providers.
+
+CIRCL Hashlookup and Team Cymru answer hundreds of IOCs in one request, but
+the orchestrator used to send one request per (provider, IOC): 5,000 hashes
+meant 5,000 round trips, 5,000 rate-limit tokens and 5,000 worker slots.
+
+A BatchWindow collects the lookups bound for one BatchProvider (see
+provider.py) and hands them on in groups:
+
+    - as soon as max_size lookups are waiting, they are emitted as one batch;
+    - a partial batch is emitted once the oldest waiting lookup has waited
+      `window` seconds (timed on the RetryScheduler, so no thread sleeps);
+    - flush() emits whatever is waiting at once, e.g. after a job has queued
+      all of its lookups.
+
+Emitted batches go to the emit callback, which must return quickly (it runs
+on the caller's thread or the scheduler's timer thread).
+
+Usage:
+    window = BatchWindow(100, 0.05, emit=submit_batch)
+    for lookup in lookups:
+        window.add(lookup)
+    window.flush()
+"""
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable
+
+from app.enrichment.retry_scheduler import RETRY_SCHEDULER, RetryScheduler
+
+DEFAULT_WINDOW = 0.05  # seconds a partial batch waits for more lookups
+
+
+class BatchWindow:
+    """Groups items into batches of at most max_size. Thread-safe.
+
+    Args:
+        max_size:  Items per batch; a full batch is emitted immediately.
+        window:    Seconds before a partial batch is emitted.
+        emit:      Called with each batch (a non-empty list, in arrival order).
+        scheduler: Delay queue that times partial batches.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        window: float,
+        emit: Callable[[list[Any]], None],
+        scheduler: RetryScheduler | None = None,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self._max_size = max_size
+        self._window = window
+        self._emit = emit
+        self._scheduler = scheduler if scheduler is not None else RETRY_SCHEDULER
+        self._lock = threading.Lock()
+        self._items: list[Any] = []
+        self._generation = 0  # bumped on every emit; stale timers see a newer value
+
+    def add(self, item: Any) -> None:
+        """Queue one item; emit a batch if it fills one."""
+        batch = None
+        timer = None
+        with self._lock:
+            self._items.append(item)
+            if len(self._items) >= self._max_size:
+                batch, self._items = self._items, []
+                self._generation += 1
+            elif len(self._items) == 1:
+                timer = self._generation  # first item of a new batch starts its clock
+        # Outside the lock: emit and the scheduler may call straight back in.
+        if batch:
+            self._emit(batch)
+        if timer is not None:
+            self._scheduler.call_later(self._window, self._expire, timer)
+
+    def flush(self) -> None:
+        """Emit every waiting item now, in batches of at most max_size."""
+        with self._lock:
+            items, self._items = self._items, []
+            self._generation += 1
+        for start in range(0, len(items), self._max_size):
+            self._emit(items[start:start + self._max_size])
+
+    def pending(self) -> int:
+        """Return the number of items waiting for a batch."""
+        with self._lock:
+            return len(self._items)
+
+    def _expire(self, generation: int) -> None:
+        with self._lock:
+            if generation != self._generation or not self._items:
+                return  # the batch this timer was started for has already gone
+            batch, self._items = self._items, []
+            self._generation += 1
+        self._emit(batch)
@@ -0,0 +1,237 @@
+"""Per-provider circuit breakers shared by every orchestrator.
+
+When a provider such as crt.sh or ThreatMiner is down, every lookup in every
+job used to run the full attempt + 1s sleep + retry cycle, each attempt
+holding a worker until the read timeout.  A CircuitBreaker per adapter name
+watches outcomes across all jobs and, once the provider is clearly failing,
+rejects lookups immediately with CIRCUIT_OPEN_ERROR instead.
+
+States:
+
+    closed     Normal operation.  Outcomes go into a rolling window of the last
+               WINDOW attempts.  The breaker opens after CONSECUTIVE_TIMEOUTS
+               timeouts in a row, or once at least MIN_CALLS attempts are in
+               the window and FAILURE_RATE of them failed.
+    open       Every lookup fails fast for the cooldown (COOLDOWN_SECONDS,
+               doubled after each failed probe up to MAX_COOLDOWN_SECONDS).
+    half_open  After the cooldown one probe lookup is let through; the rest
+               still fail fast.  A healthy probe closes the breaker, a failed
+               one re-opens it.
+
+Only provider-health failures count (is_provider_failure): timeouts,
+connection and TLS errors and HTTP 5xx.  Deterministic answers (404, 400,
+"Unsupported type"), 429s (handled by rate_limit.py) and authentication
+errors say nothing about availability and count as healthy responses or are
+ignored.
+
+PROVIDER_BREAKERS is the process-wide registry; orchestrators use it unless
+given their own.
+
+Usage:
+    breaker = PROVIDER_BREAKERS.get("Cert History")
+    if not breaker.allow():
+        ...  # fail fast with CIRCUIT_OPEN_ERROR
+    breaker.record(result)
+"""
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Callable
+
+from app.enrichment.models import EnrichmentError
+
+CIRCUIT_OPEN_ERROR = "Provider unavailable (circuit open)"
+
+WINDOW = 20
+MIN_CALLS = 10
+FAILURE_RATE = 0.5
+CONSECUTIVE_TIMEOUTS = 3
+COOLDOWN_SECONDS = 30.0
+MAX_COOLDOWN_SECONDS = 300.0
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_TIMEOUT_ERROR = "Request timed out"
+_UNAVAILABLE_ERRORS = frozenset({_TIMEOUT_ERROR, "Connection failed", "SSL/TLS error"})
+_HTTP_5XX_RE = re.compile(r"\bHTTP 5\d\d\b")
+
+
+def is_provider_failure(error: str) -> bool:
+    """Return True if an error message means the provider itself is unhealthy."""
+    return error in _UNAVAILABLE_ERRORS or bool(_HTTP_5XX_RE.search(error))
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker for one provider. Thread-safe.
+
+    Args:
+        name:                 Provider (adapter) name.
+        window:               Attempts kept for the failure-rate check.
+        min_calls:            Attempts required before the failure rate can trip.
+        failure_rate:         Failed fraction of the window that opens the breaker.
+        consecutive_timeouts: Timeouts in a row that open the breaker.
+        cooldown:             Seconds open before the first half-open probe.
+        max_cooldown:         Cap for the doubling cooldown after failed probes.
+        clock:                Monotonic clock. Injectable for tests.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        window: int = WINDOW,
+        min_calls: int = MIN_CALLS,
+        failure_rate: float = FAILURE_RATE,
+        consecutive_timeouts: int = CONSECUTIVE_TIMEOUTS,
+        cooldown: float = COOLDOWN_SECONDS,
+        max_cooldown: float = MAX_COOLDOWN_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self._min_calls = min_calls
+        self._failure_rate = failure_rate
+        self._consecutive_limit = consecutive_timeouts
+        self._base_cooldown = cooldown
+        self._max_cooldown = max_cooldown
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._outcomes: deque[bool] = deque(maxlen=window)  # True = failure
+        self._consecutive_timeouts = 0
+        self._state = CLOSED
+        self._cooldown = cooldown
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._times_opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._expire_cooldown()
+            return self._state
+
+    def allow(self) -> bool:
+        """Return True if a lookup may be sent to the provider now.
+
+        In half-open state only the first caller gets True (the probe); it
+        must later call record() or abandon().
+        """
+        with self._lock:
+            self._expire_cooldown()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def abandon(self) -> None:
+        """Give back an allowed attempt that never reached the provider."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record(self, result: Any) -> None:
+        """Record the outcome of an allowed attempt (a result or EnrichmentError)."""
+        if isinstance(result, EnrichmentError):
+            failed = is_provider_failure(result.error)
+            timed_out = result.error == _TIMEOUT_ERROR
+        else:
+            failed = timed_out = False
+
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probe_in_flight = False
+                if failed:
+                    self._cooldown = min(self._cooldown * 2, self._max_cooldown)
+                    self._open()
+                else:
+                    self._close()
+                return
+            if self._state == OPEN:
+                return  # an attempt admitted before the breaker opened
+
+            self._outcomes.append(failed)
+            self._consecutive_timeouts = self._consecutive_timeouts + 1 if timed_out else 0
+            if self._consecutive_timeouts >= self._consecutive_limit or (
+                len(self._outcomes) >= self._min_calls
+                and sum(self._outcomes) / len(self._outcomes) >= self._failure_rate
+            ):
+                self._open()
+
+    def snapshot(self) -> dict:
+        """Return {"state", "failure_rate", "retry_in_s", "times_opened"}."""
+        with self._lock:
+            self._expire_cooldown()
+            failures = sum(self._outcomes)
+            retry_in = 0.0
+            if self._state == OPEN:
+                retry_in = max(0.0, self._opened_at + self._cooldown - self._clock())
+            return {
+                "state": self._state,
+                "failure_rate": round(failures / len(self._outcomes), 2) if self._outcomes else 0.0,
+                "retry_in_s": round(retry_in, 1),
+                "times_opened": self._times_opened,
+            }
+
+    # Must be called with _lock held.
+
+    def _expire_cooldown(self) -> None:
+        if self._state == OPEN and self._clock() - self._opened_at >= self._cooldown:
+            self._state = HALF_OPEN
+            self._probe_in_flight = False
+
+    def _open(self) -> None:
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self._times_opened += 1
+
+    def _close(self) -> None:
+        self._state = CLOSED
+        self._cooldown = self._base_cooldown
+        self._outcomes.clear()
+        self._consecutive_timeouts = 0
+
+
+class CircuitBreakers:
+    """Registry of one CircuitBreaker per provider name, created on first use.
+
+    Args:
+        **breaker_kwargs: Passed to every CircuitBreaker it creates.
+    """
+
+    def __init__(self, **breaker_kwargs: Any) -> None:
+        self._breaker_kwargs = breaker_kwargs
+        self._lock = threading.Lock()
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def get(self, name: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = self._breakers[name] = CircuitBreaker(name, **self._breaker_kwargs)
+            return breaker
+
+    def snapshot(self, names: list[str] | None = None) -> dict[str, dict]:
+        """Return breaker snapshots keyed by provider, for names (default: all)."""
+        with self._lock:
+            if names is None:
+                names = sorted(self._breakers)
+            breakers = [self._breakers.get(name) for name in names]
+        return {
+            name: breaker.snapshot() if breaker is not None else dict(_CLOSED_SNAPSHOT)
+            for name, breaker in zip(names, breakers)
+        }
+
+    def reset(self) -> None:
+        """Forget every breaker (tests, or after an operator fixes a provider)."""
+        with self._lock:
+            self._breakers.clear()
+
+
+_CLOSED_SNAPSHOT = {"state": CLOSED, "failure_rate": 0.0, "retry_in_s": 0.0, "times_opened": 0}
+
+PROVIDER_BREAKERS = CircuitBreakers()
@@ -27,6 +27,11 @@ _PROVIDERS_SECTION = "providers"
 _CACHE_SECTION = "cache"
 _CACHE_TTL_KEY = "ttl_hours"
 _CACHE_TTL_DEFAULT = 24
+_CACHE_MAX_MB_KEY = "max_size_mb"
+_CACHE_MAX_MB_DEFAULT = 512
+_CACHE_MAX_ROWS_KEY = "max_rows"
+_CACHE_MAX_ROWS_DEFAULT = 0  # 0 = no row limit
+_RATE_LIMITS_SECTION = "rate_limits"
 
 
 class ConfigStore:
@@ -135,6 +140,83 @@ class ConfigStore:
         """
         self._set_value(_CACHE_SECTION, _CACHE_TTL_KEY, str(hours))
 
+    def _get_non_negative_int(self, section: str, key: str, default: int) -> int:
+        """Read a non-negative integer setting, falling back to default if unset or invalid."""
+        value = self._read_config().get(section, key, fallback=None)
+        if value is not None:
+            try:
+                parsed = int(value)
+            except ValueError:
+                return default
+            if parsed >= 0:
+                return parsed
+        return default
+
+    def get_cache_max_mb(self) -> int:
+        """Read the cache database size budget in megabytes.
+
+        Returns:
+            Size budget in MB; 0 means unlimited. Defaults to 512.
+        """
+        return self._get_non_negative_int(_CACHE_SECTION, _CACHE_MAX_MB_KEY, _CACHE_MAX_MB_DEFAULT)
+
+    def set_cache_max_mb(self, megabytes: int) -> None:
+        """Write the cache database size budget in megabytes (0 = unlimited)."""
+        self._set_value(_CACHE_SECTION, _CACHE_MAX_MB_KEY, str(megabytes))
+
+    def get_cache_max_rows(self) -> int:
+        """Read the cache row-count budget.
+
+        Returns:
+            Maximum cached rows; 0 means unlimited (the default).
+        """
+        return self._get_non_negative_int(
+            _CACHE_SECTION, _CACHE_MAX_ROWS_KEY, _CACHE_MAX_ROWS_DEFAULT
+        )
+
+    def set_cache_max_rows(self, rows: int) -> None:
+        """Write the cache row-count budget (0 = unlimited)."""
+        self._set_value(_CACHE_SECTION, _CACHE_MAX_ROWS_KEY, str(rows))
+
+    def get_rate_limits(self) -> dict[str, tuple[float, int, int]]:
+        """Read per-provider rate-limit overrides from the [rate_limits] section.
+
+        Each entry is ``<provider> = <per_minute>,<burst>,<daily_budget>``,
+        e.g. ``virustotal = 4,4,500``.  Malformed entries are skipped.
+
+        Returns:
+            Dict mapping lowercase provider name to
+            (requests_per_minute, burst, daily_budget). Empty if none are set.
+        """
+        cfg = self._read_config()
+        if _RATE_LIMITS_SECTION not in cfg:
+            return {}
+        limits: dict[str, tuple[float, int, int]] = {}
+        for name, value in cfg[_RATE_LIMITS_SECTION].items():
+            try:
+                per_minute, burst, daily = (part.strip() for part in value.split(","))
+                parsed = (float(per_minute), int(burst), int(daily))
+            except ValueError:
+                continue
+            if parsed[0] >= 0 and parsed[1] >= 0 and parsed[2] >= 0:
+                limits[name] = parsed
+        return limits
+
+    def set_rate_limit(
+        self, name: str, per_minute: float, burst: int, daily_budget: int
+    ) -> None:
+        """Write a rate-limit override for one provider.
+
+        Args:
+            name:         Provider name. Case-insensitive.
+            per_minute:   Sustained requests per minute; 0 disables pacing.
+            burst:        Back-to-back requests allowed after idling.
+            daily_budget: Requests per UTC day; 0 means no daily cap.
+        """
+        self._set_value(
+            _RATE_LIMITS_SECTION, name.lower(), f"{per_minute:g},{burst},{daily_budget}"
+        )
+
     def all_provider_keys(self) -> dict[str, str]:
         """Read all provider API keys from the [providers] INI section.
 
@@ -0,0 +1,155 @@
+"""Application-scoped enrichment executor with fair scheduling between jobs.
+
+Creating a ThreadPoolExecutor(max_workers=20) inside every enrich_all() call
+spawned and tore down up to 80 threads per burst (four concurrent jobs) with
+no global bound.  FairExecutor is created once per app and shared by every
+orchestrator:
+
+    - a global cap on worker threads (started lazily, kept for the process
+      lifetime),
+    - one FIFO queue per job, served round-robin, so a 5,000-IOC job cannot
+      starve a 3-IOC job submitted after it — each free worker takes the next
+      task from the next job in turn,
+    - metrics() for queue depth and thread utilization.
+
+submit() returns a concurrent.futures.Future, so callers can keep using
+as_completed().
+
+Usage:
+    executor = FairExecutor(max_workers=32)
+    future = executor.submit(job_id, fn, *args)
+    executor.metrics()  # {"queue_depth": ..., "busy_workers": ..., ...}
+"""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from typing import Any, Callable
+
+DEFAULT_MAX_WORKERS = 32
+
+
+class FairExecutor:
+    """Bounded worker pool with per-job round-robin queues.
+
+    Args:
+        max_workers: Maximum number of worker threads across all jobs.
+        name:        Thread name prefix.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS, name: str = "enrich-worker") -> None:
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self._max_workers = max_workers
+        self._name = name
+        self._cond = threading.Condition()
+        # job_id -> queued (future, fn, args) tuples; rotation order = dict order.
+        self._queues: OrderedDict[str, deque[tuple[Future, Callable[..., Any], tuple]]] = (
+            OrderedDict()
+        )
+        self._threads: list[threading.Thread] = []
+        self._idle = 0
+        self._busy = 0
+        self._queued = 0
+        self._completed = 0
+        self._shutdown = False
+
+    def submit(self, job_id: str, fn: Callable[..., Any], *args: Any) -> Future:
+        """Queue fn(*args) on behalf of job_id and return its Future.
+
+        Raises:
+            RuntimeError: If the executor has been shut down.
+        """
+        future: Future = Future()
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("cannot submit after shutdown")
+            queue = self._queues.get(job_id)
+            if queue is None:
+                queue = self._queues[job_id] = deque()
+            queue.append((future, fn, args))
+            self._queued += 1
+            # Grow only while queued work outnumbers idle workers.
+            if self._queued > self._idle and len(self._threads) < self._max_workers:
+                self._start_worker()
+            self._cond.notify()
+        return future
+
+    def _start_worker(self) -> None:
+        """Start one more worker thread. Call with _cond held."""
+        thread = threading.Thread(
+            target=self._worker,
+            name=f"{self._name}-{len(self._threads)}",
+            daemon=True,
+        )
+        self._threads.append(thread)
+        thread.start()
+
+    def _next_task(self) -> tuple[Future, Callable[..., Any], tuple] | None:
+        """Pop the next task round-robin across jobs. Call with _cond held."""
+        if not self._queues:
+            return None
+        job_id, queue = next(iter(self._queues.items()))
+        task = queue.popleft()
+        # Rotate: this job goes to the back of the line (or leaves it).
+        del self._queues[job_id]
+        if queue:
+            self._queues[job_id] = queue
+        self._queued -= 1
+        return task
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                self._idle += 1
+                while not self._queues and not self._shutdown:
+                    self._cond.wait()
+                self._idle -= 1
+                task = self._next_task()
+                if task is None:  # shut down with nothing left to run
+                    return
+                self._busy += 1
+
+            future, fn, args = task
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        result = fn(*args)
+                    except BaseException as exc:  # noqa: BLE001 — delivered via the future
+                        future.set_exception(exc)
+                    else:
+                        future.set_result(result)
+            finally:
+                with self._cond:
+                    self._busy -= 1
+                    self._completed += 1
+
+    def metrics(self) -> dict:
+        """Return a snapshot of pool load.
+
+        Keys: 'max_workers', 'threads' (started), 'busy_workers',
+        'utilization' (busy / max_workers), 'queue_depth' (tasks waiting),
+        'jobs_queued' (jobs with waiting tasks) and 'tasks_completed'.
+        """
+        with self._cond:
+            return {
+                "max_workers": self._max_workers,
+                "threads": len(self._threads),
+                "busy_workers": self._busy,
+                "utilization": round(self._busy / self._max_workers, 4),
+                "queue_depth": self._queued,
+                "jobs_queued": len(self._queues),
+                "tasks_completed": self._completed,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting work; workers exit once every queued task has run."""
+        with self._cond:
+            self._shutdown = True
+            self._cond.notify_all()
+            threads = list(self._threads)
+        if wait:
+            for thread in threads:
+                if thread is not threading.current_thread():
+                    thread.join()
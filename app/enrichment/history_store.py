@@ -3,9 +3,13 @@
 Persists every online analysis run so analysts can review past results
 from the home page and reload full analysis detail via /history/<id>.
 
-Thread-safe via threading.Lock on write operations.  Uses WAL journal
-mode for concurrent readers without blocking writers (same pattern as
-CacheStore).
+Thread-safe via threading.Lock on write operations.  Reads use per-thread
+read-only connections from ConnectionPool, and WAL journal mode lets them
+run without blocking the writer or each other (same pattern as CacheStore).
+
+iocs_json/results_json are stored through the codec layer
+(app/cache/codec.py) as compressed BLOBs; rows written before it are plain
+JSON TEXT and still load unchanged.
 
 Usage:
     store = HistoryStore()
@@ -18,11 +22,19 @@ For tests, pass a tmp_path-based db_path to isolate from the real filesystem.
 from __future__ import annotations
 
 import datetime
-import json
-import sqlite3
 import threading
 import uuid
 from pathlib import Path
+from typing import Iterable
+
+from app.cache.codec import (
+    DEFAULT_CODEC,
+    decode_payload,
+    encode_payload,
+    frame_json,
+    get_codec,
+)
+from app.cache.connections import ConnectionPool
 
 DEFAULT_DB_PATH = Path.home() / ".sentinelx" / "history.db"
 
@@ -47,6 +59,11 @@ def _compute_top_verdict(results: list[dict]) -> str:
     Error-only results (type == "error") are ignored for verdict
     computation; if *all* results are errors the verdict is "error".
     """
+    return top_verdict(r.get("verdict") for r in results)
+
+
+def top_verdict(verdicts: Iterable[str | None]) -> str:
+    """Most severe of the given verdicts (None for errors), as _compute_top_verdict."""
     priority = {
         "malicious": 4,
         "suspicious": 3,
@@ -56,8 +73,7 @@ def _compute_top_verdict(results: list[dict]) -> str:
     best: str | None = None
     best_rank = -1
 
-    for r in results:
-        verdict = r.get("verdict")
+    for verdict in verdicts:
         if verdict is None:
             continue  # error entries have no verdict
         rank = priority.get(verdict, 0)
@@ -77,18 +93,18 @@ class HistoryStore:
     Args:
         db_path: Path to the SQLite database file.
                  Defaults to ~/.sentinelx/history.db.
+        codec:   Payload codec name for new rows (see app/cache/codec.py).
     """
 
-    def __init__(self, db_path: Path | None = None) -> None:
+    def __init__(
+        self, db_path: Path | None = None, *, codec: str = DEFAULT_CODEC
+    ) -> None:
+        self._codec = get_codec(codec).name  # fail fast on unknown codec names
         self._db_path = db_path if db_path is not None else DEFAULT_DB_PATH
         self._lock = threading.Lock()
         self._db_path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
-        self._conn = self._connect()
-        self._conn.execute("PRAGMA journal_mode=WAL")
-        self._conn.execute("PRAGMA synchronous=NORMAL")
-        self._conn.execute("PRAGMA busy_timeout=5000")
-        self._conn.execute("PRAGMA cache_size=-8000")
-        self._conn.execute("PRAGMA temp_store=MEMORY")
+        self._pool = ConnectionPool(self._db_path)
+        self._conn = self._pool.writer  # guarded by _lock
         self._conn.execute(_CREATE_TABLE)
         self._conn.execute(
             "CREATE INDEX IF NOT EXISTS idx_history_created_at "
@@ -96,8 +112,10 @@ class HistoryStore:
         )
         self._conn.commit()
 
-    def _connect(self) -> sqlite3.Connection:
-        return sqlite3.connect(str(self._db_path), check_same_thread=False)
+    def close(self) -> None:
+        """Close the writer and all per-thread reader connections."""
+        with self._lock:
+            self._pool.close()
 
     # ------------------------------------------------------------------
     # Public API
@@ -108,8 +126,11 @@ class HistoryStore:
         input_text: str,
         mode: str,
         iocs: list[dict],
-        results: list[dict],
+        results: list[dict] | None = None,
         analysis_id: str | None = None,
+        *,
+        results_json: bytes | None = None,
+        verdict: str | None = None,
     ) -> str:
         """Persist a completed analysis run.
 
@@ -120,16 +141,27 @@ class HistoryStore:
             results:    Serialized result/error dicts from _serialize_result().
             analysis_id: Optional explicit row id.  When omitted a UUID4 hex
                          string is generated automatically.
+            results_json: The results already encoded as a compact JSON array
+                          (e.g. joined from an orchestrator's result log, see
+                          app/enrichment/result_log.py); stored as-is instead
+                          of encoding `results`.  Requires `verdict`.
+            verdict:    The top verdict of results_json (see top_verdict()).
 
         Returns:
             The generated row id (UUID4 hex string).
         """
         row_id = analysis_id if analysis_id is not None else uuid.uuid4().hex
         now = datetime.datetime.now(tz=datetime.timezone.utc).isoformat()
-        iocs_json = json.dumps(iocs)
-        results_json = json.dumps(results)
+        iocs_json = encode_payload(iocs, self._codec)
+        if results_json is not None:
+            if verdict is None:
+                raise ValueError("results_json requires verdict")
+            results_blob = frame_json(results_json, self._codec)
+            row_verdict = verdict
+        else:
+            results_blob = encode_payload(results or [], self._codec)
+            row_verdict = _compute_top_verdict(results or [])
         total_count = len(iocs)
-        top_verdict = _compute_top_verdict(results)
 
         with self._lock:
             self._conn.execute(
@@ -142,9 +174,9 @@ class HistoryStore:
                     input_text,
                     mode,
                     iocs_json,
-                    results_json,
+                    results_blob,
                     total_count,
-                    top_verdict,
+                    row_verdict,
                     now,
                 ),
             )
@@ -162,14 +194,13 @@ class HistoryStore:
             List of dicts with keys: id, input_text (truncated to 120
             chars), mode, total_count, top_verdict, created_at.
         """
-        with self._lock:
-            rows = self._conn.execute(
-                "SELECT id, input_text, mode, total_count, top_verdict, created_at "
-                "FROM analysis_history "
-                "ORDER BY created_at DESC "
-                "LIMIT ?",
-                (limit,),
-            ).fetchall()
+        rows = self._pool.reader().execute(
+            "SELECT id, input_text, mode, total_count, top_verdict, created_at "
+            "FROM analysis_history "
+            "ORDER BY created_at DESC "
+            "LIMIT ?",
+            (limit,),
+        ).fetchall()
 
         return [
             {
@@ -190,14 +221,13 @@ class HistoryStore:
             Dict with all columns (iocs and results deserialized from
             JSON), or None if the id does not exist.
         """
-        with self._lock:
-            row = self._conn.execute(
-                "SELECT id, input_text, mode, iocs_json, results_json, "
-                "       total_count, top_verdict, created_at "
-                "FROM analysis_history "
-                "WHERE id = ?",
-                (analysis_id,),
-            ).fetchone()
+        row = self._pool.reader().execute(
+            "SELECT id, input_text, mode, iocs_json, results_json, "
+            "       total_count, top_verdict, created_at "
+            "FROM analysis_history "
+            "WHERE id = ?",
+            (analysis_id,),
+        ).fetchone()
 
         if row is None:
             return None
@@ -206,8 +236,8 @@ class HistoryStore:
             "id": row[0],
             "input_text": row[1],
             "mode": row[2],
-            "iocs": json.loads(row[3]),
-            "results": json.loads(row[4]),
+            "iocs": decode_payload(row[3]),
+            "results": decode_payload(row[4]),
             "total_count": row[5],
             "top_verdict": row[6],
             "created_at": row[7],
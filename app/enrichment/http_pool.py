@@ -0,0 +1,205 @@
+"""Process-wide, host-keyed HTTP connection pools shared by every adapter session.
+
+Each HTTP adapter owns a requests.Session, and each Session used to own its
+own urllib3 pools: ten connections per host at most, although a job runs up
+to ENRICHMENT_MAX_WORKERS lookups at once, and all of them thrown away with
+the adapter whenever settings_post rebuilt the registry, so the next job paid
+a fresh TCP + TLS handshake to every provider.
+
+ConnectionPools holds one urllib3 PoolManager for the whole process.  Every
+adapter session mounts a thin HTTPAdapter that routes its requests through
+that manager, so keep-alive connections outlive the session, the adapter and
+the registry that created them.  Sessions still carry their own headers: a
+pooled connection holds no auth state.
+
+Pools are keyed by host (urllib3's pool key) and sized per provider with
+configure(): create_app derives the sizes from the orchestrator's
+per-provider concurrency caps (the semaphore cap for API-key providers, the
+worker count for uncapped zero-auth ones), so no in-flight lookup has to open
+and throw away an extra connection.  Pools never block; a request beyond the
+pool size gets a one-off connection.
+
+Every pool counts connection checkouts, hits (an idle keep-alive connection
+was reused), misses (a new connection was opened) and TLS handshakes (new
+connections, plus reconnects of connections the server closed); snapshot()
+reports them per host for /api/metrics.
+
+HTTP_POOLS is the process-wide instance; BaseHTTPAdapter mounts it on every
+session it creates.
+
+Usage:
+    HTTP_POOLS.configure({"VirusTotal": 4, "Shodan InternetDB": 32})
+    HTTP_POOLS.mount(session, "VirusTotal")
+    HTTP_POOLS.snapshot()  # {"www.virustotal.com": {"hits": ..., ...}}
+"""
+from __future__ import annotations
+
+import threading
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.poolmanager import PoolManager
+
+DEFAULT_POOL_SIZE = 10  # requests' own default, for providers configure() has not sized
+MAX_HOSTS = 64          # pools kept before the least recently used host's is closed
+
+_COUNTERS = ("requests", "hits", "misses", "tls_handshakes")
+
+
+class PoolStats:
+    """Per-host connection counters. Thread-safe."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._hosts: dict[str, dict[str, int]] = {}
+
+    def count(self, host: str, counter: str) -> None:
+        with self._lock:
+            entry = self._hosts.get(host)
+            if entry is None:
+                entry = self._hosts[host] = dict.fromkeys(_COUNTERS, 0)
+            entry[counter] += 1
+
+    def snapshot(self) -> dict[str, dict[str, int]]:
+        with self._lock:
+            hosts = {host: dict(entry) for host, entry in self._hosts.items()}
+        for entry in hosts.values():
+            entry["hits"] = entry["requests"] - entry["misses"]
+        return dict(sorted(hosts.items()))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._hosts.clear()
+
+
+class _CountingPoolMixin:
+    """Counts checkouts and new connections of a urllib3 connection pool."""
+
+    host: str
+    stats: PoolStats | None = None  # set by _CountingPoolManager
+
+    def _get_conn(self, timeout: float | None = None) -> Any:
+        conn = super()._get_conn(timeout)  # type: ignore[misc]
+        if self.stats is not None:
+            self.stats.count(self.host, "requests")
+        return conn
+
+    def _new_conn(self) -> Any:
+        if self.stats is not None:
+            self.stats.count(self.host, "misses")
+        return super()._new_conn()  # type: ignore[misc]
+
+
+class _CountingHTTPConnectionPool(_CountingPoolMixin, HTTPConnectionPool):
+    pass
+
+
+class _CountingHTTPSConnectionPool(_CountingPoolMixin, HTTPSConnectionPool):
+    def _validate_conn(self, conn: Any) -> None:
+        # urllib3 connects a closed HTTPS connection here, before the request:
+        # that is a new connection or a reconnect, each one a TLS handshake.
+        handshake = conn.is_closed
+        super()._validate_conn(conn)
+        if handshake and self.stats is not None:
+            self.stats.count(self.host, "tls_handshakes")
+
+
+class _CountingPoolManager(PoolManager):
+    def __init__(self, stats: PoolStats, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self._stats = stats
+        self.pool_classes_by_scheme = {
+            "http": _CountingHTTPConnectionPool,
+            "https": _CountingHTTPSConnectionPool,
+        }
+
+    def _new_pool(self, scheme, host, port, request_context=None):  # type: ignore[override]
+        pool = super()._new_pool(scheme, host, port, request_context)
+        pool.stats = self._stats
+        return pool
+
+
+class _SharedPoolAdapter(HTTPAdapter):
+    """requests transport adapter that sends through the shared PoolManager.
+
+    Asks for pools of its provider's configured size.  close() is a no-op:
+    the pools belong to ConnectionPools, not to the session being closed.
+    """
+
+    def __init__(self, pools: ConnectionPools, provider: str) -> None:
+        self._pools = pools
+        self._provider = provider
+        super().__init__()
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):  # noqa: ANN001
+        self.poolmanager = self._pools._manager
+
+    def build_connection_pool_key_attributes(self, request, verify, cert=None):  # noqa: ANN001
+        host_params, pool_kwargs = super().build_connection_pool_key_attributes(
+            request, verify, cert
+        )
+        pool_kwargs["maxsize"] = self._pools.pool_size(self._provider)
+        return host_params, pool_kwargs
+
+    def close(self) -> None:
+        pass
+
+
+class ConnectionPools:
+    """One process-wide set of keep-alive connection pools, keyed by host.
+
+    Args:
+        default_size: Pool size for providers configure() has not sized.
+        max_hosts:    Pools kept before the least recently used one is closed.
+    """
+
+    def __init__(self, default_size: int = DEFAULT_POOL_SIZE, max_hosts: int = MAX_HOSTS) -> None:
+        self._default_size = default_size
+        self._lock = threading.Lock()
+        self._sizes: dict[str, int] = {}
+        self._configured = False  # configure() has run
+        self.stats = PoolStats()
+        self._manager = _CountingPoolManager(
+            self.stats, num_pools=max_hosts, maxsize=default_size, block=False
+        )
+
+    def configure(self, sizes: dict[str, int]) -> bool:
+        """Set the pool size of each provider (adapter name -> connections per host).
+
+        The size is part of urllib3's pool key, so a changed size opens a new
+        pool for the provider's host; the old one is closed once it drops out
+        of the max_hosts most recently used.  The same sizes again are a no-op.
+
+        Returns:
+            True if the sizes replaced different ones an earlier configure() set.
+        """
+        sizes = {name: max(1, size) for name, size in sizes.items()}
+        with self._lock:
+            replaced = self._configured and self._sizes != sizes
+            self._sizes = sizes
+            self._configured = True
+        return replaced
+
+    def pool_size(self, provider: str) -> int:
+        with self._lock:
+            return self._sizes.get(provider, self._default_size)
+
+    def mount(self, session: requests.Session, provider: str) -> None:
+        """Route a session's http:// and https:// requests through the shared pools."""
+        adapter = _SharedPoolAdapter(self, provider)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+    def snapshot(self) -> dict[str, dict[str, int]]:
+        """Return {host: {"requests", "hits", "misses", "tls_handshakes"}}."""
+        return self.stats.snapshot()
+
+    def clear(self) -> None:
+        """Close every pooled connection and reset the counters (tests)."""
+        self._manager.clear()
+        self.stats.reset()
+
+
+HTTP_POOLS = ConnectionPools()
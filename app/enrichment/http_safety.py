@@ -1,25 +1,42 @@
 """Shared HTTP safety utilities for enrichment adapters.
 
 Centralizes the security controls applied to all outbound API requests:
-  - SEC-04: timeout=(5, 30) on all requests
-  - SEC-05: stream=True + byte counting, 1 MB response cap
+  - SEC-04: timeout=(5, 30) on all requests; read timeouts adapt per provider
+            to observed latency, never beyond 30s (see latency.py)
+  - SEC-05: stream=True + byte counting, 1 MB response cap.  read_limited()
+            streams into one preallocated buffer and parses it in place;
+            iter_json_array() parses a top-level JSON array element by
+            element, so a caller can stop reading once it has enough
   - SEC-16: SSRF allowlist enforcement before every network call
 
 Each adapter imports these instead of duplicating the logic.
 
 safe_request() is the single canonical HTTP+exception path for all adapters.
 Adapters call it instead of making raw requests — it handles SSRF validation,
-streaming reads, byte limits, and the full exception chain.
+streaming reads, byte limits, and the full exception chain.  It also records
+each provider's response time in PROVIDER_LATENCY and, for hedge=True
+requests, fires a second attempt once the first has outlived the provider's
+p95 (hedged_call).  A 429/503 error carries the provider's Retry-After, if
+any, as EnrichmentError.retry_after.
 """
 from __future__ import annotations
 
+import codecs
+import dataclasses
+import datetime
+import email.utils
 import json
 import logging
-from typing import Any, Callable
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Iterator, TypeVar
 from urllib.parse import urlparse
 
 import requests
 
+from app.enrichment.latency import LatencyTracker
 from app.enrichment.models import EnrichmentError, IOC
 
 logger = logging.getLogger(__name__)
@@ -27,6 +44,22 @@ logger = logging.getLogger(__name__)
 
 TIMEOUT = (5, 30)  # (connect, read) — SEC-04
 MAX_RESPONSE_BYTES = 1 * 1024 * 1024  # 1 MB cap — SEC-05
+READ_CHUNK_SIZE = 64 * 1024
+
+# Statuses whose Retry-After header is a back-off request (RFC 9110 §10.2.3).
+RETRY_AFTER_STATUSES = frozenset({429, 503})
+
+# Observed response times per provider; drives adaptive read timeouts and
+# hedge delays.  Hedging is switched on by create_app (ENRICHMENT_HEDGING).
+PROVIDER_LATENCY = LatencyTracker(TIMEOUT)
+
+# Hedged requests run both attempts here so the caller can take whichever
+# finishes first.  Sized for one primary plus one hedge per enrichment worker.
+HEDGE_POOL_WORKERS = 64
+_hedge_pool: ThreadPoolExecutor | None = None
+_hedge_pool_lock = threading.Lock()
+
+T = TypeVar("T")
 
 
 def validate_endpoint(url: str, allowed_hosts: list[str]) -> None:
@@ -50,11 +83,16 @@ def validate_endpoint(url: str, allowed_hosts: list[str]) -> None:
         )
 
 
-def read_limited(resp: requests.Response) -> dict:
-    """Read streaming response with byte cap (SEC-05).
+def read_limited(resp: requests.Response) -> Any:
+    """Read streaming response with byte cap (SEC-05). Returns parsed JSON.
 
-    Reads response body in 8 KB chunks. Raises ValueError if total
-    exceeds MAX_RESPONSE_BYTES before completing. Returns parsed JSON.
+    Chunks are copied into one bytearray, preallocated from Content-Length
+    when the server sent one, which json.loads() decodes directly: no chunk
+    list and no joined copy of the body.  A body whose declared length is
+    already over the cap is rejected before anything is read.  An encoded
+    body's Content-Length is only the compressed size, so it is not checked,
+    and the preallocation never exceeds MAX_RESPONSE_BYTES whatever the
+    server declares.
 
     Args:
         resp: An open streaming requests.Response.
@@ -63,16 +101,145 @@ def read_limited(resp: requests.Response) -> dict:
         ValueError: If response body exceeds MAX_RESPONSE_BYTES.
         json.JSONDecodeError: If body is not valid JSON.
     """
-    chunks: list[bytes] = []
+    declared = _content_length(resp)
+    if declared is not None and declared > MAX_RESPONSE_BYTES and not _content_encoded(resp):
+        raise _size_error()
+    buf = bytearray(min(declared or 0, MAX_RESPONSE_BYTES))
+    used = 0
+    for chunk in resp.iter_content(chunk_size=READ_CHUNK_SIZE):
+        end = used + len(chunk)
+        if end > MAX_RESPONSE_BYTES:
+            raise _size_error()
+        # Copies in place while within the preallocation; past it (no or
+        # understated Content-Length, e.g. gzip) bytearray grows amortized.
+        buf[used:end] = chunk
+        used = end
+    del buf[used:]
+    return json.loads(buf)
+
+
+def iter_json_array(resp: requests.Response) -> Iterator[Any]:
+    """Yield the elements of a streamed top-level JSON array as they arrive.
+
+    Counts bytes against MAX_RESPONSE_BYTES like read_limited().  Stop
+    iterating (and close() the generator) to stop reading: the response is
+    closed rather than drained, so a crt.sh answer listing thousands of
+    certificates costs only the bytes actually parsed.
+
+    Raises:
+        ValueError: If the body exceeds MAX_RESPONSE_BYTES, is not a JSON
+                    array, or is malformed (json.JSONDecodeError).
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    text = ""
+    pos = 0
     total = 0
-    for chunk in resp.iter_content(chunk_size=8192):
-        total += len(chunk)
-        if total > MAX_RESPONSE_BYTES:
-            raise ValueError(
-                f"Response exceeded size limit of {MAX_RESPONSE_BYTES} bytes (SEC-05)"
-            )
-        chunks.append(chunk)
-    return json.loads(b"".join(chunks))
+    started = False   # "[" seen
+    expect_value = True
+    empty = True      # nothing after the "[" yet: "]" may close it
+    finished = False
+    chunks = resp.iter_content(chunk_size=READ_CHUNK_SIZE)
+    try:
+        while True:
+            chunk = next(chunks, None)
+            eof = chunk is None
+            if not eof:
+                total += len(chunk)
+                if total > MAX_RESPONSE_BYTES:
+                    raise _size_error()
+            text = text[pos:] + text_decoder.decode(chunk or b"", final=eof)
+            pos = 0
+            while True:
+                pos = _skip_whitespace(text, pos)
+                if pos == len(text):
+                    break
+                if not started:
+                    if text[pos] != "[":
+                        raise ValueError("Expected a JSON array")
+                    started, pos = True, pos + 1
+                elif text[pos] == "]" and (not expect_value or empty):
+                    finished = True
+                    return
+                elif not expect_value:
+                    if text[pos] != ",":
+                        raise json.JSONDecodeError("Expecting ',' delimiter", text, pos)
+                    expect_value, pos = True, pos + 1
+                else:
+                    empty = False
+                    try:
+                        value, end = decoder.raw_decode(text, pos)
+                    except json.JSONDecodeError:
+                        if eof:
+                            raise
+                        break  # element incomplete: read more
+                    if end == len(text) and not eof:
+                        break  # a number may continue in the next chunk
+                    expect_value, pos = False, end
+                    yield value
+            if eof:
+                raise json.JSONDecodeError("Unterminated JSON array", text, len(text))
+    finally:
+        if not finished:
+            resp.close()  # abandoned mid-body: do not return the connection to the pool
+
+
+def _skip_whitespace(text: str, pos: int) -> int:
+    while pos < len(text) and text[pos] in " \t\n\r":
+        pos += 1
+    return pos
+
+
+def _content_length(resp: requests.Response) -> int | None:
+    value = resp.headers.get("Content-Length")
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    return None
+
+
+def _content_encoded(resp: requests.Response) -> bool:
+    value = resp.headers.get("Content-Encoding")
+    return isinstance(value, str) and value.lower() not in ("", "identity")
+
+
+def _size_error() -> ValueError:
+    return ValueError(f"Response exceeded size limit of {MAX_RESPONSE_BYTES} bytes (SEC-05)")
+
+
+def parse_retry_after(value: Any) -> float | None:
+    """Return the seconds a Retry-After header value asks clients to wait.
+
+    Accepts both RFC 9110 forms, delta-seconds ("120") and an HTTP-date; a
+    date in the past means 0.0.  Returns None for a missing or unparseable
+    value.
+    """
+    if not isinstance(value, str) or not value.strip():
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=datetime.timezone.utc)
+    now = datetime.datetime.now(tz=datetime.timezone.utc)
+    return max(0.0, (when - now).total_seconds())
+
+
+def with_retry_after(result: Any, status_code: Any, header: Any) -> Any:
+    """Attach a 429/503 response's Retry-After to an EnrichmentError.
+
+    Anything else (successful bodies, other statuses, a missing header) is
+    returned unchanged.  The orchestrators schedule the retry accordingly.
+    """
+    if not isinstance(result, EnrichmentError) or status_code not in RETRY_AFTER_STATUSES:
+        return result
+    seconds = parse_retry_after(header)
+    if seconds is None:
+        return result
+    return dataclasses.replace(result, retry_after=seconds)
 
 
 def safe_request(
@@ -86,6 +253,8 @@ def safe_request(
     data: dict[str, Any] | None = None,
     json_payload: dict[str, Any] | None = None,
     pre_raise_hook: Callable[[requests.Response], Any | None] | None = None,
+    hedge: bool = False,
+    reader: Callable[[requests.Response], Any] = read_limited,
 ) -> dict | EnrichmentError:
     """Canonical HTTP request path for all enrichment adapters.
 
@@ -104,7 +273,8 @@ def safe_request(
         url:            Full request URL.
         allowed_hosts:  SSRF allowlist (SEC-16).
         ioc:            The IOC being looked up (used for error context).
-        provider:       Provider name (used for error context).
+        provider:       Provider name (used for error context and latency
+                        tracking).
         method:         HTTP method — 'GET' or 'POST'.
         data:           Form-encoded body (POST only).
         json_payload:   JSON body (POST only).  Named to avoid shadowing
@@ -113,17 +283,92 @@ def safe_request(
                         *before* raise_for_status().  If the hook returns
                         a non-None value, that value is returned immediately
                         (short-circuit for 404→no_data patterns).
+        hedge:          Allow a hedged second attempt.  Only pass True for
+                        idempotent requests to zero-auth providers; ignored
+                        for anything but GET.
+        reader:         Turns the successful streaming Response into the
+                        return value.  Defaults to read_limited(); pass one
+                        built on iter_json_array() to stop reading early.
 
     Returns:
         Parsed JSON body as dict on success, or EnrichmentError on failure.
     """
+    def attempt() -> dict | EnrichmentError:
+        return _request_once(
+            session, url, allowed_hosts, ioc, provider, method, data, json_payload,
+            pre_raise_hook, reader,
+        )
+
+    delay = PROVIDER_LATENCY.hedge_delay(provider) if hedge and method.upper() == "GET" else None
+    if delay is None:
+        return attempt()
+    return hedged_call(attempt, delay, provider)
+
+
+def hedged_call(attempt: Callable[[], T], delay: float, provider: str) -> T:
+    """Run attempt(), and again concurrently if the first has not returned after delay.
+
+    Returns the first result that is not an EnrichmentError, or the first
+    error if both attempts fail.  The slower attempt is abandoned: it runs to
+    completion (bounded by its read timeout) and its result is discarded.
+
+    Args:
+        attempt:  The request to run; must be idempotent.
+        delay:    Seconds to wait for the first attempt before hedging.
+        provider: Provider name, for the hedge counter.
+    """
+    pool = _get_hedge_pool()
+    first = pool.submit(attempt)
+    try:
+        return first.result(timeout=delay)
+    except FutureTimeoutError:
+        pass
+
+    PROVIDER_LATENCY.record_hedge(provider)
+    pending = {first, pool.submit(attempt)}
+    error: T | None = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            result = future.result()
+            if not isinstance(result, EnrichmentError):
+                return result
+            if error is None:
+                error = result
+    return error  # type: ignore[return-value]
+
+
+def _get_hedge_pool() -> ThreadPoolExecutor:
+    global _hedge_pool
+    with _hedge_pool_lock:
+        if _hedge_pool is None:
+            _hedge_pool = ThreadPoolExecutor(
+                max_workers=HEDGE_POOL_WORKERS, thread_name_prefix="http-hedge"
+            )
+        return _hedge_pool
+
+
+def _request_once(
+    session: requests.Session,
+    url: str,
+    allowed_hosts: list[str],
+    ioc: IOC,
+    provider: str,
+    method: str,
+    data: dict[str, Any] | None,
+    json_payload: dict[str, Any] | None,
+    pre_raise_hook: Callable[[requests.Response], Any | None] | None,
+    reader: Callable[[requests.Response], Any] = read_limited,
+) -> dict | EnrichmentError:
+    """One attempt of safe_request(); records the provider's response time."""
+    started = time.monotonic()
     try:
         validate_endpoint(url, allowed_hosts)
 
         dispatch = getattr(session, method.lower())
         resp = dispatch(
             url,
-            timeout=TIMEOUT,
+            timeout=PROVIDER_LATENCY.timeout(provider),
             allow_redirects=False,
             stream=True,
             data=data,
@@ -133,17 +378,29 @@ def safe_request(
         if pre_raise_hook is not None:
             hook_result = pre_raise_hook(resp)
             if hook_result is not None:
-                return hook_result
+                PROVIDER_LATENCY.record(provider, time.monotonic() - started)
+                return with_retry_after(
+                    hook_result, resp.status_code, resp.headers.get("Retry-After")
+                )
 
         resp.raise_for_status()
-        body = read_limited(resp)
+        body = reader(resp)
+        PROVIDER_LATENCY.record(provider, time.monotonic() - started)
         return body
 
     except requests.exceptions.Timeout:
+        # Censored sample: the provider took at least this long.
+        PROVIDER_LATENCY.record(provider, time.monotonic() - started)
         return EnrichmentError(ioc=ioc, provider=provider, error="Request timed out")
     except requests.exceptions.HTTPError as exc:
-        status = exc.response.status_code if exc.response is not None else "unknown"
-        return EnrichmentError(ioc=ioc, provider=provider, error=f"HTTP {status}")
+        PROVIDER_LATENCY.record(provider, time.monotonic() - started)
+        if exc.response is None:
+            return EnrichmentError(ioc=ioc, provider=provider, error="HTTP unknown")
+        status = exc.response.status_code
+        return with_retry_after(
+            EnrichmentError(ioc=ioc, provider=provider, error=f"HTTP {status}"),
+            status, exc.response.headers.get("Retry-After"),
+        )
     except requests.exceptions.SSLError:
         return EnrichmentError(ioc=ioc, provider=provider, error="SSL/TLS error")
     except requests.exceptions.ConnectionError:
@@ -0,0 +1,566 @@
+"""Enrichment job state that outlives the process running the job.
+
+Job progress used to live only in the orchestrator's _jobs dict and the
+routes' _orchestrators registry, so a restart lost every in-flight job and a
+status poll that landed on another gunicorn worker answered 404.
+
+A JobStore holds each job's metadata (its spec: input text, mode, IOCs and
+policy; total, done and complete) and an append-only log of its entries:
+every result and every policy cancellation, as the JSON fragment the
+orchestrator already encodes once per result (result_log.py), keyed by
+sequence number and by its dispatch pair (provider|ioc_type|ioc_value).
+
+The orchestrator reserves each entry's sequence number under its lock, in
+the same order as its in-memory lists, and writes the entries to the store
+outside the lock, in sequence order (see orchestrator._StoreWriter).  So a
+store's sequence numbers are the same since cursors the in-memory status
+uses, and a client may alternate between workers without missing or
+repeating a result.  Appends are idempotent: an entry already logged at its
+sequence number is ignored, so a failed write is simply retried.
+
+Two implementations:
+
+    MemoryJobStore -- process-local, bounded like the orchestrator registry.
+        It survives nothing, so create_app attaches no store at all unless
+        a durable one is configured (the orchestrator already holds its
+        jobs in memory); useful for tests and embedding.
+    SQLiteJobStore -- one database shared by every worker process on the
+        host (WAL, one writer connection plus per-thread readers, as in
+        HistoryStore).  Any worker can serve a job's status, and jobs
+        survive restarts.
+
+Ownership is a lease: the process running a job is its owner and renews
+the heartbeat of its jobs; a job that is not complete and whose heartbeat
+is older than the lease (its process died) is claimed by the next process to
+sweep, which resumes it from its unfinished dispatch pairs.  A process that
+shuts down cleanly releases its leases, so its jobs are picked up by the
+next sweep instead of after the lease expires.  JobLeases runs the sweep at
+startup and then periodically on a daemon thread.
+
+Usage:
+    store = SQLiteJobStore(db_path)
+    store.create(job_id, spec, owner=process_owner())
+    store.start(job_id, total)
+    store.append(job_id, RESULT, 0, [(pair_key(provider, ioc), fragment)])
+    store.status_since(job_id, since)  # -> {"total", "done", ..., "fragments"}
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Protocol
+
+from app.cache.codec import DEFAULT_CODEC, decode_payload, encode_payload, get_codec
+from app.cache.connections import ConnectionPool
+from app.pipeline.models import IOC
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = Path.home() / ".sentinelx" / "jobs.db"
+DEFAULT_LEASE_SECONDS = 30.0
+DEFAULT_MAX_JOBS = 1000  # finished jobs kept by SQLiteJobStore (MemoryJobStore: 200)
+
+# Entry kinds: a result (or error), or a lookup a JobPolicy cancelled.
+RESULT = "result"
+CANCELLED = "cancelled"
+
+_BOOT_ID = uuid.uuid4().hex[:8]
+
+
+def process_owner() -> str:
+    """Return this process's lease owner token (host:pid:boot id).
+
+    The pid is read on every call, so workers forked from a preloaded app
+    each get their own token.
+    """
+    return f"{socket.gethostname()}:{os.getpid()}:{_BOOT_ID}"
+
+
+def pair_key(provider: str, ioc: IOC) -> str:
+    """Return the store key of one dispatch pair: provider|ioc_type|ioc_value."""
+    return f"{provider}|{ioc.type.value}|{ioc.value}"
+
+
+class JobStore(Protocol):
+    """Job metadata plus an append-only log of result and cancellation fragments."""
+
+    durable: bool  # True if jobs survive the process (and are visible to others)
+
+    def create(self, job_id: str, spec: dict, owner: str) -> None:
+        """Register a new job with its spec (input_text, mode, iocs, policy)."""
+
+    def start(self, job_id: str, total: int) -> None:
+        """Set a job's total dispatched lookups (registering it without a spec if new)."""
+
+    def append(
+        self, job_id: str, kind: str, start: int, entries: list[tuple[str, bytes]]
+    ) -> None:
+        """Append (pair key, fragment) entries of one kind at sequence start, start+1, ..."""
+
+    def complete(self, job_id: str) -> None:
+        """Mark a job complete; it is never resumed."""
+
+    def status_since(self, job_id: str, since: int, cancelled_since: int = 0) -> dict | None:
+        """Return total, done, complete, fragments[since:], next_since,
+        cancelled[cancelled_since:] and next_cancelled_since."""
+
+    def progress(self, job_id: str) -> tuple[int, bool] | None:
+        """Return a job's (done, complete), or None if the store does not hold it."""
+
+    def entries(self, job_id: str) -> tuple[list[tuple[str, bytes]], list[tuple[str, bytes]]]:
+        """Return a job's (pair key, fragment) results and cancellations, in order."""
+
+    def claim_interrupted(self, owner: str, lease_seconds: float) -> dict[str, dict]:
+        """Take over unfinished jobs whose lease expired; return {job_id: spec}."""
+
+    def renew(self, owner: str) -> None:
+        """Refresh the heartbeat of every unfinished job `owner` holds."""
+
+    def release(self, owner: str) -> None:
+        """Give up `owner`'s unfinished jobs so the next sweep resumes them."""
+
+    def abandon(self, job_id: str) -> None:
+        """Give up one unfinished job so the next sweep resumes it from its entries."""
+
+    def close(self) -> None:
+        """Release the store's resources."""
+
+
+def _new_record(spec: dict | None, owner: str | None, now: float) -> dict:
+    return {
+        "spec": spec,
+        "total": 0,
+        "done": 0,
+        "complete": False,
+        "owner": owner,
+        "heartbeat": now,
+        RESULT: [],
+        CANCELLED: [],
+    }
+
+
+def _decode_cancelled(fragments: list[bytes]) -> list[dict]:
+    return [json.loads(fragment) for fragment in fragments]
+
+
+class MemoryJobStore:
+    """Process-local JobStore: an LRU-bounded dict of job records. Thread-safe.
+
+    Args:
+        max_jobs: Jobs retained before the oldest is dropped.
+        clock:    Wall-clock source for heartbeats (tests).
+    """
+
+    durable = False
+
+    def __init__(self, max_jobs: int = 200, clock: Callable[[], float] = time.time) -> None:
+        self._max_jobs = max_jobs
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._jobs: OrderedDict[str, dict] = OrderedDict()
+
+    def create(self, job_id: str, spec: dict, owner: str) -> None:
+        with self._lock:
+            self._jobs[job_id] = _new_record(spec, owner, self._clock())
+            self._evict_if_needed()
+
+    def start(self, job_id: str, total: int) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                job = self._jobs[job_id] = _new_record(None, None, self._clock())
+                self._evict_if_needed()
+            job["total"] = total
+            job["heartbeat"] = self._clock()
+
+    def append(
+        self, job_id: str, kind: str, start: int, entries: list[tuple[str, bytes]]
+    ) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            log = job[kind]
+            log.extend(entries[max(len(log) - start, 0):])  # already logged: ignored
+            job["done"] = len(job[RESULT]) + len(job[CANCELLED])
+            job["heartbeat"] = self._clock()
+
+    def complete(self, job_id: str) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job["complete"] = True
+
+    def status_since(self, job_id: str, since: int, cancelled_since: int = 0) -> dict | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            results = job[RESULT]
+            fragments = [fragment for _, fragment in results[max(since, 0):]]
+            cancelled = [fragment for _, fragment in job[CANCELLED][max(cancelled_since, 0):]]
+            status = {
+                "total": job["total"],
+                "done": job["done"],
+                "complete": job["complete"],
+                "fragments": fragments,
+                "next_since": len(results),
+                "next_cancelled_since": len(job[CANCELLED]),
+            }
+        status["cancelled"] = _decode_cancelled(cancelled)
+        return status
+
+    def progress(self, job_id: str) -> tuple[int, bool] | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return (job["done"], job["complete"]) if job is not None else None
+
+    def entries(self, job_id: str) -> tuple[list[tuple[str, bytes]], list[tuple[str, bytes]]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return [], []
+            return list(job[RESULT]), list(job[CANCELLED])
+
+    def claim_interrupted(self, owner: str, lease_seconds: float) -> dict[str, dict]:
+        now = self._clock()
+        claimed: dict[str, dict] = {}
+        with self._lock:
+            for job_id, job in self._jobs.items():
+                if job["complete"] or job["spec"] is None:
+                    continue
+                if job["owner"] is not None and job["heartbeat"] >= now - lease_seconds:
+                    continue
+                job["owner"], job["heartbeat"] = owner, now
+                claimed[job_id] = job["spec"]
+        return claimed
+
+    def renew(self, owner: str) -> None:
+        now = self._clock()
+        with self._lock:
+            for job in self._jobs.values():
+                if job["owner"] == owner and not job["complete"]:
+                    job["heartbeat"] = now
+
+    def release(self, owner: str) -> None:
+        with self._lock:
+            for job in self._jobs.values():
+                if job["owner"] == owner and not job["complete"]:
+                    job["owner"] = None
+
+    def abandon(self, job_id: str) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and not job["complete"]:
+                job["owner"] = None
+
+    def close(self) -> None:
+        pass
+
+    def _evict_if_needed(self) -> None:
+        """Drop the oldest jobs beyond max_jobs. Caller holds _lock."""
+        while len(self._jobs) > self._max_jobs:
+            self._jobs.popitem(last=False)
+
+
+_CREATE_JOBS = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id         TEXT    PRIMARY KEY,
+    spec       BLOB,
+    total      INTEGER NOT NULL DEFAULT 0,
+    done       INTEGER NOT NULL DEFAULT 0,
+    results    INTEGER NOT NULL DEFAULT 0,
+    complete   INTEGER NOT NULL DEFAULT 0,
+    owner      TEXT,
+    heartbeat  REAL    NOT NULL,
+    created_at REAL    NOT NULL
+)
+"""
+
+_CREATE_ENTRIES = """
+CREATE TABLE IF NOT EXISTS job_entries (
+    job_id   TEXT    NOT NULL,
+    kind     TEXT    NOT NULL,
+    seq      INTEGER NOT NULL,
+    pair     TEXT    NOT NULL,
+    fragment BLOB    NOT NULL,
+    PRIMARY KEY (job_id, kind, seq)
+) WITHOUT ROWID
+"""
+
+
+class SQLiteJobStore:
+    """JobStore in a SQLite database shared by every worker process on the host.
+
+    Writes go through one writer connection under a lock (SQLite's own
+    locking serializes writers across processes); reads use per-thread
+    read-only connections from ConnectionPool.  Fragments are stored as-is:
+    they are already compact JSON, and status reads return them unchanged.
+    Specs are stored through the codec layer.
+
+    Args:
+        db_path:  Path to the SQLite database file.
+                  Defaults to ~/.sentinelx/jobs.db.
+        max_jobs: Finished jobs retained; older ones are pruned on create().
+        codec:    Payload codec for job specs (see app/cache/codec.py).
+        clock:    Wall-clock source for heartbeats (tests).
+    """
+
+    durable = True
+
+    def __init__(
+        self,
+        db_path: Path | None = None,
+        *,
+        max_jobs: int = DEFAULT_MAX_JOBS,
+        codec: str = DEFAULT_CODEC,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._codec = get_codec(codec).name
+        self._db_path = db_path if db_path is not None else DEFAULT_DB_PATH
+        self._max_jobs = max_jobs
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._db_path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+        self._pool = ConnectionPool(self._db_path)
+        self._conn = self._pool.writer  # guarded by _lock
+        self._conn.execute(_CREATE_JOBS)
+        self._conn.execute(_CREATE_ENTRIES)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_jobs_unfinished ON jobs (complete, heartbeat)"
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        """Close the writer and all per-thread reader connections."""
+        with self._lock:
+            self._pool.close()
+
+    def create(self, job_id: str, spec: dict, owner: str) -> None:
+        now = self._clock()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (id, spec, owner, heartbeat, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (job_id, encode_payload(spec, self._codec), owner, now, now),
+            )
+            self._prune()
+            self._conn.commit()
+
+    def _prune(self) -> None:
+        """Drop finished jobs beyond the newest max_jobs. Caller holds _lock."""
+        stale = self._conn.execute(
+            "SELECT id FROM jobs WHERE complete = 1 ORDER BY created_at DESC "
+            "LIMIT -1 OFFSET ?",
+            (self._max_jobs,),
+        ).fetchall()
+        if stale:
+            self._conn.executemany("DELETE FROM job_entries WHERE job_id = ?", stale)
+            self._conn.executemany("DELETE FROM jobs WHERE id = ?", stale)
+
+    def start(self, job_id: str, total: int) -> None:
+        now = self._clock()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, total, heartbeat, created_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET total = excluded.total, "
+                "heartbeat = excluded.heartbeat",
+                (job_id, total, now, now),
+            )
+            self._conn.commit()
+
+    def append(
+        self, job_id: str, kind: str, start: int, entries: list[tuple[str, bytes]]
+    ) -> None:
+        rows = [
+            (job_id, kind, start + offset, pair, fragment)
+            for offset, (pair, fragment) in enumerate(entries)
+        ]
+        with self._lock:
+            added = self._conn.executemany(
+                "INSERT OR IGNORE INTO job_entries (job_id, kind, seq, pair, fragment) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            ).rowcount
+            self._conn.execute(
+                "UPDATE jobs SET done = done + ?, results = results + ?, heartbeat = ? "
+                "WHERE id = ?",
+                (added, added if kind == RESULT else 0, self._clock(), job_id),
+            )
+            self._conn.commit()
+
+    def complete(self, job_id: str) -> None:
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET complete = 1 WHERE id = ?", (job_id,))
+            self._conn.commit()
+
+    def status_since(self, job_id: str, since: int, cancelled_since: int = 0) -> dict | None:
+        conn = self._pool.reader()
+        row = conn.execute(
+            "SELECT total, done, complete, results FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        # Only the entries the jobs row counts are read (done counts results
+        # plus cancellations), so both slices always match their next cursor
+        # even if an append lands between the queries.
+        cancelled_count = row[1] - row[3]
+        fragments = [
+            fragment for (fragment,) in conn.execute(
+                "SELECT fragment FROM job_entries "
+                "WHERE job_id = ? AND kind = 'result' AND seq >= ? AND seq < ? ORDER BY seq",
+                (job_id, max(since, 0), row[3]),
+            )
+        ]
+        cancelled = [
+            fragment for (fragment,) in conn.execute(
+                "SELECT fragment FROM job_entries "
+                "WHERE job_id = ? AND kind = 'cancelled' AND seq >= ? AND seq < ? ORDER BY seq",
+                (job_id, max(cancelled_since, 0), cancelled_count),
+            )
+        ]
+        return {
+            "total": row[0],
+            "done": row[1],
+            "complete": bool(row[2]),
+            "fragments": fragments,
+            "next_since": row[3],
+            "cancelled": _decode_cancelled(cancelled),
+            "next_cancelled_since": cancelled_count,
+        }
+
+    def progress(self, job_id: str) -> tuple[int, bool] | None:
+        row = self._pool.reader().execute(
+            "SELECT done, complete FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        return (row[0], bool(row[1])) if row is not None else None
+
+    def entries(self, job_id: str) -> tuple[list[tuple[str, bytes]], list[tuple[str, bytes]]]:
+        rows = self._pool.reader().execute(
+            "SELECT kind, pair, fragment FROM job_entries WHERE job_id = ? ORDER BY kind, seq",
+            (job_id,),
+        ).fetchall()
+        results = [(pair, fragment) for kind, pair, fragment in rows if kind == RESULT]
+        cancelled = [(pair, fragment) for kind, pair, fragment in rows if kind == CANCELLED]
+        return results, cancelled
+
+    def claim_interrupted(self, owner: str, lease_seconds: float) -> dict[str, dict]:
+        now = self._clock()
+        with self._lock:
+            # One UPDATE: SQLite's write lock makes the claim atomic across
+            # processes, so each expired job goes to exactly one claimant.
+            rows = self._conn.execute(
+                "UPDATE jobs SET owner = ?, heartbeat = ? "
+                "WHERE complete = 0 AND spec IS NOT NULL "
+                "AND (owner IS NULL OR heartbeat < ?) "
+                "RETURNING id, spec",
+                (owner, now, now - lease_seconds),
+            ).fetchall()
+            self._conn.commit()
+        return {job_id: decode_payload(spec) for job_id, spec in rows}
+
+    def renew(self, owner: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET heartbeat = ? WHERE owner = ? AND complete = 0",
+                (self._clock(), owner),
+            )
+            self._conn.commit()
+
+    def release(self, owner: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET owner = NULL WHERE owner = ? AND complete = 0", (owner,)
+            )
+            self._conn.commit()
+
+    def abandon(self, job_id: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET owner = NULL WHERE id = ? AND complete = 0", (job_id,)
+            )
+            self._conn.commit()
+
+
+class JobLeases:
+    """Keeps this process's job leases fresh and resumes jobs other processes lost.
+
+    Every lease_seconds / 3 it renews the heartbeat of the jobs this process
+    owns, then claims every unfinished job whose lease has expired and hands
+    their specs to `resume`.
+
+    Args:
+        store:         The shared JobStore.
+        resume:        Called with {job_id: spec} of newly claimed jobs.
+        lease_seconds: Heartbeat age after which a job counts as interrupted.
+        owner:         Lease owner token. Defaults to process_owner().
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        resume: Callable[[dict[str, dict]], None],
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+        owner: str | None = None,
+    ) -> None:
+        self._store = store
+        self._resume = resume
+        self._lease_seconds = lease_seconds
+        self.owner = owner if owner is not None else process_owner()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._run_lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start the background thread (idempotent)."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="job-leases", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None, release: bool = True) -> None:
+        """Signal the thread to exit and wait for it; release this process's leases.
+
+        Only the first call does anything (create_app also registers it atexit).
+        """
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if release:
+            try:
+                self._store.release(self.owner)
+            except Exception:  # noqa: BLE001 — shutting down; the lease expires anyway
+                logger.warning("Failed to release job leases", exc_info=True)
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self._lease_seconds / 3):
+            self.run_once()
+
+    def run_once(self) -> list[str]:
+        """Renew this process's leases and resume expired jobs; return their ids.
+
+        Errors are logged, never raised, so one failed sweep does not kill
+        the thread.
+        """
+        with self._run_lock:
+            try:
+                self._store.renew(self.owner)
+                claimed = self._store.claim_interrupted(self.owner, self._lease_seconds)
+                if claimed:
+                    logger.info("Resuming %d interrupted enrichment job(s)", len(claimed))
+                    self._resume(claimed)
+                return list(claimed)
+            except Exception:  # noqa: BLE001 — keep the thread alive
+                logger.warning("Job lease sweep failed", exc_info=True)
+                return []
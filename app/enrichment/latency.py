@@ -0,0 +1,154 @@
+"""Per-provider latency tracking: adaptive read timeouts and hedged requests.
+
+http_safety.TIMEOUT = (5, 30) used to apply to every provider, although crt.sh
+and ThreatMiner routinely take 20s+ while Shodan InternetDB answers in 100ms;
+a single stuck read on a fast provider pinned a worker for the full 30s.
+
+LatencyTracker keeps a rolling window of each provider's observed response
+times (time from sending the request to having the whole body) and derives:
+
+    timeout(provider)     — (connect, read) for the next request.  The read
+        timeout is TIMEOUT_MULTIPLIER x the provider's p95, clamped to
+        [MIN_READ_TIMEOUT, TIMEOUT[1]].  Until MIN_SAMPLES responses have been
+        seen the static TIMEOUT applies; the connect timeout never adapts.
+        A request that times out is recorded at the elapsed time, so a
+        provider that slows down raises its own p95 and the timeout widens
+        again.
+    hedge_delay(provider) — the p95, after which a hedged request fires a
+        second identical attempt (see http_safety.hedged_call).  None until
+        MIN_SAMPLES responses have been seen, or while hedging is disabled.
+
+Hedging is opt-in (SENTINELX_ENRICHMENT_HEDGING) and only ever applied to
+idempotent GETs against zero-auth providers, so it never spends API quota.
+
+http_safety.PROVIDER_LATENCY is the process-wide tracker used by
+safe_request() and async_safe_request().
+
+Usage:
+    from app.enrichment.http_safety import PROVIDER_LATENCY
+    PROVIDER_LATENCY.record("Shodan InternetDB", 0.12)
+    connect, read = PROVIDER_LATENCY.timeout("Shodan InternetDB")
+    PROVIDER_LATENCY.snapshot()  # {"Shodan InternetDB": {"p50_ms": ..., ...}}
+"""
+from __future__ import annotations
+
+import threading
+from collections import deque
+
+WINDOW = 200  # most recent responses kept per provider
+MIN_SAMPLES = 20
+TIMEOUT_MULTIPLIER = 3.0
+MIN_READ_TIMEOUT = 2.0
+
+
+class LatencyTracker:
+    """Rolling per-provider latency percentiles. Thread-safe.
+
+    Args:
+        default:     Static (connect, read) timeout; its read value is also
+                     the ceiling for adapted read timeouts.
+        window:      Samples kept per provider.
+        min_samples: Samples required before timeouts adapt or hedging starts.
+        hedging:     Whether hedge_delay() returns a delay at all.
+    """
+
+    def __init__(
+        self,
+        default: tuple[float, float],
+        window: int = WINDOW,
+        min_samples: int = MIN_SAMPLES,
+        hedging: bool = False,
+    ) -> None:
+        self._default = default
+        self._window = window
+        self._min_samples = min_samples
+        self.hedging = hedging
+        self._configured = False  # configure() has run
+        self._lock = threading.Lock()
+        self._samples: dict[str, deque[float]] = {}
+        self._sorted: dict[str, list[float]] = {}  # lazily rebuilt after record()
+        self._hedges: dict[str, int] = {}
+
+    def configure(self, *, hedging: bool) -> bool:
+        """Apply the process's hedging setting; the same setting again is a no-op.
+
+        Returns:
+            True if it replaced a different setting an earlier configure() made.
+        """
+        with self._lock:
+            replaced = self._configured and self.hedging != hedging
+            self.hedging = hedging
+            self._configured = True
+        return replaced
+
+    def record(self, provider: str, seconds: float) -> None:
+        """Add one observed response time for provider."""
+        with self._lock:
+            samples = self._samples.get(provider)
+            if samples is None:
+                samples = self._samples[provider] = deque(maxlen=self._window)
+            samples.append(seconds)
+            self._sorted.pop(provider, None)
+
+    def record_hedge(self, provider: str) -> None:
+        """Count one hedge attempt fired for provider."""
+        with self._lock:
+            self._hedges[provider] = self._hedges.get(provider, 0) + 1
+
+    def percentile(self, provider: str, pct: float) -> float | None:
+        """Return the pct (0-1) latency percentile, or None below min_samples."""
+        with self._lock:
+            return self._percentile_locked(provider, pct)
+
+    def _percentile_locked(self, provider: str, pct: float) -> float | None:
+        ordered = self._sorted.get(provider)
+        if ordered is None:
+            samples = self._samples.get(provider)
+            if not samples or len(samples) < self._min_samples:
+                return None
+            ordered = self._sorted[provider] = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+    def timeout(self, provider: str) -> tuple[float, float]:
+        """Return the (connect, read) timeout for provider's next request."""
+        return self.adapted_timeout(provider) or self._default
+
+    def adapted_timeout(self, provider: str) -> tuple[float, float] | None:
+        """Return the latency-derived timeout, or None below min_samples."""
+        p95 = self.percentile(provider, 0.95)
+        if p95 is None:
+            return None
+        connect, ceiling = self._default
+        return (connect, min(ceiling, max(MIN_READ_TIMEOUT, p95 * TIMEOUT_MULTIPLIER)))
+
+    def hedge_delay(self, provider: str) -> float | None:
+        """Return seconds to wait before hedging, or None to not hedge."""
+        if not self.hedging:
+            return None
+        return self.percentile(provider, 0.95)
+
+    def snapshot(self) -> dict[str, dict]:
+        """Return per-provider latency stats (for /api/metrics)."""
+        with self._lock:
+            providers = sorted(self._samples)
+            stats = {}
+            for provider in providers:
+                p50 = self._percentile_locked(provider, 0.50)
+                p95 = self._percentile_locked(provider, 0.95)
+                stats[provider] = {
+                    "samples": len(self._samples[provider]),
+                    "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+                    "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+                    "hedges": self._hedges.get(provider, 0),
+                }
+        for provider, entry in stats.items():
+            entry["read_timeout_s"] = round(self.timeout(provider)[1], 2)
+        return stats
+
+    def reset(self) -> None:
+        """Forget every sample (tests, or after a provider outage)."""
+        with self._lock:
+            self._samples.clear()
+            self._sorted.clear()
+            self._hedges.clear()
+
@@ -5,7 +5,7 @@ Both models are frozen dataclasses to match the Phase 1 immutability pattern.
 """
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from app.pipeline.models import IOC
 
@@ -41,11 +41,15 @@ class EnrichmentError:
     or the IOC type is not supported by the provider.
 
     Attributes:
-        ioc:      The IOC that was queried.
-        provider: Name of the TI provider.
-        error:    Human-readable error message.
+        ioc:         The IOC that was queried.
+        provider:    Name of the TI provider.
+        error:       Human-readable error message.
+        retry_after: Seconds the provider asked clients to wait before
+                     retrying (its Retry-After header), if it sent one.
+                     A scheduling hint only; not part of equality.
     """
 
     ioc: IOC
     provider: str
     error: str
+    retry_after: float | None = field(default=None, compare=False)
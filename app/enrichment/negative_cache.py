@@ -0,0 +1,86 @@
+"""Negative-cache policy: which EnrichmentErrors are worth remembering, and for how long.
+
+Successful lookups — including "not found" answers that adapters map to
+verdict="no_data" — are stored in the main enrichment cache with the user's
+TTL.  Errors used to be re-fetched on every analysis, even when the provider
+would certainly give the same answer again (an invalid identifier, a type the
+provider cannot handle, an exhausted daily quota).  For rate-limited
+providers such as VirusTotal and AbuseIPDB that spends quota on a known
+outcome each time the same noisy log is re-analysed.
+
+classify_error() maps an adapter's error message to an error class, and
+negative_ttl() returns how long an error of that class from that provider is
+cached in CacheStore's negative tier.  Transient failures (timeouts,
+connection/TLS errors, 5xx, 429, authentication errors) are never cached:
+they may succeed on the very next attempt or after the analyst fixes a key.
+
+Error classes:
+    unsupported  — the adapter cannot handle this IOC ("Unsupported type",
+                   "Invalid IP address").  Deterministic for a given build.
+    bad_request  — HTTP 400/422: the provider rejected the identifier.
+    not_found    — HTTP 404/410 that the adapter did not map to no_data.
+    quota        — a provider quota is exhausted ("WHOIS quota exceeded").
+                   Short TTL: quotas reset.
+"""
+from __future__ import annotations
+
+import re
+
+# Default TTL per error class, in seconds.
+ERROR_CLASS_TTLS: dict[str, int] = {
+    "unsupported": 7 * 24 * 3600,
+    "bad_request": 24 * 3600,
+    "not_found": 6 * 3600,
+    "quota": 3600,
+}
+
+# Per-provider overrides, keyed by (provider name, error class).  Rate-limited
+# providers hold deterministic answers longer to protect their daily budgets.
+PROVIDER_TTL_OVERRIDES: dict[tuple[str, str], int] = {
+    ("VirusTotal", "not_found"): 24 * 3600,
+    ("AbuseIPDB", "bad_request"): 7 * 24 * 3600,  # 422 for private/reserved IPs
+    ("WHOIS", "quota"): 15 * 60,
+}
+
+_HTTP_STATUS_RE = re.compile(r"\bHTTP (\d{3})\b")
+
+_STATUS_CLASSES: dict[int, str] = {
+    400: "bad_request",
+    422: "bad_request",
+    404: "not_found",
+    410: "not_found",
+}
+
+_MESSAGE_CLASSES: dict[str, str] = {
+    "Unsupported type": "unsupported",
+    "Invalid IP address": "unsupported",
+    "WHOIS quota exceeded": "quota",
+}
+
+
+def classify_error(error: str) -> str | None:
+    """Return the negative-cache error class for an error message, or None.
+
+    None means the error is transient (or unknown) and must not be cached.
+    """
+    error_class = _MESSAGE_CLASSES.get(error)
+    if error_class is not None:
+        return error_class
+    match = _HTTP_STATUS_RE.search(error)
+    if match:
+        return _STATUS_CLASSES.get(int(match.group(1)))
+    return None
+
+
+def negative_ttl(provider: str, error: str) -> tuple[str, int] | None:
+    """Return (error_class, ttl_seconds) for a cacheable error, or None.
+
+    Args:
+        provider: Adapter name (e.g. "VirusTotal").
+        error:    EnrichmentError.error message.
+    """
+    error_class = classify_error(error)
+    if error_class is None:
+        return None
+    ttl = PROVIDER_TTL_OVERRIDES.get((provider, error_class), ERROR_CLASS_TTLS[error_class])
+    return error_class, ttl
@@ -1,36 +1,113 @@
 """Enrichment orchestrator.
 
-Runs IOC lookups in parallel via ThreadPoolExecutor, tracks job progress in a
+Runs IOC lookups in parallel on a shared FairExecutor, tracks job progress in a
 thread-safe dict, retries failed lookups once, and evicts old jobs via LRU.
 
 Design decisions:
+- Lookups run on the application-scoped FairExecutor (executor.py): one globally
+  capped worker pool, round-robin between jobs.  Without one, enrich_all falls back
+  to a private FairExecutor(max_workers) for the duration of the call.
 - max_workers=20 default: thread pool is no longer the concurrency gate; per-provider
   semaphores cap rate-limited providers (e.g. VT at 4) while zero-auth providers run freely.
+- Optional shared RateLimiter (rate_limit.py): per-provider token buckets pace requests
+  to the provider's published rate and daily budget across all jobs; semaphores still
+  bound in-flight concurrency.
 - _semaphores dict: keyed by adapter name; built for adapters with requires_api_key=True;
   each semaphore limits peak concurrent lookups for that provider (default cap: 4).
 - Zero-auth adapters (requires_api_key=False) have no semaphore — unlimited concurrency.
-- Semaphore wraps each individual attempt (cache-check + lookup + cache-store) in _do_lookup,
-  but NOT the backoff sleep between retries. This prevents concurrent 429s from holding all
-  semaphore slots while sleeping, which would starve every other queued IOC.
+- Semaphore wraps each individual attempt (lookup + cache-store) in _attempt,
+  but NOT the wait between retries. This prevents concurrent 429s from holding all
+  semaphore slots while backing off, which would starve every other queued IOC.
+- No worker ever sleeps: every attempt of a lookup is its own executor task.  Retry
+  backoffs (429 backoff or the provider's Retry-After, 1s for other transient errors)
+  and waits for a rate-limit token go through the heap-scheduled RetryScheduler
+  (retry_scheduler.py), which re-submits the next attempt when it is due
 - OrderedDict for LRU eviction: simple FIFO eviction without external libraries
-- Lock protects all reads/writes to _jobs dict (thread safety)
+- Lock protects all reads/writes to _jobs dict (thread safety); a Condition on the
+  same lock is notified on every status change, so wait_for_update() lets a
+  Server-Sent Events stream push results as they land instead of being polled
 - enrich_all is designed to be called from a threading.Thread (Plan 03)
 - Fresh requests.Session is the adapter's responsibility (Pitfall 3)
 - Phase 3: accepts a list of adapters, each declaring its own supported_types set
+- Cache hits are resolved in one CacheStore.get_many() pre-pass before any work is
+  submitted; only cache misses reach the thread pool
+- Deterministic errors (see negative_cache.py) are stored in the cache's negative
+  tier with per-provider/per-class TTLs, served by the same pre-pass, and never
+  retried
+- Cache misses are submitted in dispatch-priority order (priority.py): fast,
+  high-signal providers first, slow or quota-bound ones last
+- Concurrent identical (provider, IOC) lookups — across all orchestrators in the
+  process — are collapsed by the shared SingleFlight registry; followers reuse the
+  leader's outcome and record a cached marker with the leader's completion time
+- Cached markers (ioc_value|provider -> cached_at) live in their job's record and
+  are evicted with it, so they track retained jobs, not every lookup ever served
+- A circuit breaker per provider, shared process-wide (circuit_breaker.py), fails
+  lookups fast with CIRCUIT_OPEN_ERROR while a provider is down instead of running
+  the attempt + delay + retry cycle for every IOC
+- Each result is serialized once, when it is recorded, into a JSON fragment kept in
+  the job's append-only "fragments" log (result_log.py); status polls and the
+  history save stitch fragments instead of re-serializing every result
+- Lookups for providers with a bulk API (provider.BatchProvider) are grouped per job
+  into batches of up to the provider's max_batch_size, or whatever arrived within
+  batch_window seconds (batching.py); one batch costs one request, one rate-limit
+  token and one worker.  Retries re-enter the batch window
+- With a job store (job_store.py) every recorded entry is also appended to the store:
+  its sequence number is reserved under _lock, so it matches the in-memory lists, and
+  a per-job _StoreWriter writes it outside _lock in sequence order, so no status poll
+  or worker waits on the store's disk I/O.  A failed write stays queued and is retried
+  (the store's log never has a gap); a job the store still refuses at its end is
+  handed back to the lease sweep.  A job re-run under the same job_id (resumed after
+  a restart) starts from the entries the store holds and dispatches only its
+  unfinished pairs
 """
 from __future__ import annotations
 
+import dataclasses
+import functools
+import json
 import logging
 import random
 import time
 from collections import OrderedDict
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from threading import Lock, Semaphore
-from typing import Any
+from concurrent.futures import Future, as_completed
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from threading import Condition, Lock, Semaphore
+from typing import Any, Callable
 
 from app.cache.store import CacheStore
+from app.enrichment.batching import DEFAULT_WINDOW, BatchWindow
+from app.enrichment.circuit_breaker import (
+    CIRCUIT_OPEN_ERROR,
+    CLOSED,
+    PROVIDER_BREAKERS,
+    CircuitBreakers,
+    is_provider_failure,
+)
+from app.enrichment.executor import FairExecutor
+from app.enrichment.job_store import CANCELLED, RESULT, JobStore, pair_key
 from app.enrichment.models import EnrichmentError, EnrichmentResult
-from app.pipeline.models import IOC
+from app.enrichment.negative_cache import negative_ttl
+from app.enrichment.policy import (
+    CURRENT_GUARD,
+    REASON_DEADLINE,
+    REASON_MALICIOUS,
+    JobGuard,
+    JobPolicy,
+    LookupCancelled,
+    ioc_key,
+)
+from app.enrichment.priority import order_by_priority
+from app.enrichment.provider import BatchUnavailable, is_batch_provider
+from app.enrichment.result_log import (
+    cancelled_from_dict,
+    encode_cancelled,
+    encode_result,
+    result_from_dict,
+)
+from app.enrichment.rate_limit import RateLimiter
+from app.enrichment.retry_scheduler import RETRY_SCHEDULER, RetryScheduler
+from app.enrichment.singleflight import LOOKUP_FLIGHTS, SingleFlight
+from app.pipeline.models import IOC, IOCType
 
 logger = logging.getLogger(__name__)
 
@@ -39,10 +116,71 @@ _BACKOFF_BASE = 15            # seconds for first retry delay
 _BACKOFF_MULTIPLIER = 2       # exponential factor per subsequent retry
 _BACKOFF_JITTER = 2.0         # max random jitter added to each delay (seconds)
 _MAX_RATE_LIMIT_RETRIES = 2   # extra retries on 429 (3 total attempts)
+_MAX_RETRY_AFTER = 120.0      # longer Retry-After requests are not waited out (seconds)
+_RETRY_DELAY = 1.0            # delay before the single retry of other transient errors
+_STORE_RETRY_DELAYS = (0.1, 0.5, 2.0)  # waits between job-store retries at a job's start/end
+
+DEFAULT_PROVIDER_CONCURRENCY = 4  # in-flight cap of an API-key provider without an override
+
+BUDGET_EXHAUSTED_ERROR = "Daily request budget exhausted"
+
+
+class _Lookup:
+    """One (adapter, IOC) lookup of a thread-engine job, carried across its attempts.
+
+    Each attempt runs as its own executor task; between attempts the lookup
+    waits in the RetryScheduler rather than in a worker.  outcome resolves
+    to the lookup's final result.  A lookup with a window runs its attempts
+    as part of a batch emitted by that window.
+    """
+
+    __slots__ = (
+        "job_id", "guard", "adapter", "ioc", "provider_name", "executor", "window",
+        "outcome", "started", "flight_key", "retries", "rate_limited",
+    )
+
+    def __init__(
+        self,
+        job_id: str,
+        guard: JobGuard | None,
+        adapter: Any,
+        ioc: IOC,
+        executor: FairExecutor,
+        window: BatchWindow | None = None,
+    ) -> None:
+        self.job_id = job_id
+        self.guard = guard
+        self.adapter = adapter
+        self.ioc = ioc
+        self.provider_name: str = getattr(adapter, "name", "")
+        self.executor = executor
+        self.window = window
+        self.outcome: Future = Future()
+        self.started = False
+        self.flight_key: tuple[str, str, str] | None = None  # set while leading a flight
+        self.retries = 0
+        self.rate_limited = False
+
+
+class _StoreWriter:
+    """Write-behind queue of one job's entries for the job store.
+
+    Entries are queued under the orchestrator's _lock with their sequence
+    numbers already reserved; flushes run outside it, one at a time per job,
+    so entries reach the store in sequence order.  An entry leaves the queue
+    only once its write succeeded.
+    """
+
+    __slots__ = ("pending", "flush_lock", "failing")
+
+    def __init__(self) -> None:
+        self.pending: list[tuple[str, int, str, bytes]] = []  # (kind, seq, pair, fragment)
+        self.flush_lock = Lock()
+        self.failing = False  # the last write failed (logged once per outage)
 
 
 class EnrichmentOrchestrator:
-    """Orchestrates parallel IOC enrichment using ThreadPoolExecutor.
+    """Orchestrates parallel IOC enrichment on a shared FairExecutor.
 
     Dispatches all enrichable IOCs concurrently to all matching adapters,
     retries each failure once, and records per-job progress in a thread-safe,
@@ -59,15 +197,40 @@ class EnrichmentOrchestrator:
     Args:
         adapters:             List of adapter objects. Each IOC is dispatched to every
                               adapter whose supported_types includes the IOC's type.
-        max_workers:          Maximum number of concurrent worker threads. Default 20 so
-                              the thread pool is not the bottleneck; semaphores are the
-                              real concurrency gate for rate-limited providers.
+        max_workers:          Worker threads for the private fallback executor used when
+                              no shared executor is given. Default 20 so the pool is
+                              not the bottleneck; semaphores are the real concurrency
+                              gate for rate-limited providers.
         max_jobs:             Maximum number of job status entries to retain. Oldest entries
                               are evicted via FIFO (OrderedDict) when limit is exceeded.
         provider_concurrency: Optional per-provider concurrency override dict, keyed by
                               adapter name. For any requires_api_key=True adapter not in
                               this dict, the default cap of 4 is used. Zero-auth adapters
                               are always uncapped regardless of this dict.
+        singleflight:         In-flight lookup registry used to deduplicate concurrent
+                              identical lookups. Defaults to the process-wide
+                              LOOKUP_FLIGHTS so separate jobs share it.
+        rate_limiter:         Shared per-provider token buckets (app.rate_limiter).
+                              None disables pacing.
+        executor:             Shared FairExecutor (app.enrichment_executor). Lookups
+                              are submitted under the job_id so jobs are scheduled
+                              fairly against each other.
+        provider_priority:    Per-provider dispatch priority overrides (lower runs
+                              first), on top of the defaults in priority.py.
+                              The routes pass app.config["PROVIDER_PRIORITY"].
+        breakers:             Per-provider circuit breakers. Defaults to the
+                              process-wide PROVIDER_BREAKERS so every job sees
+                              the same provider health.
+        retry_scheduler:      Delay queue that re-submits retries and token-paced
+                              attempts when due. Defaults to the process-wide
+                              RETRY_SCHEDULER.
+        batch_window:         Seconds a partial batch for a bulk-capable provider
+                              waits for more lookups. None sends one request per
+                              IOC to every provider.
+        job_store:            Durable job state (app.job_store) every result and
+                              cancellation is written through to, and resumed
+                              jobs are reloaded from. None keeps jobs in memory
+                              only.
     """
 
     def __init__(
@@ -78,42 +241,88 @@ class EnrichmentOrchestrator:
         cache: CacheStore | None = None,
         cache_ttl_seconds: int = 86400,
         provider_concurrency: dict[str, int] | None = None,
+        singleflight: SingleFlight | None = None,
+        rate_limiter: RateLimiter | None = None,
+        executor: FairExecutor | None = None,
+        provider_priority: dict[str, int] | None = None,
+        breakers: CircuitBreakers | None = None,
+        retry_scheduler: RetryScheduler | None = None,
+        batch_window: float | None = DEFAULT_WINDOW,
+        job_store: JobStore | None = None,
     ) -> None:
         self._adapters = adapters
         self._max_workers = max_workers
         self._max_jobs = max_jobs
         self._jobs: OrderedDict[str, dict] = OrderedDict()
         self._lock = Lock()
+        self._changed = Condition(self._lock)  # notified on every job status change
         self._cache = cache
         self._cache_ttl_seconds = cache_ttl_seconds
-        self._cached_markers: dict[str, str] = {}
+        self._flights = singleflight if singleflight is not None else LOOKUP_FLIGHTS
+        self._rate_limiter = rate_limiter
+        self._executor = executor
+        self._provider_priority = provider_priority
+        self._breakers = breakers if breakers is not None else PROVIDER_BREAKERS
+        self._retry_scheduler = (
+            retry_scheduler if retry_scheduler is not None else RETRY_SCHEDULER
+        )
+        self._batch_window = batch_window
+        self._job_store = job_store
+        self._writers: dict[str, _StoreWriter] = {}  # job_id -> its store queue, while running
 
         # Build per-provider semaphores for adapters that require an API key.
         # Zero-auth adapters get no semaphore (unrestricted concurrency).
+        self._provider_limits = self.concurrency_limits(adapters, provider_concurrency)
+        self._semaphores: dict[str, Semaphore] = {
+            name: Semaphore(limit) for name, limit in self._provider_limits.items()
+        }
+
+    @staticmethod
+    def concurrency_limits(
+        adapters: list[Any], provider_concurrency: dict[str, int] | None = None
+    ) -> dict[str, int]:
+        """Return the in-flight cap of each capped provider, keyed by adapter name.
+
+        Only requires_api_key adapters are capped: provider_concurrency[name],
+        or DEFAULT_PROVIDER_CONCURRENCY.  Zero-auth adapters are absent.
+        """
         concurrency = provider_concurrency or {}
-        self._semaphores: dict[str, Semaphore] = {}
+        limits: dict[str, int] = {}
         for adapter in adapters:
             name = getattr(adapter, "name", "")
             if getattr(adapter, "requires_api_key", False) and name:
-                limit = concurrency.get(name, 4)  # default cap: 4 for key-required providers
-                self._semaphores[name] = Semaphore(limit)
+                limits[name] = concurrency.get(name, DEFAULT_PROVIDER_CONCURRENCY)
+        return limits
 
-    def enrich_all(self, job_id: str, iocs: list[IOC]) -> None:
+    def enrich_all(self, job_id: str, iocs: list[IOC], policy: JobPolicy | None = None) -> None:
         """Enrich all enrichable IOCs in parallel across all matching adapters.
 
         For each IOC, dispatches to every adapter whose supported_types includes
-        the IOC's type. Runs all lookups concurrently via ThreadPoolExecutor.
+        the IOC's type. Cache hits are resolved up front in one bulk query and
+        recorded immediately; the remaining lookups are ordered by dispatch
+        priority and run concurrently on the shared FairExecutor (or a private
+        one when none was given).
         Each failed lookup (EnrichmentError result) is retried exactly once
         before being recorded.
 
         total reflects the number of dispatched lookups (IOC count x matching
         adapters), not just the IOC count.
 
+        An optional JobPolicy (policy.py) can stop the job early: lookups it
+        cancels are recorded in the status "cancelled" list and count toward
+        done.  With a deadline, enrich_all returns when it expires even if
+        lookups are still running; their late results are discarded.
+
+        With a job store, entries it already holds for job_id (recorded before
+        the process running the job stopped) are loaded first and their pairs
+        are not dispatched again.
+
         Thread safety: all mutations to the job status dict are protected by _lock.
 
         Args:
             job_id: Unique identifier for this enrichment job.
             iocs:   List of IOCs to enrich. Unsupported types are silently skipped.
+            policy: Optional early-termination policy for this job.
         """
         # Build (adapter, ioc) pairs: each IOC dispatched to every matching adapter
         dispatch_pairs = [
@@ -122,29 +331,640 @@ class EnrichmentOrchestrator:
             for adapter in self._adapters
             if ioc.type in adapter.supported_types
         ]
+        loaded = self._load_entries(job_id, dispatch_pairs)
+        if loaded is None:
+            return
+        results, fragments, cancelled, finished = loaded
+        if finished:
+            dispatch_pairs = [
+                (adapter, ioc) for adapter, ioc in dispatch_pairs
+                if pair_key(getattr(adapter, "name", ""), ioc) not in finished
+            ]
+        total = len(dispatch_pairs) + len(results) + len(cancelled)
+        if self._job_store is not None and not self._retry_store(self._job_store.start,
+                                                                 job_id, total):
+            self._abandon_job(job_id)
+            return
 
         with self._lock:
             self._jobs[job_id] = {
-                "total": len(dispatch_pairs),
-                "done": 0,
-                "results": [],
+                "total": total,
+                "done": len(results) + len(cancelled),
+                "results": results,  # append-only: get_status_since() slices it by cursor
+                "fragments": fragments,  # results[i] encoded once (result_log.py), same order
+                "cached_markers": {},  # ioc_value|provider -> cached_at, this job's hits
+                "cancelled": cancelled,
                 "complete": False,
             }
             self._evict_if_needed()
+            self._changed.notify_all()
+            if self._job_store is not None:
+                self._writers[job_id] = _StoreWriter()
 
-        with ThreadPoolExecutor(max_workers=self._max_workers) as pool:
-            futures = {
-                pool.submit(self._do_lookup, adapter, ioc): (adapter, ioc)
-                for adapter, ioc in dispatch_pairs
-            }
-            for future in as_completed(futures):
-                result = future.result()
-                with self._lock:
-                    self._jobs[job_id]["results"].append(result)
-                    self._jobs[job_id]["done"] += 1
+        # Resolve every cache hit up front in one bulk pass; only misses are
+        # submitted to the pool, so warm re-analyses never touch a worker thread.
+        guard = JobGuard(policy) if policy is not None and not policy.is_default else None
+
+        cached_results = self._resolve_cached(job_id, dispatch_pairs)
+        if cached_results:
+            hits = list(cached_results.values())
+            fragments = self._encode(job_id, hits)
+            with self._lock:
+                job = self._jobs[job_id]
+                self._log_entries(job_id, RESULT, len(job["results"]), hits, fragments)
+                job["results"].extend(hits)
+                job["fragments"].extend(fragments)
+                job["done"] += len(hits)
+                self._changed.notify_all()
+            self._flush_store(job_id)
+            if guard is not None:
+                for result in cached_results.values():
+                    guard.observe(result)  # cached malicious verdicts count too
+
+        # Fast, high-signal providers first; slow and quota-bound ones last.
+        pending_pairs = order_by_priority(
+            [pair for index, pair in enumerate(dispatch_pairs) if index not in cached_results],
+            self._provider_priority,
+        )
+
+        if pending_pairs:
+            self._run_pending(job_id, pending_pairs, guard)
 
         with self._lock:
             self._jobs[job_id]["complete"] = True
+            self._changed.notify_all()
+        if self._job_store is not None:
+            self._finish_store(job_id)
+
+    def _load_entries(
+        self, job_id: str, dispatch_pairs: list[tuple[Any, IOC]]
+    ) -> tuple[list, list[bytes], list[LookupCancelled], set[str]] | None:
+        """Load the entries the job store holds for a resumed job.
+
+        Returns (results, their fragments, cancelled, finished pair keys),
+        all empty without a store or for a new job, or None if the store
+        could not be read (the job is then abandoned, see _abandon_job()).  Results are rebuilt
+        around the job's own IOC objects; every stored entry is kept, even
+        for a provider no longer configured, so sequence numbers stay aligned
+        with the store.
+        """
+        if self._job_store is None:
+            return [], [], [], set()
+        stored = self._retry_store(self._job_store.entries, job_id)
+        if stored is None:
+            # Running without them would log new entries over their sequence
+            # numbers: hand the job back to the lease sweep instead.
+            self._abandon_job(job_id)
+            return None
+        stored_results, stored_cancelled = stored
+        if not stored_results and not stored_cancelled:
+            return [], [], [], set()
+
+        iocs = {pair_key(getattr(a, "name", ""), ioc): ioc for a, ioc in dispatch_pairs}
+
+        def ioc_for(pair: str, data: dict) -> IOC:
+            ioc = iocs.get(pair)
+            if ioc is None:
+                ioc = IOC(type=IOCType(data["ioc_type"]), value=data["ioc_value"],
+                          raw_match=data["ioc_value"])
+            return ioc
+
+        results: list = []
+        fragments: list[bytes] = []
+        for pair, fragment in stored_results:
+            data = json.loads(fragment)
+            results.append(result_from_dict(data, ioc_for(pair, data)))
+            fragments.append(fragment)
+        cancelled: list[LookupCancelled] = []
+        for pair, fragment in stored_cancelled:
+            data = json.loads(fragment)
+            cancelled.append(cancelled_from_dict(data, ioc_for(pair, data)))
+        finished = {pair for pair, _ in stored_results} | {pair for pair, _ in stored_cancelled}
+        return results, fragments, cancelled, finished
+
+    def _log_entries(
+        self, job_id: str, kind: str, start: int, entries: list[Any], fragments: list[bytes]
+    ) -> None:
+        """Queue entries for the job store at sequence start. Caller holds _lock.
+
+        The caller runs _flush_store() once it has released _lock.
+        """
+        writer = self._writers.get(job_id)
+        if writer is None:
+            return
+        writer.pending.extend(
+            (kind, start + offset, pair_key(entry.provider, entry.ioc), fragment)
+            for offset, (entry, fragment) in enumerate(zip(entries, fragments))
+        )
+
+    def _flush_store(self, job_id: str, wait: bool = False) -> bool:
+        """Write a job's queued entries to the job store, in sequence order, outside _lock.
+
+        Only one thread flushes a job at a time.  Without wait, a call that
+        finds another thread flushing returns at once: that thread drains the
+        queue, including this call's entries.  A failed write leaves its
+        entries queued for the next flush.
+
+        Returns:
+            True if nothing is left queued.
+        """
+        with self._lock:
+            writer = self._writers.get(job_id)
+        if writer is None:
+            return True
+        while True:
+            if not writer.flush_lock.acquire(blocking=wait):
+                return False
+            try:
+                while True:
+                    with self._lock:
+                        batch = list(writer.pending)
+                    if not batch:
+                        break
+                    try:
+                        self._write_entries(job_id, batch)
+                    except Exception:
+                        if not writer.failing:
+                            logger.warning("Job store write for %s failed; will retry",
+                                           job_id, exc_info=True)
+                            writer.failing = True
+                        return False
+                    if writer.failing:
+                        logger.info("Job store writes for %s recovered", job_id)
+                        writer.failing = False
+                    with self._lock:
+                        del writer.pending[:len(batch)]
+            finally:
+                writer.flush_lock.release()
+            with self._lock:
+                if not writer.pending:
+                    return True
+            # Entries queued after the last drain, by a caller that found us flushing.
+
+    def _write_entries(self, job_id: str, batch: list[tuple[str, int, str, bytes]]) -> None:
+        """Append a batch to the job store, one append per run of consecutive entries."""
+        run: list[tuple[str, bytes]] = []
+        run_kind, run_start = RESULT, 0
+        for kind, seq, pair, fragment in batch:
+            if run and (kind != run_kind or seq != run_start + len(run)):
+                self._job_store.append(job_id, run_kind, run_start, run)  # type: ignore[union-attr]
+                run = []
+            if not run:
+                run_kind, run_start = kind, seq
+            run.append((pair, fragment))
+        if run:
+            self._job_store.append(job_id, run_kind, run_start, run)  # type: ignore[union-attr]
+
+    def _finish_store(self, job_id: str) -> None:
+        """Flush a finished job's last entries and mark it complete in the job store.
+
+        Retried with backoff.  If the store still refuses, the job is
+        abandoned there rather than left looking finished with results
+        missing: another process resumes it from the entries that were
+        written.
+        """
+        for attempt in range(len(_STORE_RETRY_DELAYS) + 1):
+            if attempt:
+                time.sleep(_STORE_RETRY_DELAYS[attempt - 1])
+            if self._flush_store(job_id, wait=True) and self._store_call(
+                self._job_store.complete, job_id  # type: ignore[union-attr]
+            ):
+                break
+        else:
+            logger.error("Job %s could not be saved to the job store; released for resume",
+                         job_id)
+            self._store_call(self._job_store.abandon, job_id)  # type: ignore[union-attr]
+        with self._lock:
+            self._writers.pop(job_id, None)
+
+    def _abandon_job(self, job_id: str) -> None:
+        """Give up on a job the job store cannot start: release it for the lease sweep.
+
+        The job is not run here, so it never has entries the store lacks.
+        """
+        logger.error("Job %s could not be started in the job store; released for resume",
+                     job_id)
+        self._store_call(self._job_store.abandon, job_id)  # type: ignore[union-attr]
+
+    def _retry_store(self, call: Callable[..., Any], *args: Any) -> Any:
+        """Run a job-store call, retrying with backoff; None if every attempt failed."""
+        for attempt in range(len(_STORE_RETRY_DELAYS) + 1):
+            if attempt:
+                time.sleep(_STORE_RETRY_DELAYS[attempt - 1])
+            try:
+                result = call(*args)
+            except Exception:
+                logger.warning("Job store call failed (attempt %d)", attempt + 1, exc_info=True)
+                continue
+            return True if result is None else result
+        return None
+
+    @staticmethod
+    def _store_call(call: Callable[..., Any], *args: Any) -> bool:
+        """Run one job-store call; False (logged) if it raised."""
+        try:
+            call(*args)
+        except Exception:
+            logger.warning("Job store call failed", exc_info=True)
+            return False
+        return True
+
+    def _run_pending(
+        self, job_id: str, pending_pairs: list[tuple[Any, IOC]], guard: JobGuard | None = None
+    ) -> None:
+        """Run the cache-miss lookups of one job and record each result as it lands.
+
+        Returns once every lookup has finished or been cancelled by the job's
+        policy.  Overridden by the async engine.
+        """
+        executor = self._executor or FairExecutor(self._max_workers)
+        timed_out = False
+        try:
+            windows = self._open_batch_windows()
+            futures: dict[Future, tuple[Any, IOC]] = {}
+            for adapter, ioc in pending_pairs:
+                window = windows.get(id(adapter))
+                if window is not None and ioc.type not in adapter.batch_types:
+                    window = None
+                future = self._start_lookup(executor, job_id, guard, adapter, ioc, window)
+                futures[future] = (adapter, ioc)
+            for window in windows.values():
+                window.flush()  # the job's last partial batches need not wait out the window
+            pending = set(futures)
+            try:
+                for future in as_completed(futures, timeout=guard.remaining() if guard else None):
+                    pending.discard(future)
+                    adapter, ioc = futures[future]
+                    if future.cancelled():
+                        # Only stop_on_first_malicious cancels queued futures.
+                        self._record_result(
+                            job_id, LookupCancelled(ioc, getattr(adapter, "name", ""),
+                                                    REASON_MALICIOUS),
+                        )
+                        continue
+                    result = future.result()
+                    self._record_result(job_id, result)
+                    if guard is not None and guard.stopped(ioc):
+                        self._cancel_ioc(futures, pending, ioc)
+            except FutureTimeoutError:
+                timed_out = True
+                for future in pending:
+                    future.cancel()  # running lookups finish in the background
+                    adapter, ioc = futures[future]
+                    self._record_result(
+                        job_id, LookupCancelled(ioc, getattr(adapter, "name", ""), REASON_DEADLINE)
+                    )
+        finally:
+            if executor is not self._executor:
+                executor.shutdown(wait=not timed_out)
+
+    def _open_batch_windows(self) -> dict[int, BatchWindow]:
+        """Return a fresh BatchWindow per bulk-capable adapter, keyed by id(adapter)."""
+        if self._batch_window is None:
+            return {}
+        return {
+            id(adapter): BatchWindow(
+                adapter.max_batch_size,
+                self._batch_window,
+                functools.partial(self._submit_batch, adapter),
+                self._retry_scheduler,
+            )
+            for adapter in self._adapters
+            if is_batch_provider(adapter)
+        }
+
+    @staticmethod
+    def _cancel_ioc(
+        futures: dict[Future, tuple[Any, IOC]], pending: set[Future], ioc: IOC
+    ) -> None:
+        """Cancel the still-queued lookups of one IOC (running ones are not interrupted)."""
+        key = ioc_key(ioc)
+        for future in pending:
+            if ioc_key(futures[future][1]) == key:
+                future.cancel()
+
+    def _start_lookup(
+        self,
+        executor: FairExecutor,
+        job_id: str,
+        guard: JobGuard | None,
+        adapter: Any,
+        ioc: IOC,
+        window: BatchWindow | None = None,
+    ) -> Future:
+        """Queue the first attempt of one lookup; return the Future of its final result.
+
+        With a window the lookup waits there for a batch instead of being
+        submitted on its own.  Like an executor future, the returned Future
+        can be cancelled only until the lookup's first attempt has started.
+        """
+        lookup = _Lookup(job_id, guard, adapter, ioc, executor, window)
+        self._resubmit(lookup)
+        return lookup.outcome
+
+    def _begin(self, lookup: _Lookup) -> bool:
+        """Mark a lookup's first attempt as started; return False if it must not run.
+
+        A lookup cancelled by its job's policy while queued does not run.
+        Otherwise it joins the single-flight registry; a follower does not
+        run either and is settled from the leader's outcome by _follow().
+        """
+        if lookup.started:
+            return True
+        lookup.started = True
+        if not lookup.outcome.set_running_or_notify_cancel():
+            return False
+        if lookup.provider_name:
+            key = (lookup.provider_name, lookup.ioc.type.value, lookup.ioc.value)
+            flight, leader = self._flights.join(key)
+            if not leader:
+                flight.add_done_callback(lambda done: self._follow(lookup, done))
+                return False
+            lookup.flight_key = key
+        return True
+
+    def _step(self, lookup: _Lookup) -> None:
+        """Run one attempt of a lookup on a worker, then settle or reschedule it.
+
+        The first step joins the single-flight registry (see _begin()), so a
+        follower returns its worker at once.  A retry, or an attempt still
+        waiting for a rate-limit token, goes back through the retry
+        scheduler, so no worker ever sleeps.  The result is observed here, on
+        the worker, so the job's next queued lookup of a just-flagged IOC is
+        refused even before the coordinating thread has seen the verdict.
+        """
+        if not self._begin(lookup):
+            return
+
+        token = CURRENT_GUARD.set(lookup.guard)
+        try:
+            result = self._attempt(
+                lookup.adapter, lookup.ioc, lookup.provider_name,
+                self._semaphores.get(lookup.provider_name),
+            )
+            if isinstance(result, float):
+                delay: float | None = result  # no rate-limit token yet
+            else:
+                delay = self._next_delay(lookup, result)
+        except BaseException as exc:
+            self._settle(lookup, error=exc)
+            return
+        finally:
+            CURRENT_GUARD.reset(token)
+        self._continue(lookup, result, delay)
+
+    def _next_delay(
+        self, lookup: _Lookup, result: EnrichmentResult | EnrichmentError | LookupCancelled
+    ) -> float | None:
+        """Apply _retry_delay() to a finished attempt, counting the retry it schedules."""
+        if lookup.retries == 0:
+            lookup.rate_limited = self._is_rate_limit_error(result)
+        delay = self._retry_delay(
+            lookup.provider_name, lookup.ioc, result, lookup.retries, lookup.rate_limited
+        )
+        if delay is not None:
+            lookup.retries += 1
+        return delay
+
+    def _continue(self, lookup: _Lookup, result: Any, delay: float | None) -> None:
+        """Settle a lookup (delay None) or queue its next attempt after delay seconds."""
+        if delay is None:
+            self._settle(lookup, result)
+        elif delay > 0:
+            self._retry_scheduler.call_later(delay, self._resubmit, lookup)
+        else:
+            self._resubmit(lookup)
+
+    def _resubmit(self, lookup: _Lookup) -> None:
+        """Queue a lookup's next attempt (on the scheduler's timer thread when delayed)."""
+        if lookup.window is not None:
+            lookup.window.add(lookup)
+            return
+        try:
+            lookup.executor.submit(lookup.job_id, self._step, lookup)
+        except RuntimeError:
+            # The job's private executor is gone: its deadline passed.
+            self._settle(lookup, LookupCancelled(lookup.ioc, lookup.provider_name, REASON_DEADLINE))
+
+    def _submit_batch(self, adapter: Any, batch: list[_Lookup]) -> None:
+        """Queue one attempt of a batch of a job's lookups for a bulk-capable adapter."""
+        first = batch[0]
+        try:
+            first.executor.submit(first.job_id, self._batch_step, adapter, batch)
+        except RuntimeError:
+            # The job's private executor is gone: its deadline passed.
+            for lookup in batch:
+                if not lookup.started:
+                    lookup.started = True
+                    if not lookup.outcome.set_running_or_notify_cancel():
+                        continue
+                self._settle(
+                    lookup, LookupCancelled(lookup.ioc, lookup.provider_name, REASON_DEADLINE)
+                )
+
+    def _batch_step(self, adapter: Any, batch: list[_Lookup]) -> None:
+        """Run one attempt of a batch with a single adapter.lookup_batch() call.
+
+        The batch mirrors _attempt(): one rate-limit token, one breaker
+        admission and one semaphore slot cover the whole request, while each
+        lookup still passes its own job's policy check and gets its own
+        retry decision.  Retried lookups re-enter the batch window; a batch
+        the provider cannot take (BatchUnavailable) leaves it for good and
+        runs as single lookups.
+        """
+        batch = [lookup for lookup in batch if self._begin(lookup)]
+        if not batch:
+            return
+        provider_name = batch[0].provider_name
+        limiter = self._rate_limiter if provider_name else None
+        wait = limiter.try_acquire(provider_name) if limiter is not None else 0.0
+        if wait is not None and wait > 0:
+            self._retry_scheduler.call_later(wait, self._submit_batch, adapter, batch)
+            return
+
+        admitted: list[_Lookup] = []
+        for lookup in batch:
+            token = CURRENT_GUARD.set(lookup.guard)
+            try:
+                cancelled = self._policy_check(adapter, lookup.ioc, provider_name)
+            finally:
+                CURRENT_GUARD.reset(token)
+            if cancelled is not None:
+                self._settle(lookup, cancelled)
+            else:
+                admitted.append(lookup)
+
+        breaker = self._breakers.get(provider_name) if provider_name else None
+        refused = None
+        if admitted and breaker is not None and not breaker.allow():
+            refused = CIRCUIT_OPEN_ERROR
+        elif admitted and wait is None:
+            if breaker is not None:
+                breaker.abandon()
+            refused = BUDGET_EXHAUSTED_ERROR
+        if not admitted or refused is not None:
+            if limiter is not None and wait is not None:
+                limiter.refund(provider_name)
+            for lookup in admitted:
+                self._refund_quota(adapter, lookup.guard)
+                self._settle(
+                    lookup, EnrichmentError(ioc=lookup.ioc, provider=provider_name, error=refused)
+                )
+            return
+
+        sem = self._semaphores.get(provider_name)
+        if sem is not None:
+            sem.acquire()
+        try:
+            results = adapter.lookup_batch([lookup.ioc for lookup in admitted])
+            if len(results) != len(admitted):
+                raise ValueError(
+                    f"{provider_name} lookup_batch returned {len(results)} results "
+                    f"for {len(admitted)} IOCs"
+                )
+            for lookup, result in zip(admitted, results):
+                self._store_outcome(lookup.ioc, provider_name, result)
+        except BatchUnavailable:
+            # Nothing was sent: each lookup runs on its own through lookup().
+            if breaker is not None:
+                breaker.abandon()
+            if limiter is not None and wait is not None:
+                limiter.refund(provider_name)
+            for lookup in admitted:
+                self._refund_quota(adapter, lookup.guard)  # its single attempt is admitted anew
+                lookup.window = None
+                self._resubmit(lookup)
+            return
+        except BaseException as exc:
+            if breaker is not None:
+                breaker.abandon()
+            for lookup in admitted:
+                self._settle(lookup, error=exc)
+            return
+        finally:
+            if sem is not None:
+                sem.release()
+
+        # One request, one breaker outcome: a provider failure if any IOC saw one.
+        failures = [
+            result for result in results
+            if isinstance(result, EnrichmentError) and is_provider_failure(result.error)
+        ]
+        if breaker is not None:
+            breaker.record(failures[0] if failures else results[0])
+        if limiter is not None and any(self._is_rate_limit_error(r) for r in results):
+            limiter.penalize(provider_name)
+
+        for lookup, result in zip(admitted, results):
+            token = CURRENT_GUARD.set(lookup.guard)
+            try:
+                delay = self._next_delay(lookup, result)
+            finally:
+                CURRENT_GUARD.reset(token)
+            self._continue(lookup, result, delay)
+
+    def _follow(self, lookup: _Lookup, flight: Future) -> None:
+        """Settle a single-flight follower from its leader's outcome.
+
+        A follower that receives an EnrichmentResult records a cached marker
+        stamped with the leader's completion time, exactly as a cache hit would.
+        """
+        try:
+            shared = flight.result()
+        except BaseException as exc:
+            self._settle(lookup, error=exc)
+            return
+        result = shared.value
+        if isinstance(result, LookupCancelled):
+            self._resubmit(lookup)  # the leader's job policy, not ours: look it up ourselves
+            return
+        if result.ioc is not lookup.ioc:
+            result = dataclasses.replace(result, ioc=lookup.ioc)  # keep this job's raw_match
+        if isinstance(result, EnrichmentResult):
+            self._mark_cached(
+                lookup.job_id, {lookup.ioc.value + "|" + lookup.provider_name: shared.finished_at}
+            )
+        self._settle(lookup, result)
+
+    def _settle(
+        self,
+        lookup: _Lookup,
+        result: EnrichmentResult | EnrichmentError | LookupCancelled | None = None,
+        error: BaseException | None = None,
+    ) -> None:
+        """Finish a lookup: release its flight's followers, then resolve its Future."""
+        if lookup.flight_key is not None:
+            self._flights.finish(lookup.flight_key, result, error)
+            lookup.flight_key = None
+        if error is not None:
+            lookup.outcome.set_exception(error)
+            return
+        if lookup.guard is not None:
+            lookup.guard.observe(result)
+        lookup.outcome.set_result(result)
+
+    def _record_result(
+        self, job_id: str, result: EnrichmentResult | EnrichmentError | LookupCancelled
+    ) -> None:
+        """Append one finished (or cancelled) lookup to the job status under _lock."""
+        if isinstance(result, LookupCancelled):
+            fragments = None
+            encoded = [encode_cancelled(result)] if self._job_store is not None else []
+        else:
+            fragments = encoded = self._encode(job_id, [result])
+        with self._lock:
+            job = self._jobs[job_id]
+            if fragments is None:
+                self._log_entries(job_id, CANCELLED, len(job["cancelled"]), [result], encoded)
+                job["cancelled"].append(result)
+            else:
+                self._log_entries(job_id, RESULT, len(job["results"]), [result], encoded)
+                job["results"].append(result)
+                job["fragments"].extend(fragments)
+            job["done"] += 1
+            self._changed.notify_all()
+        self._flush_store(job_id)
+
+    def _encode(
+        self, job_id: str, results: list[EnrichmentResult | EnrichmentError]
+    ) -> list[bytes]:
+        """Encode a job's results as JSON fragments, stamped with their cached markers.
+
+        Markers are recorded before their result (by _resolve_cached and
+        _follow), so they are read once here; encoding runs outside _lock.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            job_markers = job["cached_markers"] if job is not None else {}
+            markers = [
+                job_markers.get(r.ioc.value + "|" + r.provider)
+                if isinstance(r, EnrichmentResult) else None
+                for r in results
+            ]
+        return [encode_result(r, cached_at) for r, cached_at in zip(results, markers)]
+
+    def _mark_cached(self, job_id: str, markers: dict[str, str]) -> None:
+        """Record cached markers (ioc_value|provider -> cached_at) in a job's record."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:  # evicted: its markers would be dropped with it anyway
+                job["cached_markers"].update(markers)
+
+    def _policy_check(self, adapter: Any, ioc: IOC, provider_name: str) -> LookupCancelled | None:
+        """Ask the calling job's guard whether an adapter call may go ahead."""
+        guard = CURRENT_GUARD.get()
+        if guard is None:
+            return None
+        reason = guard.admit(ioc, bool(getattr(adapter, "requires_api_key", False)))
+        if reason is None:
+            return None
+        return LookupCancelled(ioc=ioc, provider=provider_name, reason=reason)
+
+    @staticmethod
+    def _refund_quota(adapter: Any, guard: JobGuard | None) -> None:
+        """Undo _policy_check()'s quota spend for an adapter call that was then refused."""
+        if guard is not None:
+            guard.refund(bool(getattr(adapter, "requires_api_key", False)))
 
     def get_status(self, job_id: str) -> dict | None:
         """Return a snapshot of the job status dict, or None if not found.
@@ -157,7 +977,9 @@ class EnrichmentOrchestrator:
             job_id: The job identifier returned by enrich_all.
 
         Returns:
-            Copy of status dict with keys: total, done, results, complete.
+            Copy of status dict with keys: total, done, results, cancelled
+            (LookupCancelled entries), complete, and providers (circuit-breaker
+            snapshot per provider, see provider_health()).
             The results value is a new list (snapshot), not the live reference.
             None if job_id is not found (evicted or never created).
         """
@@ -166,142 +988,340 @@ class EnrichmentOrchestrator:
             if job is None:
                 return None
             copy = dict(job)
+            del copy["fragments"]  # encoded form: read through get_status_since()
             copy["results"] = list(job["results"])
-            return copy
+            copy["cancelled"] = list(job["cancelled"])
+        copy["providers"] = self.provider_health()
+        return copy
+
+    def get_status_since(
+        self, job_id: str, since: int, cancelled_since: int = 0
+    ) -> dict | None:
+        """Return the job status with only the entries recorded after the caller's cursors.
+
+        The job's results and cancelled lists are append-only (entries are
+        never removed or reordered), so results[since:] and
+        cancelled[cancelled_since:] under the lock are exactly what a
+        cursor-based poller has not seen yet, and copying them costs
+        O(delta) instead of the O(n) snapshot get_status() takes.
+
+        Args:
+            job_id:          The job identifier returned by enrich_all.
+            since:           Number of results the caller already has (its
+                             cursor); negative values are treated as 0.
+            cancelled_since: Likewise for cancelled entries.
+
+        Returns:
+            Dict with keys total, done, complete, results (the new results
+            only), fragments (those results as encoded JSON fragments, see
+            result_log.py), next_since (the cursor for the next call),
+            cancelled (the new cancelled entries only), next_cancelled_since
+            and providers as in get_status().  None if job_id is not found.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            results, cancelled = job["results"], job["cancelled"]
+            status = {
+                "total": job["total"],
+                "done": job["done"],
+                "complete": job["complete"],
+                "results": results[max(since, 0):],
+                "fragments": job["fragments"][max(since, 0):],
+                "next_since": len(results),
+                "cancelled": cancelled[max(cancelled_since, 0):],
+                "next_cancelled_since": len(cancelled),
+            }
+        status["providers"] = self.provider_health()
+        return status
+
+    def wait_for_update(self, job_id: str, done: int, timeout: float) -> bool:
+        """Block until the job has moved past `done` finished lookups, or timeout.
+
+        Woken by every recorded result, so a streaming reader sees each one
+        as it lands without polling get_status().
+
+        Args:
+            job_id:  The job identifier returned by enrich_all.
+            done:    The job's done count the caller has already seen.
+            timeout: Seconds to wait at most.
+
+        Returns:
+            True if the job's done count differs from `done`, it is complete,
+            or it no longer exists (evicted); False if the timeout expired.
+        """
+        def changed() -> bool:
+            job = self._jobs.get(job_id)
+            return job is None or job["complete"] or job["done"] != done
+
+        with self._changed:
+            return self._changed.wait_for(changed, timeout)
+
+    def provider_health(self) -> dict[str, dict]:
+        """Return circuit-breaker snapshots for this orchestrator's providers."""
+        names = [getattr(adapter, "name", "") for adapter in self._adapters]
+        return self._breakers.snapshot([name for name in names if name])
+
+    def cached_markers_for(self, job_id: str) -> dict[str, str]:
+        """Return a copy of one job's cached markers (ioc_value|provider -> cached_at).
+
+        Status responses do not need this: each result's marker is already
+        in its encoded fragment (see get_status_since()).
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job["cached_markers"]) if job is not None else {}
 
     @property
     def cached_markers(self) -> dict[str, str]:
-        """Return copy of cached result markers (ioc_value|provider -> cached_at).
+        """Return the cached markers of every retained job, merged.
 
-        Protected by _lock to prevent returning a partially-written snapshot when
-        worker threads are simultaneously updating _cached_markers.
+        Markers are scoped to their job and evicted with it; for one job's
+        markers use cached_markers_for().
         """
         with self._lock:
-            return dict(self._cached_markers)
+            merged: dict[str, str] = {}
+            for job in self._jobs.values():
+                merged.update(job["cached_markers"])
+            return merged
 
-    def _do_lookup(self, adapter: Any, ioc: IOC) -> EnrichmentResult | EnrichmentError:
-        """Look up a single IOC via a specific adapter, with per-provider semaphore gating.
+    def _resolve_cached(
+        self, job_id: str, dispatch_pairs: list[tuple[Any, IOC]]
+    ) -> dict[int, EnrichmentResult | EnrichmentError]:
+        """Resolve cache hits for all dispatch pairs with bulk cache queries.
 
-        The semaphore wraps each *individual attempt* (cache-check + adapter.lookup() +
-        cache-store) but is released before any backoff sleep between retries.  This
-        prevents a batch of concurrent 429s from holding all semaphore slots while
-        sleeping, which would starve every other queued IOC.
+        Positive hits come from one CacheStore.get_many call; the remaining
+        keys are checked against the negative tier with one
+        get_negative_many call.  Records a cached marker for every positive
+        hit in the job's record.
 
-        Control flow:
-          1. Acquire semaphore → _single_attempt() → release semaphore.
-          2a. On 429 error:     sleep (outside sem) → loop back to 1.
-          2b. On non-429 error: sleep 1s (outside sem) → loop back to 1 (once).
-          3. On success or retry exhaustion: return result.
+        Args:
+            job_id:         The job the markers are recorded for.
+            dispatch_pairs: (adapter, ioc) pairs built by enrich_all.
 
-        try/finally guarantees semaphore release even when _single_attempt raises.
+        Returns:
+            Dict mapping the index of each cache-hit pair in dispatch_pairs to its
+            reconstructed EnrichmentResult, or EnrichmentError for negative-cache
+            hits. Empty when no cache is configured.
+        """
+        if self._cache is None:
+            return {}
 
-        Args:
-            adapter: The adapter to use for this lookup.
-            ioc:     The IOC to enrich.
+        keyed_pairs = [
+            (index, (ioc.value, ioc.type.value, getattr(adapter, "name", "")), ioc)
+            for index, (adapter, ioc) in enumerate(dispatch_pairs)
+            if getattr(adapter, "name", "")
+        ]
+        if not keyed_pairs:
+            return {}
+
+        hits = self._cache.get_many(
+            [key for _, key, _ in keyed_pairs], self._cache_ttl_seconds
+        )
+
+        negative_hits = self._cache.get_negative_many(
+            [key for _, key, _ in keyed_pairs if key not in hits]
+        )
+
+        results: dict[int, EnrichmentResult | EnrichmentError] = {}
+        markers: dict[str, str] = {}
+        for index, key, ioc in keyed_pairs:
+            cached = hits.get(key)
+            if cached is None:
+                negative = negative_hits.get(key)
+                if negative is not None:
+                    results[index] = EnrichmentError(
+                        ioc=ioc, provider=key[2], error=negative["error"]
+                    )
+                continue
+            markers[ioc.value + "|" + key[2]] = cached.get("cached_at", "")
+            results[index] = EnrichmentResult(
+                ioc=ioc,
+                provider=cached["provider"],
+                verdict=cached["verdict"],
+                detection_count=cached["detection_count"],
+                total_engines=cached["total_engines"],
+                scan_date=cached.get("scan_date"),
+                raw_stats=cached.get("raw_stats", {}),
+            )
+
+        if markers:
+            self._mark_cached(job_id, markers)
+        return results
+
+    def _attempt(
+        self, adapter: Any, ioc: IOC, provider_name: str, sem: Semaphore | None
+    ) -> EnrichmentResult | EnrichmentError | LookupCancelled | float:
+        """Take a rate-limit token, then run _single_attempt under the semaphore.
+
+        Never waits for a token: when none is available yet nothing is spent
+        and the seconds until the next one are returned instead, for the
+        caller to schedule the attempt again.  try/finally guarantees
+        semaphore release even when _single_attempt raises.  A 429 drains
+        the provider's bucket so every job backs off together.  The calling
+        job's policy guard and the provider's circuit breaker are consulted
+        once the token is in hand; a refused attempt gives the token back,
+        and the quota the guard spent on it (_refund_quota()).
 
         Returns:
-            EnrichmentResult on success (first or retry attempt).
-            EnrichmentError if all attempts fail.
+            The attempt's result; an EnrichmentError (without calling the
+            adapter) with BUDGET_EXHAUSTED_ERROR when the provider's daily
+            budget is spent, or CIRCUIT_OPEN_ERROR while its breaker is open;
+            or a float, the seconds until the provider's next token.
         """
-        provider_name = getattr(adapter, "name", "")
-        sem = self._semaphores.get(provider_name)
+        limiter = self._rate_limiter if provider_name else None
+        wait = limiter.try_acquire(provider_name) if limiter is not None else 0.0
+        if wait is not None and wait > 0:
+            return wait
+
+        cancelled = self._policy_check(adapter, ioc, provider_name)
+        if cancelled is not None:
+            if limiter is not None and wait is not None:
+                limiter.refund(provider_name)
+            return cancelled
+
+        breaker = self._breakers.get(provider_name) if provider_name else None
+        if breaker is not None and not breaker.allow():
+            if limiter is not None and wait is not None:
+                limiter.refund(provider_name)
+            self._refund_quota(adapter, CURRENT_GUARD.get())
+            return EnrichmentError(ioc=ioc, provider=provider_name, error=CIRCUIT_OPEN_ERROR)
+
+        if wait is None:
+            if breaker is not None:
+                breaker.abandon()
+            self._refund_quota(adapter, CURRENT_GUARD.get())
+            return EnrichmentError(ioc=ioc, provider=provider_name, error=BUDGET_EXHAUSTED_ERROR)
 
-        # --- First attempt (under semaphore) ---
         if sem is not None:
             sem.acquire()
         try:
             result = self._single_attempt(adapter, ioc, provider_name)
+        except BaseException:
+            if breaker is not None:
+                breaker.abandon()
+            raise
         finally:
             if sem is not None:
                 sem.release()
+        if breaker is not None:
+            breaker.record(result)
 
+        if limiter is not None and self._is_rate_limit_error(result):
+            limiter.penalize(provider_name)
+        return result
+
+    def _retry_delay(
+        self, provider_name: str, ioc: IOC, result: Any, retries: int, rate_limited: bool
+    ) -> float | None:
+        """Decide whether a finished attempt is retried, and after how long.
+
+        The retry policy of both engines:
+          - success, a policy cancellation, a deterministic error, an exhausted
+            daily budget or an open circuit breaker: no retry.
+          - 429: up to _MAX_RATE_LIMIT_RETRIES retries while the provider keeps
+            answering 429.  The delay is the provider's Retry-After when it
+            sent one (giving up if that exceeds _MAX_RETRY_AFTER); otherwise
+            paced providers retry at once, since the drained token bucket
+            already paces them, and unpaced ones back off exponentially with
+            jitter.
+          - any other error: one retry after _RETRY_DELAY, unless the
+            provider's breaker has opened meanwhile.
+          - no retry that would only be due after the job's deadline.
+
+        Args:
+            retries:      Retries already made for this lookup.
+            rate_limited: Whether the lookup's first attempt failed with a 429.
+
+        Returns:
+            Seconds to wait before the next attempt, or None to keep result.
+        """
         if not isinstance(result, EnrichmentError):
-            return result
+            return None
+        if result.error in (BUDGET_EXHAUSTED_ERROR, CIRCUIT_OPEN_ERROR):
+            return None  # no token until tomorrow / provider down — retrying cannot help
+        if negative_ttl(provider_name, result.error) is not None:
+            return None  # deterministic — a retry would get the same answer
 
         if self._is_rate_limit_error(result):
-            # 429: exponential backoff with jitter, up to _MAX_RATE_LIMIT_RETRIES
-            for attempt in range(1, _MAX_RATE_LIMIT_RETRIES + 1):
+            if retries >= _MAX_RATE_LIMIT_RETRIES or (retries and not rate_limited):
+                return None
+            attempt = retries + 1
+            paced = (
+                self._rate_limiter is not None
+                and bool(provider_name)
+                and self._rate_limiter.bucket(provider_name) is not None
+            )
+            if result.retry_after is not None:
+                if result.retry_after > _MAX_RETRY_AFTER:
+                    logger.warning(
+                        "Rate limit (429) from %s for %s — Retry-After %.0fs, giving up",
+                        provider_name, ioc.value, result.retry_after,
+                    )
+                    return None
+                delay = result.retry_after
+            elif paced:
+                delay = 0.0  # the drained bucket paces the retry
+            else:
                 delay = (
                     _BACKOFF_BASE * (_BACKOFF_MULTIPLIER ** (attempt - 1))
                     + random.uniform(0, _BACKOFF_JITTER)  # noqa: S311
                 )
-                logger.warning(
-                    "Rate limit (429) from %s for %s — backoff attempt %d, sleeping %.1fs",
-                    provider_name,
-                    ioc.value,
-                    attempt,
-                    delay,
-                )
-                # Sleep OUTSIDE semaphore — other threads can make progress
-                time.sleep(delay)
-
-                if sem is not None:
-                    sem.acquire()
-                try:
-                    result = self._single_attempt(adapter, ioc, provider_name)
-                finally:
-                    if sem is not None:
-                        sem.release()
-
-                if not isinstance(result, EnrichmentError):
-                    return result
-                if not self._is_rate_limit_error(result):
-                    break  # different error on retry — stop 429-backoff loop
+            logger.warning(
+                "Rate limit (429) from %s for %s — retry %d in %.1fs",
+                provider_name, ioc.value, attempt, delay,
+            )
+        elif retries or self._circuit_open(provider_name):
+            return None
         else:
-            # Non-429 error: single retry after 1s delay (outside semaphore)
-            time.sleep(1)
+            delay = _RETRY_DELAY
 
-            if sem is not None:
-                sem.acquire()
-            try:
-                result = self._single_attempt(adapter, ioc, provider_name)
-            finally:
-                if sem is not None:
-                    sem.release()
-
-        return result
+        guard = CURRENT_GUARD.get()
+        remaining = guard.remaining() if guard is not None else None
+        if remaining is not None and delay >= remaining:
+            return None  # the job's deadline comes first
+        return delay
 
     def _single_attempt(
         self, adapter: Any, ioc: IOC, provider_name: str
     ) -> EnrichmentResult | EnrichmentError:
-        """Execute one cache-check + adapter.lookup() + cache-store attempt.
+        """Execute one adapter.lookup() + cache-store attempt.
 
         Must be called with the provider semaphore already acquired (if applicable).
-        Contains no retry or backoff logic — that lives in _do_lookup().
+        Contains no retry or backoff logic — that lives in _step() and _retry_delay().
 
-        Cache hit path: reads from cache, records marker under _lock, returns cached result.
-        Cache miss path: calls adapter.lookup(), stores success in cache, returns result.
+        Cache hits never reach this method: enrich_all resolves them in bulk via
+        _resolve_cached() before dispatching work to the pool.
 
         Args:
             adapter:       The adapter to use for this lookup.
             ioc:           The IOC to enrich.
             provider_name: Pre-resolved adapter name (avoids repeated getattr).
 
+        Deterministic errors are written to the negative tier with the TTL
+        from negative_cache.negative_ttl().
+
         Returns:
-            EnrichmentResult on success (cache hit or successful lookup).
+            EnrichmentResult on success.
             EnrichmentError if adapter.lookup() returns one.
         """
-        # Check cache
-        if self._cache is not None and provider_name:
-            cached = self._cache.get(
-                ioc.value, ioc.type.value, provider_name, self._cache_ttl_seconds
-            )
-            if cached is not None:
-                cached_at = cached.pop("cached_at", "")
-                cache_key = ioc.value + "|" + provider_name
-                with self._lock:
-                    self._cached_markers[cache_key] = cached_at
-                return EnrichmentResult(
-                    ioc=ioc,
-                    provider=cached["provider"],
-                    verdict=cached["verdict"],
-                    detection_count=cached["detection_count"],
-                    total_engines=cached["total_engines"],
-                    scan_date=cached.get("scan_date"),
-                    raw_stats=cached.get("raw_stats", {}),
-                )
-
         result = adapter.lookup(ioc)
+        self._store_outcome(ioc, provider_name, result)
+        return result
+
+    def _store_outcome(
+        self, ioc: IOC, provider_name: str, result: EnrichmentResult | EnrichmentError
+    ) -> None:
+        """Write a lookup outcome to the cache (or its negative tier, if deterministic)."""
+        if self._cache is not None and provider_name and isinstance(result, EnrichmentError):
+            policy = negative_ttl(provider_name, result.error)
+            if policy is not None:
+                error_class, ttl_seconds = policy
+                self._cache.put_negative(
+                    ioc.value, ioc.type.value, provider_name,
+                    result.error, error_class, ttl_seconds,
+                )
 
         # Store successful results in cache
         if self._cache is not None and provider_name and isinstance(result, EnrichmentResult):
@@ -319,7 +1339,9 @@ class EnrichmentOrchestrator:
                 },
             )
 
-        return result
+    def _circuit_open(self, provider_name: str) -> bool:
+        """Return True if provider_name's breaker is rejecting lookups right now."""
+        return bool(provider_name) and self._breakers.get(provider_name).state != CLOSED
 
     def _is_rate_limit_error(self, result: Any) -> bool:
         """Return True if *result* is a rate-limit (429) EnrichmentError.
@@ -0,0 +1,209 @@
+"""Per-job short-circuit policies for enrichment jobs.
+
+For triage an analyst often only needs to know whether *any* provider calls
+an IOC malicious.  A JobPolicy passed to EnrichmentOrchestrator.enrich_all
+lets a job stop early:
+
+    stop_on_first_malicious_per_ioc — once one provider returns "malicious"
+        for an IOC, that IOC's remaining lookups are cancelled.
+    deadline_seconds — wall-clock budget for the whole job; lookups still
+        pending when it expires are cancelled and the job completes.
+    max_quota_spend — maximum number of requests the job may send to
+        API-key providers (every attempt counts, retries included); further
+        key-provider lookups are cancelled.  Zero-auth providers are free.
+
+Cancelled lookups are recorded as LookupCancelled entries in the job's
+"cancelled" list rather than as results, and count toward "done" so progress
+still reaches total.
+
+JobGuard holds one job's live policy state.  Before every adapter call the
+orchestrator asks the guard of the job that is making the call (the
+CURRENT_GUARD context variable, set by the worker running that job's task)
+whether the attempt may proceed.  Results are observed by the worker that
+produced them, before it picks up its next task, so a malicious verdict stops
+the IOC's queued lookups without waiting for the coordinating thread.
+
+Usage:
+    policy = JobPolicy.from_dict({"stop_on_first_malicious_per_ioc": True})
+    orchestrator.enrich_all(job_id, iocs, policy=policy)
+"""
+from __future__ import annotations
+
+import contextvars
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from app.pipeline.models import IOC
+
+REASON_MALICIOUS = "malicious_verdict"
+REASON_DEADLINE = "deadline"
+REASON_QUOTA = "quota_budget"
+
+
+@dataclass(frozen=True)
+class JobPolicy:
+    """Early-termination rules for one enrichment job.
+
+    Attributes:
+        stop_on_first_malicious_per_ioc: Cancel an IOC's pending lookups after
+                                         its first malicious verdict.
+        deadline_seconds:                Wall-clock budget for the job, or None.
+        max_quota_spend:                 Requests allowed to API-key providers,
+                                         or None for no cap.
+    """
+
+    stop_on_first_malicious_per_ioc: bool = False
+    deadline_seconds: float | None = None
+    max_quota_spend: int | None = None
+
+    @property
+    def is_default(self) -> bool:
+        return self == JobPolicy()
+
+    @classmethod
+    def from_dict(cls, data: Any) -> JobPolicy:
+        """Build a policy from a JSON object (the /api/analyze "policy" field).
+
+        Raises:
+            ValueError: If data is not an object, has unknown keys, or a value
+                        has the wrong type or sign.
+        """
+        if data is None:
+            return cls()
+        if not isinstance(data, dict):
+            raise ValueError("Field 'policy' must be an object")
+        unknown = set(data) - {"stop_on_first_malicious_per_ioc", "deadline_seconds",
+                               "max_quota_spend"}
+        if unknown:
+            raise ValueError(f"Unknown policy field(s): {', '.join(sorted(unknown))}")
+
+        stop = data.get("stop_on_first_malicious_per_ioc", False)
+        if not isinstance(stop, bool):
+            raise ValueError("policy.stop_on_first_malicious_per_ioc must be a boolean")
+
+        deadline = data.get("deadline_seconds")
+        if deadline is not None and (
+            isinstance(deadline, bool) or not isinstance(deadline, (int, float)) or deadline <= 0
+        ):
+            raise ValueError("policy.deadline_seconds must be a positive number")
+
+        quota = data.get("max_quota_spend")
+        if quota is not None and (
+            isinstance(quota, bool) or not isinstance(quota, int) or quota < 0
+        ):
+            raise ValueError("policy.max_quota_spend must be a non-negative integer")
+
+        return cls(
+            stop_on_first_malicious_per_ioc=stop,
+            deadline_seconds=float(deadline) if deadline is not None else None,
+            max_quota_spend=quota,
+        )
+
+
+@dataclass(frozen=True)
+class LookupCancelled:
+    """A lookup a JobPolicy cancelled before it ran.
+
+    Attributes:
+        ioc:      The IOC that was not looked up.
+        provider: Adapter name.
+        reason:   REASON_MALICIOUS, REASON_DEADLINE or REASON_QUOTA.
+    """
+
+    ioc: IOC
+    provider: str
+    reason: str
+
+
+def ioc_key(ioc: IOC) -> tuple[str, str]:
+    return (ioc.type.value, ioc.value)
+
+
+class JobGuard:
+    """Live policy state of one job. Thread-safe.
+
+    Args:
+        policy: The job's JobPolicy.
+        clock:  Monotonic clock. Injectable for tests.
+    """
+
+    def __init__(self, policy: JobPolicy, clock: Callable[[], float] = time.monotonic) -> None:
+        self.policy = policy
+        self._clock = clock
+        self._deadline = (
+            clock() + policy.deadline_seconds if policy.deadline_seconds is not None else None
+        )
+        self._lock = threading.Lock()
+        self._malicious: set[tuple[str, str]] = set()
+        self._spent = 0
+
+    def remaining(self) -> float | None:
+        """Seconds until the deadline (never negative), or None without one."""
+        if self._deadline is None:
+            return None
+        return max(0.0, self._deadline - self._clock())
+
+    def admit(self, ioc: IOC, requires_api_key: bool) -> str | None:
+        """Decide whether one adapter call may go ahead.
+
+        Spends one unit of quota for API-key providers when admitted.
+
+        Returns:
+            None to proceed, or the cancellation reason.
+        """
+        with self._lock:
+            if self.policy.stop_on_first_malicious_per_ioc and ioc_key(ioc) in self._malicious:
+                return REASON_MALICIOUS
+            if self._deadline is not None and self._clock() >= self._deadline:
+                return REASON_DEADLINE
+            if requires_api_key and self.policy.max_quota_spend is not None:
+                if self._spent >= self.policy.max_quota_spend:
+                    return REASON_QUOTA
+                self._spent += 1
+            return None
+
+    def refund(self, requires_api_key: bool) -> None:
+        """Give back the quota unit admit() spent on a call that was then not made."""
+        if not requires_api_key or self.policy.max_quota_spend is None:
+            return
+        with self._lock:
+            self._spent = max(0, self._spent - 1)
+
+    def observe(self, result: Any) -> bool:
+        """Record a finished result.
+
+        Returns:
+            True if it is the first malicious verdict for its IOC under a
+            stop_on_first_malicious_per_ioc policy, i.e. the caller should
+            cancel that IOC's pending lookups.
+        """
+        if not self.policy.stop_on_first_malicious_per_ioc:
+            return False
+        if getattr(result, "verdict", None) != "malicious":
+            return False
+        key = ioc_key(result.ioc)
+        with self._lock:
+            if key in self._malicious:
+                return False
+            self._malicious.add(key)
+            return True
+
+    def stopped(self, ioc: IOC) -> bool:
+        """True once an IOC's remaining lookups should be cancelled."""
+        if not self.policy.stop_on_first_malicious_per_ioc:
+            return False
+        with self._lock:
+            return ioc_key(ioc) in self._malicious
+
+    @property
+    def quota_spent(self) -> int:
+        with self._lock:
+            return self._spent
+
+
+# The guard of the job whose task is running in the current thread / asyncio task.
+CURRENT_GUARD: contextvars.ContextVar[JobGuard | None] = contextvars.ContextVar(
+    "sentinelx_job_guard", default=None
+)
@@ -6,10 +6,17 @@ used by ProviderRegistry to verify adapter conformance.
 
 All adapters that implement this protocol will be auto-discoverable
 by the ProviderRegistry without requiring explicit subclassing.
+
+Providers whose API accepts many IOCs per request may additionally satisfy
+BatchProvider; the thread-engine orchestrator then groups their lookups into
+batches (see batching.py) instead of sending one request per IOC.  A
+provider whose bulk endpoint is unusable for a while raises BatchUnavailable
+from lookup_batch(); the orchestrator then runs that batch's lookups one by
+one through lookup().
 """
 from __future__ import annotations
 
-from typing import Protocol, runtime_checkable
+from typing import Any, Protocol, runtime_checkable
 
 from app.enrichment.models import EnrichmentError, EnrichmentResult
 from app.pipeline.models import IOC, IOCType
@@ -58,3 +65,58 @@ class Provider(Protocol):
             True if the provider can be used, False otherwise.
         """
         ...
+
+
+class BatchUnavailable(Exception):
+    """Raised by lookup_batch() when the bulk endpoint cannot be used right now.
+
+    Nothing was looked up: the caller falls back to lookup() per IOC.
+    """
+
+
+@runtime_checkable
+class BatchProvider(Provider, Protocol):
+    """Optional bulk-query extension of Provider.
+
+    Attributes:
+        max_batch_size: Most IOCs the provider accepts in one request.
+        batch_types:    IOC types lookup_batch() handles; lookups of other
+                        supported types still go through lookup().
+
+    Methods:
+        lookup_batch: Enrich several IOCs with one request.
+    """
+
+    max_batch_size: int
+    batch_types: frozenset[IOCType]
+
+    def lookup_batch(self, iocs: list[IOC]) -> list[EnrichmentResult | EnrichmentError]:
+        """Enrich up to max_batch_size IOCs of batch_types in one request.
+
+        Args:
+            iocs: The IOCs to look up.
+
+        Returns:
+            One EnrichmentResult or EnrichmentError per IOC, in input order.
+            A failure of the whole request is returned as an error for
+            every IOC.
+
+        Raises:
+            BatchUnavailable: The bulk endpoint is unusable; look the IOCs up
+                              one by one instead.
+        """
+        ...
+
+
+def is_batch_provider(adapter: Any) -> bool:
+    """Return True if adapter declares bulk support (see BatchProvider).
+
+    Checks the declared attribute types rather than isinstance(), so mocks
+    that answer every attribute are not mistaken for batch providers.
+    """
+    return (
+        isinstance(getattr(adapter, "max_batch_size", None), int)
+        and getattr(adapter, "max_batch_size") > 1
+        and isinstance(getattr(adapter, "batch_types", None), frozenset)
+        and callable(getattr(adapter, "lookup_batch", None))
+    )
@@ -0,0 +1,269 @@
+"""Per-provider token-bucket rate limiting shared by every orchestrator.
+
+Per-provider semaphores bound how many lookups are *in flight*, but providers
+publish *rate* limits (VirusTotal public API: 4 requests/minute and 500/day;
+AbuseIPDB free tier: 1,000/day).  Without pacing, a large job bursts past
+those limits and only slows down after the 429s arrive.
+
+Each provider with a RateLimit gets a TokenBucket:
+
+    - tokens refill continuously at rate_per_minute / 60 per second, up to
+      ``burst`` tokens,
+    - every request spends one token, waiting exactly as long as the refill
+      needs (never a fixed blind sleep),
+    - at most ``daily_budget`` requests are admitted per UTC day; once spent,
+      acquire() fails immediately so the lookup is reported as an error
+      rather than burning a request that would 429.
+
+One RateLimiter lives on the Flask app and is passed to every orchestrator,
+so concurrent jobs draw from the same buckets.  Limits come from
+DEFAULT_RATE_LIMITS, overridden per provider by ConfigStore's
+[rate_limits] section.  Daily counters are in-memory and reset on restart.
+
+Usage:
+    limiter = RateLimiter.from_config(ConfigStore())
+    if not limiter.acquire("VirusTotal"):
+        ...  # daily budget exhausted
+"""
+from __future__ import annotations
+
+import datetime
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    from app.enrichment.config_store import ConfigStore
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """Published rate limit of one provider.
+
+    Attributes:
+        rate_per_minute: Sustained requests per minute.
+        burst:           Requests that may be sent back-to-back after idling.
+        daily_budget:    Requests per UTC day; 0 means no daily cap.
+    """
+
+    rate_per_minute: float
+    burst: int
+    daily_budget: int = 0
+
+
+# Keyed by adapter name.  Providers not listed are not paced.
+DEFAULT_RATE_LIMITS: dict[str, RateLimit] = {
+    "VirusTotal": RateLimit(rate_per_minute=4, burst=4, daily_budget=500),
+    "AbuseIPDB": RateLimit(rate_per_minute=60, burst=10, daily_budget=1000),
+}
+
+
+def _utc_today() -> datetime.date:
+    return datetime.datetime.now(tz=datetime.timezone.utc).date()
+
+
+class TokenBucket:
+    """Thread-safe token bucket with an optional daily request budget.
+
+    Args:
+        limit: The provider's RateLimit.
+        clock: Monotonic clock (seconds). Injectable for tests.
+        today: Returns the current UTC date. Injectable for tests.
+    """
+
+    def __init__(
+        self,
+        limit: RateLimit,
+        clock: Callable[[], float] = time.monotonic,
+        today: Callable[[], datetime.date] = _utc_today,
+    ) -> None:
+        self.limit = limit
+        self._rate = limit.rate_per_minute / 60.0
+        self._capacity = float(max(limit.burst, 1))
+        self._clock = clock
+        self._today = today
+        self._tokens = self._capacity
+        self._updated = clock()
+        self._day = today()
+        self._spent_today = 0
+        self._cond = threading.Condition()
+
+    def _refill(self, now: float) -> None:
+        """Add tokens earned since the last update. Call with _cond held."""
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+        day = self._today()
+        if day != self._day:
+            self._day = day
+            self._spent_today = 0
+
+    def try_acquire(self) -> float | None:
+        """Take a token if one is available.
+
+        Returns:
+            0.0 if a token was taken, the seconds until one will be available
+            otherwise, or None if the daily budget is exhausted.
+        """
+        with self._cond:
+            return self._try_acquire_locked()
+
+    def _try_acquire_locked(self) -> float | None:
+        self._refill(self._clock())
+        if self.limit.daily_budget and self._spent_today >= self.limit.daily_budget:
+            return None
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            self._spent_today += 1
+            return 0.0
+        if self._rate <= 0:
+            return None
+        return (1.0 - self._tokens) / self._rate
+
+    def acquire(self, timeout: float | None = None) -> bool:
+        """Block until a token is available and take it.
+
+        Waits exactly until the next token is due, re-checking after each
+        wait since other threads may take it first.  Never consumes a token
+        on failure.
+
+        Args:
+            timeout: Maximum seconds to wait, or None to wait as long as needed.
+
+        Returns:
+            True if a token was taken; False if the daily budget is exhausted
+            or the timeout elapsed first.
+        """
+        deadline = None if timeout is None else self._clock() + timeout
+        with self._cond:
+            while True:
+                wait = self._try_acquire_locked()
+                if wait is None:
+                    return False
+                if wait == 0.0:
+                    return True
+                if deadline is not None:
+                    remaining = deadline - self._clock()
+                    if remaining <= 0:
+                        return False
+                    wait = min(wait, remaining)
+                self._cond.wait(wait)
+
+    def refund(self) -> None:
+        """Give back a token taken by try_acquire() that was never spent."""
+        with self._cond:
+            self._refill(self._clock())
+            self._tokens = min(self._capacity, self._tokens + 1.0)
+            self._spent_today = max(0, self._spent_today - 1)
+            self._cond.notify()
+
+    def penalize(self) -> None:
+        """Drain the bucket after a 429 so every caller paces from empty."""
+        with self._cond:
+            self._refill(self._clock())
+            self._tokens = 0.0
+
+    def snapshot(self) -> dict:
+        """Return current tokens, today's spend and the configured limit."""
+        with self._cond:
+            self._refill(self._clock())
+            return {
+                "tokens": round(self._tokens, 2),
+                "spent_today": self._spent_today,
+                "daily_budget": self.limit.daily_budget,
+                "rate_per_minute": self.limit.rate_per_minute,
+                "burst": self.limit.burst,
+            }
+
+
+class RateLimiter:
+    """Registry of TokenBuckets keyed by provider (adapter) name.
+
+    Provider names are matched case-insensitively, so ConfigStore's
+    lowercase keys and adapter display names ("VirusTotal") agree.
+
+    Args:
+        limits: Provider name -> RateLimit. Providers not present are unpaced.
+        clock:  Passed through to every TokenBucket.
+    """
+
+    def __init__(
+        self,
+        limits: dict[str, RateLimit] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._buckets: dict[str, TokenBucket] = {}
+        self.configure(limits if limits is not None else DEFAULT_RATE_LIMITS)
+
+    @classmethod
+    def from_config(cls, config_store: ConfigStore) -> RateLimiter:
+        """Build a limiter from DEFAULT_RATE_LIMITS plus ConfigStore overrides."""
+        return cls(limits_from_config(config_store))
+
+    def configure(self, limits: dict[str, RateLimit]) -> None:
+        """Replace the configured limits.
+
+        Buckets whose limit is unchanged keep their tokens and daily spend,
+        so saving settings mid-day does not reset the budget.
+        """
+        with self._lock:
+            buckets: dict[str, TokenBucket] = {}
+            for name, limit in limits.items():
+                key = name.lower()
+                existing = self._buckets.get(key)
+                if existing is not None and existing.limit == limit:
+                    buckets[key] = existing
+                else:
+                    buckets[key] = TokenBucket(limit, clock=self._clock)
+            self._buckets = buckets
+
+    def bucket(self, provider: str) -> TokenBucket | None:
+        """Return the provider's bucket, or None if it is not rate limited."""
+        with self._lock:
+            return self._buckets.get(provider.lower())
+
+    def acquire(self, provider: str, timeout: float | None = None) -> bool:
+        """Take a token for provider (always True for unpaced providers)."""
+        bucket = self.bucket(provider)
+        return True if bucket is None else bucket.acquire(timeout)
+
+    def try_acquire(self, provider: str) -> float | None:
+        """TokenBucket.try_acquire() for provider (always 0.0 for unpaced providers)."""
+        bucket = self.bucket(provider)
+        return 0.0 if bucket is None else bucket.try_acquire()
+
+    def refund(self, provider: str) -> None:
+        """Give back a token taken by try_acquire() (no-op if unpaced)."""
+        bucket = self.bucket(provider)
+        if bucket is not None:
+            bucket.refund()
+
+    def penalize(self, provider: str) -> None:
+        """Drain the provider's bucket after it answered 429 (no-op if unpaced)."""
+        bucket = self.bucket(provider)
+        if bucket is not None:
+            bucket.penalize()
+
+    def snapshot(self) -> dict[str, dict]:
+        """Return TokenBucket.snapshot() for every paced provider (lowercase keys)."""
+        with self._lock:
+            buckets = dict(self._buckets)
+        return {name: bucket.snapshot() for name, bucket in buckets.items()}
+
+
+def limits_from_config(config_store: ConfigStore) -> dict[str, RateLimit]:
+    """Merge ConfigStore [rate_limits] overrides into DEFAULT_RATE_LIMITS.
+
+    Config entries are keyed by lowercase provider name; an entry with a zero
+    rate removes pacing for that provider.  The returned dict is keyed by
+    lowercase provider name.
+    """
+    limits = {name.lower(): limit for name, limit in DEFAULT_RATE_LIMITS.items()}
+    for key, (per_minute, burst, daily) in config_store.get_rate_limits().items():
+        if per_minute <= 0:
+            limits.pop(key, None)
+        else:
+            limits[key] = RateLimit(per_minute, burst, daily)
+    return limits
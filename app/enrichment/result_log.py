@@ -0,0 +1,112 @@
+"""Results serialized once, at completion, as JSON fragments.
+
+The status endpoint used to run the result serializer again for every result
+in every poll response, and the history save then serialized the whole list
+a final time; each poll also copied the orchestrator's cached_markers dict to
+look up cache timestamps.
+
+The orchestrator now encodes each result exactly once, when it is recorded,
+into a compact UTF-8 JSON object (a "fragment") that already carries its
+cached_at marker, and keeps the fragments in an append-only log next to the
+job's results.  Readers stitch fragments into a JSON array with
+join_fragments() instead of re-encoding: a status poll for results[since:]
+joins the new fragments, and the history save frames the whole array.
+
+The same fragments (and encoded policy cancellations) are what a job store
+(job_store.py) persists; result_from_dict() and cancelled_from_dict() turn
+them back into objects when an interrupted job is resumed.
+
+Usage:
+    fragment = encode_result(result, cached_at="2024-01-01T00:00:00+00:00")
+    body = join_fragments([fragment, ...])   # b'[{...},...]'
+"""
+from __future__ import annotations
+
+from app.cache.codec import dumps_json
+from app.enrichment.models import EnrichmentError, EnrichmentResult
+from app.enrichment.policy import LookupCancelled
+from app.pipeline.models import IOC
+
+
+def result_to_dict(
+    result: EnrichmentResult | EnrichmentError, cached_at: str | None = None
+) -> dict:
+    """Serialize an enrichment result or error to a JSON-safe dict.
+
+    cached_at (when the result was served from cache or a shared in-flight
+    lookup) is included for results only, and only when non-empty.
+    """
+    if isinstance(result, EnrichmentResult):
+        d: dict = {
+            "type": "result",
+            "ioc_value": result.ioc.value,
+            "ioc_type": result.ioc.type.value,
+            "provider": result.provider,
+            "verdict": result.verdict,
+            "detection_count": result.detection_count,
+            "total_engines": result.total_engines,
+            "scan_date": result.scan_date,
+            "raw_stats": result.raw_stats,
+        }
+        if cached_at:
+            d["cached_at"] = cached_at
+        return d
+    return {
+        "type": "error",
+        "ioc_value": result.ioc.value,
+        "ioc_type": result.ioc.type.value,
+        "provider": result.provider,
+        "error": result.error,
+    }
+
+
+def encode_result(
+    result: EnrichmentResult | EnrichmentError, cached_at: str | None = None
+) -> bytes:
+    """Encode one result as a compact JSON object fragment."""
+    return dumps_json(result_to_dict(result, cached_at))
+
+
+def cancelled_to_dict(cancelled: LookupCancelled) -> dict:
+    """Serialize a lookup cancelled by a job policy to a JSON-safe dict."""
+    return {
+        "type": "cancelled",
+        "ioc_value": cancelled.ioc.value,
+        "ioc_type": cancelled.ioc.type.value,
+        "provider": cancelled.provider,
+        "reason": cancelled.reason,
+    }
+
+
+def encode_cancelled(cancelled: LookupCancelled) -> bytes:
+    """Encode one cancelled lookup as a compact JSON object fragment."""
+    return dumps_json(cancelled_to_dict(cancelled))
+
+
+def result_from_dict(data: dict, ioc: IOC) -> EnrichmentResult | EnrichmentError:
+    """Rebuild a result or error serialized by result_to_dict() for `ioc`.
+
+    The IOC is passed in rather than rebuilt, so the result carries the
+    job's own IOC object (raw_match included).  cached_at is not kept.
+    """
+    if data["type"] == "error":
+        return EnrichmentError(ioc=ioc, provider=data["provider"], error=data["error"])
+    return EnrichmentResult(
+        ioc=ioc,
+        provider=data["provider"],
+        verdict=data["verdict"],
+        detection_count=data["detection_count"],
+        total_engines=data["total_engines"],
+        scan_date=data["scan_date"],
+        raw_stats=data["raw_stats"],
+    )
+
+
+def cancelled_from_dict(data: dict, ioc: IOC) -> LookupCancelled:
+    """Rebuild a cancelled lookup serialized by cancelled_to_dict() for `ioc`."""
+    return LookupCancelled(ioc=ioc, provider=data["provider"], reason=data["reason"])
+
+
+def join_fragments(fragments: list[bytes]) -> bytes:
+    """Stitch encoded results into one JSON array without re-encoding them."""
+    return b"[" + b",".join(fragments) + b"]"
@@ -0,0 +1,106 @@
+"""Heap-scheduled delay queue for enrichment retries.
+
+The thread engine used to wait out retry delays with time.sleep() inside the
+worker running the lookup: 15-32s per 429 backoff, 1s per transient error,
+and however long the next rate-limit token was away.  Every sleeping lookup
+pinned one of the pool's workers, so a handful of VirusTotal 429s could stall
+a whole job.
+
+RetryScheduler keeps delayed callbacks in a heap ordered by due time and runs
+them on a single timer thread.  The orchestrator hands it a callback that
+re-submits the lookup's next attempt to the FairExecutor, so a lookup waiting
+for its retry costs a heap entry instead of a worker.  Callbacks run on the
+timer thread and must return quickly.
+
+RETRY_SCHEDULER is the process-wide instance; its timer thread starts on the
+first call_later().
+
+Usage:
+    RETRY_SCHEDULER.call_later(15.0, executor.submit, job_id, fn, *args)
+"""
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class RetryScheduler:
+    """Runs callbacks after a delay on one daemon timer thread. Thread-safe.
+
+    Args:
+        name:  Name of the timer thread.
+        clock: Monotonic clock (seconds) the due times are computed with.
+    """
+
+    def __init__(
+        self,
+        name: str = "enrichment-retry",
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._name = name
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._heap: list[tuple[float, int, Callable[..., Any], tuple]] = []
+        self._seq = itertools.count()  # FIFO among callbacks due at the same time
+        self._thread: threading.Thread | None = None
+        self._shutdown = False
+
+    def call_later(self, delay: float, fn: Callable[..., Any], *args: Any) -> None:
+        """Run fn(*args) on the timer thread once delay seconds have passed.
+
+        Raises:
+            RuntimeError: If the scheduler has been shut down.
+        """
+        due = self._clock() + max(0.0, delay)
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule after shutdown")
+            heapq.heappush(self._heap, (due, next(self._seq), fn, args))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def pending(self) -> int:
+        """Return the number of callbacks not yet due."""
+        with self._cond:
+            return len(self._heap)
+
+    def shutdown(self) -> None:
+        """Stop the timer thread; callbacks not yet due are dropped."""
+        with self._cond:
+            self._shutdown = True
+            self._heap.clear()
+            self._cond.notify()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    if self._shutdown:
+                        return
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    wait = self._heap[0][0] - self._clock()
+                    if wait <= 0:
+                        break
+                    self._cond.wait(wait)
+                _, _, fn, args = heapq.heappop(self._heap)
+            try:
+                fn(*args)
+            except Exception:
+                logger.exception("Scheduled retry callback failed")
+
+
+# Shared by every orchestrator in the process.
+RETRY_SCHEDULER = RetryScheduler()
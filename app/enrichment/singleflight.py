@@ -0,0 +1,178 @@
+"""Process-wide single-flight deduplication of concurrent identical lookups.
+
+Every analysis job gets its own EnrichmentOrchestrator, so two analysts
+pasting overlapping alerts at the same time would each call adapter.lookup()
+for the same (provider, IOC).  SingleFlight collapses those calls: the first
+caller for a key (the leader) runs the lookup; callers that arrive while it
+is in flight (followers) block until it finishes and receive the same
+outcome, without issuing another HTTP request.
+
+The thread engine uses the non-blocking join()/finish() pair instead of do(),
+so a follower hands its worker back and is resumed by a callback.
+
+The registry only holds calls that are *in flight*.  Once the leader
+finishes, the key is removed, and later callers are served by the cache.
+
+AsyncSingleFlight is the same registry for coroutines on the async engine's
+event loop.
+
+Usage:
+    flight = LOOKUP_FLIGHTS.do(("VirusTotal", "ipv4", "1.2.3.4"), lambda: lookup())
+    flight.value       # the leader's return value
+    flight.shared      # True for followers
+    flight.finished_at # ISO timestamp at which the leader finished
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Hashable
+
+
+@dataclass(frozen=True)
+class Flight:
+    """Outcome of SingleFlight.do().
+
+    Attributes:
+        value:       The leader's return value.
+        shared:      True if this caller waited on another caller's call.
+        finished_at: ISO8601 UTC time the leader's call completed.
+    """
+
+    value: Any
+    shared: bool
+    finished_at: str
+
+
+class _Call:
+    __slots__ = ("future",)
+
+    def __init__(self) -> None:
+        # Followers' view of the call: resolves to Flight(value, True, finished_at).
+        self.future: Future = Future()
+
+
+class SingleFlight:
+    """Registry of in-flight calls keyed by an arbitrary hashable key.
+
+    Thread-safe.  If the leader's function raises, every follower waiting on
+    that call re-raises the same exception.
+
+    do() blocks followers.  Callers that must not hold a thread while another
+    caller's lookup is in flight (the thread engine's retry scheduling) use
+    join() and finish() instead: followers get a Future to add callbacks to.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Flight:
+        """Run fn() once per key among concurrent callers and share the outcome."""
+        future, leader = self.join(key)
+        if not leader:
+            return future.result()
+
+        try:
+            value = fn()
+        except BaseException as exc:
+            self.finish(key, error=exc)
+            raise
+        return Flight(value, False, self.finish(key, value))
+
+    def join(self, key: Hashable) -> tuple[Future, bool]:
+        """Register interest in key without blocking.
+
+        Returns:
+            (future, leader).  The leader must run the call and report it
+            with finish(); a follower's future resolves to the shared Flight
+            (or raises the leader's exception) when it does.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        return call.future, leader
+
+    def finish(self, key: Hashable, value: Any = None, error: BaseException | None = None) -> str:
+        """Complete the leader's call for key and release its followers.
+
+        Returns:
+            The ISO8601 UTC completion time shared with the followers.
+        """
+        finished_at = datetime.datetime.now(tz=datetime.timezone.utc).isoformat()
+        with self._lock:
+            call = self._calls.pop(key)
+        if error is not None:
+            call.future.set_exception(error)
+        else:
+            call.future.set_result(Flight(value, True, finished_at))
+        return finished_at
+
+    def in_flight(self) -> int:
+        """Return the number of keys currently being looked up."""
+        with self._lock:
+            return len(self._calls)
+
+
+class _AsyncCall:
+    __slots__ = ("task", "waiters", "finished_at")
+
+    def __init__(self, task: asyncio.Task) -> None:
+        self.task = task
+        self.waiters = 0
+        self.finished_at = ""
+
+
+class AsyncSingleFlight:
+    """SingleFlight for coroutines running on one event loop.
+
+    The leader's fn() runs as its own task, which every caller awaits through
+    asyncio.shield(): cancelling one caller (e.g. a job hitting its deadline)
+    never cancels the shared call for the others.  The call itself is
+    cancelled only when its last caller goes away.  Not thread-safe: every
+    do() call must run on the same loop.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, _AsyncCall] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Flight:
+        """Await fn() once per key among concurrent callers and share the outcome."""
+        call = self._calls.get(key)
+        shared = call is not None
+        if call is None:
+            call = self._calls[key] = _AsyncCall(asyncio.ensure_future(fn()))
+            call.task.add_done_callback(lambda _task, c=call: self._finish(key, c))
+
+        call.waiters += 1
+        try:
+            value = await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if not call.task.done() and call.waiters == 1:
+                self._forget(key, call)
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+        return Flight(value, shared, call.finished_at)
+
+    def _finish(self, key: Hashable, call: _AsyncCall) -> None:
+        call.finished_at = datetime.datetime.now(tz=datetime.timezone.utc).isoformat()
+        self._forget(key, call)
+
+    def _forget(self, key: Hashable, call: _AsyncCall) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def in_flight(self) -> int:
+        """Return the number of keys currently being looked up."""
+        return len(self._calls)
+
+
+# Shared by every orchestrator in the process.
+LOOKUP_FLIGHTS = SingleFlight()
@@ -2,20 +2,34 @@
 
 Module-level state lives here so that analysis (which creates orchestrators)
 and enrichment_status (which reads them) share the same registry.
+
+With a job store configured (current_app.job_store, see
+app/enrichment/job_store.py) every job is also registered there, and its
+orchestrator writes its entries through to it.
+A status request for a job this process is not running -- another worker's,
+or one evicted from _orchestrators -- is answered from the store.
 """
 
+import dataclasses
 import logging
+import time
 import uuid
 from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor
 from threading import Lock
 
-from flask import current_app, jsonify, request
+from flask import Response, current_app, jsonify, request, stream_with_context
 
+from app.cache.codec import dumps_json
+from app.enrichment.async_engine import AsyncEnrichmentOrchestrator
 from app.enrichment.config_store import ConfigStore
+from app.enrichment.history_store import top_verdict
+from app.enrichment.job_store import JobStore, process_owner
 from app.enrichment.models import EnrichmentError, EnrichmentResult
 from app.enrichment.orchestrator import EnrichmentOrchestrator
-from app.pipeline.models import IOC
+from app.enrichment.policy import JobPolicy, LookupCancelled
+from app.enrichment.result_log import cancelled_to_dict, join_fragments, result_to_dict
+from app.pipeline.models import IOC, IOCType
 
 logger = logging.getLogger(__name__)
 
@@ -26,8 +40,22 @@ _orchestrators: OrderedDict[str, EnrichmentOrchestrator] = OrderedDict()
 _orch_lock = Lock()
 
 # Shared thread pool for enrichment jobs — caps concurrent enrichments to 4.
+# These threads only coordinate jobs; the lookups themselves run on the
+# app-scoped FairExecutor (current_app.enrichment_executor).
 _enrichment_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="enrich")
 
+# Server-Sent Events status stream: comment line sent after this many idle
+# seconds so proxies keep the connection open; the stream ends after
+# _STREAM_MAX_SECONDS and the browser's EventSource reconnects with
+# Last-Event-ID (the since cursor), so no request holds a worker for good.
+_STREAM_KEEPALIVE_SECONDS = 15.0
+_STREAM_MAX_SECONDS = 300.0
+_STREAM_RETRY_MS = 1000
+
+# A stream of a job served from the job store (no local orchestrator to wake
+# it) re-reads the job's progress this often.
+_STORE_POLL_SECONDS = 0.5
+
 
 def _mask_key(key: str | None) -> str | None:
     """Return key with all but the last 4 characters replaced by asterisks.
@@ -43,32 +71,20 @@ def _serialize_result(
     r: EnrichmentResult | EnrichmentError,
     cached_markers: dict[str, str] | None = None,
 ) -> dict:
-    """Serialize an enrichment result or error to a JSON-safe dict."""
-    if isinstance(r, EnrichmentResult):
-        d: dict = {
-            "type": "result",
-            "ioc_value": r.ioc.value,
-            "ioc_type": r.ioc.type.value,
-            "provider": r.provider,
-            "verdict": r.verdict,
-            "detection_count": r.detection_count,
-            "total_engines": r.total_engines,
-            "scan_date": r.scan_date,
-            "raw_stats": r.raw_stats,
-        }
-        if cached_markers is not None:
-            cache_key = r.ioc.value + "|" + r.provider
-            cached_at = cached_markers.get(cache_key)
-            if cached_at:
-                d["cached_at"] = cached_at
-        return d
-    return {
-        "type": "error",
-        "ioc_value": r.ioc.value,
-        "ioc_type": r.ioc.type.value,
-        "provider": r.provider,
-        "error": r.error,
-    }
+    """Serialize an enrichment result or error to a JSON-safe dict.
+
+    The orchestrator encodes each result once as it lands (result_log.py);
+    this is the same serializer for callers holding result objects.
+    """
+    cached_at = None
+    if cached_markers is not None and isinstance(r, EnrichmentResult):
+        cached_at = cached_markers.get(r.ioc.value + "|" + r.provider)
+    return result_to_dict(r, cached_at)
+
+
+def _serialize_cancelled(c: LookupCancelled) -> dict:
+    """Serialize a lookup cancelled by a job policy to a JSON-safe dict."""
+    return cancelled_to_dict(c)
 
 
 def _serialize_ioc(ioc: IOC) -> dict:
@@ -87,24 +103,39 @@ def _run_enrichment_and_save(
     input_text: str,
     mode: str,
     history_store: object,
+    cache_store: object | None = None,
+    policy: JobPolicy | None = None,
 ) -> None:
     """Run enrichment and save results to history.
 
-    Failures during history save are logged but do not break enrichment.
+    When a write-behind cache_store is given it is flushed before history is
+    saved, so every result in the saved analysis is also durable in the cache.
+    Failures during the flush or history save are logged but do not break
+    enrichment.
     """
-    orchestrator.enrich_all(job_id, iocs)
+    if policy is None:
+        orchestrator.enrich_all(job_id, iocs)
+    else:
+        orchestrator.enrich_all(job_id, iocs, policy=policy)
+
+    if cache_store is not None:
+        try:
+            cache_store.flush()  # type: ignore[attr-defined]
+        except Exception:
+            logger.warning("Failed to flush cache for %s", job_id, exc_info=True)
 
     try:
-        status = orchestrator.get_status(job_id)
+        # The results were encoded as they landed: join them, don't re-serialize.
+        status = orchestrator.get_status_since(job_id, 0)
         if status is None:
             return
-        serialized_results = [_serialize_result(r) for r in status["results"]]
         serialized_iocs = [_serialize_ioc(ioc) for ioc in iocs]
         history_store.save_analysis(  # type: ignore[union-attr]
             input_text=input_text,
             mode=mode,
             iocs=serialized_iocs,
-            results=serialized_results,
+            results_json=join_fragments(status["fragments"]),
+            verdict=top_verdict(getattr(r, "verdict", None) for r in status["results"]),
             analysis_id=job_id,
         )
     except Exception:
@@ -116,23 +147,96 @@ def _setup_orchestrator(
     text: str,
     mode: str,
     history_store: object,
+    policy: JobPolicy | None = None,
 ) -> tuple[str, EnrichmentOrchestrator, object]:
     """Create an orchestrator, register it, and submit the enrichment job.
 
     Returns (job_id, orchestrator, registry). The 'not configured' guard
     stays in each caller since the response format differs (redirect vs JSON).
     """
-    registry = current_app.registry
     job_id = uuid.uuid4().hex
-    cache = current_app.cache_store
+    job_store = getattr(current_app, "job_store", None)
+    if job_store is not None:
+        spec = {
+            "input_text": text,
+            "mode": mode,
+            "iocs": [_serialize_ioc(ioc) for ioc in iocs],
+            "policy": dataclasses.asdict(policy) if policy is not None else None,
+        }
+        try:
+            job_store.create(job_id, spec, process_owner())
+        except Exception:
+            logger.warning("Failed to register job %s in the job store", job_id, exc_info=True)
+            job_store = None
+
+    orchestrator = _make_orchestrator(job_store)
+    _submit_job(job_id, orchestrator, iocs, text, mode, history_store, policy)
+    return job_id, orchestrator, current_app.registry
+
+
+def _resume_jobs(claimed: dict[str, dict]) -> None:
+    """Re-submit jobs claimed from a process that stopped before finishing them.
+
+    Called by the app's JobLeases (inside an app context) with {job_id: spec}.
+    Each job runs under its old id; its orchestrator loads the entries the
+    store holds and dispatches only the unfinished pairs.  A deadline policy
+    starts over.  Status requests keep working throughout: until the job is
+    registered here they are answered from the store.
+    """
+    job_store = current_app.job_store
+    for job_id, spec in claimed.items():
+        try:
+            iocs = [
+                IOC(type=IOCType(d["type"]), value=d["value"], raw_match=d["raw_match"])
+                for d in spec["iocs"]
+            ]
+            policy = JobPolicy.from_dict(spec["policy"]) if spec.get("policy") else None
+        except (KeyError, TypeError, ValueError):
+            logger.warning("Cannot resume job %s: unreadable spec", job_id, exc_info=True)
+            job_store.complete(job_id)
+            continue
+        _submit_job(
+            job_id, _make_orchestrator(job_store), iocs, spec["input_text"], spec["mode"],
+            current_app.history_store, policy,
+        )
+
+
+def _make_orchestrator(job_store: JobStore | None) -> EnrichmentOrchestrator:
+    """Build an orchestrator over the configured providers for the app's engine."""
+    registry = current_app.registry
     config_store = ConfigStore()
     cache_ttl_hours = config_store.get_cache_ttl()
-    orchestrator = EnrichmentOrchestrator(
-        adapters=registry.configured(),
-        cache=cache,
-        cache_ttl_seconds=cache_ttl_hours * 3600,
-    )
+    options = {
+        "cache": current_app.cache_store,
+        "cache_ttl_seconds": cache_ttl_hours * 3600,
+        "rate_limiter": current_app.rate_limiter,
+        "job_store": job_store,
+        "provider_priority": current_app.config.get("PROVIDER_PRIORITY") or None,
+    }
+    loop_thread = getattr(current_app, "enrichment_loop", None)
+    if loop_thread is not None:
+        orchestrator: EnrichmentOrchestrator = AsyncEnrichmentOrchestrator(
+            registry.configured(), loop_thread=loop_thread, **options
+        )
+    else:
+        orchestrator = EnrichmentOrchestrator(
+            adapters=registry.configured(),
+            executor=current_app.enrichment_executor,
+            **options,
+        )
+    return orchestrator
 
+
+def _submit_job(
+    job_id: str,
+    orchestrator: EnrichmentOrchestrator,
+    iocs: list[IOC],
+    text: str,
+    mode: str,
+    history_store: object,
+    policy: JobPolicy | None,
+) -> None:
+    """Register an orchestrator under job_id and run the job on the enrichment pool."""
     with _orch_lock:
         _orchestrators[job_id] = orchestrator
         while len(_orchestrators) > _MAX_ORCHESTRATORS:
@@ -141,10 +245,54 @@ def _setup_orchestrator(
     _enrichment_pool.submit(
         _run_enrichment_and_save,
         orchestrator, job_id, iocs, text, mode,
-        history_store,
+        history_store, current_app.cache_store, policy,
     )
 
-    return job_id, orchestrator, registry
+
+class _StoredJob:
+    """Status reader for a job this process is not running, backed by the job store.
+
+    Offers the two orchestrator methods the status routes use.  Nothing
+    wakes it when results land, so wait_for_update() polls the store; and
+    provider health is per process, so none is reported.
+    """
+
+    def __init__(self, store: JobStore) -> None:
+        self._store = store
+
+    def get_status_since(
+        self, job_id: str, since: int, cancelled_since: int = 0
+    ) -> dict | None:
+        status = self._store.status_since(job_id, since, cancelled_since)
+        if status is not None:
+            status["providers"] = {}
+        return status
+
+    def wait_for_update(self, job_id: str, done: int, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while True:
+            progress = self._store.progress(job_id)
+            if progress is None or progress[1] or progress[0] != done:
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(_STORE_POLL_SECONDS, remaining))
+
+
+def _job_source(job_id: str) -> EnrichmentOrchestrator | _StoredJob | None:
+    """Return this process's orchestrator for job_id, else a reader of its stored state.
+
+    None if neither this process nor the job store knows the job.
+    """
+    with _orch_lock:
+        orchestrator = _orchestrators.get(job_id)
+    if orchestrator is not None:
+        return orchestrator
+    job_store = getattr(current_app, "job_store", None)
+    if job_store is None or job_store.progress(job_id) is None:
+        return None
+    return _StoredJob(job_store)
 
 
 def _get_enrichment_status(job_id: str):
@@ -152,28 +300,107 @@ def _get_enrichment_status(job_id: str):
 
     Returns a Flask JSON response tuple.
     """
-    with _orch_lock:
-        orchestrator = _orchestrators.get(job_id)
-    if orchestrator is None:
+    source = _job_source(job_id)
+    if source is None:
         return jsonify({"error": "job not found"}), 404
 
-    status = orchestrator.get_status(job_id)
-    if status is None:
+    since = request.args.get("since", 0, type=int)
+    cancelled_since = request.args.get("cancelled_since", 0, type=int)
+    payload = _status_payload(source, job_id, since, cancelled_since)
+    if payload is None:
         return jsonify({"error": "job not found"}), 404
+    return current_app.response_class(payload[1], mimetype="application/json")
 
-    since = request.args.get("since", 0, type=int)
-    cached_markers = orchestrator.cached_markers
 
-    all_results = status["results"]
-    new_results = all_results[since:]
-    serialized = [
-        _serialize_result(r, cached_markers) for r in new_results
-    ]
+def _stream_enrichment_status(job_id: str):
+    """Shared Server-Sent Events body for both HTML and API stream routes.
+
+    Pushes one "status" event — the same payload as the polling endpoint —
+    each time lookups finish, woken by the orchestrator instead of polling
+    it.  Each event's id is its next_since cursor: a reconnecting EventSource
+    sends it back as Last-Event-ID and resumes where it left off (an explicit
+    ?since= works as for polling).  Each event carries only the cancelled
+    entries the stream has not sent yet; a reconnect starts from
+    ?cancelled_since= (default 0), as the event id holds the results cursor
+    only.  The stream ends after the event with complete=true, or with a
+    "gone" event if the job is evicted.  A job run by another process is
+    streamed from the job store, polled for progress.
+    """
+    source = _job_source(job_id)
+    if source is None:
+        return jsonify({"error": "job not found"}), 404
+
+    last_event_id = request.headers.get("Last-Event-ID", "")
+    if last_event_id.isdigit():
+        since = int(last_event_id)
+    else:
+        since = request.args.get("since", 0, type=int)
+
+    cancelled_since = request.args.get("cancelled_since", 0, type=int)
+
+    def events():
+        cursor, cancelled_cursor = since, cancelled_since
+        seen_done = None
+        yield f"retry: {_STREAM_RETRY_MS}\n\n"
+        deadline = time.monotonic() + _STREAM_MAX_SECONDS
+        while True:
+            payload = _status_payload(source, job_id, cursor, cancelled_cursor)
+            if payload is None:
+                yield 'event: gone\ndata: {"error": "job not found"}\n\n'
+                return
+            fields, body = payload
+            if fields["done"] != seen_done or fields["complete"]:
+                cursor, seen_done = fields["next_since"], fields["done"]
+                cancelled_cursor = fields["next_cancelled_since"]
+                yield f"id: {cursor}\nevent: status\ndata: ".encode() + body + b"\n\n"
+            if fields["complete"]:
+                return
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            if not source.wait_for_update(
+                job_id, seen_done, min(_STREAM_KEEPALIVE_SECONDS, remaining)
+            ):
+                yield ": keep-alive\n\n"
+
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-    return jsonify({
+
+def _status_payload(
+    orchestrator: EnrichmentOrchestrator | _StoredJob,
+    job_id: str,
+    since: int,
+    cancelled_since: int = 0,
+) -> tuple[dict, bytes] | None:
+    """Build the status JSON for results[since:] and cancelled[cancelled_since:].
+
+    Returns (status fields, JSON body), or None if the job is gone.  Only the
+    delta is copied out of the orchestrator (get_status_since), and its
+    results arrive already encoded
+    with their cached_at markers, so the body is stitched from those
+    fragments: a poll of a long job costs O(new results) and serializes
+    nothing but the small envelope.  A job store reports its cancelled
+    entries already serialized.
+    """
+    status = orchestrator.get_status_since(job_id, since, cancelled_since)
+    if status is None:
+        return None
+
+    fields = {
         "total": status["total"],
         "done": status["done"],
         "complete": status["complete"],
-        "results": serialized,
-        "next_since": len(all_results),
-    })
+        "next_since": status["next_since"],
+        "cancelled": [
+            c if isinstance(c, dict) else _serialize_cancelled(c)
+            for c in status.get("cancelled", [])
+        ],
+        "next_cancelled_since": status["next_cancelled_since"],
+        "providers": status.get("providers", {}),
+    }
+    body = dumps_json(fields)[:-1] + b',"results":' + join_fragments(status["fragments"]) + b"}"
+    return fields, body
@@ -6,11 +6,21 @@ CSRF-exempt (stateless JSON API) but rate-limited.
 Routes:
     POST /api/analyze  — extract IOCs from text, optionally launch enrichment
     GET  /api/status/<job_id> — poll enrichment progress (same as HTML endpoint)
+    GET  /api/stream/<job_id> — enrichment progress as Server-Sent Events
+    GET  /api/metrics — enrichment executor load (queue depth, thread utilization)
+                        per-provider latency (p50/p95, read timeout, hedges),
+                        circuit-breaker state, lookups waiting for a retry and
+                        HTTP connection-pool reuse per host
 """
 
 from flask import Blueprint, current_app, jsonify, request
 
 from app import limiter
+from app.enrichment.circuit_breaker import PROVIDER_BREAKERS
+from app.enrichment.http_pool import HTTP_POOLS
+from app.enrichment.http_safety import PROVIDER_LATENCY
+from app.enrichment.policy import JobPolicy
+from app.enrichment.retry_scheduler import RETRY_SCHEDULER
 from app.pipeline.extractor import run_pipeline
 from app.pipeline.models import IOCType, group_by_type
 
@@ -19,6 +29,7 @@ from ._helpers import (
     _serialize_ioc,
     _serialize_result,
     _setup_orchestrator,
+    _stream_enrichment_status,
 )
 
 bp_api = Blueprint("api", __name__, url_prefix="/api")
@@ -34,16 +45,20 @@ def api_analyze():
     Request body (JSON):
         text (str, required): Free-form text containing IOCs.
         mode (str, optional): "offline" (default) or "online".
+        policy (object, optional, online only): early-termination rules —
+            stop_on_first_malicious_per_ioc (bool), deadline_seconds (number),
+            max_quota_spend (int, requests to API-key providers).
 
     Offline response (200):
         {"mode": "offline", "total_count": N, "iocs": [...]}
 
     Online response (200):
         {"mode": "online", "total_count": N, "iocs": [...], "job_id": "...",
-         "status_url": "/api/status/<job_id>"}
+         "status_url": "/api/status/<job_id>",
+         "stream_url": "/api/stream/<job_id>"}
 
     Errors:
-        400: Missing/invalid JSON body, empty text, or invalid mode.
+        400: Missing/invalid JSON body, empty text, invalid mode or policy.
         400: No provider configured (online mode).
     """
     data = request.get_json(silent=True)
@@ -58,6 +73,11 @@ def api_analyze():
     if mode not in _VALID_MODES:
         return jsonify({"error": f"Invalid mode '{mode}'. Must be 'offline' or 'online'."}), 400
 
+    try:
+        policy = JobPolicy.from_dict(data.get("policy"))
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
     iocs = run_pipeline(text)
     grouped = group_by_type(iocs)
     total_count = len(iocs)
@@ -87,10 +107,12 @@ def api_analyze():
 
         job_id, _, registry = _setup_orchestrator(
             iocs, text, mode, current_app.history_store,
+            policy=None if policy.is_default else policy,
         )
 
         response["job_id"] = job_id
         response["status_url"] = f"/api/status/{job_id}"
+        response["stream_url"] = f"/api/stream/{job_id}"
 
     return jsonify(response), 200
 
@@ -101,6 +123,43 @@ def api_status(job_id: str):
     """Poll enrichment progress for a job.
 
     Same semantics as the HTML enrichment_status endpoint.
-    Supports cursor-based polling via ?since= query param.
+    Supports cursor-based polling via ?since= (results) and
+    ?cancelled_since= (cancelled lookups) query params.
     """
     return _get_enrichment_status(job_id)
+
+
+@bp_api.route("/stream/<job_id>", methods=["GET"])
+@limiter.limit("120 per minute")
+def api_stream(job_id: str):
+    """Stream enrichment progress for a job as Server-Sent Events.
+
+    One "status" event (same JSON as /api/status) per batch of finished
+    lookups, ending with complete=true.  Event ids are next_since cursors:
+    reconnect with Last-Event-ID or ?since= to resume.
+    """
+    return _stream_enrichment_status(job_id)
+
+
+@bp_api.route("/metrics", methods=["GET"])
+@limiter.limit("120 per minute")
+def api_metrics():
+    """Return enrichment executor and provider latency metrics.
+
+    Response (200):
+        {"executor": {"max_workers", "threads", "busy_workers", "utilization",
+                      "queue_depth", "jobs_queued", "tasks_completed"},
+         "providers": {name: {"samples", "p50_ms", "p95_ms", "hedges",
+                              "read_timeout_s"}},
+         "circuit_breakers": {name: {"state", "failure_rate", "retry_in_s",
+                                     "times_opened"}},
+         "retries_pending": int,
+         "http_pools": {host: {"requests", "hits", "misses", "tls_handshakes"}}}
+    """
+    return jsonify({
+        "executor": current_app.enrichment_executor.metrics(),
+        "providers": PROVIDER_LATENCY.snapshot(),
+        "circuit_breakers": PROVIDER_BREAKERS.snapshot(),
+        "retries_pending": RETRY_SCHEDULER.pending(),
+        "http_pools": HTTP_POOLS.snapshot(),
+    })
@@ -1,9 +1,9 @@
-"""Enrichment polling route."""
+"""Enrichment progress routes: JSON polling and a Server-Sent Events stream."""
 
 from app import limiter
 
 from . import bp
-from ._helpers import _get_enrichment_status
+from ._helpers import _get_enrichment_status, _stream_enrichment_status
 
 
 @bp.route("/enrichment/status/<job_id>", methods=["GET"])
@@ -14,3 +14,14 @@ def enrichment_status(job_id: str):
     Supports cursor-based polling via ?since= query param.
     """
     return _get_enrichment_status(job_id)
+
+
+@bp.route("/enrichment/stream/<job_id>", methods=["GET"])
+@limiter.limit("120 per minute")
+def enrichment_stream(job_id: str):
+    """Stream enrichment progress for a job as Server-Sent Events.
+
+    Each event carries the status JSON of the polling endpoint; reconnects
+    resume from Last-Event-ID (or ?since=).
+    """
+    return _stream_enrichment_status(job_id)
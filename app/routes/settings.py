@@ -6,6 +6,7 @@ from flask import (
 
 from app import limiter
 from app.enrichment.config_store import ConfigStore
+from app.enrichment.rate_limit import limits_from_config
 from app.enrichment.setup import PROVIDER_INFO, build_registry
 
 from . import bp
@@ -37,6 +38,9 @@ def settings_get():
         providers=providers_with_status,
         cache_stats=cache_stats,
         cache_ttl=cache_ttl,
+        cache_max_mb=config_store.get_cache_max_mb(),
+        cache_max_rows=config_store.get_cache_max_rows(),
+        maintenance=current_app.cache_maintenance.status(),
     )
 
 
@@ -64,6 +68,7 @@ def settings_post():
 
     allowed_hosts = current_app.config.get("ALLOWED_API_HOSTS", [])
     current_app.registry = build_registry(allowed_hosts=allowed_hosts, config_store=config_store)
+    current_app.rate_limiter.configure(limits_from_config(config_store))
 
     flash(f"API key saved for {provider_id}.", "success")
     return redirect(url_for("main.settings_get"))
@@ -94,3 +99,22 @@ def cache_ttl_set():
     config_store.set_cache_ttl(ttl)
     flash(f"Cache TTL set to {ttl} hours.", "success")
     return redirect(url_for("main.settings_get"))
+
+
+@bp.route("/settings/cache/budget", methods=["POST"])
+@limiter.limit("10 per minute")
+def cache_budget_set():
+    """Update the cache size and row-count budgets enforced by maintenance."""
+    try:
+        max_mb = int(request.form.get("cache_max_mb", "").strip())
+        max_rows = int(request.form.get("cache_max_rows", "").strip())
+        if max_mb < 0 or max_rows < 0:
+            raise ValueError
+    except (ValueError, TypeError):
+        flash("Cache limits must be non-negative integers (0 = unlimited).", "error")
+        return redirect(url_for("main.settings_get"))
+    config_store = ConfigStore()
+    config_store.set_cache_max_mb(max_mb)
+    config_store.set_cache_max_rows(max_rows)
+    flash("Cache limits saved. They apply at the next maintenance run.", "success")
+    return redirect(url_for("main.settings_get"))
@@ -2,4 +2,4 @@
 `)!==-1?'"'+t.replace(/"/g,'""')+'"':t}function k(t,n){if(!t)return"";let e=t[n];return e==null?"":Array.isArray(e)?e.join("; "):String(e)}var Ft=["ioc_value","ioc_type","provider","verdict","detection_count","total_engines","scan_date","signature","malware_printable","threat_type","countryCode","isp","top_detections"];function Et(t){let n=JSON.stringify(t,null,2),e=new Blob([n],{type:"application/json"});ht(e,"sentinelx-export-"+vt()+".json")}function xt(t){let n=Ft.join(",")+`
 `,e=[];for(let i of t){if(i.type!=="result")continue;let c=i.raw_stats,a=[T(i.ioc_value),T(i.ioc_type),T(i.provider),T(i.verdict),String(i.detection_count),String(i.total_engines),T(i.scan_date??""),T(k(c,"signature")),T(k(c,"malware_printable")),T(k(c,"threat_type")),T(k(c,"countryCode")),T(k(c,"isp")),T(k(c,"top_detections"))];e.push(a.join(","))}let r=n+e.join(`
 `),o=new Blob([r],{type:"text/csv"});ht(o,"sentinelx-export-"+vt()+".csv")}function bt(t){let n=document.querySelectorAll(".ioc-card[data-ioc-value]"),e=new Set,r=[];n.forEach(o=>{let i=o.getAttribute("data-ioc-value");i&&!e.has(i)&&(e.add(i),r.push(i))}),z(r.join(`
-`),t)}function G(t){let n,e,r,o=0,i=0;if(t.type==="result"){n=t.verdict,o=t.detection_count,i=t.total_engines,n==="malicious"?e=t.detection_count+"/"+t.total_engines+" engines":n==="suspicious"?e=t.total_engines>1?t.detection_count+"/"+t.total_engines+" engines":"Suspicious":n==="clean"?e="Clean, "+t.total_engines+" engines":n==="known_good"?e="NSRL match":e="Not in database";let c=yt(t.scan_date);r=t.provider+": "+n+" ("+e+(c?", scanned "+c:"")+")"}else n="error",e=t.error,r=t.provider+": error, "+t.error;return{verdict:n,statText:e,summaryText:r,detectionCount:o,totalEngines:i}}function U(t){let n=t.querySelector(".enrichment-details");if(!n||n.querySelector(".detail-link-footer"))return;let e=t.closest(".ioc-card");if(!e)return;let r=e.getAttribute("data-ioc-type")??"",o=e.getAttribute("data-ioc-value")??"";if(!r||!o)return;let i=document.createElement("div");i.className="detail-link-footer";let c=document.createElement("a");c.className="detail-link",c.textContent="View full detail \u2192",c.setAttribute("href","/ioc/"+r+"/"+encodeURIComponent(o)),i.appendChild(c),n.appendChild(i)}function J(t){let n=Array.from(t.querySelectorAll(".provider-detail-row"));n.sort((e,r)=>{let o=e.getAttribute("data-verdict"),i=r.getAttribute("data-verdict"),c=o?C(o):-1;return(i?C(i):-1)-c});for(let e of n)t.appendChild(e)}function X(t){let n=document.getElementById("export-btn"),e=document.getElementById("export-dropdown");if(!n||!e)return;n.addEventListener("click",function(){let o=e.style.display!=="none";e.style.display=o?"none":""}),document.addEventListener("click",function(o){o.target.closest(".export-group")||(e.style.display="none")}),e.querySelectorAll("[data-export]").forEach(function(o){o.addEventListener("click",function(){let i=o.getAttribute("data-export");i==="json"?Et(t):i==="csv"?xt(t):i==="iocs"&&bt(o),e.style.display="none"})})}var et=new Map,nt=new Map,St=[];function Kt(t,n){let e=et.get(n);e!==void 0&&clearTimeout(e);let r=setTimeout(()=>{et.delete(n),J(t)},100);et.set(n,r)}function Wt(t,n,e){let r=nt.get(n);r!==void 0&&clearTimeout(r);let o=setTimeout(()=>{nt.delete(n),P(t,n,e)},100);nt.set(n,o)}function Gt(t){return document.querySelector('.copy-btn[data-value="'+CSS.escape(t)+'"]')}function Ut(t,n){let e=Gt(t);if(!e)return;let r=Z(n[t]??[]);r&&e.setAttribute("data-enrichment",r.summaryText)}function Jt(t,n){let e=document.getElementById("enrich-progress-fill"),r=document.getElementById("enrich-progress-text");if(!e||!r)return;let o=n>0?Math.round(t/n*100):0;e.style.width=o+"%",r.textContent=t+"/"+n+" providers complete"}function Ct(t,n,e){let r=n?m(n,"data-ioc-type"):"",o=ut(),c=(Object.prototype.hasOwnProperty.call(o,r)?o[r]??0:0)-e;if(c<=0){let d=t.querySelector(".enrichment-waiting-text");d&&t.removeChild(d);return}let a=t.querySelector(".enrichment-waiting-text");a||(a=document.createElement("span"),a.className="enrichment-waiting-text enrichment-pending-text",t.appendChild(a)),a.textContent=c+" provider"+(c!==1?"s":"")+" still loading..."}function Tt(t){let n=document.getElementById("enrich-warning");n&&(n.style.display="block",n.textContent="Warning: "+t+" Consider using offline mode or checking your API key in Settings.")}function Xt(){let t=document.getElementById("enrich-progress");t&&t.classList.add("complete");let n=document.getElementById("enrich-progress-text");n&&(n.textContent="Enrichment complete");let e=document.getElementById("export-btn");e&&e.removeAttribute("disabled"),document.querySelectorAll(".enrichment-slot").forEach(r=>{W(r)}),document.querySelectorAll(".enrichment-slot--loaded").forEach(r=>{U(r)})}function $t(t,n,e){let r=M(t.ioc_value);if(!r)return;let o=r.querySelector(".enrichment-slot");if(!o)return;if(N.has(t.provider)){let h=o.querySelector(".spinner-wrapper");h&&o.removeChild(h),o.classList.add("enrichment-slot--loaded"),e[t.ioc_value]=(e[t.ioc_value]??0)+1;let L=o.querySelector(".enrichment-section--context");if(L&&t.type==="result"){let b=j(t);L.appendChild(b),K(r,t)}Ct(o,r,e[t.ioc_value]??1);return}let i=o.querySelector(".spinner-wrapper");i&&o.removeChild(i),o.classList.add("enrichment-slot--loaded"),e[t.ioc_value]=(e[t.ioc_value]??0)+1;let c=e[t.ioc_value]??1,{verdict:a,statText:d,summaryText:s,detectionCount:l,totalEngines:f}=G(t),x=n[t.ioc_value]??[];n[t.ioc_value]=x,x.push({provider:t.provider,verdict:a,summaryText:s,detectionCount:l,totalEngines:f,statText:d,cachedAt:t.type==="result"?t.cached_at??void 0:void 0});let v=a==="no_data"||a==="error",p=v?".enrichment-section--no-data":".enrichment-section--reputation",u=o.querySelector(p);if(u){let h=F(t.provider,a,d,t);u.appendChild(h),v||Kt(u,t.ioc_value)}Wt(o,t.ioc_value,n),Ct(o,r,c);let y=I(n[t.ioc_value]??[]);V(t.ioc_value,y),Ut(t.ioc_value,n)}function rt(){let t=document.querySelector(".page-results");if(!t)return;function n(e){let r=e.closest(".ioc-summary-row");if(!r)return;let o=r.closest(".enrichment-slot"),i=o?o.querySelector(".enrichment-details"):null;if(!i)return;let c=i.classList.toggle("is-open");r.classList.toggle("is-open",c),r.setAttribute("aria-expanded",String(c))}t.addEventListener("click",e=>{n(e.target)}),t.addEventListener("keydown",e=>{if(e.key==="Enter"||e.key===" "){let r=e.target;r.closest(".ioc-summary-row")&&(e.preventDefault(),n(r))}})}function Lt(){let t=document.querySelector(".page-results");if(!t)return;let n=m(t,"data-job-id"),e=m(t,"data-mode");if(!n||e!=="online")return;rt();let r=0,o={},i={},c=setInterval(function(){fetch("/enrichment/status/"+n+"?since="+r).then(function(a){return a.ok?a.json():null}).then(function(a){if(!a)return;Jt(a.done,a.total);let d=a.results;for(let s=0;s<d.length;s++){let l=d[s];if(l&&(St.push(l),$t(l,o,i),l.type==="error"&&l.error)){let f=l.error.toLowerCase();f.indexOf("rate limit")!==-1||f.indexOf("429")!==-1?Tt("Rate limit reached for "+l.provider+"."):(f.indexOf("authentication")!==-1||f.indexOf("401")!==-1||f.indexOf("403")!==-1)&&Tt("Authentication error for "+l.provider+". Please check your API key in Settings.")}}d.length>0&&(q(),O()),r=a.next_since,a.complete&&(clearInterval(c),Xt())}).catch(function(){})},750);X(St)}var At=[];function zt(t,n,e){let r=M(t.ioc_value);if(!r)return;let o=r.querySelector(".enrichment-slot");if(!o)return;if(N.has(t.provider)){let u=o.querySelector(".spinner-wrapper");u&&o.removeChild(u),o.classList.add("enrichment-slot--loaded"),e[t.ioc_value]=(e[t.ioc_value]??0)+1;let y=o.querySelector(".enrichment-section--context");if(y&&t.type==="result"){let h=j(t);y.appendChild(h),K(r,t)}return}let i=o.querySelector(".spinner-wrapper");i&&o.removeChild(i),o.classList.add("enrichment-slot--loaded"),e[t.ioc_value]=(e[t.ioc_value]??0)+1;let{verdict:c,statText:a,summaryText:d,detectionCount:s,totalEngines:l}=G(t),f=n[t.ioc_value]??[];n[t.ioc_value]=f,f.push({provider:t.provider,verdict:c,summaryText:d,detectionCount:s,totalEngines:l,statText:a,cachedAt:t.type==="result"?t.cached_at??void 0:void 0});let v=c==="no_data"||c==="error"?".enrichment-section--no-data":".enrichment-section--reputation",p=o.querySelector(v);if(p){let u=F(t.provider,c,a,t);p.appendChild(u)}}function wt(){let t=document.querySelector(".page-results");if(!t)return;let n=t.getAttribute("data-history-results");if(!n)return;let e;try{e=JSON.parse(n)}catch{console.error("[history] Failed to parse data-history-results JSON");return}if(!Array.isArray(e)||e.length===0)return;let r={},o={};for(let s of e)At.push(s),zt(s,r,o);let i=new Set;for(let s of e){if(i.has(s.ioc_value))continue;i.add(s.ioc_value);let l=M(s.ioc_value);if(!l)continue;let f=l.querySelector(".enrichment-slot");if(!f)continue;P(f,s.ioc_value,r);let v=(r[s.ioc_value]??[]).filter(u=>!N.has(u.provider));if(v.length>0){let u=I(v);V(s.ioc_value,u)}let p=f.querySelector(".enrichment-section--reputation");p&&J(p)}q(),O(),document.querySelectorAll(".enrichment-slot").forEach(s=>{W(s)}),document.querySelectorAll(".enrichment-slot--loaded").forEach(s=>{U(s)});let c=document.getElementById("enrich-progress");c&&c.classList.add("complete");let a=document.getElementById("enrich-progress-text");a&&(a.textContent="Enrichment complete");let d=document.getElementById("export-btn");d&&d.removeAttribute("disabled"),rt(),X(At)}function Yt(){let t=document.querySelectorAll(".settings-section[data-provider]");if(t.length===0)return;function n(e){t.forEach(o=>{if(o!==e){o.removeAttribute("data-expanded");let i=o.querySelector(".accordion-header");i&&i.setAttribute("aria-expanded","false")}}),e.setAttribute("data-expanded","");let r=e.querySelector(".accordion-header");r&&r.setAttribute("aria-expanded","true")}t.forEach(e=>{let r=e.querySelector(".accordion-header");r&&r.addEventListener("click",()=>{e.hasAttribute("data-expanded")?(e.removeAttribute("data-expanded"),r.setAttribute("aria-expanded","false")):n(e)})})}function Qt(){document.querySelectorAll(".settings-section").forEach(n=>{let e=n.querySelector("[data-role='toggle-key']"),r=n.querySelector("input[type='password'], input[type='text']");!e||!r||e.addEventListener("click",()=>{r.type==="password"?(r.type="text",e.textContent="Hide"):(r.type="password",e.textContent="Show")})})}function Mt(){Yt(),Qt()}function Zt(){let t=document.querySelector(".filter-bar-wrapper");if(!t)return;let n=!1;window.addEventListener("scroll",function(){let e=window.scrollY>40;e!==n&&(n=e,t.classList.toggle("is-scrolled",n))},{passive:!0})}function te(){document.querySelectorAll(".ioc-card").forEach((n,e)=>{n.style.setProperty("--card-index",String(Math.min(e,15)))})}function It(){Zt(),te()}var ee={malicious:"#ef4444",suspicious:"#f97316",clean:"#22c55e",known_good:"#3b82f6",no_data:"#6b7280",error:"#6b7280",ioc:"#8b5cf6"},ne="http://www.w3.org/2000/svg";function ot(t){return ee[t]??"#6b7280"}function S(t){return document.createElementNS(ne,t)}function re(t){let n=t.getAttribute("data-graph-nodes"),e=t.getAttribute("data-graph-edges"),r=[],o=[];try{r=n?JSON.parse(n):[],o=e?JSON.parse(e):[]}catch{r=[],o=[]}let i=r.filter(g=>g.role==="provider"),c=r.find(g=>g.role==="ioc");if(!c||i.length===0){let g=document.createElement("p");g.className="graph-empty",g.appendChild(document.createTextNode("No provider data to graph")),t.appendChild(g);return}let a=S("svg");a.setAttribute("viewBox","0 0 700 450"),a.setAttribute("width","100%"),a.setAttribute("role","img"),a.setAttribute("aria-label","Provider relationship graph");let d=350,s=225,l=170,f=30,x=20,v=S("g");v.setAttribute("class","graph-edges");let p=new Map(i.map((g,w)=>[g.id,w]));for(let g of o){let w=p.get(g.to);if(w===void 0)continue;let _=2*Math.PI*w/i.length-Math.PI/2,B=d+l*Math.cos(_),D=s+l*Math.sin(_),E=S("line");E.setAttribute("x1",String(d)),E.setAttribute("y1",String(s)),E.setAttribute("x2",String(Math.round(B))),E.setAttribute("y2",String(Math.round(D))),E.setAttribute("stroke",ot(g.verdict)),E.setAttribute("stroke-width","2"),E.setAttribute("opacity","0.6"),v.appendChild(E)}a.appendChild(v);let u=S("g");u.setAttribute("class","graph-nodes"),i.forEach((g,w)=>{let _=2*Math.PI*w/i.length-Math.PI/2,B=d+l*Math.cos(_),D=s+l*Math.sin(_),E=S("g");E.setAttribute("class","graph-node graph-node--provider");let it=S("title");it.appendChild(document.createTextNode(g.id)),E.appendChild(it);let R=S("circle");R.setAttribute("cx",String(Math.round(B))),R.setAttribute("cy",String(Math.round(D))),R.setAttribute("r",String(x)),R.setAttribute("fill",ot(g.verdict)),E.appendChild(R);let A=S("text");A.setAttribute("x",String(Math.round(B))),A.setAttribute("y",String(Math.round(D+x+14))),A.setAttribute("text-anchor","middle"),A.setAttribute("font-size","10"),A.setAttribute("fill","#e5e7eb"),A.appendChild(document.createTextNode(g.label)),E.appendChild(A),u.appendChild(E)}),a.appendChild(u);let y=S("g");y.setAttribute("class","graph-node graph-node--ioc");let h=S("title");h.appendChild(document.createTextNode(c.id)),y.appendChild(h);let L=S("circle");L.setAttribute("cx",String(d)),L.setAttribute("cy",String(s)),L.setAttribute("r",String(f)),L.setAttribute("fill",ot("ioc")),y.appendChild(L);let b=S("text");b.setAttribute("x",String(d)),b.setAttribute("y",String(s+4)),b.setAttribute("text-anchor","middle"),b.setAttribute("font-size","10"),b.setAttribute("fill","#fff"),b.setAttribute("font-weight","bold"),b.appendChild(document.createTextNode(c.label)),y.appendChild(b),a.appendChild(y),t.appendChild(a)}function kt(){let t=document.getElementById("relationship-graph");t&&re(t)}function _t(){at(),lt(),pt(),Lt(),wt(),Mt(),It(),kt()}document.readyState==="loading"?document.addEventListener("DOMContentLoaded",_t):_t();})();
+`),t)}function G(t){let n,e,r,o=0,i=0;if(t.type==="result"){n=t.verdict,o=t.detection_count,i=t.total_engines,n==="malicious"?e=t.detection_count+"/"+t.total_engines+" engines":n==="suspicious"?e=t.total_engines>1?t.detection_count+"/"+t.total_engines+" engines":"Suspicious":n==="clean"?e="Clean, "+t.total_engines+" engines":n==="known_good"?e="NSRL match":e="Not in database";let c=yt(t.scan_date);r=t.provider+": "+n+" ("+e+(c?", scanned "+c:"")+")"}else n="error",e=t.error,r=t.provider+": error, "+t.error;return{verdict:n,statText:e,summaryText:r,detectionCount:o,totalEngines:i}}function U(t){let n=t.querySelector(".enrichment-details");if(!n||n.querySelector(".detail-link-footer"))return;let e=t.closest(".ioc-card");if(!e)return;let r=e.getAttribute("data-ioc-type")??"",o=e.getAttribute("data-ioc-value")??"";if(!r||!o)return;let i=document.createElement("div");i.className="detail-link-footer";let c=document.createElement("a");c.className="detail-link",c.textContent="View full detail \u2192",c.setAttribute("href","/ioc/"+r+"/"+encodeURIComponent(o)),i.appendChild(c),n.appendChild(i)}function J(t){let n=Array.from(t.querySelectorAll(".provider-detail-row"));n.sort((e,r)=>{let o=e.getAttribute("data-verdict"),i=r.getAttribute("data-verdict"),c=o?C(o):-1;return(i?C(i):-1)-c});for(let e of n)t.appendChild(e)}function X(t){let n=document.getElementById("export-btn"),e=document.getElementById("export-dropdown");if(!n||!e)return;n.addEventListener("click",function(){let o=e.style.display!=="none";e.style.display=o?"none":""}),document.addEventListener("click",function(o){o.target.closest(".export-group")||(e.style.display="none")}),e.querySelectorAll("[data-export]").forEach(function(o){o.addEventListener("click",function(){let i=o.getAttribute("data-export");i==="json"?Et(t):i==="csv"?xt(t):i==="iocs"&&bt(o),e.style.display="none"})})}var et=new Map,nt=new Map,St=[];function Kt(t,n){let e=et.get(n);e!==void 0&&clearTimeout(e);let r=setTimeout(()=>{et.delete(n),J(t)},100);et.set(n,r)}function Wt(t,n,e){let r=nt.get(n);r!==void 0&&clearTimeout(r);let o=setTimeout(()=>{nt.delete(n),P(t,n,e)},100);nt.set(n,o)}function Gt(t){return document.querySelector('.copy-btn[data-value="'+CSS.escape(t)+'"]')}function Ut(t,n){let e=Gt(t);if(!e)return;let r=Z(n[t]??[]);r&&e.setAttribute("data-enrichment",r.summaryText)}function Jt(t,n){let e=document.getElementById("enrich-progress-fill"),r=document.getElementById("enrich-progress-text");if(!e||!r)return;let o=n>0?Math.round(t/n*100):0;e.style.width=o+"%",r.textContent=t+"/"+n+" providers complete"}function Ct(t,n,e){let r=n?m(n,"data-ioc-type"):"",o=ut(),c=(Object.prototype.hasOwnProperty.call(o,r)?o[r]??0:0)-e;if(c<=0){let d=t.querySelector(".enrichment-waiting-text");d&&t.removeChild(d);return}let a=t.querySelector(".enrichment-waiting-text");a||(a=document.createElement("span"),a.className="enrichment-waiting-text enrichment-pending-text",t.appendChild(a)),a.textContent=c+" provider"+(c!==1?"s":"")+" still loading..."}function Tt(t){let n=document.getElementById("enrich-warning");n&&(n.style.display="block",n.textContent="Warning: "+t+" Consider using offline mode or checking your API key in Settings.")}function Xt(){let t=document.getElementById("enrich-progress");t&&t.classList.add("complete");let n=document.getElementById("enrich-progress-text");n&&(n.textContent="Enrichment complete");let e=document.getElementById("export-btn");e&&e.removeAttribute("disabled"),document.querySelectorAll(".enrichment-slot").forEach(r=>{W(r)}),document.querySelectorAll(".enrichment-slot--loaded").forEach(r=>{U(r)})}function $t(t,n,e){let r=M(t.ioc_value);if(!r)return;let o=r.querySelector(".enrichment-slot");if(!o)return;if(N.has(t.provider)){let h=o.querySelector(".spinner-wrapper");h&&o.removeChild(h),o.classList.add("enrichment-slot--loaded"),e[t.ioc_value]=(e[t.ioc_value]??0)+1;let L=o.querySelector(".enrichment-section--context");if(L&&t.type==="result"){let b=j(t);L.appendChild(b),K(r,t)}Ct(o,r,e[t.ioc_value]??1);return}let i=o.querySelector(".spinner-wrapper");i&&o.removeChild(i),o.classList.add("enrichment-slot--loaded"),e[t.ioc_value]=(e[t.ioc_value]??0)+1;let c=e[t.ioc_value]??1,{verdict:a,statText:d,summaryText:s,detectionCount:l,totalEngines:f}=G(t),x=n[t.ioc_value]??[];n[t.ioc_value]=x,x.push({provider:t.provider,verdict:a,summaryText:s,detectionCount:l,totalEngines:f,statText:d,cachedAt:t.type==="result"?t.cached_at??void 0:void 0});let v=a==="no_data"||a==="error",p=v?".enrichment-section--no-data":".enrichment-section--reputation",u=o.querySelector(p);if(u){let h=F(t.provider,a,d,t);u.appendChild(h),v||Kt(u,t.ioc_value)}Wt(o,t.ioc_value,n),Ct(o,r,c);let y=I(n[t.ioc_value]??[]);V(t.ioc_value,y),Ut(t.ioc_value,n)}function rt(){let t=document.querySelector(".page-results");if(!t)return;function n(e){let r=e.closest(".ioc-summary-row");if(!r)return;let o=r.closest(".enrichment-slot"),i=o?o.querySelector(".enrichment-details"):null;if(!i)return;let c=i.classList.toggle("is-open");r.classList.toggle("is-open",c),r.setAttribute("aria-expanded",String(c))}t.addEventListener("click",e=>{n(e.target)}),t.addEventListener("keydown",e=>{if(e.key==="Enter"||e.key===" "){let r=e.target;r.closest(".ioc-summary-row")&&(e.preventDefault(),n(r))}})}function Lt(){let t=document.querySelector(".page-results");if(!t)return;let n=m(t,"data-job-id"),e=m(t,"data-mode");if(!n||e!=="online")return;rt();let r=0,h=0,o={},i={};function c(a){Jt(a.done,a.total);let d=a.results;for(let s=0;s<d.length;s++){let l=d[s];if(l&&(St.push(l),$t(l,o,i),l.type==="error"&&l.error)){let f=l.error.toLowerCase();f.indexOf("rate limit")!==-1||f.indexOf("429")!==-1?Tt("Rate limit reached for "+l.provider+"."):(f.indexOf("authentication")!==-1||f.indexOf("401")!==-1||f.indexOf("403")!==-1)&&Tt("Authentication error for "+l.provider+". Please check your API key in Settings.")}}return d.length>0&&(q(),O()),r=a.next_since,h=a.next_cancelled_since,a.complete?(Xt(),!0):!1}function a(){let d=setInterval(function(){fetch("/enrichment/status/"+n+"?since="+r+"&cancelled_since="+h).then(function(s){return s.ok?s.json():null}).then(function(s){s&&c(s)&&clearInterval(d)}).catch(function(){})},750)}if(typeof EventSource<"u"){let d=new EventSource("/enrichment/stream/"+n),s=0;d.onopen=function(){s=0},d.addEventListener("status",function(l){c(JSON.parse(l.data))&&d.close()}),d.addEventListener("gone",function(){d.close()}),d.onerror=function(){s++,(d.readyState===EventSource.CLOSED||s>=3)&&(d.close(),a())}}else a();X(St)}var At=[];function zt(t,n,e){let r=M(t.ioc_value);if(!r)return;let o=r.querySelector(".enrichment-slot");if(!o)return;if(N.has(t.provider)){let u=o.querySelector(".spinner-wrapper");u&&o.removeChild(u),o.classList.add("enrichment-slot--loaded"),e[t.ioc_value]=(e[t.ioc_value]??0)+1;let y=o.querySelector(".enrichment-section--context");if(y&&t.type==="result"){let h=j(t);y.appendChild(h),K(r,t)}return}let i=o.querySelector(".spinner-wrapper");i&&o.removeChild(i),o.classList.add("enrichment-slot--loaded"),e[t.ioc_value]=(e[t.ioc_value]??0)+1;let{verdict:c,statText:a,summaryText:d,detectionCount:s,totalEngines:l}=G(t),f=n[t.ioc_value]??[];n[t.ioc_value]=f,f.push({provider:t.provider,verdict:c,summaryText:d,detectionCount:s,totalEngines:l,statText:a,cachedAt:t.type==="result"?t.cached_at??void 0:void 0});let v=c==="no_data"||c==="error"?".enrichment-section--no-data":".enrichment-section--reputation",p=o.querySelector(v);if(p){let u=F(t.provider,c,a,t);p.appendChild(u)}}function wt(){let t=document.querySelector(".page-results");if(!t)return;let n=t.getAttribute("data-history-results");if(!n)return;let e;try{e=JSON.parse(n)}catch{console.error("[history] Failed to parse data-history-results JSON");return}if(!Array.isArray(e)||e.length===0)return;let r={},o={};for(let s of e)At.push(s),zt(s,r,o);let i=new Set;for(let s of e){if(i.has(s.ioc_value))continue;i.add(s.ioc_value);let l=M(s.ioc_value);if(!l)continue;let f=l.querySelector(".enrichment-slot");if(!f)continue;P(f,s.ioc_value,r);let v=(r[s.ioc_value]??[]).filter(u=>!N.has(u.provider));if(v.length>0){let u=I(v);V(s.ioc_value,u)}let p=f.querySelector(".enrichment-section--reputation");p&&J(p)}q(),O(),document.querySelectorAll(".enrichment-slot").forEach(s=>{W(s)}),document.querySelectorAll(".enrichment-slot--loaded").forEach(s=>{U(s)});let c=document.getElementById("enrich-progress");c&&c.classList.add("complete");let a=document.getElementById("enrich-progress-text");a&&(a.textContent="Enrichment complete");let d=document.getElementById("export-btn");d&&d.removeAttribute("disabled"),rt(),X(At)}function Yt(){let t=document.querySelectorAll(".settings-section[data-provider]");if(t.length===0)return;function n(e){t.forEach(o=>{if(o!==e){o.removeAttribute("data-expanded");let i=o.querySelector(".accordion-header");i&&i.setAttribute("aria-expanded","false")}}),e.setAttribute("data-expanded","");let r=e.querySelector(".accordion-header");r&&r.setAttribute("aria-expanded","true")}t.forEach(e=>{let r=e.querySelector(".accordion-header");r&&r.addEventListener("click",()=>{e.hasAttribute("data-expanded")?(e.removeAttribute("data-expanded"),r.setAttribute("aria-expanded","false")):n(e)})})}function Qt(){document.querySelectorAll(".settings-section").forEach(n=>{let e=n.querySelector("[data-role='toggle-key']"),r=n.querySelector("input[type='password'], input[type='text']");!e||!r||e.addEventListener("click",()=>{r.type==="password"?(r.type="text",e.textContent="Hide"):(r.type="password",e.textContent="Show")})})}function Mt(){Yt(),Qt()}function Zt(){let t=document.querySelector(".filter-bar-wrapper");if(!t)return;let n=!1;window.addEventListener("scroll",function(){let e=window.scrollY>40;e!==n&&(n=e,t.classList.toggle("is-scrolled",n))},{passive:!0})}function te(){document.querySelectorAll(".ioc-card").forEach((n,e)=>{n.style.setProperty("--card-index",String(Math.min(e,15)))})}function It(){Zt(),te()}var ee={malicious:"#ef4444",suspicious:"#f97316",clean:"#22c55e",known_good:"#3b82f6",no_data:"#6b7280",error:"#6b7280",ioc:"#8b5cf6"},ne="http://www.w3.org/2000/svg";function ot(t){return ee[t]??"#6b7280"}function S(t){return document.createElementNS(ne,t)}function re(t){let n=t.getAttribute("data-graph-nodes"),e=t.getAttribute("data-graph-edges"),r=[],o=[];try{r=n?JSON.parse(n):[],o=e?JSON.parse(e):[]}catch{r=[],o=[]}let i=r.filter(g=>g.role==="provider"),c=r.find(g=>g.role==="ioc");if(!c||i.length===0){let g=document.createElement("p");g.className="graph-empty",g.appendChild(document.createTextNode("No provider data to graph")),t.appendChild(g);return}let a=S("svg");a.setAttribute("viewBox","0 0 700 450"),a.setAttribute("width","100%"),a.setAttribute("role","img"),a.setAttribute("aria-label","Provider relationship graph");let d=350,s=225,l=170,f=30,x=20,v=S("g");v.setAttribute("class","graph-edges");let p=new Map(i.map((g,w)=>[g.id,w]));for(let g of o){let w=p.get(g.to);if(w===void 0)continue;let _=2*Math.PI*w/i.length-Math.PI/2,B=d+l*Math.cos(_),D=s+l*Math.sin(_),E=S("line");E.setAttribute("x1",String(d)),E.setAttribute("y1",String(s)),E.setAttribute("x2",String(Math.round(B))),E.setAttribute("y2",String(Math.round(D))),E.setAttribute("stroke",ot(g.verdict)),E.setAttribute("stroke-width","2"),E.setAttribute("opacity","0.6"),v.appendChild(E)}a.appendChild(v);let u=S("g");u.setAttribute("class","graph-nodes"),i.forEach((g,w)=>{let _=2*Math.PI*w/i.length-Math.PI/2,B=d+l*Math.cos(_),D=s+l*Math.sin(_),E=S("g");E.setAttribute("class","graph-node graph-node--provider");let it=S("title");it.appendChild(document.createTextNode(g.id)),E.appendChild(it);let R=S("circle");R.setAttribute("cx",String(Math.round(B))),R.setAttribute("cy",String(Math.round(D))),R.setAttribute("r",String(x)),R.setAttribute("fill",ot(g.verdict)),E.appendChild(R);let A=S("text");A.setAttribute("x",String(Math.round(B))),A.setAttribute("y",String(Math.round(D+x+14))),A.setAttribute("text-anchor","middle"),A.setAttribute("font-size","10"),A.setAttribute("fill","#e5e7eb"),A.appendChild(document.createTextNode(g.label)),E.appendChild(A),u.appendChild(E)}),a.appendChild(u);let y=S("g");y.setAttribute("class","graph-node graph-node--ioc");let h=S("title");h.appendChild(document.createTextNode(c.id)),y.appendChild(h);let L=S("circle");L.setAttribute("cx",String(d)),L.setAttribute("cy",String(s)),L.setAttribute("r",String(f)),L.setAttribute("fill",ot("ioc")),y.appendChild(L);let b=S("text");b.setAttribute("x",String(d)),b.setAttribute("y",String(s+4)),b.setAttribute("text-anchor","middle"),b.setAttribute("font-size","10"),b.setAttribute("fill","#fff"),b.setAttribute("font-weight","bold"),b.appendChild(document.createTextNode(c.label)),y.appendChild(b),a.appendChild(y),t.appendChild(a)}function kt(){let t=document.getElementById("relationship-graph");t&&re(t)}function _t(){at(),lt(),pt(),Lt(),wt(),Mt(),It(),kt()}document.readyState==="loading"?document.addEventListener("DOMContentLoaded",_t):_t();})();
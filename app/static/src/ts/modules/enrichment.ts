@@ -36,6 +36,9 @@ const summaryTimers: Map<string, ReturnType<typeof setTimeout>> = new Map();
 /** Accumulated enrichment results for export */
 const allResults: EnrichmentItem[] = [];
 
+/** Consecutive stream errors (failed reconnects) before falling back to polling */
+const STREAM_MAX_FAILURES = 3;
+
 // ---- Private helpers ----
 
 /**
@@ -356,9 +359,11 @@ export function wireExpandToggles(): void {
  * Wires chevron expand/collapse toggles once at init time (before polling
  * starts) so they work regardless of when results populate details.
  *
- * Starts a 750ms polling interval for /enrichment/status/<job_id>,
- * renders incremental results, shows warning banners for errors, and
- * marks enrichment complete when all tasks are done.
+ * Subscribes to the /enrichment/stream/<job_id> Server-Sent Events stream,
+ * falling back to a 750ms polling interval for /enrichment/status/<job_id>
+ * where EventSource is unavailable or the stream fails; renders incremental
+ * results, shows warning banners for errors, and marks enrichment complete
+ * when all tasks are done.
  *
  * Source: main.js initEnrichmentPolling() (lines 316-373) +
  *         initExportButton() (lines 615-643).
@@ -372,11 +377,13 @@ export function init(): void {
 
   if (!jobId || mode !== "online") return;
 
-  // Wire expand/collapse toggles once at init (before polling starts)
+  // Wire expand/collapse toggles once at init (before updates start)
   wireExpandToggles();
 
   // Cursor-based dedup: ?since=N returns only new results, no client-side tracking needed
   let since = 0;
+  // Same for cancelled lookups (?cancelled_since=N), so a poll never copies the whole list
+  let cancelledSince = 0;
 
   // Per-IOC verdict tracking for worst-verdict copy/export computation
   // iocVerdicts[ioc_value] = [{provider, verdict, summaryText, detectionCount, totalEngines, statText}]
@@ -385,65 +392,106 @@ export function init(): void {
   // Per-IOC result count tracking for pending indicator
   const iocResultCounts: Record<string, number> = {};
 
-  // Use ReturnType<typeof setInterval> to avoid NodeJS.Timeout conflict
-  const intervalId: ReturnType<typeof setInterval> = setInterval(function () {
-    fetch("/enrichment/status/" + jobId + "?since=" + since)
-      .then(function (resp) {
-        if (!resp.ok) return null;
-        return resp.json() as Promise<EnrichmentStatus>;
-      })
-      .then(function (data) {
-        if (!data) return;
-
-        updateProgressBar(data.done, data.total);
-
-        // Render any new results not yet displayed, and check for warnings
-        const results = data.results;
-        for (let i = 0; i < results.length; i++) {
-          const result = results[i];
-          if (!result) continue;
-          allResults.push(result);
-          renderEnrichmentResult(result, iocVerdicts, iocResultCounts);
-
-          // Show warning banner for rate-limit or auth errors
-          if (result.type === "error" && result.error) {
-            const errLower = result.error.toLowerCase();
-            if (
-              errLower.indexOf("rate limit") !== -1 ||
-              errLower.indexOf("429") !== -1
-            ) {
-              showEnrichWarning("Rate limit reached for " + result.provider + ".");
-            } else if (
-              errLower.indexOf("authentication") !== -1 ||
-              errLower.indexOf("401") !== -1 ||
-              errLower.indexOf("403") !== -1
-            ) {
-              showEnrichWarning(
-                "Authentication error for " +
-                  result.provider +
-                  ". Please check your API key in Settings."
-              );
-            }
-          }
+  // Render one status payload; returns true once the job is complete.
+  function handleStatus(data: EnrichmentStatus): boolean {
+    updateProgressBar(data.done, data.total);
+
+    // Render any new results not yet displayed, and check for warnings
+    const results = data.results;
+    for (let i = 0; i < results.length; i++) {
+      const result = results[i];
+      if (!result) continue;
+      allResults.push(result);
+      renderEnrichmentResult(result, iocVerdicts, iocResultCounts);
+
+      // Show warning banner for rate-limit or auth errors
+      if (result.type === "error" && result.error) {
+        const errLower = result.error.toLowerCase();
+        if (
+          errLower.indexOf("rate limit") !== -1 ||
+          errLower.indexOf("429") !== -1
+        ) {
+          showEnrichWarning("Rate limit reached for " + result.provider + ".");
+        } else if (
+          errLower.indexOf("authentication") !== -1 ||
+          errLower.indexOf("401") !== -1 ||
+          errLower.indexOf("403") !== -1
+        ) {
+          showEnrichWarning(
+            "Authentication error for " +
+              result.provider +
+              ". Please check your API key in Settings."
+          );
         }
+      }
+    }
 
-        // Batch dashboard + sort once per tick (not per-result) — R023 O(N²) fix
-        if (results.length > 0) {
-          updateDashboardCounts();
-          sortCardsBySeverity();
-        }
+    // Batch dashboard + sort once per update (not per-result) — R023 O(N²) fix
+    if (results.length > 0) {
+      updateDashboardCounts();
+      sortCardsBySeverity();
+    }
 
-        since = data.next_since;
+    since = data.next_since;
+    cancelledSince = data.next_cancelled_since;
 
-        if (data.complete) {
-          clearInterval(intervalId);
-          markEnrichmentComplete();
-        }
-      })
-      .catch(function () {
-        // Fetch error — silently continue; retry on next interval tick
-      });
-  }, 750);
+    if (data.complete) {
+      markEnrichmentComplete();
+      return true;
+    }
+    return false;
+  }
+
+  // Poll /enrichment/status/<job_id> every 750ms from the current cursor.
+  function startPolling(): void {
+    // Use ReturnType<typeof setInterval> to avoid NodeJS.Timeout conflict
+    const intervalId: ReturnType<typeof setInterval> = setInterval(function () {
+      fetch(
+        "/enrichment/status/" + jobId + "?since=" + since + "&cancelled_since=" + cancelledSince
+      )
+        .then(function (resp) {
+          if (!resp.ok) return null;
+          return resp.json() as Promise<EnrichmentStatus>;
+        })
+        .then(function (data) {
+          if (data && handleStatus(data)) clearInterval(intervalId);
+        })
+        .catch(function () {
+          // Fetch error — silently continue; retry on next interval tick
+        });
+    }, 750);
+  }
+
+  if (typeof EventSource !== "undefined") {
+    // Server push: one "status" event per batch of finished lookups. On a
+    // dropped connection EventSource reconnects by itself and sends the last
+    // event id (the next_since cursor) as Last-Event-ID.
+    const source = new EventSource("/enrichment/stream/" + jobId);
+    let failures = 0;
+    source.onopen = function () {
+      failures = 0;
+    };
+    source.addEventListener("status", function (event: MessageEvent<string>) {
+      if (handleStatus(JSON.parse(event.data) as EnrichmentStatus)) {
+        source.close();
+      }
+    });
+    source.addEventListener("gone", function () {
+      source.close();
+    });
+    // A non-200 answer (e.g. 404 for an unknown job) closes the stream for
+    // good, and a stream that keeps failing to reconnect never recovers:
+    // switch to polling, which picks up from the same since cursor.
+    source.onerror = function () {
+      failures++;
+      if (source.readyState === EventSource.CLOSED || failures >= STREAM_MAX_FAILURES) {
+        source.close();
+        startPolling();
+      }
+    };
+  } else {
+    startPolling();
+  }
 
   // Wire the export button
   sharedInitExportButton(allResults);
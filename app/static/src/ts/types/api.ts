@@ -112,4 +112,6 @@ export interface EnrichmentStatus {
   results: EnrichmentItem[];
   /** Cursor for the next poll — pass as ?since=N to receive only new results. */
   next_since: number;
+  /** Cursor for cancelled lookups — pass as ?cancelled_since=N to receive only new ones. */
+  next_cancelled_since: number;
 }
@@ -20,6 +20,7 @@ def app():
             "TESTING": True,
             "WTF_CSRF_ENABLED": False,
             "SERVER_NAME": "localhost",
+            "CACHE_MAINTENANCE_INTERVAL": 0,
         }
     )
     yield test_app
@@ -29,3 +30,18 @@ def app():
 def client(app):  # noqa: F811
     """Create Flask test client."""
     return app.test_client()
+
+
+@pytest.fixture(autouse=True)
+def _reset_provider_state():
+    """Keep process-wide provider state (latency samples, circuit breakers)
+    from leaking between tests."""
+    from app.enrichment.circuit_breaker import PROVIDER_BREAKERS
+    from app.enrichment.http_safety import PROVIDER_LATENCY
+
+    PROVIDER_LATENCY.reset()
+    PROVIDER_BREAKERS.reset()
+    yield
+    PROVIDER_LATENCY.reset()
+    PROVIDER_LATENCY.hedging = False
+    PROVIDER_BREAKERS.reset()
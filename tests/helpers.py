@@ -12,6 +12,7 @@ import json
 import requests
 from unittest.mock import MagicMock
 
+from app.enrichment.result_log import encode_result
 from app.pipeline.models import IOC, IOCType
 
 
@@ -95,3 +96,35 @@ def mock_adapter_session(adapter, *, method="get", response=None, side_effect=No
     elif response is not None:
         target.return_value = response
     return adapter
+
+
+# ---------------------------------------------------------------------------
+# Mock orchestrator helper
+# ---------------------------------------------------------------------------
+
+def make_mock_orchestrator() -> MagicMock:
+    """Build a mock EnrichmentOrchestrator for the status routes.
+
+    Set get_status.return_value to the job's full status dict;
+    get_status_since() slices its results and cancelled entries by cursor
+    and encodes the results as fragments the way the real orchestrator does.
+    """
+    orchestrator = MagicMock()
+
+    def get_status_since(job_id: str, since: int, cancelled_since: int = 0) -> dict | None:
+        status = orchestrator.get_status(job_id)
+        if status is None:
+            return None
+        delta = status["results"][max(since, 0):]
+        cancelled = status.get("cancelled", [])
+        return {
+            **status,
+            "results": delta,
+            "fragments": [encode_result(r) for r in delta],
+            "next_since": len(status["results"]),
+            "cancelled": cancelled[max(cancelled_since, 0):],
+            "next_cancelled_since": len(cancelled),
+        }
+
+    orchestrator.get_status_since.side_effect = get_status_since
+    return orchestrator
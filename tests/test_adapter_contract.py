@@ -272,7 +272,7 @@ _ASN_CYMRU = AdapterEntry(
     excluded_types=_excluded(frozenset({IOCType.IPV4, IOCType.IPV6})),
     http_method=None,
     is_http=False,
-    allowed_hosts_config_entry=None,
+    allowed_hosts_config_entry="whois.cymru.com",  # bulk whois (lookup_batch)
     sample_ioc_factory=make_ipv4_ioc,
 )
 
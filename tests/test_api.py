@@ -1,14 +1,17 @@
-"""Tests for the REST API blueprint (/api/analyze, /api/status/<job_id>)."""
+"""Tests for the REST API blueprint (/api/analyze, /api/status/<job_id>, /api/stream/<job_id>)."""
 
+import json
+import threading
+import time
 from unittest.mock import MagicMock, patch
 
 import pytest
 
 from app import create_app
-from app.enrichment.models import EnrichmentResult
+from app.enrichment.models import EnrichmentError, EnrichmentResult
 from app.pipeline.models import IOCType
 
-from tests.helpers import make_ipv4_ioc
+from tests.helpers import make_ipv4_ioc, make_mock_orchestrator
 
 
 @pytest.fixture()
@@ -147,9 +150,52 @@ class TestApiAnalyzeOnline:
             assert "job_id" in data
             assert "status_url" in data
             assert data["status_url"].startswith("/api/status/")
+            assert data["stream_url"] == f"/api/stream/{data['job_id']}"
             mock_pool.submit.assert_called_once()
 
 
+class TestApiAnalyzePolicy:
+    """Early-termination policy selection via the 'policy' field."""
+
+    def _configure(self, client):
+        mock_provider = MagicMock()
+        mock_provider.name = "test_provider"
+        mock_provider.supported_types = frozenset({IOCType.IPV4})
+        client.application.registry.configured.return_value = [mock_provider]
+
+    def test_policy_passed_to_job(self, client):
+        from app.enrichment.policy import JobPolicy
+
+        self._configure(client)
+        with patch("app.routes._helpers._enrichment_pool") as mock_pool:
+            resp = client.post("/api/analyze", json={
+                "text": "8.8.8.8", "mode": "online",
+                "policy": {"stop_on_first_malicious_per_ioc": True, "deadline_seconds": 30},
+            })
+        assert resp.status_code == 200
+        policy = mock_pool.submit.call_args.args[-1]
+        assert policy == JobPolicy(stop_on_first_malicious_per_ioc=True, deadline_seconds=30.0)
+
+    def test_no_policy_submits_none(self, client):
+        self._configure(client)
+        with patch("app.routes._helpers._enrichment_pool") as mock_pool:
+            client.post("/api/analyze", json={"text": "8.8.8.8", "mode": "online"})
+        assert mock_pool.submit.call_args.args[-1] is None
+
+    @pytest.mark.parametrize("policy", [
+        "fast",
+        {"deadline_seconds": -1},
+        {"max_quota_spend": 1.5},
+        {"stop_on_first_malicious_per_ioc": "yes"},
+        {"unknown": 1},
+    ])
+    def test_invalid_policy_rejected(self, client, policy):
+        resp = client.post("/api/analyze", json={"text": "8.8.8.8", "mode": "online",
+                                                  "policy": policy})
+        assert resp.status_code == 400
+        assert "policy" in resp.get_json()["error"].lower()
+
+
 # ---------- GET /api/status/<job_id> ----------
 
 
@@ -165,7 +211,7 @@ class TestApiStatus:
         """Known job returns polling progress."""
         import app.routes._helpers as helpers
 
-        mock_orch = MagicMock()
+        mock_orch = make_mock_orchestrator()
         ioc = make_ipv4_ioc()
         result = EnrichmentResult(
             ioc=ioc, provider="test", verdict="clean",
@@ -196,7 +242,7 @@ class TestApiStatus:
         """?since= cursor filters results."""
         import app.routes._helpers as helpers
 
-        mock_orch = MagicMock()
+        mock_orch = make_mock_orchestrator()
         ioc = make_ipv4_ioc()
         results = [
             EnrichmentResult(ioc=ioc, provider="p1", verdict="clean", detection_count=0, total_engines=10, scan_date=None, raw_stats={}),
@@ -220,6 +266,237 @@ class TestApiStatus:
             helpers._orchestrators.pop(job_id, None)
 
 
+class TestApiStatusEncodedResults:
+    def test_results_stitched_from_result_log(self, client):
+        """A real orchestrator's encoded results (with cached_at) are served as-is."""
+        import app.routes._helpers as helpers
+        from app.enrichment.orchestrator import EnrichmentOrchestrator
+
+        ioc = make_ipv4_ioc("10.3.0.1")
+        adapter = MagicMock()
+        adapter.name = "DNS"
+        adapter.requires_api_key = False
+        adapter.supported_types = frozenset({IOCType.IPV4})
+        cache = MagicMock()
+        cache.get_many.return_value = {
+            (ioc.value, "ipv4", "DNS"): {
+                "provider": "DNS", "verdict": "clean", "detection_count": 0,
+                "total_engines": 1, "scan_date": None, "raw_stats": {"a": [1]},
+                "cached_at": "2024-01-01T00:00:00+00:00",
+            },
+        }
+        cache.get_negative_many.return_value = {}
+        orchestrator = EnrichmentOrchestrator(adapters=[adapter], cache=cache)
+        orchestrator.enrich_all("log_job", [ioc])
+        helpers._orchestrators["log_job"] = orchestrator
+        try:
+            resp = client.get("/api/status/log_job")
+        finally:
+            helpers._orchestrators.pop("log_job", None)
+
+        assert resp.mimetype == "application/json"
+        data = resp.get_json()
+        assert data["next_since"] == 1 and data["complete"] is True
+        assert data["results"] == [{
+            "type": "result", "ioc_value": "10.3.0.1", "ioc_type": "ipv4",
+            "provider": "DNS", "verdict": "clean", "detection_count": 0,
+            "total_engines": 1, "scan_date": None, "raw_stats": {"a": [1]},
+            "cached_at": "2024-01-01T00:00:00+00:00",
+        }]
+
+
+def _sse_events(chunks) -> list[dict]:
+    """Parse a text/event-stream body into {"id", "event", "data"} dicts (comments dropped)."""
+    events = []
+    for block in "".join(
+        c.decode() if isinstance(c, bytes) else c for c in chunks
+    ).split("\n\n"):
+        fields = dict(
+            line.split(": ", 1) for line in block.splitlines() if line and not line.startswith(":")
+        )
+        if "event" in fields:
+            fields["data"] = json.loads(fields["data"])
+            events.append(fields)
+    return events
+
+
+class TestApiStream:
+    """Server-Sent Events progress via GET /api/stream/<job_id>."""
+
+    def test_unknown_job(self, client):
+        resp = client.get("/api/stream/nonexistent")
+        assert resp.status_code == 404
+
+    def test_results_pushed_as_they_land(self, client):
+        import app.routes._helpers as helpers
+        from app.enrichment.orchestrator import EnrichmentOrchestrator
+        from app.pipeline.models import IOC
+
+        release = threading.Event()
+        iocs = [IOC(type=IOCType.IPV4, value=f"10.0.0.{i}", raw_match="") for i in range(2)]
+
+        def lookup(ioc):
+            if ioc.value == "10.0.0.1":
+                release.wait(5)
+            return EnrichmentResult(
+                ioc=ioc, provider="p1", verdict="clean", detection_count=0,
+                total_engines=1, scan_date=None, raw_stats={},
+            )
+
+        adapter = MagicMock()
+        adapter.name = "p1"
+        adapter.requires_api_key = False
+        adapter.supported_types = frozenset({IOCType.IPV4})
+        adapter.lookup.side_effect = lookup
+        orchestrator = EnrichmentOrchestrator(adapters=[adapter], batch_window=None)
+        helpers._orchestrators["stream_job"] = orchestrator
+        runner = threading.Thread(target=orchestrator.enrich_all, args=("stream_job", iocs))
+        runner.start()  # 10.0.0.1 blocks until released, so the job stays open
+        try:
+            while orchestrator.get_status("stream_job") is None:
+                time.sleep(0.001)
+            resp = client.get("/api/stream/stream_job")
+            assert resp.mimetype == "text/event-stream"
+            chunks = []
+            for chunk in resp.response:
+                chunks.append(chunk)
+                if b'"done":1' in chunk:
+                    release.set()  # first result arrived while the job is still running
+            events = _sse_events(chunks)
+        finally:
+            release.set()
+            runner.join(5)
+            helpers._orchestrators.pop("stream_job", None)
+
+        statuses = [e for e in events if e["event"] == "status"]
+        assert statuses[-1]["data"]["complete"] is True
+        assert [e["id"] for e in statuses] == [str(e["data"]["next_since"]) for e in statuses]
+        pushed = [r["ioc_value"] for e in statuses for r in e["data"]["results"]]
+        assert sorted(pushed) == ["10.0.0.0", "10.0.0.1"]  # each result sent exactly once
+
+    def test_reconnect_resumes_from_last_event_id(self, client):
+        import app.routes._helpers as helpers
+
+        ioc = make_ipv4_ioc()
+        mock_orch = make_mock_orchestrator()
+        mock_orch.get_status.return_value = {
+            "total": 2, "done": 2, "complete": True,
+            "results": [
+                EnrichmentResult(ioc=ioc, provider=p, verdict="clean", detection_count=0,
+                                 total_engines=10, scan_date=None, raw_stats={})
+                for p in ("p1", "p2")
+            ],
+        }
+        mock_orch.cached_markers = {}
+        helpers._orchestrators["resume_job"] = mock_orch
+        try:
+            resp = client.get("/api/stream/resume_job", headers={"Last-Event-ID": "1"})
+            events = _sse_events(resp.response)
+        finally:
+            helpers._orchestrators.pop("resume_job", None)
+
+        assert len(events) == 1
+        assert events[0]["id"] == "2"
+        assert [r["provider"] for r in events[0]["data"]["results"]] == ["p2"]
+
+
+class TestApiStatusCancelled:
+    def test_cancelled_lookups_reported(self, client):
+        import app.routes._helpers as helpers
+        from app.enrichment.policy import LookupCancelled
+
+        mock_orch = make_mock_orchestrator()
+        ioc = make_ipv4_ioc()
+        mock_orch.get_status.return_value = {
+            "total": 2, "done": 2, "complete": True, "results": [],
+            "cancelled": [LookupCancelled(ioc, "WHOIS", "deadline")],
+        }
+        mock_orch.cached_markers = {}
+        helpers._orchestrators["cancel_job"] = mock_orch
+        try:
+            data = client.get("/api/status/cancel_job").get_json()
+        finally:
+            helpers._orchestrators.pop("cancel_job", None)
+        assert data["cancelled"] == [{
+            "type": "cancelled", "ioc_value": ioc.value, "ioc_type": "ipv4",
+            "provider": "WHOIS", "reason": "deadline",
+        }]
+        assert data["next_cancelled_since"] == 1
+
+    def test_cancelled_since_cursor(self, client):
+        import app.routes._helpers as helpers
+        from app.enrichment.policy import LookupCancelled
+
+        mock_orch = make_mock_orchestrator()
+        ioc = make_ipv4_ioc()
+        mock_orch.get_status.return_value = {
+            "total": 2, "done": 2, "complete": True, "results": [],
+            "cancelled": [LookupCancelled(ioc, "WHOIS", "deadline"),
+                          LookupCancelled(ioc, "Shodan", "deadline")],
+        }
+        helpers._orchestrators["cancel_job"] = mock_orch
+        try:
+            data = client.get("/api/status/cancel_job?cancelled_since=1").get_json()
+        finally:
+            helpers._orchestrators.pop("cancel_job", None)
+        assert [c["provider"] for c in data["cancelled"]] == ["Shodan"]
+        assert data["next_cancelled_since"] == 2
+        mock_orch.get_status_since.assert_called_once_with("cancel_job", 0, 1)
+
+
+class TestApiStatusProviders:
+    def test_breaker_state_reported(self, client):
+        import app.routes._helpers as helpers
+        from app.enrichment.circuit_breaker import PROVIDER_BREAKERS
+        from app.enrichment.orchestrator import EnrichmentOrchestrator
+
+        adapter = MagicMock()
+        adapter.name = "Cert History"
+        adapter.supported_types = set()
+        orchestrator = EnrichmentOrchestrator(adapters=[adapter])
+        orchestrator.enrich_all("breaker_job", [])
+        for _ in range(3):
+            PROVIDER_BREAKERS.get("Cert History").record(
+                EnrichmentError(ioc=make_ipv4_ioc(), provider="Cert History",
+                                error="Request timed out")
+            )
+        helpers._orchestrators["breaker_job"] = orchestrator
+        try:
+            data = client.get("/api/status/breaker_job").get_json()
+        finally:
+            helpers._orchestrators.pop("breaker_job", None)
+        assert data["providers"]["Cert History"]["state"] == "open"
+
+
+class TestApiMetrics:
+    """Executor load via GET /api/metrics."""
+
+    def test_metrics_shape(self, client):
+        resp = client.get("/api/metrics")
+        assert resp.status_code == 200
+        executor = resp.get_json()["executor"]
+        assert executor["max_workers"] == 32
+        for key in ("threads", "busy_workers", "utilization", "queue_depth", "jobs_queued"):
+            assert key in executor
+        assert isinstance(resp.get_json()["retries_pending"], int)
+        assert isinstance(resp.get_json()["http_pools"], dict)
+
+    def test_metrics_include_provider_latency(self, client):
+        from app.enrichment.http_safety import PROVIDER_LATENCY
+
+        PROVIDER_LATENCY.record("Shodan InternetDB", 0.1)
+        providers = client.get("/api/metrics").get_json()["providers"]
+        assert providers["Shodan InternetDB"]["samples"] == 1
+        assert providers["Shodan InternetDB"]["read_timeout_s"] == 30
+
+    def test_metrics_include_circuit_breakers(self, client):
+        from app.enrichment.circuit_breaker import PROVIDER_BREAKERS
+
+        PROVIDER_BREAKERS.get("ThreatMiner")
+        breakers = client.get("/api/metrics").get_json()["circuit_breakers"]
+        assert breakers["ThreatMiner"]["state"] == "closed"
+
+
 # ---------- CSRF exemption ----------
 
 
@@ -39,12 +39,17 @@ SAMPLE_TXT = "23028 | 216.90.108.0/24 | US | arin | 1998-09-25"
 
 
 def _make_adapter(allowed_hosts: list[str] | None = None):
-    """Construct a CymruASNAdapter. allowed_hosts is accepted but unused (DNS is port 53)."""
+    """Construct a CymruASNAdapter. allowed_hosts only gates bulk whois (DNS is port 53)."""
     from app.enrichment.adapters.asn_cymru import CymruASNAdapter
 
     return CymruASNAdapter(allowed_hosts=allowed_hosts or [])
 
 
+def _make_batch_adapter():
+    """Construct a CymruASNAdapter allowed to reach the bulk whois host."""
+    return _make_adapter(["whois.cymru.com"])
+
+
 def _make_txt_answer(txt_string: str) -> MagicMock:
     """Return a mock DNS answer list whose first element has .strings containing TXT bytes.
 
@@ -377,3 +382,93 @@ class TestNoHTTPSafety:
         assert "requests" not in dir(asn_module), (
             "CymruASNAdapter must not import 'requests' — DNS uses port 53 directly"
         )
+
+
+# ---------------------------------------------------------------------------
+# Bulk whois (lookup_batch)
+# ---------------------------------------------------------------------------
+
+BULK_REPLY = (
+    "Bulk mode; whois.cymru.com [2026-10-18 12:00:00 +0000]\n"
+    "AS      | IP               | BGP Prefix          | CC | Registry | Allocated  | AS Name\n"
+    "23028   | 216.90.108.31    | 216.90.108.0/24     | US | arin     | 1998-09-25 | TEAMCYMRU, US\n"
+    "NA      | 192.168.1.1      | NA                  |    |          |            | NA\n"
+)
+
+
+class _FakeSocket:
+    """Minimal socket: records what was sent, replays a canned reply."""
+
+    def __init__(self, reply: bytes) -> None:
+        self.sent = b""
+        self._chunks = [reply, b""]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+    def sendall(self, data: bytes) -> None:
+        self.sent += data
+
+    def recv(self, size: int) -> bytes:
+        return self._chunks.pop(0)
+
+
+class TestLookupBatch:
+
+    def test_one_bulk_query_for_all_ips(self) -> None:
+        fake = _FakeSocket(BULK_REPLY.encode())
+        with patch("socket.create_connection", return_value=fake) as connect:
+            _make_batch_adapter().lookup_batch([IPV4_IOC, PRIVATE_IPV4_IOC])
+
+        connect.assert_called_once()
+        assert connect.call_args.args[0] == ("whois.cymru.com", 43)
+        assert fake.sent == b"begin\nverbose\n216.90.108.31\n192.168.1.1\nend\n"
+
+    def test_results_match_dns_lookup_shape(self) -> None:
+        with patch("socket.create_connection", return_value=_FakeSocket(BULK_REPLY.encode())):
+            routed, private = _make_batch_adapter().lookup_batch([IPV4_IOC, PRIVATE_IPV4_IOC])
+
+        assert routed.ioc == IPV4_IOC
+        assert routed.verdict == "no_data"
+        assert routed.raw_stats == {
+            "asn": "23028", "prefix": "216.90.108.0/24", "rir": "arin", "allocated": "1998-09-25",
+        }
+        assert private.ioc == PRIVATE_IPV4_IOC
+        assert private.raw_stats == {}
+
+    def test_invalid_ip_gets_single_lookup_error(self) -> None:
+        with patch("socket.create_connection", return_value=_FakeSocket(BULK_REPLY.encode())):
+            results = _make_batch_adapter().lookup_batch([INVALID_IP_IOC, IPV4_IOC])
+
+        assert isinstance(results[0], EnrichmentError)
+        assert results[0].error == "Invalid IP address"
+        assert results[1].raw_stats["asn"] == "23028"
+
+    def test_unreachable_whois_hands_batch_back_and_cools_down(self) -> None:
+        from app.enrichment.provider import BatchUnavailable
+
+        adapter = _make_batch_adapter()
+        with patch("socket.create_connection", side_effect=OSError("port 43 blocked")) as connect, \
+                patch("time.monotonic", return_value=1000.0):
+            with pytest.raises(BatchUnavailable):
+                adapter.lookup_batch([IPV4_IOC, IPV6_IOC])
+            assert adapter.batch_types == frozenset()
+            with pytest.raises(BatchUnavailable):
+                adapter.lookup_batch([IPV4_IOC])
+        assert connect.call_count == 1  # the second batch did not wait out a connect timeout
+
+        with patch("time.monotonic", return_value=1000.0 + 301):
+            assert adapter.batch_types == frozenset({IOCType.IPV4, IOCType.IPV6})
+
+    def test_whois_host_must_be_allowlisted(self) -> None:
+        from app.enrichment.provider import BatchUnavailable
+
+        adapter = _make_adapter()
+        assert adapter.batch_types == frozenset()
+        with patch("socket.create_connection") as connect:
+            with pytest.raises(BatchUnavailable):
+                adapter.lookup_batch([IPV4_IOC])
+        connect.assert_not_called()
@@ -0,0 +1,340 @@
+"""Tests for the asyncio enrichment engine (app/enrichment/async_engine.py).
+
+Covers native (alookup) and bridged (sync lookup) adapters, job status
+tracking, retries, per-provider caps, single-flight across jobs sharing one
+loop, cache integration and AsyncBaseHTTPAdapter.alookup().
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.cache.store import CacheStore
+from app.enrichment.adapters.shodan import ShodanAdapter
+from app.enrichment.async_engine import AsyncEnrichmentOrchestrator, EventLoopThread
+from app.enrichment.models import EnrichmentError, EnrichmentResult
+from app.enrichment.rate_limit import RateLimit, RateLimiter
+from app.pipeline.models import IOC, IOCType
+
+
+def _make_ioc(value: str) -> IOC:
+    return IOC(type=IOCType.IPV4, value=value, raw_match=value)
+
+
+def _make_result(ioc: IOC, provider: str) -> EnrichmentResult:
+    return EnrichmentResult(
+        ioc=ioc, provider=provider, verdict="clean", detection_count=0,
+        total_engines=10, scan_date=None, raw_stats={},
+    )
+
+
+class _AsyncAdapter:
+    """Native async adapter: records concurrency and call count."""
+
+    supported_types = frozenset({IOCType.IPV4})
+
+    def __init__(self, name: str = "Async", requires_api_key: bool = False, delay: float = 0.0):
+        self.name = name
+        self.requires_api_key = requires_api_key
+        self.delay = delay
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+        self.lookup = MagicMock(side_effect=AssertionError("sync path must not be used"))
+
+    async def alookup(self, ioc: IOC, client=None):
+        self.calls += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        return _make_result(ioc, self.name)
+
+
+@pytest.fixture()
+def loop_thread():
+    thread = EventLoopThread(bridge_workers=4)
+    yield thread
+    thread.stop(timeout=5)
+
+
+class TestAsyncEngineDispatch:
+    def test_native_adapter_results_recorded(self, loop_thread):
+        adapter = _AsyncAdapter()
+        iocs = [_make_ioc(f"10.0.0.{i}") for i in range(50)]
+        orchestrator = AsyncEnrichmentOrchestrator([adapter], loop_thread=loop_thread)
+
+        orchestrator.enrich_all("job", iocs)
+
+        status = orchestrator.get_status("job")
+        assert status["complete"] is True
+        assert status["done"] == status["total"] == 50
+        assert adapter.calls == 50
+        adapter.lookup.assert_not_called()
+
+    def test_sync_adapter_bridged_to_thread_pool(self, loop_thread):
+        loop_threads = []
+        adapter = MagicMock()
+        adapter.name = "Sync"
+        adapter.requires_api_key = False
+        adapter.supported_types = {IOCType.IPV4}
+
+        def lookup(ioc):
+            loop_threads.append(threading.current_thread().name)
+            return _make_result(ioc, "Sync")
+
+        adapter.lookup.side_effect = lookup
+        orchestrator = AsyncEnrichmentOrchestrator([adapter], loop_thread=loop_thread)
+        orchestrator.enrich_all("job", [_make_ioc("10.0.0.1"), _make_ioc("10.0.0.2")])
+
+        assert orchestrator.get_status("job")["done"] == 2
+        assert all(name.startswith("enrich-loop-bridge") for name in loop_threads)
+
+    def test_private_loop_without_shared_thread(self):
+        adapter = _AsyncAdapter()
+        orchestrator = AsyncEnrichmentOrchestrator([adapter])
+        orchestrator.enrich_all("job", [_make_ioc("10.0.0.1")])
+        assert orchestrator.get_status("job")["complete"] is True
+
+    def test_key_required_provider_capped(self, loop_thread):
+        adapter = _AsyncAdapter(name="VirusTotal", requires_api_key=True, delay=0.01)
+        orchestrator = AsyncEnrichmentOrchestrator([adapter], loop_thread=loop_thread)
+        orchestrator.enrich_all("job", [_make_ioc(f"10.0.1.{i}") for i in range(20)])
+        assert adapter.peak <= 4
+
+    def test_error_retried_once(self, loop_thread):
+        adapter = _AsyncAdapter()
+        ioc = _make_ioc("10.0.0.9")
+        adapter.alookup = AsyncMock(side_effect=[
+            EnrichmentError(ioc=ioc, provider="Async", error="Request timed out"),
+            _make_result(ioc, "Async"),
+        ])
+        orchestrator = AsyncEnrichmentOrchestrator([adapter], loop_thread=loop_thread)
+
+        with patch("app.enrichment.async_engine.asyncio.sleep", new=AsyncMock()) as sleep:
+            orchestrator.enrich_all("job", [ioc])
+
+        sleep.assert_awaited_once_with(1)
+        assert adapter.alookup.await_count == 2
+        assert isinstance(orchestrator.get_status("job")["results"][0], EnrichmentResult)
+
+    def test_retry_after_sets_429_delay(self, loop_thread):
+        adapter = _AsyncAdapter()
+        ioc = _make_ioc("10.0.0.10")
+        adapter.alookup = AsyncMock(side_effect=[
+            EnrichmentError(ioc=ioc, provider="Async", error="HTTP 429", retry_after=4.0),
+            _make_result(ioc, "Async"),
+        ])
+        orchestrator = AsyncEnrichmentOrchestrator([adapter], loop_thread=loop_thread)
+
+        with patch("app.enrichment.async_engine.asyncio.sleep", new=AsyncMock()) as sleep:
+            orchestrator.enrich_all("job", [ioc])
+
+        sleep.assert_awaited_once_with(4.0)
+        assert isinstance(orchestrator.get_status("job")["results"][0], EnrichmentResult)
+
+    def test_daily_budget_exhausted_skips_lookup(self, loop_thread):
+        adapter = _AsyncAdapter(name="VirusTotal", requires_api_key=True)
+        limiter = RateLimiter({"VirusTotal": RateLimit(rate_per_minute=60, burst=1, daily_budget=1)})
+        orchestrator = AsyncEnrichmentOrchestrator(
+            [adapter], loop_thread=loop_thread, rate_limiter=limiter
+        )
+        orchestrator.enrich_all("job", [_make_ioc("10.0.2.1"), _make_ioc("10.0.2.2")])
+
+        errors = [r for r in orchestrator.get_status("job")["results"] if isinstance(r, EnrichmentError)]
+        assert adapter.calls == 1
+        assert [e.error for e in errors] == ["Daily request budget exhausted"]
+
+
+class TestAsyncEngineSharing:
+    def test_concurrent_jobs_share_one_lookup(self, loop_thread):
+        adapter = _AsyncAdapter(delay=0.2)
+        ioc = _make_ioc("10.0.3.1")
+        orchestrators = [
+            AsyncEnrichmentOrchestrator([adapter], loop_thread=loop_thread) for _ in range(2)
+        ]
+        threads = [
+            threading.Thread(target=orch.enrich_all, args=(f"job{i}", [ioc]))
+            for i, orch in enumerate(orchestrators)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(5)
+
+        assert adapter.calls == 1
+        markers = [orch.cached_markers for orch in orchestrators]
+        assert sum(1 for m in markers if "10.0.3.1|Async" in m) == 1
+
+    def test_results_cached_and_served_from_cache(self, loop_thread, tmp_path):
+        cache = CacheStore(db_path=tmp_path / "cache.db")
+        adapter = _AsyncAdapter()
+        iocs = [_make_ioc("10.0.4.1"), _make_ioc("10.0.4.2")]
+
+        first = AsyncEnrichmentOrchestrator([adapter], loop_thread=loop_thread, cache=cache)
+        first.enrich_all("job1", iocs)
+        second = AsyncEnrichmentOrchestrator([adapter], loop_thread=loop_thread, cache=cache)
+        second.enrich_all("job2", iocs)
+
+        assert adapter.calls == 2
+        assert second.get_status("job2")["done"] == 2
+        assert set(second.cached_markers) == {"10.0.4.1|Async", "10.0.4.2|Async"}
+
+
+class TestAsyncBaseHTTPAdapter:
+    def test_alookup_uses_template_hooks(self):
+        adapter = ShodanAdapter(allowed_hosts=["internetdb.shodan.io"])
+        ioc = _make_ioc("1.2.3.4")
+        body = {"ports": [22], "vulns": [], "tags": [], "hostnames": [], "cpes": []}
+
+        with patch(
+            "app.enrichment.adapters.async_base.async_safe_request",
+            new=AsyncMock(return_value=body),
+        ) as request:
+            result = asyncio.run(adapter.alookup(ioc))
+
+        assert isinstance(result, EnrichmentResult)
+        assert result.provider == "Shodan InternetDB"
+        args, kwargs = request.await_args
+        assert args[1] == "https://internetdb.shodan.io/1.2.3.4"
+        assert args[2] == ["internetdb.shodan.io"]
+        assert kwargs["method"] == "GET"
+        assert kwargs["pre_raise_hook"] is not None
+
+    def test_alookup_rejects_unsupported_type(self):
+        adapter = ShodanAdapter(allowed_hosts=["internetdb.shodan.io"])
+        ioc = IOC(type=IOCType.DOMAIN, value="example.com", raw_match="example.com")
+        result = asyncio.run(adapter.alookup(ioc))
+        assert isinstance(result, EnrichmentError)
+        assert result.error == "Unsupported type"
+
+
+class TestEngineSelection:
+    def test_thread_engine_is_default(self, app):
+        assert app.config["ENRICHMENT_ENGINE"] == "thread"
+        assert app.enrichment_loop is None
+
+    def test_async_engine_creates_shared_loop(self):
+        from app import create_app
+
+        app = create_app({
+            "TESTING": True,
+            "CACHE_MAINTENANCE_INTERVAL": 0,
+            "ENRICHMENT_ENGINE": "async",
+        })
+        assert isinstance(app.enrichment_loop, EventLoopThread)
+        assert app.enrichment_loop.running is False  # started on first job
+
+
+class TestAsyncEnginePolicy:
+    def test_stop_on_first_malicious(self, loop_thread):
+        from app.enrichment.policy import JobPolicy
+
+        class Malicious(_AsyncAdapter):
+            async def alookup(self, ioc, client=None):
+                self.calls += 1
+                return EnrichmentResult(ioc=ioc, provider=self.name, verdict="malicious",
+                                        detection_count=1, total_engines=1, scan_date=None,
+                                        raw_stats={})
+
+        fast = Malicious(name="Shodan InternetDB")
+        slow = _AsyncAdapter(name="WHOIS", delay=5)
+        slow.supported_types = fast.supported_types
+        orchestrator = AsyncEnrichmentOrchestrator([slow, fast], loop_thread=loop_thread)
+
+        orchestrator.enrich_all(
+            "job", [_make_ioc("6.6.6.6")], policy=JobPolicy(stop_on_first_malicious_per_ioc=True)
+        )
+
+        status = orchestrator.get_status("job")
+        assert [r.provider for r in status["results"]] == ["Shodan InternetDB"]
+        assert [(c.provider, c.reason) for c in status["cancelled"]] == [
+            ("WHOIS", "malicious_verdict")
+        ]
+
+    def test_deadline(self, loop_thread):
+        from app.enrichment.policy import JobPolicy
+
+        adapter = _AsyncAdapter(delay=5)
+        orchestrator = AsyncEnrichmentOrchestrator([adapter], loop_thread=loop_thread)
+        orchestrator.enrich_all(
+            "job", [_make_ioc(f"10.0.5.{i}") for i in range(3)],
+            policy=JobPolicy(deadline_seconds=0.1),
+        )
+        status = orchestrator.get_status("job")
+        assert status["complete"] is True
+        assert [c.reason for c in status["cancelled"]] == ["deadline"] * 3
+        assert loop_thread.flights.in_flight() == 0  # abandoned calls were cancelled
+
+    def test_cancelled_follower_does_not_cancel_shared_lookup(self, loop_thread):
+        from app.enrichment.policy import JobPolicy
+
+        adapter = _AsyncAdapter(delay=0.3)
+        ioc = _make_ioc("10.0.6.1")
+        patient = AsyncEnrichmentOrchestrator([adapter], loop_thread=loop_thread)
+        hasty = AsyncEnrichmentOrchestrator([adapter], loop_thread=loop_thread)
+        thread = threading.Thread(target=patient.enrich_all, args=("slow-job", [ioc]))
+        thread.start()
+        hasty.enrich_all("fast-job", [ioc], policy=JobPolicy(deadline_seconds=0.05))
+        thread.join(5)
+
+        assert [c.reason for c in hasty.get_status("fast-job")["cancelled"]] == ["deadline"]
+        assert len(patient.get_status("slow-job")["results"]) == 1
+        assert adapter.calls == 1
+
+
+class TestAsyncEngineCircuitBreaker:
+    def test_open_breaker_fails_fast(self, loop_thread):
+        from app.enrichment.circuit_breaker import CIRCUIT_OPEN_ERROR, CircuitBreakers
+
+        adapter = _AsyncAdapter()
+        ioc = _make_ioc("10.0.7.1")
+        adapter.alookup = AsyncMock(
+            return_value=EnrichmentError(ioc=ioc, provider="Async", error="Request timed out")
+        )
+        orchestrator = AsyncEnrichmentOrchestrator(
+            [adapter], loop_thread=loop_thread, breakers=CircuitBreakers(consecutive_timeouts=1)
+        )
+
+        orchestrator.enrich_all("job", [ioc, _make_ioc("10.0.7.2")])
+
+        errors = sorted(r.error for r in orchestrator.get_status("job")["results"])
+        assert adapter.alookup.await_count == 1
+        assert errors == [CIRCUIT_OPEN_ERROR, "Request timed out"]
+
+    def test_checks_run_in_thread_engine_order(self, loop_thread):
+        from app.enrichment.circuit_breaker import CircuitBreakers
+
+        order: list[str] = []
+        adapter = _AsyncAdapter()
+        breakers = CircuitBreakers()
+        orchestrator = AsyncEnrichmentOrchestrator(
+            [adapter], loop_thread=loop_thread, breakers=breakers,
+            rate_limiter=RateLimiter({"Async": RateLimit(rate_per_minute=60, burst=5)}),
+        )
+        take_token, policy_check = orchestrator._atake_token, orchestrator._policy_check
+        allow = breakers.get("Async").allow
+
+        async def atake_token(provider_name):
+            order.append("token")
+            return await take_token(provider_name)
+
+        def check_policy(*args):
+            order.append("policy")
+            return policy_check(*args)
+
+        def breaker_allow():
+            order.append("breaker")
+            return allow()
+
+        with patch.object(orchestrator, "_atake_token", atake_token), \
+                patch.object(orchestrator, "_policy_check", check_policy), \
+                patch.object(breakers.get("Async"), "allow", breaker_allow):
+            orchestrator.enrich_all("job", [_make_ioc("10.0.7.3")])
+
+        # The half-open probe is claimed only once the token is in hand.
+        assert order == ["token", "policy", "breaker"]
+        assert adapter.calls == 1
@@ -0,0 +1,241 @@
+"""Tests for the asyncio HTTP client and async_safe_request().
+
+Runs against a local HTTP/1.1 stub server so the real socket path — framing,
+keep-alive reuse, timeouts and the SEC-05 byte cap — is exercised end to end.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.enrichment.async_http import AsyncHTTPClient, async_safe_request
+from app.enrichment.http_safety import MAX_RESPONSE_BYTES
+from app.enrichment.models import EnrichmentError, EnrichmentResult
+from tests.helpers import make_ipv4_ioc
+
+IOC = make_ipv4_ioc("1.2.3.4")
+PROVIDER = "TestProvider"
+ALLOWED = ["127.0.0.1"]
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = 0
+    slow_once_calls = 0
+    last_path = ""
+
+    def setup(self) -> None:
+        super().setup()
+        type(self).connections += 1
+
+    def log_message(self, *args) -> None:  # keep pytest output quiet
+        pass
+
+    def _send(self, status: int, body: bytes, chunked: bool = False) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if chunked:
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for start in range(0, len(body), 65536):
+                piece = body[start:start + 65536]
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(piece), piece))
+            self.wfile.write(b"0\r\n\r\n")
+        else:
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        path = type(self).last_path = self.path
+        if path.startswith("/status/"):
+            self._send(int(path.rsplit("/", 1)[1]), b'{"error": true}')
+        elif path == "/big":
+            self._send(200, b"[" + b"1," * MAX_RESPONSE_BYTES + b"1]")
+        elif path == "/big-chunked":
+            self._send(200, b"[" + b"1," * MAX_RESPONSE_BYTES + b"1]", chunked=True)
+        elif path == "/chunked":
+            self._send(200, json.dumps({"chunked": True}).encode(), chunked=True)
+        elif path == "/slow":
+            time.sleep(0.5)
+            self._send(200, b"{}")
+        elif path == "/slow-once":
+            type(self).slow_once_calls += 1
+            if type(self).slow_once_calls == 1:
+                time.sleep(0.5)
+            self._send(200, json.dumps({"call": type(self).slow_once_calls}).encode())
+        else:
+            self._send(200, json.dumps({
+                "method": "GET", "path": path, "key": self.headers.get("X-Key"),
+            }).encode())
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self._send(200, json.dumps({
+            "method": "POST",
+            "content_type": self.headers.get("Content-Type"),
+            "body": body.decode(),
+        }).encode())
+
+
+@pytest.fixture(scope="module")
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _request(url: str, client: AsyncHTTPClient | None = None, **kwargs):
+    async def run():
+        return await async_safe_request(
+            client or AsyncHTTPClient(), url, ALLOWED, IOC, PROVIDER, **kwargs
+        )
+    return asyncio.run(run())
+
+
+class TestAsyncSafeRequestSuccess:
+    def test_get_returns_parsed_json_and_sends_headers(self, server_url):
+        body = _request(server_url + "/v1/check?ip=1.2.3.4", headers={"X-Key": "secret"})
+        assert body == {"method": "GET", "path": "/v1/check?ip=1.2.3.4", "key": "secret"}
+
+    def test_post_json_payload(self, server_url):
+        body = _request(server_url + "/q", method="POST", json_payload={"query": "x"})
+        assert body["content_type"] == "application/json"
+        assert json.loads(body["body"]) == {"query": "x"}
+
+    def test_post_form_data(self, server_url):
+        body = _request(server_url + "/q", method="POST", data={"hash": "abc"})
+        assert body["content_type"] == "application/x-www-form-urlencoded"
+        assert body["body"] == "hash=abc"
+
+    def test_chunked_body(self, server_url):
+        assert _request(server_url + "/chunked") == {"chunked": True}
+
+    def test_keep_alive_reuses_connection(self, server_url):
+        async def run():
+            client = AsyncHTTPClient()
+            before = _StubHandler.connections
+            for _ in range(5):
+                await async_safe_request(client, server_url + "/a", ALLOWED, IOC, PROVIDER)
+            opened = _StubHandler.connections - before
+            await client.close()
+            return opened
+
+        assert asyncio.run(run()) == 1
+
+
+class TestAsyncRequestTarget:
+    """IOC values reach the wire percent-encoded exactly as the thread engine sends them."""
+
+    @pytest.mark.parametrize("value", [
+        "http://пример.рф/путь?q=é",
+        "http://evil.com/a b?x=1 2",
+        "http://evil.com/a\r\nX-Injected: 1",
+    ])
+    def test_adapter_url_requoted_like_requests(self, server_url, monkeypatch, value):
+        import requests
+
+        from app.enrichment.adapters import otx
+        from app.enrichment.adapters.otx import OTXAdapter
+        from app.pipeline.models import IOC as PipelineIOC, IOCType
+
+        monkeypatch.setattr(otx, "OTX_BASE", server_url + "/api/v1/indicators")
+        adapter = OTXAdapter(allowed_hosts=ALLOWED, api_key="k")
+        ioc = PipelineIOC(type=IOCType.URL, value=value, raw_match=value)
+
+        result = asyncio.run(adapter.alookup(ioc, AsyncHTTPClient()))
+
+        assert isinstance(result, EnrichmentResult), result
+        expected = requests.Request("GET", adapter._build_url(ioc)).prepare().path_url
+        assert _StubHandler.last_path == expected
+
+    def test_unsafe_target_rejected(self):
+        from urllib.parse import urlsplit
+
+        from app.enrichment.async_http import _request_target
+
+        with pytest.raises(ValueError, match="Invalid characters"):
+            _request_target(urlsplit("http://127.0.0.1/a b"))
+
+
+class TestAsyncSafeRequestErrors:
+    def test_ssrf_rejected_before_connecting(self):
+        result = _request("http://evil.example.com/x")
+        assert isinstance(result, EnrichmentError)
+        assert "SSRF" in result.error
+
+    def test_http_error_status(self, server_url):
+        result = _request(server_url + "/status/500")
+        assert result.error == "HTTP 500"
+
+    def test_pre_raise_hook_short_circuits(self, server_url):
+        sentinel = object()
+        seen = []
+
+        def hook(resp):
+            seen.append(resp.status_code)
+            return sentinel if resp.status_code == 404 else None
+
+        assert _request(server_url + "/status/404", pre_raise_hook=hook) is sentinel
+        assert seen == [404]
+
+    def test_hook_returning_none_falls_through(self, server_url):
+        result = _request(server_url + "/status/429", pre_raise_hook=lambda resp: None)
+        assert result.error == "HTTP 429"
+
+    @pytest.mark.parametrize("path", ["/big", "/big-chunked"])
+    def test_response_size_cap(self, server_url, path):
+        result = _request(server_url + path)
+        assert isinstance(result, EnrichmentError)
+        assert "SEC-05" in result.error
+
+    def test_read_timeout(self, server_url):
+        async def run():
+            client = AsyncHTTPClient(timeout=(5, 0.1))
+            return await async_safe_request(client, server_url + "/slow", ALLOWED, IOC, PROVIDER)
+
+        assert asyncio.run(run()).error == "Request timed out"
+
+    def test_connection_refused(self):
+        # Bind and close a socket to get a port nothing listens on.
+        import socket
+
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+        sock.close()
+        result = _request(f"http://127.0.0.1:{port}/x")
+        assert result.error == "Connection failed"
+
+
+class TestAsyncSafeRequestLatency:
+    def test_response_time_recorded(self, server_url):
+        from app.enrichment.http_safety import PROVIDER_LATENCY
+
+        _request(server_url + "/a")
+        _request(server_url + "/status/500")
+        assert PROVIDER_LATENCY.snapshot()[PROVIDER]["samples"] == 2
+
+    def test_hedge_answers_before_slow_first_attempt(self, server_url):
+        from app.enrichment.http_safety import PROVIDER_LATENCY
+
+        for _ in range(20):
+            PROVIDER_LATENCY.record(PROVIDER, 0.05)
+        PROVIDER_LATENCY.hedging = True
+        _StubHandler.slow_once_calls = 0
+
+        started = time.monotonic()
+        body = _request(server_url + "/slow-once", hedge=True)
+
+        assert body == {"call": 2}
+        assert time.monotonic() - started < 0.4
+        assert PROVIDER_LATENCY.snapshot()[PROVIDER]["hedges"] == 1
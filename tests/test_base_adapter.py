@@ -357,6 +357,28 @@ class TestBuildRequestBody:
         assert json_payload is None
 
 
+# ---------------------------------------------------------------------------
+# 8b. Hedging is limited to zero-auth GET adapters
+# ---------------------------------------------------------------------------
+
+class TestHedgeable:
+
+    @patch("app.enrichment.adapters.base.safe_request")
+    def test_zero_auth_get_is_hedged(self, mock_sr):
+        mock_sr.return_value = {}
+        StubAdapter(allowed_hosts=["api.stub.test"]).lookup(make_ipv4_ioc())
+        assert mock_sr.call_args.kwargs["hedge"] is True
+
+    @pytest.mark.parametrize("adapter_cls", [StubKeyAdapter, StubPostAdapter])
+    def test_key_or_post_adapter_never_hedged(self, adapter_cls):
+        assert adapter_cls(allowed_hosts=[], api_key="k")._hedgeable() is False
+
+    def test_opt_out_class_attribute(self):
+        adapter = StubAdapter(allowed_hosts=[])
+        adapter.hedge_requests = False
+        assert adapter._hedgeable() is False
+
+
 # ---------------------------------------------------------------------------
 # 9. BaseHTTPAdapter is abstract — cannot be instantiated directly
 # ---------------------------------------------------------------------------
@@ -0,0 +1,82 @@
+"""Tests for size- or time-bounded lookup batching (app/enrichment/batching.py)."""
+from __future__ import annotations
+
+import pytest
+
+from app.enrichment.batching import BatchWindow
+from app.enrichment.retry_scheduler import RetryScheduler
+
+
+class _HeldScheduler(RetryScheduler):
+    """Keeps every timer until fire() is called."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.held: list[tuple] = []
+
+    def call_later(self, delay, fn, *args) -> None:
+        self.held.append((delay, fn, args))
+
+    def fire(self) -> None:
+        held, self.held = self.held, []
+        for _, fn, args in held:
+            fn(*args)
+
+
+@pytest.fixture()
+def scheduler():
+    return _HeldScheduler()
+
+
+def _window(scheduler, max_size: int = 3, window: float = 0.05):
+    batches: list[list[int]] = []
+    return BatchWindow(max_size, window, batches.append, scheduler), batches
+
+
+def test_full_batch_emitted_immediately(scheduler) -> None:
+    window, batches = _window(scheduler)
+    for item in range(7):
+        window.add(item)
+
+    assert batches == [[0, 1, 2], [3, 4, 5]]
+    assert window.pending() == 1
+
+
+def test_partial_batch_emitted_when_window_expires(scheduler) -> None:
+    window, batches = _window(scheduler, window=0.2)
+    window.add("a")
+    window.add("b")
+
+    assert batches == []
+    assert [delay for delay, _, _ in scheduler.held] == [0.2]  # one timer per batch
+    scheduler.fire()
+    assert batches == [["a", "b"]]
+
+
+def test_stale_timer_does_not_split_next_batch(scheduler) -> None:
+    window, batches = _window(scheduler)
+    for item in range(3):
+        window.add(item)  # full batch; its timer is now stale
+    window.add(3)
+
+    scheduler.fire()
+    assert batches == [[0, 1, 2], [3]]
+    scheduler.fire()
+    assert batches == [[0, 1, 2], [3]]
+
+
+def test_flush_emits_waiting_items_in_max_size_chunks(scheduler) -> None:
+    window, batches = _window(scheduler, max_size=100)
+    for item in range(250):
+        window.add(item)
+    window.flush()
+
+    assert [len(batch) for batch in batches] == [100, 100, 50]
+    assert window.pending() == 0
+    scheduler.fire()
+    assert len(batches) == 3
+
+
+def test_max_size_must_be_positive(scheduler) -> None:
+    with pytest.raises(ValueError):
+        BatchWindow(0, 0.05, print, scheduler)
@@ -0,0 +1,80 @@
+"""Tests for background cache maintenance (app/cache/maintenance.py)."""
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.cache.maintenance import CacheMaintenance
+from app.cache.store import CacheStore
+from app.enrichment.config_store import ConfigStore
+
+
+@pytest.fixture()
+def cache(tmp_path: Path) -> CacheStore:
+    return CacheStore(db_path=tmp_path / "cache.db")
+
+
+@pytest.fixture()
+def config(tmp_path: Path) -> ConfigStore:
+    return ConfigStore(config_path=tmp_path / "config.ini")
+
+
+def _maintenance(cache: CacheStore, config: ConfigStore, **kwargs) -> CacheMaintenance:
+    return CacheMaintenance(cache, config_store_factory=lambda: config, **kwargs)
+
+
+class TestRunOnce:
+    def test_purges_expired_and_enforces_row_budget(
+        self, cache: CacheStore, config: ConfigStore
+    ) -> None:
+        for i in range(10):
+            cache.put(f"10.0.0.{i}", "ipv4", "VT", {"verdict": "clean"})
+        cache._conn.execute(
+            "UPDATE enrichment_cache SET cached_at_epoch = 0 WHERE ioc_value = '10.0.0.0'"
+        )
+        cache._conn.commit()
+        config.set_cache_max_rows(5)
+
+        status = _maintenance(cache, config).run_once()
+
+        assert status["rows_purged"] == 1
+        assert status["rows_evicted"] == 4
+        assert status["runs"] == 1
+        assert status["last_run"] is not None
+        assert status["db_size_bytes"] > 0
+        assert cache.stats()["total_entries"] == 5
+
+    def test_reads_budget_fresh_each_run(self, cache: CacheStore, config: ConfigStore) -> None:
+        for i in range(4):
+            cache.put(f"10.0.0.{i}", "ipv4", "VT", {"verdict": "clean"})
+        maintenance = _maintenance(cache, config)
+        assert maintenance.run_once()["rows_evicted"] == 0
+        config.set_cache_max_rows(1)
+        assert maintenance.run_once()["rows_evicted"] == 3
+        assert maintenance.status()["total_rows_evicted"] == 3
+
+    def test_errors_are_recorded_not_raised(self, cache: CacheStore, config: ConfigStore) -> None:
+        maintenance = _maintenance(cache, config)
+        cache.purge_expired = MagicMock(side_effect=RuntimeError("disk on fire"))  # type: ignore[method-assign]
+        status = maintenance.run_once()
+        assert status["last_error"] == "disk on fire"
+        assert status["runs"] == 1
+
+
+class TestThread:
+    def test_runs_after_interval_and_stops(self, cache: CacheStore, config: ConfigStore) -> None:
+        maintenance = _maintenance(cache, config, interval_seconds=0.05)
+        assert maintenance.status()["last_run"] is None
+        maintenance.start()
+        deadline = time.monotonic() + 5
+        while maintenance.status()["runs"] == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        maintenance.stop(timeout=5)
+        assert maintenance.status()["runs"] >= 1
+        assert maintenance.status()["running"] is False
+
+    def test_app_does_not_start_thread_when_disabled(self, app) -> None:
+        assert app.cache_maintenance.status()["running"] is False
@@ -1,6 +1,6 @@
 """Tests for SQLite enrichment result cache.
 
-Covers put/get, TTL expiry, clear, stats, thread safety, upsert,
+Covers put/get, bulk get_many, TTL expiry, clear, stats, thread safety, upsert,
 and no-error-caching contract.
 """
 from __future__ import annotations
@@ -115,6 +115,152 @@ class TestThreadSafety:
         assert s["total_entries"] == 100
 
 
+class TestWriteBehind:
+    @pytest.fixture()
+    def wb_cache(self, tmp_path: Path):
+        store = CacheStore(
+            db_path=tmp_path / "cache.db",
+            write_behind=True,
+            flush_rows=50,
+            flush_interval_ms=10_000,
+        )
+        yield store
+        store.close()
+
+    def test_flush_makes_queued_puts_visible(self, wb_cache: CacheStore) -> None:
+        """Queued puts are committed by flush() and then readable."""
+        for i in range(10):
+            wb_cache.put(f"10.0.0.{i}", "ipv4", "VT", {"verdict": "clean"})
+        assert wb_cache.flush(timeout=5) is True
+        assert wb_cache.stats()["total_entries"] == 10
+        assert wb_cache.get("10.0.0.3", "ipv4", "VT", ttl_seconds=3600) is not None
+
+    def test_rows_committed_in_batches(self, wb_cache: CacheStore) -> None:
+        """120 puts with flush_rows=50 commit as 50 + 50 + 20 (final flush)."""
+        for i in range(120):
+            wb_cache.put(f"10.0.1.{i}", "ipv4", "VT", {"idx": i})
+        wb_cache.flush(timeout=5)
+        s = wb_cache.stats()
+        assert s["total_entries"] == 120
+        assert s["flushes"] == 3
+        assert s["last_flush_rows"] == 20
+        assert s["queue_depth"] == 0
+        assert s["last_flush_ms"] >= 0
+
+    def test_interval_triggers_flush(self, tmp_path: Path) -> None:
+        """A partial batch is committed once flush_interval_ms elapses."""
+        import time
+
+        store = CacheStore(
+            db_path=tmp_path / "cache.db", write_behind=True, flush_interval_ms=20,
+        )
+        try:
+            store.put("1.2.3.4", "ipv4", "VT", {"verdict": "clean"})
+            deadline = time.monotonic() + 5
+            while store.stats()["flushes"] == 0 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert store.get("1.2.3.4", "ipv4", "VT", ttl_seconds=3600) is not None
+        finally:
+            store.close()
+
+    def test_clear_discards_queued_puts(self, wb_cache: CacheStore) -> None:
+        """clear() also removes rows that were still queued."""
+        wb_cache.put("1.2.3.4", "ipv4", "VT", {"verdict": "clean"})
+        wb_cache.clear()
+        assert wb_cache.stats()["total_entries"] == 0
+
+    def test_sync_mode_stats(self, cache: CacheStore) -> None:
+        """Synchronous stores report write_behind False and an empty queue."""
+        cache.put("1.2.3.4", "ipv4", "VT", {"verdict": "clean"})
+        s = cache.stats()
+        assert s["write_behind"] is False
+        assert s["queue_depth"] == 0
+        assert cache.flush() is True
+
+
+class TestMemoryTier:
+    def test_repeat_get_served_from_memory(self, tmp_path: Path) -> None:
+        """A second get() for a key loaded from SQLite is a memory-tier hit."""
+        writer = CacheStore(db_path=tmp_path / "cache.db", memory_max_bytes=0)
+        writer.put("1.2.3.4", "ipv4", "VT", {"verdict": "clean"})
+        cache = CacheStore(db_path=tmp_path / "cache.db")
+
+        assert cache.get("1.2.3.4", "ipv4", "VT", ttl_seconds=3600) is not None
+        assert cache.get("1.2.3.4", "ipv4", "VT", ttl_seconds=3600) is not None
+        s = cache.stats()
+        assert (s["memory_hits"], s["memory_misses"]) == (1, 1)
+        assert (s["sqlite_hits"], s["sqlite_misses"]) == (1, 0)
+        assert s["memory_hit_ratio"] == 0.5
+        assert s["memory_entries"] == 1
+
+    def test_put_populates_memory_tier(self, cache: CacheStore) -> None:
+        """put() makes the entry readable from memory even before SQLite is read."""
+        cache.put("1.2.3.4", "ipv4", "VT", {"verdict": "malicious"})
+        result = cache.get("1.2.3.4", "ipv4", "VT", ttl_seconds=3600)
+        assert result is not None and result["verdict"] == "malicious"
+        assert cache.stats()["sqlite_hits"] == 0
+
+    def test_put_updates_memory_entry(self, cache: CacheStore) -> None:
+        cache.put("1.2.3.4", "ipv4", "VT", {"verdict": "clean"})
+        cache.get("1.2.3.4", "ipv4", "VT", ttl_seconds=3600)
+        cache.put("1.2.3.4", "ipv4", "VT", {"verdict": "malicious"})
+        assert cache.get("1.2.3.4", "ipv4", "VT", ttl_seconds=3600)["verdict"] == "malicious"
+
+    def test_nested_mutation_does_not_leak_between_reads(self, tmp_path: Path) -> None:
+        """Each hit owns its raw_stats, whether the entry came from put() or SQLite."""
+        writer = CacheStore(db_path=tmp_path / "cache.db", memory_max_bytes=0)
+        writer.put("1.2.3.4", "ipv4", "VT", {"verdict": "clean", "raw_stats": {"tags": ["a"]}})
+        cache = CacheStore(db_path=tmp_path / "cache.db")
+        cache.put("evil.com", "domain", "VT", {"verdict": "clean", "raw_stats": {"tags": ["a"]}})
+
+        for key in (("1.2.3.4", "ipv4"), ("evil.com", "domain")):
+            first = cache.get(*key, "VT", ttl_seconds=3600)
+            first["raw_stats"]["tags"].append("mutated")
+            second = cache.get(*key, "VT", ttl_seconds=3600)
+            assert second["raw_stats"] == {"tags": ["a"]}
+        assert cache.stats()["memory_hits"] >= 2
+
+    def test_memory_respects_ttl(self, cache: CacheStore) -> None:
+        cache.put("1.2.3.4", "ipv4", "VT", {"verdict": "clean"})
+        assert cache.get("1.2.3.4", "ipv4", "VT", ttl_seconds=0) is None
+
+    def test_clear_empties_memory_tier(self, cache: CacheStore) -> None:
+        cache.put("1.2.3.4", "ipv4", "VT", {"verdict": "clean"})
+        cache.clear()
+        assert cache.get("1.2.3.4", "ipv4", "VT", ttl_seconds=3600) is None
+        assert cache.stats()["memory_entries"] == 0
+
+    def test_purge_expired_drops_memory_entries(self, cache: CacheStore) -> None:
+        cache.put("1.2.3.4", "ipv4", "VT", {"verdict": "clean"})
+        cache.purge_expired(ttl_seconds=-60)  # cutoff in the future: everything expired
+        assert cache.stats()["memory_entries"] == 0
+
+    def test_byte_budget_evicts_least_recently_used(self, tmp_path: Path) -> None:
+        """The memory tier stays within its byte budget, evicting LRU entries first."""
+        cache = CacheStore(db_path=tmp_path / "cache.db", memory_max_bytes=200)
+        payload = {"blob": "x" * 60}  # ~73 bytes encoded
+        cache.put("a", "domain", "VT", payload)
+        cache.put("b", "domain", "VT", payload)
+        cache.get("a", "domain", "VT", ttl_seconds=3600)  # touch a -> b is LRU
+        cache.put("c", "domain", "VT", payload)
+
+        s = cache.stats()
+        assert s["memory_bytes"] <= 200
+        assert s["memory_entries"] == 2
+        cache.get("b", "domain", "VT", ttl_seconds=3600)
+        assert cache.stats()["sqlite_hits"] == 1  # b had to come from SQLite
+
+    def test_returned_dicts_are_copies(self, cache: CacheStore) -> None:
+        """Mutating a returned result does not corrupt the memory tier."""
+        cache.put("1.2.3.4", "ipv4", "VT", {"verdict": "clean"})
+        first = cache.get("1.2.3.4", "ipv4", "VT", ttl_seconds=3600)
+        first.pop("cached_at")
+        first["verdict"] = "tampered"
+        second = cache.get("1.2.3.4", "ipv4", "VT", ttl_seconds=3600)
+        assert second["verdict"] == "clean"
+        assert "cached_at" in second
+
+
 class TestGetCachedAt:
     def test_get_returns_cached_at(self, cache: CacheStore) -> None:
         """get() result includes a 'cached_at' key with ISO timestamp."""
@@ -125,6 +271,249 @@ class TestGetCachedAt:
         assert isinstance(result["cached_at"], str)
 
 
+class TestGetMany:
+    def test_get_many_returns_only_hits(self, cache: CacheStore) -> None:
+        """get_many() returns a dict of hits keyed by (value, type, provider)."""
+        cache.put("1.2.3.4", "ipv4", "VT", {"verdict": "malicious"})
+        cache.put("evil.com", "domain", "TF", {"verdict": "clean"})
+        hits = cache.get_many(
+            [
+                ("1.2.3.4", "ipv4", "VT"),
+                ("evil.com", "domain", "TF"),
+                ("9.9.9.9", "ipv4", "VT"),
+            ],
+            ttl_seconds=3600,
+        )
+        assert set(hits) == {("1.2.3.4", "ipv4", "VT"), ("evil.com", "domain", "TF")}
+        assert hits[("1.2.3.4", "ipv4", "VT")]["verdict"] == "malicious"
+        assert "cached_at" in hits[("evil.com", "domain", "TF")]
+
+    def test_get_many_respects_ttl(self, cache: CacheStore) -> None:
+        """Expired entries are treated as misses."""
+        cache.put("1.2.3.4", "ipv4", "VT", {"verdict": "clean"})
+        assert cache.get_many([("1.2.3.4", "ipv4", "VT")], ttl_seconds=0) == {}
+
+    def test_get_many_spans_multiple_chunks(self, cache: CacheStore) -> None:
+        """More keys than one chunk holds are all resolved."""
+        from app.cache.store import _GET_MANY_CHUNK
+
+        count = _GET_MANY_CHUNK * 2 + 7
+        for i in range(count):
+            cache.put(f"10.{i // 256}.{i % 256}.1", "ipv4", "VT", {"idx": i})
+        keys = [(f"10.{i // 256}.{i % 256}.1", "ipv4", "VT") for i in range(count)]
+        hits = cache.get_many(keys, ttl_seconds=3600)
+        assert len(hits) == count
+
+    def test_get_many_empty(self, cache: CacheStore) -> None:
+        """get_many() with no keys returns an empty dict without querying."""
+        assert cache.get_many([], ttl_seconds=3600) == {}
+
+
+class TestEpochMigration:
+    def test_legacy_database_is_migrated(self, tmp_path: Path) -> None:
+        """A pre-epoch database gains cached_at_epoch, backfilled from cached_at."""
+        import datetime
+        import json
+        import sqlite3
+
+        db_path = tmp_path / "legacy.db"
+        fresh = datetime.datetime.now(tz=datetime.timezone.utc)
+        stale = fresh - datetime.timedelta(days=3)
+        conn = sqlite3.connect(str(db_path))
+        conn.execute(
+            "CREATE TABLE enrichment_cache ("
+            " ioc_value TEXT NOT NULL, ioc_type TEXT NOT NULL, provider TEXT NOT NULL,"
+            " result_json TEXT NOT NULL, cached_at TEXT NOT NULL,"
+            " PRIMARY KEY (ioc_value, ioc_type, provider))"
+        )
+        conn.execute("CREATE INDEX idx_cache_cached_at ON enrichment_cache (cached_at)")
+        conn.executemany(
+            "INSERT INTO enrichment_cache VALUES (?, ?, ?, ?, ?)",
+            [
+                ("1.2.3.4", "ipv4", "VT", json.dumps({"verdict": "clean"}), fresh.isoformat()),
+                ("evil.com", "domain", "VT", json.dumps({"verdict": "malicious"}),
+                 stale.isoformat()),
+            ],
+        )
+        conn.commit()
+        conn.close()
+
+        cache = CacheStore(db_path=db_path)
+        epochs = dict(cache._conn.execute(
+            "SELECT ioc_value, cached_at_epoch FROM enrichment_cache"
+        ).fetchall())
+        assert epochs["1.2.3.4"] == int(fresh.timestamp())
+        assert epochs["evil.com"] == int(stale.timestamp())
+        assert cache.get("1.2.3.4", "ipv4", "VT", ttl_seconds=3600) is not None
+        assert cache.get("evil.com", "domain", "VT", ttl_seconds=86400) is None
+        assert cache.purge_expired(ttl_seconds=86400) == 1
+
+        indexes = {row[1] for row in cache._conn.execute("PRAGMA index_list(enrichment_cache)")}
+        assert "idx_cache_cached_at_epoch" in indexes
+        assert "idx_cache_cached_at" not in indexes
+
+    def test_ttl_filter_is_in_sql(self, cache: CacheStore) -> None:
+        """Expired rows are excluded by the query itself, not decoded and discarded."""
+        from unittest.mock import patch
+
+        cache.put("1.2.3.4", "ipv4", "VT", {"verdict": "clean"})
+        cache._memory.clear()
+        with patch("app.cache.store.unframe_json") as decode:
+            assert cache.get("1.2.3.4", "ipv4", "VT", ttl_seconds=0) is None
+        decode.assert_not_called()
+
+
+class TestPayloadCodec:
+    def test_rows_stored_as_framed_blobs(self, cache: CacheStore) -> None:
+        """New rows use the codec layer; large payloads are compressed."""
+        big = {"verdict": "no_data", "raw_stats": {"subdomains": [f"h{i}.example.com" for i in range(100)]}}
+        cache.put("example.com", "domain", "crt.sh", big)
+        cache.flush()
+        blob = cache._conn.execute("SELECT result_json FROM enrichment_cache").fetchone()[0]
+        assert isinstance(blob, bytes)
+        assert blob[1] == 1  # zlib codec id
+        cache._memory.clear()
+        got = cache.get("example.com", "domain", "crt.sh", ttl_seconds=3600)
+        assert got["raw_stats"] == big["raw_stats"]
+
+    def test_legacy_text_row_readable(self, cache: CacheStore) -> None:
+        """Plain-JSON TEXT rows from before the codec layer are still served."""
+        import json
+        import time
+
+        cache._conn.execute(
+            "INSERT INTO enrichment_cache "
+            "(ioc_value, ioc_type, provider, result_json, cached_at, cached_at_epoch) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            ("1.2.3.4", "ipv4", "VT", json.dumps({"verdict": "clean"}),
+             "2025-01-01T00:00:00+00:00", int(time.time())),
+        )
+        cache._conn.commit()
+        assert cache.get("1.2.3.4", "ipv4", "VT", ttl_seconds=3600)["verdict"] == "clean"
+        assert cache.get_all_for_ioc("1.2.3.4", "ipv4")[0]["verdict"] == "clean"
+
+    def test_row_with_unavailable_codec_is_a_miss(self, cache: CacheStore) -> None:
+        """A row written with a codec this process lacks (e.g. zstd) does not fail the lookup."""
+        import time
+
+        cache.put("5.6.7.8", "ipv4", "VT", {"verdict": "clean"})
+        cache._conn.execute(
+            "INSERT INTO enrichment_cache "
+            "(ioc_value, ioc_type, provider, result_json, cached_at, cached_at_epoch) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            ("1.2.3.4", "ipv4", "VT", bytes([1, 200]) + b"\x00",
+             "2025-01-01T00:00:00+00:00", int(time.time())),
+        )
+        cache._conn.commit()
+        cache.flush()
+        cache._memory.clear()
+
+        hits = cache.get_many([("1.2.3.4", "ipv4", "VT"), ("5.6.7.8", "ipv4", "VT")], 3600)
+        assert list(hits) == [("5.6.7.8", "ipv4", "VT")]
+        assert cache.get_all_for_ioc("1.2.3.4", "ipv4") == []
+
+    def test_raw_codec_option(self, tmp_path: Path) -> None:
+        store = CacheStore(db_path=tmp_path / "raw.db", codec="raw", memory_max_bytes=0)
+        store.put("1.2.3.4", "ipv4", "VT", {"verdict": "x" * 1000})
+        blob = store._conn.execute("SELECT result_json FROM enrichment_cache").fetchone()[0]
+        assert blob[1] == 0
+        assert store.get("1.2.3.4", "ipv4", "VT", ttl_seconds=3600)["verdict"] == "x" * 1000
+
+
+class TestLruEviction:
+    def test_hits_update_last_accessed_after_flush(self, cache: CacheStore) -> None:
+        cache.put("1.2.3.4", "ipv4", "VT", {"verdict": "clean"})
+        cache._conn.execute("UPDATE enrichment_cache SET last_accessed_epoch = 1")
+        cache._conn.commit()
+        cache.get("1.2.3.4", "ipv4", "VT", ttl_seconds=3600)
+        # Buffered, not written, on the read path.
+        assert cache._conn.execute(
+            "SELECT last_accessed_epoch FROM enrichment_cache"
+        ).fetchone()[0] == 1
+        assert cache.flush_access_times() == 1
+        assert cache._conn.execute(
+            "SELECT last_accessed_epoch FROM enrichment_cache"
+        ).fetchone()[0] > 1
+
+    def test_evicts_least_recently_used_rows(self, cache: CacheStore) -> None:
+        for i in range(5):
+            cache.put(f"10.0.0.{i}", "ipv4", "VT", {"verdict": "clean"})
+        cache._conn.execute("UPDATE enrichment_cache SET last_accessed_epoch = 100")
+        cache._conn.commit()
+        cache.get("10.0.0.0", "ipv4", "VT", ttl_seconds=3600)
+        cache.get("10.0.0.1", "ipv4", "VT", ttl_seconds=3600)
+
+        assert cache.evict_lru(max_rows=2, batch_rows=1) == 3
+
+        remaining = {row[0] for row in cache._conn.execute("SELECT ioc_value FROM enrichment_cache")}
+        assert remaining == {"10.0.0.0", "10.0.0.1"}
+        # Evicted keys are dropped from the memory tier too.
+        assert cache.get("10.0.0.4", "ipv4", "VT", ttl_seconds=3600) is None
+
+    def test_byte_budget(self, cache: CacheStore) -> None:
+        blob = {"verdict": "clean", "raw": "x" * 3000}
+        for i in range(300):
+            cache.put(f"10.0.{i // 256}.{i % 256}", "ipv4", "VT", dict(blob, i=i))
+        budget = cache._used_bytes() // 2
+        evicted = cache.evict_lru(max_bytes=budget)
+        assert evicted > 0
+        assert cache._used_bytes() <= budget
+
+    def test_no_budget_is_noop(self, cache: CacheStore) -> None:
+        cache.put("1.2.3.4", "ipv4", "VT", {"verdict": "clean"})
+        assert cache.evict_lru() == 0
+
+    def test_compact_shrinks_new_database(self, cache: CacheStore) -> None:
+        for i in range(500):
+            cache.put(f"10.0.{i // 256}.{i % 256}", "ipv4", "VT", {"raw": f"{i}" * 500})
+        cache.clear()
+        cache.compact()
+        assert cache._conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+        assert cache._conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
+        assert cache._db_path.with_name("cache.db-wal").stat().st_size == 0
+
+    def test_legacy_database_gains_access_column(self, tmp_path: Path) -> None:
+        import sqlite3
+
+        db_path = tmp_path / "legacy.db"
+        conn = sqlite3.connect(str(db_path))
+        conn.execute(
+            "CREATE TABLE enrichment_cache ("
+            " ioc_value TEXT NOT NULL, ioc_type TEXT NOT NULL, provider TEXT NOT NULL,"
+            " result_json TEXT NOT NULL, cached_at TEXT NOT NULL,"
+            " cached_at_epoch INTEGER NOT NULL DEFAULT 0,"
+            " PRIMARY KEY (ioc_value, ioc_type, provider))"
+        )
+        conn.commit()
+        conn.close()
+        cache = CacheStore(db_path=db_path)
+        cache.put("1.2.3.4", "ipv4", "VT", {"verdict": "clean"})
+        assert cache.evict_lru(max_rows=0) == 0
+        assert cache.evict_lru(max_rows=1) == 0
+
+
+class TestNegativeTier:
+    def test_put_and_get_negative(self, cache: CacheStore) -> None:
+        cache.put_negative("1.2.3.4", "ipv4", "AbuseIPDB", "HTTP 422", "bad_request", 3600)
+        hits = cache.get_negative_many([("1.2.3.4", "ipv4", "AbuseIPDB"), ("x", "ipv4", "VT")])
+        assert list(hits) == [("1.2.3.4", "ipv4", "AbuseIPDB")]
+        assert hits[("1.2.3.4", "ipv4", "AbuseIPDB")]["error"] == "HTTP 422"
+        # Negative entries never surface as positive results.
+        assert cache.get("1.2.3.4", "ipv4", "AbuseIPDB", ttl_seconds=3600) is None
+
+    def test_expired_negative_entries_ignored_and_purged(self, cache: CacheStore) -> None:
+        cache.put_negative("1.2.3.4", "ipv4", "WHOIS", "WHOIS quota exceeded", "quota", 0)
+        cache.put_negative("5.6.7.8", "ipv4", "WHOIS", "WHOIS quota exceeded", "quota", 3600)
+        assert cache.get_negative_many([("1.2.3.4", "ipv4", "WHOIS")]) == {}
+        assert cache.purge_negative_expired() == 1
+        assert cache.stats()["negative_entries"] == 1
+
+    def test_clear_removes_negative_entries(self, cache: CacheStore) -> None:
+        cache.put_negative("1.2.3.4", "ipv4", "VT", "HTTP 404", "not_found", 3600)
+        cache.clear()
+        assert cache.get_negative_many([("1.2.3.4", "ipv4", "VT")]) == {}
+
+
 class TestGetAllForIoc:
     def test_get_all_for_ioc_returns_all_providers(self, cache: CacheStore) -> None:
         """get_all_for_ioc returns results from all providers for an IOC."""
@@ -176,15 +565,18 @@ class TestPurgeExpired:
         cache.put("1.2.3.4", "ipv4", "VT", {"verdict": "clean"})
 
         # Insert an "old" entry by writing directly to the DB with a past timestamp
-        old_ts = (
+        old_dt = (
             datetime.datetime.now(tz=datetime.timezone.utc)
             - datetime.timedelta(hours=2)
-        ).isoformat()
+        )
         cache._conn.execute(
             "INSERT OR REPLACE INTO enrichment_cache "
-            "(ioc_value, ioc_type, provider, result_json, cached_at) "
-            "VALUES (?, ?, ?, ?, ?)",
-            ("evil.com", "domain", "TF", json.dumps({"verdict": "malicious"}), old_ts),
+            "(ioc_value, ioc_type, provider, result_json, cached_at, cached_at_epoch) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                "evil.com", "domain", "TF", json.dumps({"verdict": "malicious"}),
+                old_dt.isoformat(), int(old_dt.timestamp()),
+            ),
         )
         cache._conn.commit()
 
@@ -201,6 +593,14 @@ class TestPurgeExpired:
         result = cache.purge_expired(ttl_seconds=3600)
         assert result == 0
 
+    def test_purge_expired_runs_in_batches(self, cache: CacheStore) -> None:
+        """purge_expired() deletes everything across several bounded batches."""
+        for i in range(25):
+            cache.put(f"10.0.0.{i}", "ipv4", "VT", {"verdict": "clean"})
+        deleted = cache.purge_expired(ttl_seconds=-60, batch_rows=10)
+        assert deleted == 25
+        assert cache.stats()["total_entries"] == 0
+
     def test_purge_expired_keeps_fresh_entries(self, cache: CacheStore) -> None:
         """purge_expired() returns 0 and keeps all entries when none are expired."""
         cache.put("1.2.3.4", "ipv4", "VT", {"verdict": "clean"})
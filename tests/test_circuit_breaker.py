@@ -0,0 +1,135 @@
+"""Tests for per-provider circuit breakers (app/enrichment/circuit_breaker.py)."""
+from __future__ import annotations
+
+import pytest
+
+from app.enrichment.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitBreakers,
+    is_provider_failure,
+)
+from app.enrichment.models import EnrichmentError, EnrichmentResult
+from tests.helpers import make_ipv4_ioc
+
+IOC = make_ipv4_ioc("1.2.3.4")
+
+
+def _error(message: str) -> EnrichmentError:
+    return EnrichmentError(ioc=IOC, provider="P", error=message)
+
+
+OK = EnrichmentResult(ioc=IOC, provider="P", verdict="clean", detection_count=0,
+                      total_engines=1, scan_date=None, raw_stats={})
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.parametrize("message,expected", [
+    ("Request timed out", True),
+    ("Connection failed", True),
+    ("SSL/TLS error", True),
+    ("HTTP 503", True),
+    ("HTTP 404", False),
+    ("HTTP 429", False),
+    ("Rate limit exceeded (429)", False),
+    ("Authentication error (401)", False),
+    ("Unsupported type", False),
+])
+def test_is_provider_failure(message, expected):
+    assert is_provider_failure(message) is expected
+
+
+class TestCircuitBreaker:
+    def _breaker(self, clock=None, **kwargs) -> CircuitBreaker:
+        kwargs.setdefault("min_calls", 4)
+        return CircuitBreaker("P", clock=clock or _Clock(), **kwargs)
+
+    def test_consecutive_timeouts_open(self):
+        breaker = self._breaker(consecutive_timeouts=3)
+        for _ in range(2):
+            breaker.record(_error("Request timed out"))
+        assert breaker.state == CLOSED
+        breaker.record(_error("Request timed out"))
+        assert breaker.state == OPEN
+        assert breaker.allow() is False
+
+    def test_success_resets_timeout_streak(self):
+        breaker = self._breaker(consecutive_timeouts=2, min_calls=100)
+        breaker.record(_error("Request timed out"))
+        breaker.record(OK)
+        breaker.record(_error("Request timed out"))
+        assert breaker.state == CLOSED
+
+    def test_failure_rate_opens_after_min_calls(self):
+        breaker = self._breaker(failure_rate=0.5)
+        for result in (OK, _error("HTTP 502"), OK):
+            breaker.record(result)
+        assert breaker.state == CLOSED  # below min_calls
+        breaker.record(_error("Connection failed"))
+        assert breaker.state == OPEN
+
+    def test_deterministic_errors_count_as_healthy(self):
+        breaker = self._breaker()
+        for _ in range(10):
+            breaker.record(_error("HTTP 404"))
+        assert breaker.state == CLOSED
+
+    def test_half_open_admits_single_probe(self):
+        clock = _Clock()
+        breaker = self._breaker(clock, consecutive_timeouts=1, cooldown=30)
+        breaker.record(_error("Request timed out"))
+        clock.now += 29
+        assert breaker.allow() is False
+        clock.now += 1
+        assert breaker.state == HALF_OPEN
+        assert breaker.allow() is True
+        assert breaker.allow() is False  # probe in flight
+        breaker.abandon()
+        assert breaker.allow() is True
+
+    def test_healthy_probe_closes(self):
+        clock = _Clock()
+        breaker = self._breaker(clock, consecutive_timeouts=1, cooldown=30)
+        breaker.record(_error("Request timed out"))
+        clock.now += 30
+        assert breaker.allow() is True
+        breaker.record(OK)
+        assert breaker.state == CLOSED
+        assert breaker.snapshot()["failure_rate"] == 0.0
+
+    def test_failed_probe_reopens_with_longer_cooldown(self):
+        clock = _Clock()
+        breaker = self._breaker(clock, consecutive_timeouts=1, cooldown=30, max_cooldown=45)
+        breaker.record(_error("Request timed out"))
+        clock.now += 30
+        breaker.allow()
+        breaker.record(_error("HTTP 500"))
+        assert breaker.state == OPEN
+        assert breaker.snapshot()["retry_in_s"] == 45  # doubled, capped
+        clock.now += 45
+        assert breaker.state == HALF_OPEN
+        assert breaker.snapshot()["times_opened"] == 2
+
+
+class TestCircuitBreakers:
+    def test_one_breaker_per_name(self):
+        breakers = CircuitBreakers(consecutive_timeouts=1)
+        assert breakers.get("A") is breakers.get("A")
+        breakers.get("A").record(_error("Request timed out"))
+        assert breakers.get("A").state == OPEN
+        assert breakers.get("B").state == CLOSED
+
+    def test_snapshot_reports_unknown_providers_closed(self):
+        breakers = CircuitBreakers()
+        snapshot = breakers.snapshot(["Never Used"])
+        assert snapshot["Never Used"]["state"] == CLOSED
+        assert breakers.snapshot() == {}
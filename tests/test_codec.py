@@ -0,0 +1,57 @@
+"""Tests for the cache/history payload codec layer (app/cache/codec.py)."""
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from app.cache.codec import (
+    _COMPRESS_MIN_BYTES,
+    CODECS,
+    decode_payload,
+    decode_payload_sized,
+    encode_payload,
+    get_codec,
+)
+
+_LARGE = {"subdomains": [f"host{i}.example.com" for i in range(200)]}
+
+
+class TestRoundtrip:
+    @pytest.mark.parametrize("codec", sorted(CODECS))
+    def test_roundtrip_every_codec(self, codec: str) -> None:
+        assert decode_payload(encode_payload(_LARGE, codec)) == _LARGE
+
+    def test_small_payload_stored_raw(self) -> None:
+        """Payloads under the threshold skip compression."""
+        encoded = encode_payload({"verdict": "clean"}, "zlib")
+        assert encoded[1] == CODECS["raw"].codec_id
+        assert decode_payload(encoded) == {"verdict": "clean"}
+
+    def test_large_payload_compressed(self) -> None:
+        encoded = encode_payload(_LARGE, "zlib")
+        assert encoded[1] == CODECS["zlib"].codec_id
+        assert len(encoded) < len(json.dumps(_LARGE)) // 4
+
+    def test_sized_decode_reports_uncompressed_length(self) -> None:
+        _, size = decode_payload_sized(encode_payload(_LARGE, "zlib"))
+        assert size > _COMPRESS_MIN_BYTES
+        assert size == len(json.dumps(_LARGE, separators=(",", ":")))
+
+
+class TestLegacyAndErrors:
+    def test_legacy_text_json_decoded(self) -> None:
+        """str values are pre-codec TEXT rows and are parsed as plain JSON."""
+        assert decode_payload('{"verdict": "malicious"}') == {"verdict": "malicious"}
+
+    def test_unknown_version_rejected(self) -> None:
+        with pytest.raises(ValueError, match="format header"):
+            decode_payload(b"\x09\x01abc")
+
+    def test_unknown_codec_id_rejected(self) -> None:
+        with pytest.raises(ValueError, match="codec id 200"):
+            decode_payload(b"\x01\xc8abc")
+
+    def test_get_codec_unknown_name(self) -> None:
+        with pytest.raises(ValueError, match="Unknown payload codec"):
+            get_codec("brotli")
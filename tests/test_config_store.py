@@ -143,3 +143,26 @@ class TestConfigStoreMultiProvider:
         # [virustotal] section key must not appear here
         assert "api_key" not in result
         assert result == {"urlhaus": "uh-key"}
+
+
+class TestConfigStoreCacheBudget:
+    """Tests for the cache size/row budget used by background maintenance."""
+
+    def test_defaults(self, tmp_path: Path) -> None:
+        store = ConfigStore(config_path=tmp_path / "config.ini")
+        assert store.get_cache_max_mb() == 512
+        assert store.get_cache_max_rows() == 0
+
+    def test_roundtrip(self, tmp_path: Path) -> None:
+        store = ConfigStore(config_path=tmp_path / "config.ini")
+        store.set_cache_max_mb(64)
+        store.set_cache_max_rows(10_000)
+        assert store.get_cache_max_mb() == 64
+        assert store.get_cache_max_rows() == 10_000
+
+    def test_invalid_values_fall_back_to_default(self, tmp_path: Path) -> None:
+        config_path = tmp_path / "config.ini"
+        config_path.write_text("[cache]\nmax_size_mb = lots\nmax_rows = -5\n")
+        store = ConfigStore(config_path=config_path)
+        assert store.get_cache_max_mb() == 512
+        assert store.get_cache_max_rows() == 0
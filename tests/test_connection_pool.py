@@ -0,0 +1,91 @@
+"""Tests for the SQLite ConnectionPool (shared writer + per-thread readers).
+
+Covers reader reuse within a thread, isolation across threads, read-only
+enforcement, visibility of committed writes, and close().
+"""
+from __future__ import annotations
+
+import sqlite3
+import threading
+from pathlib import Path
+
+import pytest
+
+from app.cache.connections import ConnectionPool
+from app.cache.store import CacheStore
+from app.enrichment.history_store import HistoryStore
+
+
+@pytest.fixture()
+def pool(tmp_path: Path):
+    p = ConnectionPool(tmp_path / "test.db")
+    p.writer.execute("CREATE TABLE t (v INTEGER)")
+    p.writer.commit()
+    yield p
+    p.close()
+
+
+class TestReaders:
+    def test_reader_reused_within_thread(self, pool: ConnectionPool) -> None:
+        assert pool.reader() is pool.reader()
+
+    def test_each_thread_gets_own_reader(self, pool: ConnectionPool) -> None:
+        seen: list[sqlite3.Connection] = []  # hold references so ids cannot be reused
+
+        def read() -> None:
+            seen.append(pool.reader())
+
+        threads = [threading.Thread(target=read) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len({id(conn) for conn in seen}) == 4
+        assert all(pool.reader() is not conn for conn in seen)
+
+    def test_reader_is_read_only(self, pool: ConnectionPool) -> None:
+        with pytest.raises(sqlite3.OperationalError):
+            pool.reader().execute("INSERT INTO t VALUES (1)")
+
+    def test_reader_sees_committed_writes(self, pool: ConnectionPool) -> None:
+        reader = pool.reader()
+        assert reader.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+        pool.writer.execute("INSERT INTO t VALUES (1)")
+        pool.writer.commit()
+        assert reader.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1
+
+    def test_close_closes_readers(self, tmp_path: Path) -> None:
+        p = ConnectionPool(tmp_path / "close.db")
+        reader = p.reader()
+        p.close()
+        with pytest.raises(sqlite3.ProgrammingError):
+            reader.execute("SELECT 1")
+
+
+class TestStoresUseReaders:
+    def test_cache_reads_do_not_take_write_lock(self, tmp_path: Path) -> None:
+        """CacheStore.get() completes while another thread holds the write lock."""
+        cache = CacheStore(db_path=tmp_path / "cache.db")
+        cache.put("1.2.3.4", "ipv4", "VT", {"verdict": "clean"})
+        results: list[dict | None] = []
+        with cache._lock:
+            t = threading.Thread(
+                target=lambda: results.append(
+                    cache.get("1.2.3.4", "ipv4", "VT", ttl_seconds=3600)
+                )
+            )
+            t.start()
+            t.join(timeout=5)
+        assert results and results[0] is not None
+
+    def test_history_reads_do_not_take_write_lock(self, tmp_path: Path) -> None:
+        """HistoryStore.load_analysis() completes while the write lock is held."""
+        store = HistoryStore(db_path=tmp_path / "history.db")
+        row_id = store.save_analysis("text", "online", [], [])
+        results: list[dict | None] = []
+        with store._lock:
+            t = threading.Thread(target=lambda: results.append(store.load_analysis(row_id)))
+            t.start()
+            t.join(timeout=5)
+        assert results and results[0] is not None
+        store.close()
@@ -194,6 +194,32 @@ class TestCertDataExtraction:
         f"Expected 50 subdomains (cap), got {len(result.raw_stats['subdomains'])}"
         )
 
+    def test_reading_stops_once_cap_reached(self) -> None:
+        """Certificates after the 50th unique subdomain are not read; result is marked truncated."""
+        ioc = make_domain_ioc("example.com")
+        certs = [
+            {"id": i, "name_value": f"sub{i:03d}.example.com", "not_before": "2024-01-01T00:00:00"}
+            for i in range(200)
+        ]
+
+        adapter = _make_adapter()
+        response = make_mock_response(200, certs)
+        mock_adapter_session(adapter, response=response)
+        result = adapter.lookup(ioc)
+
+        assert isinstance(result, EnrichmentResult)
+        assert len(result.raw_stats["subdomains"]) == 50
+        assert result.raw_stats["cert_count"] == 50
+        assert result.raw_stats["truncated"] is True
+        response.close.assert_called_once()
+
+    def test_complete_response_not_marked_truncated(self) -> None:
+        adapter = _make_adapter()
+        mock_adapter_session(adapter, response=make_mock_response(200, SAMPLE_CERTS))
+        result = adapter.lookup(make_domain_ioc("example.com"))
+
+        assert "truncated" not in result.raw_stats
+
     def test_null_not_before_skipped_in_date_range(self) -> None:
         """Cert entries with null/missing not_before are skipped when computing date range."""
         ioc = make_domain_ioc("example.com")
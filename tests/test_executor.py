@@ -0,0 +1,72 @@
+"""Tests for the shared fair enrichment executor (app/enrichment/executor.py)."""
+from __future__ import annotations
+
+import threading
+from concurrent.futures import as_completed
+
+import pytest
+
+from app.enrichment.executor import FairExecutor
+
+
+def test_runs_tasks_and_returns_results() -> None:
+    executor = FairExecutor(max_workers=4)
+    futures = [executor.submit("job", pow, i, 2) for i in range(10)]
+    assert sorted(f.result(timeout=5) for f in as_completed(futures)) == [i * i for i in range(10)]
+    executor.shutdown()
+    assert executor.metrics()["tasks_completed"] == 10
+
+
+def test_exceptions_delivered_through_future() -> None:
+    executor = FairExecutor(max_workers=1)
+
+    def boom() -> None:
+        raise ValueError("bad")
+
+    with pytest.raises(ValueError, match="bad"):
+        executor.submit("job", boom).result(timeout=5)
+    executor.shutdown()
+
+
+def test_thread_count_never_exceeds_cap() -> None:
+    executor = FairExecutor(max_workers=3)
+    release = threading.Event()
+    futures = [executor.submit(f"job{i % 2}", release.wait, 5) for i in range(20)]
+    metrics = executor.metrics()
+    assert metrics["threads"] <= 3
+    assert metrics["queue_depth"] + metrics["busy_workers"] <= 20
+    release.set()
+    for f in futures:
+        f.result(timeout=5)
+    assert executor.metrics()["threads"] <= 3
+    executor.shutdown()
+
+
+def test_small_job_not_starved_by_large_job() -> None:
+    """With one worker, a 3-task job interleaves with a 50-task job submitted first."""
+    executor = FairExecutor(max_workers=1)
+    gate = threading.Event()
+    order: list[str] = []
+
+    executor.submit("big", gate.wait, 5)  # occupy the worker while we queue
+    big = [executor.submit("big", order.append, "big") for _ in range(50)]
+    small = [executor.submit("small", order.append, "small") for _ in range(3)]
+    gate.set()
+    for f in big + small:
+        f.result(timeout=5)
+
+    last_small = max(i for i, name in enumerate(order) if name == "small")
+    assert last_small < 8  # served round-robin, not after all 50 big tasks
+    executor.shutdown()
+
+
+def test_submit_after_shutdown_rejected() -> None:
+    executor = FairExecutor(max_workers=1)
+    executor.shutdown()
+    with pytest.raises(RuntimeError):
+        executor.submit("job", print)
+
+
+def test_invalid_cap() -> None:
+    with pytest.raises(ValueError):
+        FairExecutor(max_workers=0)
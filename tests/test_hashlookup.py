@@ -263,3 +263,65 @@ class TestURLPattern:
         called_url = adapter._session.get.call_args.args[0]
         assert "/lookup/sha256/" in called_url, f"Expected /lookup/sha256/ in URL, got: {called_url}"
 
+
+
+class TestLookupBatch:
+
+    def test_bulk_post_per_hash_type(self) -> None:
+        """MD5 hashes go to /bulk/md5 in one POST carrying every hash."""
+        iocs = [make_md5_ioc("a" * 32), make_md5_ioc("d" * 32)]
+        mock_resp = make_mock_response(200, [HASHLOOKUP_FOUND_MD5_RESPONSE])
+
+        adapter = _make_adapter()
+        mock_adapter_session(adapter, method="post", response=mock_resp)
+        adapter.lookup_batch(iocs)
+
+        assert adapter._session.post.call_count == 1
+        call = adapter._session.post.call_args
+        assert call.args[0] == "https://hashlookup.circl.lu/bulk/md5"
+        assert call.kwargs["json"] == {"hashes": ["a" * 32, "d" * 32]}
+
+    def test_found_is_known_good_missing_is_no_data(self) -> None:
+        iocs = [make_md5_ioc("d" * 32), make_md5_ioc("A" * 32)]
+        mock_resp = make_mock_response(200, [HASHLOOKUP_FOUND_MD5_RESPONSE])
+
+        adapter = _make_adapter()
+        mock_adapter_session(adapter, method="post", response=mock_resp)
+        results = adapter.lookup_batch(iocs)
+
+        assert [r.verdict for r in results] == ["no_data", "known_good"]
+        assert [r.ioc for r in results] == iocs
+        assert results[1].raw_stats["file_name"] == "calc.exe"
+
+    def test_404_means_no_hash_known(self) -> None:
+        iocs = [make_sha1_ioc("b" * 40), make_sha1_ioc("e" * 40)]
+
+        adapter = _make_adapter()
+        mock_adapter_session(adapter, method="post", response=make_mock_response(404))
+        results = adapter.lookup_batch(iocs)
+
+        assert [r.verdict for r in results] == ["no_data", "no_data"]
+
+    def test_request_error_returned_for_every_ioc(self) -> None:
+        iocs = [make_md5_ioc("a" * 32), make_md5_ioc("d" * 32)]
+
+        adapter = _make_adapter()
+        mock_adapter_session(adapter, method="post", response=make_mock_response(503))
+        results = adapter.lookup_batch(iocs)
+
+        assert all(isinstance(r, EnrichmentError) for r in results)
+        assert [r.ioc for r in results] == iocs
+        assert results[0].error == "HTTP 503"
+
+    def test_sha256_falls_back_to_single_lookup(self) -> None:
+        ioc = make_sha256_ioc("c" * 64)
+
+        adapter = _make_adapter()
+        mock_adapter_session(
+            adapter, response=make_mock_response(200, HASHLOOKUP_FOUND_SHA256_RESPONSE)
+        )
+        results = adapter.lookup_batch([ioc])
+
+        adapter._session.post.assert_not_called()
+        assert isinstance(results[0], EnrichmentResult)
+        assert results[0].verdict == "known_good"
@@ -16,6 +16,8 @@ import pytest
 from app.enrichment.history_store import HistoryStore
 from app.pipeline.models import IOC, IOCType
 
+from tests.helpers import make_mock_orchestrator
+
 
 # ---------------------------------------------------------------------------
 # Fixtures
@@ -81,7 +83,7 @@ class TestEnrichmentSaveWrapper:
         """The wrapper calls enrich_all then saves to HistoryStore."""
         from app.routes._helpers import _run_enrichment_and_save
 
-        mock_orch = MagicMock()
+        mock_orch = make_mock_orchestrator()
         mock_orch.enrich_all.return_value = None
         mock_orch.get_status.return_value = {
             "total": 1,
@@ -104,11 +106,32 @@ class TestEnrichmentSaveWrapper:
         assert call_kwargs[1]["mode"] == "online"
         assert call_kwargs[1]["analysis_id"] == "test_job_id"
 
+    def test_cache_flushed_before_history_save(self):
+        """A write-behind cache store is flushed after enrichment, before saving."""
+        from app.routes._helpers import _run_enrichment_and_save
+
+        calls: list[str] = []
+        mock_orch = make_mock_orchestrator()
+        mock_orch.enrich_all.side_effect = lambda *a: calls.append("enrich")
+        mock_orch.get_status.return_value = {
+            "total": 0, "done": 0, "complete": True, "results": [],
+        }
+        mock_cache = MagicMock()
+        mock_cache.flush.side_effect = lambda: calls.append("flush")
+        mock_store = MagicMock()
+        mock_store.save_analysis.side_effect = lambda **kw: calls.append("save")
+
+        _run_enrichment_and_save(
+            mock_orch, "job", [], "input", "online", mock_store, mock_cache
+        )
+
+        assert calls == ["enrich", "flush", "save"]
+
     def test_save_failure_does_not_break_enrichment(self):
         """If HistoryStore.save_analysis raises, enrichment still completes."""
         from app.routes._helpers import _run_enrichment_and_save
 
-        mock_orch = MagicMock()
+        mock_orch = make_mock_orchestrator()
         mock_orch.enrich_all.return_value = None
         mock_orch.get_status.return_value = {
             "total": 1,
@@ -133,7 +156,7 @@ class TestEnrichmentSaveWrapper:
         """If orchestrator.get_status returns None, save is skipped."""
         from app.routes._helpers import _run_enrichment_and_save
 
-        mock_orch = MagicMock()
+        mock_orch = make_mock_orchestrator()
         mock_orch.enrich_all.return_value = None
         mock_orch.get_status.return_value = None
 
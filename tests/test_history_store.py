@@ -6,13 +6,14 @@ concurrent write safety.
 """
 from __future__ import annotations
 
+import json
 import threading
 import time
 from pathlib import Path
 
 import pytest
 
-from app.enrichment.history_store import HistoryStore, _compute_top_verdict
+from app.enrichment.history_store import HistoryStore, _compute_top_verdict, top_verdict
 
 
 # -- Fixtures ---------------------------------------------------------------
@@ -74,6 +75,20 @@ class TestSaveAndLoad:
         assert loaded["iocs"] == _SAMPLE_IOCS
         assert loaded["results"] == _SAMPLE_RESULTS
 
+    def test_roundtrip_pre_encoded_results(self, store: HistoryStore) -> None:
+        """results_json (e.g. joined result-log fragments) is stored without re-encoding."""
+        results_json = json.dumps(_SAMPLE_RESULTS, separators=(",", ":")).encode()
+        row_id = store.save_analysis(
+            "1.2.3.4 evil.com", "online", _SAMPLE_IOCS,
+            results_json=results_json, verdict="malicious",
+        )
+        loaded = store.load_analysis(row_id)
+        assert loaded["results"] == _SAMPLE_RESULTS
+        assert loaded["top_verdict"] == "malicious"
+
+        with pytest.raises(ValueError):
+            store.save_analysis("x", "online", [], results_json=b"[]")
+
     def test_load_returns_none_for_missing_id(self, store: HistoryStore) -> None:
         """load_analysis() returns None when the ID does not exist."""
         assert store.load_analysis("nonexistent") is None
@@ -204,6 +219,10 @@ class TestComputeTopVerdictUnit:
         """Entries without 'verdict' key are skipped."""
         assert _compute_top_verdict([{"type": "error"}, {"verdict": "clean"}]) == "clean"
 
+    def test_top_verdict_of_plain_verdicts(self) -> None:
+        assert top_verdict([None, "clean", "suspicious"]) == "suspicious"
+        assert top_verdict([None]) == "error"
+
 
 class TestIOCSerialization:
     """IOC serialization / deserialization fidelity tests."""
@@ -283,3 +302,39 @@ class TestDBCreation:
         # Verify it works by saving
         row_id = store.save_analysis("test", "online", [], [])
         assert store.load_analysis(row_id) is not None
+
+
+class TestPayloadCodec:
+    """Compressed payload storage and legacy TEXT rows."""
+
+    def test_payloads_stored_as_compressed_blobs(self, store: HistoryStore) -> None:
+        """Large result payloads are written as framed zlib BLOBs."""
+        results = [dict(_SAMPLE_RESULTS[0], provider=f"P{i}") for i in range(20)]
+        row_id = store.save_analysis("text", "online", _SAMPLE_IOCS, results)
+        blob = store._conn.execute(
+            "SELECT results_json FROM analysis_history WHERE id = ?", (row_id,)
+        ).fetchone()[0]
+        assert isinstance(blob, bytes)
+        assert blob[1] == 1  # zlib codec id
+        assert store.load_analysis(row_id)["results"] == results
+
+    def test_legacy_text_rows_still_load(self, store: HistoryStore) -> None:
+        """Rows written as plain JSON TEXT before the codec layer load unchanged."""
+        import json
+
+        store._conn.execute(
+            "INSERT INTO analysis_history "
+            "(id, input_text, mode, iocs_json, results_json, "
+            "total_count, top_verdict, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            ("legacy", "text", "online", json.dumps(_SAMPLE_IOCS),
+             json.dumps(_SAMPLE_RESULTS), 2, "malicious", "2025-01-01T00:00:00+00:00"),
+        )
+        store._conn.commit()
+
+        loaded = store.load_analysis("legacy")
+        assert loaded["iocs"] == _SAMPLE_IOCS
+        assert loaded["results"] == _SAMPLE_RESULTS
+
+    def test_unknown_codec_rejected(self, tmp_path: Path) -> None:
+        with pytest.raises(ValueError, match="Unknown payload codec"):
+            HistoryStore(db_path=tmp_path / "history.db", codec="lz4")
@@ -0,0 +1,118 @@
+"""Tests for the shared, host-keyed HTTP connection pools (app/enrichment/http_pool.py)."""
+from __future__ import annotations
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from app.enrichment.http_pool import (
+    HTTP_POOLS,
+    ConnectionPools,
+    PoolStats,
+    _CountingHTTPSConnectionPool,
+    _SharedPoolAdapter,
+)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture()
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture()
+def pools():
+    pools = ConnectionPools()
+    yield pools
+    pools.clear()
+
+
+def _session(pools: ConnectionPools, provider: str = "Stub") -> requests.Session:
+    session = requests.Session()
+    pools.mount(session, provider)
+    return session
+
+
+def test_connections_survive_session_rebuild(pools, server_url) -> None:
+    """A registry rebuild creates new sessions; they reuse the warm connection."""
+    first = _session(pools)
+    first.get(server_url + "/a").content
+    first.close()  # the shared pools must not be closed with the session
+
+    second = _session(pools)
+    second.get(server_url + "/b").content
+
+    stats = pools.snapshot()["127.0.0.1"]
+    assert stats["requests"] == 2
+    assert stats["misses"] == 1
+    assert stats["hits"] == 1
+
+
+def test_pool_size_follows_provider_config(pools, server_url) -> None:
+    pools.configure({"VirusTotal": 4, "Shodan InternetDB": 32})
+    _session(pools, "VirusTotal").get(server_url + "/vt").content
+    _session(pools, "Shodan InternetDB").get(server_url + "/shodan").content
+
+    open_pools = pools._manager.pools
+    sizes = sorted(open_pools[key].pool.maxsize for key in open_pools.keys())
+    assert sizes == [4, 32]
+    assert pools.pool_size("Unknown") == 10
+
+
+def test_tls_handshake_counted_when_connection_opens() -> None:
+    stats = PoolStats()
+    pool = _CountingHTTPSConnectionPool("example.com")
+    pool.stats = stats
+    conn = MagicMock(is_closed=True, is_verified=True)
+
+    pool._validate_conn(conn)
+    conn.is_closed = False
+    pool._validate_conn(conn)  # reused keep-alive connection: no handshake
+
+    assert stats.snapshot()["example.com"]["tls_handshakes"] == 1
+
+
+def test_base_adapter_sessions_use_shared_pools() -> None:
+    from app.enrichment.adapters.shodan import ShodanAdapter
+
+    adapter = ShodanAdapter(allowed_hosts=["internetdb.shodan.io"])
+    transport = adapter._session.get_adapter("https://internetdb.shodan.io/1.1.1.1")
+
+    assert isinstance(transport, _SharedPoolAdapter)
+    assert transport.poolmanager is HTTP_POOLS._manager
+
+
+def test_configure_is_idempotent(pools) -> None:
+    assert pools.configure({"VirusTotal": 4}) is False  # first configuration
+    assert pools.configure({"VirusTotal": 4}) is False
+    assert pools.configure({"VirusTotal": 8}) is True  # replaced different sizes
+    assert pools.pool_size("VirusTotal") == 8
+
+
+def test_create_app_sizes_pools_from_concurrency_caps(app) -> None:
+    assert HTTP_POOLS.pool_size("VirusTotal") == 4
+    assert HTTP_POOLS.pool_size("Shodan InternetDB") == app.config["ENRICHMENT_MAX_WORKERS"]
+    assert app.extensions["sentinelx.http"]["pool_sizes"]["VirusTotal"] == 4
@@ -1,17 +1,28 @@
 """Tests for safe_request() — canonical HTTP path for all enrichment adapters.
 
 Covers: success paths (GET/POST), SSRF rejection, every exception type in the
-chain, pre_raise_hook short-circuit and pass-through, and stream/redirect flags.
+chain, pre_raise_hook short-circuit and pass-through, and stream/redirect flags,
+plus the byte-capped readers read_limited() and iter_json_array().
 """
 from __future__ import annotations
 
+import datetime
 import json
+from email.utils import format_datetime
 from unittest.mock import MagicMock
 
 import pytest
 import requests
 
-from app.enrichment.http_safety import safe_request, validate_endpoint, read_limited
+from app.enrichment.http_safety import (
+    MAX_RESPONSE_BYTES,
+    READ_CHUNK_SIZE,
+    iter_json_array,
+    parse_retry_after,
+    read_limited,
+    safe_request,
+    validate_endpoint,
+)
 from app.enrichment.models import EnrichmentError, EnrichmentResult
 from tests.helpers import make_mock_response, make_ipv4_ioc
 
@@ -176,6 +187,52 @@ class TestSafeRequestExceptions:
         assert "something broke" in result.error
 
 
+# ── Retry-After ────────────────────────────────────────────────────────────
+
+
+class TestRetryAfter:
+    def test_parse_delta_seconds_and_dates(self):
+        assert parse_retry_after("120") == 120.0
+        future = datetime.datetime.now(tz=datetime.timezone.utc) + datetime.timedelta(seconds=60)
+        assert 55 <= parse_retry_after(format_datetime(future, usegmt=True)) <= 60
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0  # in the past
+        assert parse_retry_after("soon") is None
+        assert parse_retry_after(None) is None
+
+    def test_429_error_carries_retry_after(self):
+        resp = make_mock_response(429, None)
+        resp.headers = {"Retry-After": "30"}
+        session = _make_session_with(resp)
+
+        result = safe_request(session, URL, ALLOWED, IOC, PROVIDER)
+
+        assert isinstance(result, EnrichmentError)
+        assert result.error == "HTTP 429"
+        assert result.retry_after == 30.0
+
+    def test_hook_error_carries_retry_after(self):
+        resp = make_mock_response(429, None)
+        resp.headers = {"Retry-After": "12"}
+        session = _make_session_with(resp)
+        hook = MagicMock(return_value=EnrichmentError(
+            ioc=IOC, provider=PROVIDER, error="Rate limit exceeded (429)"
+        ))
+
+        result = safe_request(session, URL, ALLOWED, IOC, PROVIDER, pre_raise_hook=hook)
+
+        assert result.error == "Rate limit exceeded (429)"
+        assert result.retry_after == 12.0
+
+    def test_other_statuses_ignore_retry_after(self):
+        resp = make_mock_response(404, None)
+        resp.headers = {"Retry-After": "30"}
+        session = _make_session_with(resp)
+
+        result = safe_request(session, URL, ALLOWED, IOC, PROVIDER)
+
+        assert result.retry_after is None
+
+
 # ── pre_raise_hook ─────────────────────────────────────────────────────────
 
 
@@ -219,3 +276,165 @@ class TestSafeRequestPreRaiseHook:
         assert result == body
         hook.assert_called_once_with(resp)
         resp.raise_for_status.assert_called_once()
+
+
+# ── Adaptive timeouts and hedging ─────────────────────────────────────────
+
+
+class TestSafeRequestLatency:
+    def _warm(self, seconds: float, count: int = 20) -> None:
+        from app.enrichment.http_safety import PROVIDER_LATENCY
+
+        for _ in range(count):
+            PROVIDER_LATENCY.record(PROVIDER, seconds)
+
+    def test_response_time_recorded(self):
+        from app.enrichment.http_safety import PROVIDER_LATENCY
+
+        session = MagicMock()
+        session.get.side_effect = lambda url, **kwargs: make_mock_response(200, {"ok": True})
+        safe_request(session, URL, ALLOWED, IOC, PROVIDER)
+        safe_request(session, URL, ALLOWED, IOC, "Other")
+        stats = PROVIDER_LATENCY.snapshot()
+        assert stats[PROVIDER]["samples"] == 1
+        assert stats["Other"]["samples"] == 1
+
+    def test_timeout_recorded(self):
+        from app.enrichment.http_safety import PROVIDER_LATENCY
+
+        session = MagicMock()
+        session.get.side_effect = requests.exceptions.ReadTimeout()
+        safe_request(session, URL, ALLOWED, IOC, PROVIDER)
+        assert PROVIDER_LATENCY.snapshot()[PROVIDER]["samples"] == 1
+
+    def test_adapted_read_timeout_passed_to_session(self):
+        self._warm(0.1)
+        session = _make_session_with(make_mock_response(200, {"ok": True}))
+        safe_request(session, URL, ALLOWED, IOC, PROVIDER)
+        assert session.get.call_args.kwargs["timeout"] == (5, 2.0)
+
+    def _slow_then_fast_session(self):
+        import threading
+
+        calls = []
+        release = threading.Event()
+
+        def get(url, **kwargs):
+            calls.append(threading.current_thread().name)
+            if len(calls) == 1:
+                release.wait(5)  # the first attempt hangs
+                return make_mock_response(200, {"attempt": "first"})
+            return make_mock_response(200, {"attempt": "hedge"})
+
+        session = MagicMock()
+        session.get.side_effect = get
+        return session, calls, release
+
+    def test_hedge_fires_after_p95_and_first_answer_wins(self):
+        from app.enrichment.http_safety import PROVIDER_LATENCY
+
+        self._warm(0.05)
+        PROVIDER_LATENCY.hedging = True
+        session, calls, release = self._slow_then_fast_session()
+
+        result = safe_request(session, URL, ALLOWED, IOC, PROVIDER, hedge=True)
+        release.set()
+
+        assert result == {"attempt": "hedge"}
+        assert len(calls) == 2
+        assert PROVIDER_LATENCY.snapshot()[PROVIDER]["hedges"] == 1
+
+    def test_no_hedge_without_flag_or_for_post(self):
+        from app.enrichment.http_safety import PROVIDER_LATENCY
+
+        self._warm(0.05)
+        PROVIDER_LATENCY.hedging = True
+        session = _make_session_with(make_mock_response(200, {"ok": True}), method="post")
+        safe_request(session, URL, ALLOWED, IOC, PROVIDER, method="POST", hedge=True)
+        assert PROVIDER_LATENCY.snapshot()[PROVIDER]["hedges"] == 0
+
+        session, calls, release = self._slow_then_fast_session()
+        release.set()
+        assert safe_request(session, URL, ALLOWED, IOC, PROVIDER) == {"attempt": "first"}
+        assert len(calls) == 1
+
+
+# ── Streaming readers ──────────────────────────────────────────────────────
+
+
+def _chunked_response(raw: bytes, chunk: int = 7, headers: dict | None = None) -> MagicMock:
+    resp = MagicMock()
+    resp.headers = headers or {}
+    resp.iter_content = MagicMock(
+        return_value=iter([raw[i:i + chunk] for i in range(0, len(raw), chunk)])
+    )
+    return resp
+
+
+class TestReadLimited:
+    def test_parses_chunked_body_with_and_without_content_length(self):
+        body = {"data": ["é" * 50, list(range(200))]}
+        raw = json.dumps(body).encode()
+
+        assert read_limited(_chunked_response(raw)) == body
+        assert read_limited(
+            _chunked_response(raw, headers={"Content-Length": str(len(raw))})
+        ) == body
+
+    def test_declared_length_over_cap_rejected_before_reading(self):
+        resp = _chunked_response(b"{}", headers={"Content-Length": str(MAX_RESPONSE_BYTES + 1)})
+
+        with pytest.raises(ValueError, match="size limit"):
+            read_limited(resp)
+        resp.iter_content.assert_not_called()
+
+    def test_encoded_body_preallocation_capped(self):
+        """A huge declared Content-Length on a gzip body must not size the buffer."""
+        import tracemalloc
+
+        resp = _chunked_response(
+            b'{"ok": true}',
+            headers={"Content-Length": str(500 * 1024 * 1024), "Content-Encoding": "gzip"},
+        )
+        tracemalloc.start()
+        try:
+            assert read_limited(resp) == {"ok": True}
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        assert peak <= MAX_RESPONSE_BYTES + READ_CHUNK_SIZE
+
+    def test_streamed_bytes_over_cap_rejected(self):
+        raw = b"[" + b" " * MAX_RESPONSE_BYTES + b"]"
+        with pytest.raises(ValueError, match="size limit"):
+            read_limited(_chunked_response(raw, chunk=64 * 1024, headers={"Content-Length": "2"}))
+
+
+class TestIterJsonArray:
+    def test_yields_elements_split_across_chunks(self):
+        items = [{"id": i, "name_value": f"a{i}.example.com"} for i in range(20)] + [12345, "x"]
+        resp = _chunked_response(json.dumps(items).encode(), chunk=5)
+
+        assert list(iter_json_array(resp)) == items
+        resp.close.assert_not_called()
+
+    def test_empty_array(self):
+        assert list(iter_json_array(_chunked_response(b" [ ] "))) == []
+
+    def test_stopping_early_closes_response(self):
+        resp = _chunked_response(json.dumps(list(range(100))).encode())
+        elements = iter_json_array(resp)
+
+        assert [next(elements), next(elements)] == [0, 1]
+        elements.close()
+        resp.close.assert_called_once()
+
+    @pytest.mark.parametrize("raw", [b'{"a": 1}', b"[1, 2", b"[1 2]", b"[1,]"])
+    def test_malformed_or_non_array_raises_value_error(self, raw):
+        with pytest.raises(ValueError):
+            list(iter_json_array(_chunked_response(raw, chunk=2)))
+
+    def test_bytes_over_cap_rejected(self):
+        raw = b"[" + b"1," * (MAX_RESPONSE_BYTES // 2) + b"1]"
+        with pytest.raises(ValueError, match="size limit"):
+            list(iter_json_array(_chunked_response(raw, chunk=64 * 1024)))
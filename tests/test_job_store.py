@@ -0,0 +1,377 @@
+"""Tests for durable enrichment job state (app/enrichment/job_store.py).
+
+Covers:
+- Both JobStore implementations: appends, since cursors, progress, claims
+- SQLiteJobStore shared by two store instances (two worker processes)
+- JobLeases sweep: renew, claim, resume callback
+- Orchestrator write-through and resume from unfinished dispatch pairs
+- Status routes answering from the store for jobs run elsewhere
+- create_app resuming an interrupted job from a SQLite store
+"""
+from __future__ import annotations
+
+import json
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import app.enrichment.orchestrator as orchestrator_module
+import app.routes._helpers as helpers
+from app.enrichment.job_store import (
+    CANCELLED,
+    RESULT,
+    JobLeases,
+    MemoryJobStore,
+    SQLiteJobStore,
+    pair_key,
+)
+from app.enrichment.models import EnrichmentResult
+from app.enrichment.orchestrator import EnrichmentOrchestrator
+from app.enrichment.policy import REASON_QUOTA, LookupCancelled
+from app.enrichment.result_log import encode_cancelled, encode_result
+from app.enrichment.retry_scheduler import RetryScheduler
+from app.pipeline.models import IOC, IOCType
+
+_SPEC = {"input_text": "1.1.1.1", "mode": "online", "policy": None,
+         "iocs": [{"type": "ipv4", "value": "1.1.1.1", "raw_match": "1.1.1.1"}]}
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _ioc(value: str) -> IOC:
+    return IOC(type=IOCType.IPV4, value=value, raw_match=value)
+
+
+def _result(ioc: IOC, provider: str = "Stub", verdict: str = "clean") -> EnrichmentResult:
+    return EnrichmentResult(ioc=ioc, provider=provider, verdict=verdict, detection_count=0,
+                            total_engines=1, scan_date=None, raw_stats={})
+
+
+def _entry(value: str, provider: str = "Stub") -> tuple[str, bytes]:
+    ioc = _ioc(value)
+    return pair_key(provider, ioc), encode_result(_result(ioc, provider))
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store_and_clock(request, tmp_path):
+    clock = _Clock()
+    if request.param == "memory":
+        store = MemoryJobStore(clock=clock)
+    else:
+        store = SQLiteJobStore(tmp_path / "jobs.db", clock=clock)
+    yield store, clock
+    store.close()
+
+
+class TestJobStore:
+    def test_status_since_follows_appends(self, store_and_clock) -> None:
+        store, _ = store_and_clock
+        store.create("job", _SPEC, "owner-a")
+        store.start("job", 3)
+        store.append("job", RESULT, 0, [_entry("1.1.1.1"), _entry("2.2.2.2")])
+        cancelled = LookupCancelled(_ioc("3.3.3.3"), "Stub", REASON_QUOTA)
+        store.append("job", CANCELLED, 0, [(pair_key("Stub", cancelled.ioc),
+                                            encode_cancelled(cancelled))])
+
+        status = store.status_since("job", 1)
+        assert (status["total"], status["done"], status["complete"]) == (3, 3, False)
+        assert [json.loads(f)["ioc_value"] for f in status["fragments"]] == ["2.2.2.2"]
+        assert status["next_since"] == 2
+        assert status["cancelled"] == [{"type": "cancelled", "ioc_value": "3.3.3.3",
+                                        "ioc_type": "ipv4", "provider": "Stub",
+                                        "reason": REASON_QUOTA}]
+        assert status["next_cancelled_since"] == 1
+        assert store.status_since("job", 2, cancelled_since=1)["cancelled"] == []
+        assert store.progress("job") == (3, False)
+
+        store.complete("job")
+        assert store.progress("job") == (3, True)
+        assert store.status_since("missing", 0) is None
+        assert store.progress("missing") is None
+
+    def test_append_ignores_entries_already_logged(self, store_and_clock) -> None:
+        store, _ = store_and_clock
+        store.start("job", 2)
+        store.append("job", RESULT, 0, [_entry("1.1.1.1")])
+        store.append("job", RESULT, 0, [_entry("1.1.1.1"), _entry("2.2.2.2")])
+
+        results, cancelled = store.entries("job")
+        assert [pair for pair, _ in results] == ["Stub|ipv4|1.1.1.1", "Stub|ipv4|2.2.2.2"]
+        assert cancelled == []
+        assert store.progress("job") == (2, False)
+
+    def test_claims_only_expired_unfinished_jobs(self, store_and_clock) -> None:
+        store, clock = store_and_clock
+        store.create("live", _SPEC, "owner-a")
+        store.create("done", _SPEC, "owner-a")
+        store.complete("done")
+        store.start("no-spec", 1)  # registered by an orchestrator alone: not resumable
+
+        assert store.claim_interrupted("owner-b", lease_seconds=30) == {}
+        clock.now += 60
+        assert store.claim_interrupted("owner-b", lease_seconds=30) == {"live": _SPEC}
+        assert store.claim_interrupted("owner-c", lease_seconds=30) == {}  # owner-b holds it
+
+        clock.now += 60
+        store.renew("owner-b")
+        assert store.claim_interrupted("owner-c", lease_seconds=30) == {}
+
+    def test_released_jobs_are_claimed_at_once(self, store_and_clock) -> None:
+        store, _ = store_and_clock
+        store.create("job", _SPEC, "owner-a")
+        store.release("owner-a")
+        assert store.claim_interrupted("owner-b", lease_seconds=30) == {"job": _SPEC}
+
+
+class TestSQLiteJobStore:
+    def test_two_processes_share_job_state(self, tmp_path) -> None:
+        """A second store on the same file (another worker) sees every write."""
+        writer = SQLiteJobStore(tmp_path / "jobs.db")
+        reader = SQLiteJobStore(tmp_path / "jobs.db")
+        try:
+            writer.create("job", _SPEC, "owner-a")
+            writer.start("job", 2)
+            writer.append("job", RESULT, 0, [_entry("1.1.1.1")])
+            assert reader.status_since("job", 0)["next_since"] == 1
+
+            writer.append("job", RESULT, 1, [_entry("2.2.2.2")])
+            writer.complete("job")
+            status = reader.status_since("job", 1)
+            assert len(status["fragments"]) == 1
+            assert (status["done"], status["complete"]) == (2, True)
+        finally:
+            writer.close()
+            reader.close()
+
+    def test_prunes_oldest_finished_jobs(self, tmp_path) -> None:
+        clock = _Clock()
+        store = SQLiteJobStore(tmp_path / "jobs.db", max_jobs=2, clock=clock)
+        try:
+            for job_id in ("a", "b", "c"):
+                clock.now += 1
+                store.create(job_id, _SPEC, "owner")
+                store.append(job_id, RESULT, 0, [_entry("1.1.1.1")])
+                store.complete(job_id)
+            clock.now += 1
+            store.create("d", _SPEC, "owner")  # unfinished jobs are never pruned
+
+            assert store.progress("a") is None
+            assert store.entries("a") == ([], [])
+            assert all(store.progress(job_id) is not None for job_id in ("b", "c", "d"))
+        finally:
+            store.close()
+
+
+class TestJobLeases:
+    def test_run_once_resumes_claimed_jobs(self) -> None:
+        clock = _Clock()
+        store = MemoryJobStore(clock=clock)
+        store.create("mine", _SPEC, "me")
+        store.create("lost", _SPEC, "dead-process")
+        resume = MagicMock()
+        leases = JobLeases(store, resume, lease_seconds=30, owner="me")
+
+        clock.now += 60
+        assert leases.run_once() == ["lost"]  # "mine" was renewed first
+        resume.assert_called_once_with({"lost": _SPEC})
+
+        resume.reset_mock()
+        assert leases.run_once() == []
+        resume.assert_not_called()
+
+    def test_stop_releases_leases(self) -> None:
+        store = MemoryJobStore()
+        store.create("job", _SPEC, "me")
+        JobLeases(store, MagicMock(), owner="me").stop()
+        assert store.claim_interrupted("other", lease_seconds=30) == {"job": _SPEC}
+
+
+class _Immediate(RetryScheduler):
+    def call_later(self, delay, fn, *args) -> None:
+        fn(*args)
+
+
+def _adapter() -> MagicMock:
+    adapter = MagicMock()
+    adapter.name = "Stub"
+    adapter.requires_api_key = False
+    adapter.supported_types = {IOCType.IPV4}
+    adapter.lookup.side_effect = lambda ioc: _result(ioc, "Stub", "malicious")
+    return adapter
+
+
+def _orchestrator(adapter, store) -> EnrichmentOrchestrator:
+    return EnrichmentOrchestrator(adapters=[adapter], job_store=store,
+                                  retry_scheduler=_Immediate(), batch_window=None)
+
+
+class TestOrchestratorWriteThrough:
+    def test_results_land_in_store_in_memory_order(self) -> None:
+        store = MemoryJobStore()
+        orchestrator = _orchestrator(_adapter(), store)
+        orchestrator.enrich_all("job", [_ioc("1.1.1.1"), _ioc("2.2.2.2")])
+
+        memory = orchestrator.get_status_since("job", 0)
+        stored = store.status_since("job", 0)
+        assert stored["fragments"] == memory["fragments"]
+        assert (stored["total"], stored["done"], stored["complete"]) == (2, 2, True)
+
+    def test_resume_dispatches_only_unfinished_pairs(self) -> None:
+        store = MemoryJobStore()
+        store.create("job", _SPEC, "dead-process")
+        store.append("job", RESULT, 0, [_entry("1.1.1.1")])
+        adapter = _adapter()
+
+        iocs = [_ioc("1.1.1.1"), _ioc("2.2.2.2")]
+        _orchestrator(adapter, store).enrich_all("job", iocs)
+
+        assert [call.args[0].value for call in adapter.lookup.call_args_list] == ["2.2.2.2"]
+        stored = store.status_since("job", 0)
+        assert (stored["total"], stored["done"], stored["complete"]) == (2, 2, True)
+        assert [json.loads(f)["verdict"] for f in stored["fragments"]] == ["clean", "malicious"]
+
+    def test_resumed_results_are_rebuilt_around_job_iocs(self) -> None:
+        store = MemoryJobStore()
+        store.start("job", 1)
+        store.append("job", RESULT, 0, [_entry("1.1.1.1")])
+        iocs = [IOC(type=IOCType.IPV4, value="1.1.1.1", raw_match="1[.]1[.]1[.]1")]
+        orchestrator = _orchestrator(_adapter(), store)
+
+        orchestrator.enrich_all("job", iocs)
+
+        result = orchestrator.get_status("job")["results"][0]
+        assert result.ioc is iocs[0]
+        assert result.verdict == "clean"
+
+    def test_store_is_written_outside_the_orchestrator_lock(self) -> None:
+        store = MemoryJobStore()
+        orchestrator = _orchestrator(_adapter(), store)
+        held = []
+        real_append = store.append
+
+        def append(*args) -> None:
+            held.append(orchestrator._lock.locked())
+            real_append(*args)
+
+        store.append = append
+        orchestrator.enrich_all("job", [_ioc("1.1.1.1"), _ioc("2.2.2.2")])
+
+        assert held and not any(held)
+        assert len(store.status_since("job", 0)["fragments"]) == 2
+
+    def test_failed_writes_are_retried_without_a_gap(self) -> None:
+        store = MemoryJobStore()
+        real_append = store.append
+        failures = iter([OSError("disk full")] * 2)
+
+        def append(*args) -> None:
+            error = next(failures, None)
+            if error is not None:
+                raise error
+            real_append(*args)
+
+        store.append = append
+        orchestrator = _orchestrator(_adapter(), store)
+        with patch.object(orchestrator_module, "_STORE_RETRY_DELAYS", (0, 0, 0)):
+            orchestrator.enrich_all("job", [_ioc("1.1.1.1"), _ioc("2.2.2.2")])
+
+        stored = store.status_since("job", 0)
+        assert stored["fragments"] == orchestrator.get_status_since("job", 0)["fragments"]
+        assert (stored["done"], stored["complete"]) == (2, True)
+
+    def test_job_the_store_keeps_refusing_is_abandoned(self) -> None:
+        store = MagicMock()
+        store.entries.return_value = ([], [])
+        store.append.side_effect = OSError("disk full")
+        orchestrator = _orchestrator(_adapter(), store)
+
+        with patch.object(orchestrator_module, "_STORE_RETRY_DELAYS", (0, 0, 0)):
+            orchestrator.enrich_all("job", [_ioc("1.1.1.1")])
+
+        assert orchestrator.get_status("job")["done"] == 1  # the job itself still finishes
+        store.complete.assert_not_called()
+        store.abandon.assert_called_once_with("job")
+
+    def test_unreadable_store_abandons_the_job_before_running_it(self) -> None:
+        store = MagicMock()
+        store.entries.side_effect = OSError("locked")
+        adapter = _adapter()
+        orchestrator = _orchestrator(adapter, store)
+
+        with patch.object(orchestrator_module, "_STORE_RETRY_DELAYS", (0, 0, 0)):
+            orchestrator.enrich_all("job", [_ioc("1.1.1.1")])
+
+        adapter.lookup.assert_not_called()
+        store.append.assert_not_called()
+        store.abandon.assert_called_once_with("job")
+
+
+class TestStatusFromStore:
+    """A job another worker runs is served from the shared store."""
+
+    def _store_job(self, app) -> None:
+        store = app.job_store = MemoryJobStore()
+        store.create("elsewhere", _SPEC, "other-worker")
+        store.start("elsewhere", 2)
+        store.append("elsewhere", RESULT, 0, [_entry("1.1.1.1"), _entry("2.2.2.2")])
+
+    def test_api_status_reads_store(self, app, client) -> None:
+        self._store_job(app)
+        assert "elsewhere" not in helpers._orchestrators
+
+        data = client.get("/api/status/elsewhere?since=1").get_json()
+
+        assert (data["total"], data["done"], data["complete"]) == (2, 2, False)
+        assert [r["ioc_value"] for r in data["results"]] == ["2.2.2.2"]
+        assert data["next_since"] == 2
+        assert client.get("/api/status/unknown").status_code == 404
+
+    def test_stream_polls_store_until_complete(self, app, client) -> None:
+        self._store_job(app)
+        threading.Timer(0.2, app.job_store.complete, args=("elsewhere",)).start()
+
+        with patch.object(helpers, "_STORE_POLL_SECONDS", 0.05):
+            body = client.get("/api/stream/elsewhere").get_data(as_text=True)
+
+        statuses = [line for line in body.splitlines() if line.startswith("data: ")]
+        assert json.loads(statuses[0][6:])["complete"] is False
+        assert json.loads(statuses[-1][6:])["complete"] is True
+
+
+def test_create_app_resumes_interrupted_jobs(tmp_path) -> None:
+    from app import create_app
+
+    db_path = tmp_path / "jobs.db"
+    previous = SQLiteJobStore(db_path)
+    spec = dict(_SPEC, policy={"stop_on_first_malicious_per_ioc": True,
+                               "deadline_seconds": None, "max_quota_spend": None})
+    previous.create("interrupted", spec, "stopped-process")
+    previous.release("stopped-process")  # a clean shutdown hands its jobs back
+    previous.close()
+
+    with patch.object(helpers, "_submit_job") as submit:
+        app = create_app({"TESTING": True, "CACHE_MAINTENANCE_INTERVAL": 0,
+                          "JOB_STORE": "sqlite", "JOB_STORE_PATH": str(db_path)})
+    try:
+        submit.assert_called_once()
+        job_id, orchestrator, iocs, text, mode, _, policy = submit.call_args.args
+        assert job_id == "interrupted"
+        assert orchestrator._job_store is app.job_store
+        assert iocs == [_ioc("1.1.1.1")]
+        assert (text, mode) == ("1.1.1.1", "online")
+        assert policy.stop_on_first_malicious_per_ioc is True
+    finally:
+        app.job_leases.stop()
+        app.job_store.close()
+
+
+def test_create_app_attaches_no_store_by_default(app) -> None:
+    assert app.job_store is None
+    assert app.job_leases is None
@@ -0,0 +1,65 @@
+"""Tests for per-provider latency tracking (app/enrichment/latency.py)."""
+from __future__ import annotations
+
+from app.enrichment.latency import MIN_READ_TIMEOUT, LatencyTracker
+
+DEFAULT = (5, 30)
+
+
+def _tracker(samples: list[float], **kwargs) -> LatencyTracker:
+    tracker = LatencyTracker(DEFAULT, min_samples=10, **kwargs)
+    for seconds in samples:
+        tracker.record("P", seconds)
+    return tracker
+
+
+class TestLatencyTracker:
+    def test_static_timeout_until_min_samples(self):
+        tracker = _tracker([0.1] * 9)
+        assert tracker.percentile("P", 0.95) is None
+        assert tracker.adapted_timeout("P") is None
+        assert tracker.timeout("P") == DEFAULT
+        assert tracker.timeout("unknown") == DEFAULT
+
+    def test_fast_provider_gets_floor_timeout(self):
+        tracker = _tracker([0.1] * 20)
+        assert tracker.timeout("P") == (5, MIN_READ_TIMEOUT)
+
+    def test_read_timeout_tracks_p95(self):
+        tracker = _tracker([1.0] * 19 + [4.0])
+        assert tracker.percentile("P", 0.50) == 1.0
+        assert tracker.percentile("P", 0.95) == 4.0
+        assert tracker.timeout("P") == (5, 12.0)
+
+    def test_slow_provider_capped_at_static_timeout(self):
+        tracker = _tracker([20.0] * 20)
+        assert tracker.timeout("P") == DEFAULT
+
+    def test_window_forgets_old_samples(self):
+        tracker = LatencyTracker(DEFAULT, window=10, min_samples=10)
+        for seconds in [25.0] * 10 + [0.5] * 10:
+            tracker.record("P", seconds)
+        assert tracker.percentile("P", 0.95) == 0.5
+
+    def test_hedge_delay_requires_hedging(self):
+        assert _tracker([1.0] * 20).hedge_delay("P") is None
+        assert _tracker([1.0] * 20, hedging=True).hedge_delay("P") == 1.0
+        assert _tracker([1.0] * 5, hedging=True).hedge_delay("P") is None
+
+    def test_configure_is_idempotent(self):
+        tracker = _tracker([])
+        assert tracker.configure(hedging=True) is False  # first configuration
+        assert tracker.configure(hedging=True) is False
+        assert tracker.hedging is True
+        assert tracker.configure(hedging=False) is True  # replaced a different setting
+        assert tracker.hedging is False
+
+    def test_snapshot(self):
+        tracker = _tracker([0.1] * 20)
+        tracker.record_hedge("P")
+        assert tracker.snapshot() == {
+            "P": {"samples": 20, "p50_ms": 100.0, "p95_ms": 100.0, "hedges": 1,
+                  "read_timeout_s": MIN_READ_TIMEOUT},
+        }
+        tracker.reset()
+        assert tracker.snapshot() == {}
@@ -0,0 +1,55 @@
+"""Tests for the negative-cache error policy (app/enrichment/negative_cache.py)."""
+from __future__ import annotations
+
+import pytest
+
+from app.enrichment.negative_cache import (
+    ERROR_CLASS_TTLS,
+    classify_error,
+    negative_ttl,
+)
+
+
+@pytest.mark.parametrize(
+    ("error", "expected"),
+    [
+        ("Unsupported type", "unsupported"),
+        ("Invalid IP address", "unsupported"),
+        ("WHOIS quota exceeded", "quota"),
+        ("HTTP 404", "not_found"),
+        ("HTTP 410", "not_found"),
+        ("HTTP 400", "bad_request"),
+        ("HTTP 422", "bad_request"),
+    ],
+)
+def test_deterministic_errors_classified(error: str, expected: str) -> None:
+    assert classify_error(error) == expected
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        "Request timed out",
+        "Connection failed",
+        "SSL/TLS error",
+        "HTTP 500",
+        "HTTP 503",
+        "HTTP 429",
+        "Rate limit exceeded (429)",
+        "Authentication error (401)",
+        "WHOIS command failed",
+        "Unexpected error: boom",
+    ],
+)
+def test_transient_errors_not_cached(error: str) -> None:
+    assert classify_error(error) is None
+    assert negative_ttl("VirusTotal", error) is None
+
+
+def test_default_ttl_per_class() -> None:
+    assert negative_ttl("Shodan InternetDB", "HTTP 404") == ("not_found", ERROR_CLASS_TTLS["not_found"])
+
+
+def test_provider_override() -> None:
+    assert negative_ttl("VirusTotal", "HTTP 404") == ("not_found", 24 * 3600)
+    assert negative_ttl("WHOIS", "WHOIS quota exceeded") == ("quota", 15 * 60)
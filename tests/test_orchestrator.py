@@ -24,6 +24,7 @@ from app.enrichment.orchestrator import (
     _BACKOFF_BASE,
     _MAX_RATE_LIMIT_RETRIES,
 )
+from app.enrichment.retry_scheduler import RetryScheduler
 from app.pipeline.models import IOC, IOCType
 
 
@@ -51,8 +52,21 @@ def _make_error(ioc: IOC, msg: str = "Timeout", provider: str = "VirusTotal") ->
     return EnrichmentError(ioc=ioc, provider=provider, error=msg)
 
 
-def _make_orchestrator(adapter, max_workers: int = 4) -> EnrichmentOrchestrator:
-    return EnrichmentOrchestrator(adapters=[adapter], max_workers=max_workers)
+class _ImmediateScheduler(RetryScheduler):
+    """RetryScheduler that runs callbacks at once and records the requested delays."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.delays: list[float] = []
+
+    def call_later(self, delay, fn, *args) -> None:
+        self.delays.append(delay)
+        fn(*args)
+
+
+def _make_orchestrator(adapter, max_workers: int = 4, **kwargs) -> EnrichmentOrchestrator:
+    kwargs.setdefault("retry_scheduler", _ImmediateScheduler())
+    return EnrichmentOrchestrator(adapters=[adapter], max_workers=max_workers, **kwargs)
 
 
 def _make_mock_adapter(supported_types: set | None = None) -> MagicMock:
@@ -110,8 +124,7 @@ class TestEnrichAll:
         mock_adapter.requires_api_key = False  # no semaphore gating
 
         orchestrator = _make_orchestrator(mock_adapter, max_workers=5)
-        with patch("app.enrichment.orchestrator.time.sleep"):
-            orchestrator.enrich_all("job-parallel", iocs)
+        orchestrator.enrich_all("job-parallel", iocs)
 
         status = orchestrator.get_status("job-parallel")
         assert len(status["results"]) == 5
@@ -149,17 +162,16 @@ class TestEnrichAll:
         mock_adapter.lookup.side_effect = side_effect
 
         orchestrator = _make_orchestrator(mock_adapter)
-        with patch("app.enrichment.orchestrator.time.sleep"):
-            orchestrator.enrich_all("job-isolation", [ioc_a, ioc_b, ioc_c])
+        orchestrator.enrich_all("job-isolation", [ioc_a, ioc_b, ioc_c])
 
-            status = orchestrator.get_status("job-isolation")
-            assert len(status["results"]) == 3
+        status = orchestrator.get_status("job-isolation")
+        assert len(status["results"]) == 3
 
-            results = status["results"]
-            error_count = sum(1 for r in results if isinstance(r, EnrichmentError))
-            success_count = sum(1 for r in results if isinstance(r, EnrichmentResult))
-            assert error_count == 1
-            assert success_count == 2
+        results = status["results"]
+        error_count = sum(1 for r in results if isinstance(r, EnrichmentError))
+        success_count = sum(1 for r in results if isinstance(r, EnrichmentResult))
+        assert error_count == 1
+        assert success_count == 2
 
 
 class TestRetryBehavior:
@@ -176,13 +188,12 @@ class TestRetryBehavior:
         mock_adapter.lookup.side_effect = [error_result, success_result]
 
         orchestrator = _make_orchestrator(mock_adapter)
-        with patch("app.enrichment.orchestrator.time.sleep"):
-            orchestrator.enrich_all("job-retry-success", [ioc])
+        orchestrator.enrich_all("job-retry-success", [ioc])
 
-            status = orchestrator.get_status("job-retry-success")
-            assert len(status["results"]) == 1
-            assert isinstance(status["results"][0], EnrichmentResult)
-            assert mock_adapter.lookup.call_count == 2
+        status = orchestrator.get_status("job-retry-success")
+        assert len(status["results"]) == 1
+        assert isinstance(status["results"][0], EnrichmentResult)
+        assert mock_adapter.lookup.call_count == 2
 
     def test_retry_still_fails(self, mock_adapter):
         """Adapter returns EnrichmentError on both calls.
@@ -195,13 +206,12 @@ class TestRetryBehavior:
         mock_adapter.lookup.side_effect = [error_result, error_result]
 
         orchestrator = _make_orchestrator(mock_adapter)
-        with patch("app.enrichment.orchestrator.time.sleep"):
-            orchestrator.enrich_all("job-retry-fail", [ioc])
+        orchestrator.enrich_all("job-retry-fail", [ioc])
 
-            status = orchestrator.get_status("job-retry-fail")
-            assert len(status["results"]) == 1
-            assert isinstance(status["results"][0], EnrichmentError)
-            assert mock_adapter.lookup.call_count == 2
+        status = orchestrator.get_status("job-retry-fail")
+        assert len(status["results"]) == 1
+        assert isinstance(status["results"][0], EnrichmentError)
+        assert mock_adapter.lookup.call_count == 2
 
 
 class TestJobStatusTracking:
@@ -249,6 +259,34 @@ class TestJobStatusTracking:
         orchestrator = _make_orchestrator(mock_adapter)
         assert orchestrator.get_status("nonexistent") is None
 
+    def test_wait_for_update_wakes_on_each_result(self, mock_adapter):
+        """wait_for_update returns as soon as a lookup finishes, not on timeout."""
+        iocs = [_make_ioc(IOCType.IPV4, f"10.0.0.{i}") for i in range(2)]
+        release = threading.Event()
+
+        def lookup(ioc):
+            if ioc is iocs[1]:
+                release.wait(5)
+            return _make_result(ioc)
+
+        mock_adapter.lookup.side_effect = lookup
+        orchestrator = _make_orchestrator(mock_adapter, batch_window=None)
+        runner = threading.Thread(target=orchestrator.enrich_all, args=("job-wait", iocs))
+        runner.start()
+        try:
+            while orchestrator.get_status("job-wait") is None:
+                time.sleep(0.001)
+            assert orchestrator.wait_for_update("job-wait", 0, timeout=5) is True
+            done = orchestrator.get_status("job-wait")["done"]
+            assert done == 1
+            assert orchestrator.wait_for_update("job-wait", done, timeout=0.05) is False
+            release.set()
+            assert orchestrator.wait_for_update("job-wait", done, timeout=5) is True
+        finally:
+            release.set()
+            runner.join(5)
+        assert orchestrator.wait_for_update("nonexistent", 0, timeout=0) is True
+
 
 class TestLRUEviction:
 
@@ -347,18 +385,19 @@ class TestMultiAdapterDispatch:
         adapter_a.lookup.return_value = _make_error(ioc, msg="Timeout", provider="ProviderA")
         adapter_b.lookup.return_value = _make_result(ioc, provider="ProviderB")
 
-        orchestrator = EnrichmentOrchestrator(adapters=[adapter_a, adapter_b], max_workers=4)
-        with patch("app.enrichment.orchestrator.time.sleep"):
-            orchestrator.enrich_all("job-provider-isolation", [ioc])
+        orchestrator = EnrichmentOrchestrator(
+            adapters=[adapter_a, adapter_b], max_workers=4, retry_scheduler=_ImmediateScheduler()
+        )
+        orchestrator.enrich_all("job-provider-isolation", [ioc])
 
-            status = orchestrator.get_status("job-provider-isolation")
-            # Both results present: one error from a, one result from b
-            assert len(status["results"]) == 2
+        status = orchestrator.get_status("job-provider-isolation")
+        # Both results present: one error from a, one result from b
+        assert len(status["results"]) == 2
 
-            error_count = sum(1 for r in status["results"] if isinstance(r, EnrichmentError))
-            result_count = sum(1 for r in status["results"] if isinstance(r, EnrichmentResult))
-            assert error_count == 1
-            assert result_count == 1
+        error_count = sum(1 for r in status["results"] if isinstance(r, EnrichmentError))
+        result_count = sum(1 for r in status["results"] if isinstance(r, EnrichmentResult))
+        assert error_count == 1
+        assert result_count == 1
 
 
 # ---------------------------------------------------------------------------
@@ -421,8 +460,7 @@ class TestPerProviderSemaphore:
         vt_adapter.lookup.side_effect = coordinated_vt_lookup
 
         orchestrator = EnrichmentOrchestrator(adapters=[vt_adapter], max_workers=20)
-        with patch("app.enrichment.orchestrator.time.sleep"):
-            orchestrator.enrich_all("job-semaphore-cap", iocs)
+        orchestrator.enrich_all("job-semaphore-cap", iocs)
 
         status = orchestrator.get_status("job-semaphore-cap")
         assert len(status["results"]) == 8
@@ -451,8 +489,7 @@ class TestPerProviderSemaphore:
         orchestrator = EnrichmentOrchestrator(
             adapters=[vt_adapter, dns_adapter], max_workers=20
         )
-        with patch("app.enrichment.orchestrator.time.sleep"):
-            orchestrator.enrich_all("job-dns-free", iocs)
+        orchestrator.enrich_all("job-dns-free", iocs)
 
         status = orchestrator.get_status("job-dns-free")
         assert len(status["results"]) == 16, (
@@ -518,8 +555,8 @@ class TestBackoff429:
     """Prove that 429 rate-limit errors trigger exponential backoff, not immediate retry.
 
     These tests verify that:
-    - 429/rate-limit errors cause time.sleep() calls before retrying
-    - Non-429 errors do NOT trigger time.sleep() (immediate retry preserved)
+    - 429/rate-limit errors schedule the retry after a backoff delay
+    - Non-429 errors schedule a single retry 1s out
     - All retries exhaust correctly (3 total attempts for 429)
     - Delay values increase exponentially across successive retries
     - Both "429" numeric and "rate limit" string variants trigger backoff
@@ -529,7 +566,7 @@ class TestBackoff429:
         """Adapter returns 429 error on first call, EnrichmentResult on second.
 
         Expects:
-        - time.sleep called at least once with delay ≥ _BACKOFF_BASE
+        - a retry scheduled at least once with delay ≥ _BACKOFF_BASE
         - Final result is EnrichmentResult (retry after backoff succeeded)
         - adapter.lookup called exactly 2 times (initial + 1 retry)
         """
@@ -540,18 +577,18 @@ class TestBackoff429:
             _make_result(ioc, provider="VirusTotal"),
         ]
 
-        orchestrator = _make_orchestrator(adapter)
-        with patch("app.enrichment.orchestrator.time.sleep") as mock_sleep:
-            orchestrator.enrich_all("job-429-sleep", [ioc])
+        scheduler = _ImmediateScheduler()
+        orchestrator = _make_orchestrator(adapter, retry_scheduler=scheduler)
+        orchestrator.enrich_all("job-429-sleep", [ioc])
 
         status = orchestrator.get_status("job-429-sleep")
         assert isinstance(status["results"][0], EnrichmentResult), (
             "Expected EnrichmentResult after retry, got EnrichmentError"
         )
-        assert mock_sleep.call_count >= 1, "Expected time.sleep to be called for 429 backoff"
-        sleep_arg = mock_sleep.call_args_list[0][0][0]
-        assert sleep_arg >= _BACKOFF_BASE, (
-            f"First backoff delay {sleep_arg:.1f}s must be ≥ base {_BACKOFF_BASE}s"
+        assert len(scheduler.delays) >= 1, "Expected a retry to be scheduled for 429 backoff"
+        delay = scheduler.delays[0]
+        assert delay >= _BACKOFF_BASE, (
+            f"First backoff delay {delay:.1f}s must be ≥ base {_BACKOFF_BASE}s"
         )
         assert adapter.lookup.call_count == 2
 
@@ -559,7 +596,7 @@ class TestBackoff429:
         """Adapter returns generic Timeout error on first call, success on second.
 
         Expects:
-        - time.sleep called exactly once with a 1s delay (new non-429 retry delay)
+        - a retry scheduled exactly once with a 1s delay
         - Final result is EnrichmentResult (retry succeeded)
         - adapter.lookup called exactly 2 times
         """
@@ -570,27 +607,22 @@ class TestBackoff429:
             _make_result(ioc, provider="VirusTotal"),
         ]
 
-        orchestrator = _make_orchestrator(adapter)
-        with patch("app.enrichment.orchestrator.time.sleep") as mock_sleep:
-            orchestrator.enrich_all("job-timeout-no-sleep", [ioc])
+        scheduler = _ImmediateScheduler()
+        orchestrator = _make_orchestrator(adapter, retry_scheduler=scheduler)
+        orchestrator.enrich_all("job-timeout-no-sleep", [ioc])
 
         status = orchestrator.get_status("job-timeout-no-sleep")
         assert isinstance(status["results"][0], EnrichmentResult), (
             "Expected EnrichmentResult after immediate retry"
         )
-        assert mock_sleep.call_count == 1, (
-            "Non-429 retry should sleep exactly once (1s delay)"
-        )
-        assert mock_sleep.call_args_list[0][0][0] == 1, (
-            "Non-429 retry delay should be 1 second"
-        )
+        assert scheduler.delays == [1], "Non-429 retry should be scheduled once, 1s out"
         assert adapter.lookup.call_count == 2
 
     def test_triple_429_exhausts_retries(self):
         """Adapter returns HTTP 429 on all 3 calls — retries exhaust, final result is error.
 
         Expects:
-        - time.sleep called exactly _MAX_RATE_LIMIT_RETRIES (2) times
+        - a retry scheduled exactly _MAX_RATE_LIMIT_RETRIES (2) times
         - Final result is EnrichmentError (all attempts failed)
         - adapter.lookup called exactly 3 times (1 initial + 2 retries)
         """
@@ -599,17 +631,16 @@ class TestBackoff429:
         error = _make_error(ioc, msg="HTTP 429", provider="VirusTotal")
         adapter.lookup.return_value = error  # all calls return 429
 
-        orchestrator = _make_orchestrator(adapter)
-        with patch("app.enrichment.orchestrator.time.sleep") as mock_sleep:
-            orchestrator.enrich_all("job-triple-429", [ioc])
+        scheduler = _ImmediateScheduler()
+        orchestrator = _make_orchestrator(adapter, retry_scheduler=scheduler)
+        orchestrator.enrich_all("job-triple-429", [ioc])
 
         status = orchestrator.get_status("job-triple-429")
         assert isinstance(status["results"][0], EnrichmentError), (
             "Expected EnrichmentError after exhausting all 429 retries"
         )
-        assert mock_sleep.call_count == _MAX_RATE_LIMIT_RETRIES, (
-            f"Expected {_MAX_RATE_LIMIT_RETRIES} sleep calls for {_MAX_RATE_LIMIT_RETRIES} retries, "
-            f"got {mock_sleep.call_count}"
+        assert len(scheduler.delays) == _MAX_RATE_LIMIT_RETRIES, (
+            f"Expected {_MAX_RATE_LIMIT_RETRIES} scheduled retries, got {len(scheduler.delays)}"
         )
         assert adapter.lookup.call_count == 3, (
             f"Expected 3 total lookup calls (1 initial + {_MAX_RATE_LIMIT_RETRIES} retries), "
@@ -617,32 +648,31 @@ class TestBackoff429:
         )
 
     def test_backoff_delays_increase_exponentially(self):
-        """On successive 429 errors, each sleep delay must be greater than the previous.
+        """On successive 429 errors, each retry delay must be greater than the previous.
 
         With base=15s, multiplier=2: attempt 1 ≈ 15s, attempt 2 ≈ 30s (+jitter).
-        Asserts second sleep arg > first sleep arg.
+        Asserts second delay > first delay.
         """
         ioc = _make_ioc(IOCType.IPV4, "4.5.6.7")
         adapter = _make_vt_adapter()
         error = _make_error(ioc, msg="HTTP 429", provider="VirusTotal")
         adapter.lookup.return_value = error
 
-        orchestrator = _make_orchestrator(adapter)
-        with patch("app.enrichment.orchestrator.time.sleep") as mock_sleep:
-            orchestrator.enrich_all("job-exp-backoff", [ioc])
+        scheduler = _ImmediateScheduler()
+        orchestrator = _make_orchestrator(adapter, retry_scheduler=scheduler)
+        orchestrator.enrich_all("job-exp-backoff", [ioc])
 
-        assert mock_sleep.call_count == _MAX_RATE_LIMIT_RETRIES, (
-            f"Expected {_MAX_RATE_LIMIT_RETRIES} sleep calls, got {mock_sleep.call_count}"
+        assert len(scheduler.delays) == _MAX_RATE_LIMIT_RETRIES, (
+            f"Expected {_MAX_RATE_LIMIT_RETRIES} scheduled retries, got {len(scheduler.delays)}"
         )
-        delay_1 = mock_sleep.call_args_list[0][0][0]
-        delay_2 = mock_sleep.call_args_list[1][0][0]
+        delay_1, delay_2 = scheduler.delays
         assert delay_2 > delay_1, (
             f"Second delay ({delay_2:.1f}s) must exceed first delay ({delay_1:.1f}s) "
             "for exponential backoff"
         )
 
     def test_rate_limit_string_without_429_triggers_backoff(self):
-        """'Rate limit exceeded' (no numeric 429) also triggers backoff sleep.
+        """'Rate limit exceeded' (no numeric 429) also triggers backoff.
 
         Verifies that case-insensitive 'rate limit' substring match works
         independently of the numeric code.
@@ -654,104 +684,126 @@ class TestBackoff429:
             _make_result(ioc, provider="VirusTotal"),
         ]
 
-        orchestrator = _make_orchestrator(adapter)
-        with patch("app.enrichment.orchestrator.time.sleep") as mock_sleep:
-            orchestrator.enrich_all("job-ratelimit-string", [ioc])
+        scheduler = _ImmediateScheduler()
+        orchestrator = _make_orchestrator(adapter, retry_scheduler=scheduler)
+        orchestrator.enrich_all("job-ratelimit-string", [ioc])
 
         status = orchestrator.get_status("job-ratelimit-string")
         assert isinstance(status["results"][0], EnrichmentResult)
-        assert mock_sleep.call_count >= 1, (
-            "'Rate limit exceeded' (no 429 code) must still trigger backoff sleep"
+        assert scheduler.delays and scheduler.delays[0] >= _BACKOFF_BASE, (
+            "'Rate limit exceeded' (no 429 code) must still trigger backoff"
         )
 
+    def test_retry_after_sets_delay(self):
+        """A Retry-After sent with the 429 replaces the exponential backoff."""
+        ioc = _make_ioc(IOCType.IPV4, "5.6.7.9")
+        adapter = _make_vt_adapter()
+        adapter.lookup.side_effect = [
+            EnrichmentError(ioc=ioc, provider="VirusTotal", error="HTTP 429", retry_after=7.0),
+            _make_result(ioc, provider="VirusTotal"),
+        ]
+
+        scheduler = _ImmediateScheduler()
+        orchestrator = _make_orchestrator(adapter, retry_scheduler=scheduler)
+        orchestrator.enrich_all("job-retry-after", [ioc])
+
+        assert scheduler.delays == [7.0]
+        assert isinstance(orchestrator.get_status("job-retry-after")["results"][0],
+                          EnrichmentResult)
+
+    def test_retry_after_beyond_cap_gives_up(self):
+        ioc = _make_ioc(IOCType.IPV4, "5.6.7.10")
+        adapter = _make_vt_adapter()
+        adapter.lookup.return_value = EnrichmentError(
+            ioc=ioc, provider="VirusTotal", error="HTTP 429", retry_after=3600.0
+        )
+
+        scheduler = _ImmediateScheduler()
+        orchestrator = _make_orchestrator(adapter, retry_scheduler=scheduler)
+        orchestrator.enrich_all("job-retry-after-long", [ioc])
+
+        assert scheduler.delays == []
+        assert adapter.lookup.call_count == 1
+
 
 # ---------------------------------------------------------------------------
 # Tests — M004 S01 concurrency correctness fixes
 # ---------------------------------------------------------------------------
 
 
+class _HeldScheduler(RetryScheduler):
+    """RetryScheduler that keeps every callback until release() is called."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.held: list[tuple] = []
+
+    def call_later(self, delay, fn, *args) -> None:
+        self.held.append((delay, fn, args))
+
+    def release(self) -> None:
+        held, self.held = self.held, []
+        for _, fn, args in held:
+            fn(*args)
+
+
 class TestSemaphoreReleasedDuringBackoff:
-    """Prove that the semaphore is released before time.sleep() during 429 backoff.
+    """Prove that neither the semaphore nor a worker is held during 429 backoff.
 
-    Before the fix, the semaphore was held for the entire retry cycle (including
-    sleep), so all N slots slept simultaneously and starved every other queued IOC.
-    After the fix, the semaphore is released before sleep so other threads can run.
+    Originally the semaphore was held for the entire retry cycle (including
+    sleep), so all N slots slept simultaneously and starved every other queued
+    IOC; later the worker thread still slept.  Now the retry waits in the
+    RetryScheduler, so the semaphore slot and the worker are both free.
     """
 
-    def test_semaphore_released_during_backoff_sleep(self):
-        """IOC-B should complete while IOC-A is sleeping after a 429.
+    def test_semaphore_and_worker_released_during_backoff(self):
+        """IOC-B should complete while IOC-A's retry is waiting after a 429.
 
-        Uses threading.Event coordination:
-        - IOC-A hits 429 → sets 'sleeping' event → (would) sleep
-        - IOC-B waits for 'sleeping' event → acquires semaphore → completes
-        - Assert IOC-B completed before mock_sleep returned (i.e. sem was released)
-
-        With semaphore cap=1, if the sem were held during sleep, IOC-B would
-        block waiting for IOC-A to wake up, and 'b_completed' would never be set.
+        One worker and a semaphore cap of 1: if either were held while IOC-A
+        waits for its retry, IOC-B could not run until the retry was released.
         """
-        sleeping_event = threading.Event()   # set when IOC-A is about to sleep
-        b_completed_event = threading.Event()  # set when IOC-B finishes its lookup
-        # We need to detect when IOC-B completes while the sleep mock is "sleeping"
-        b_completed_before_sleep_returns = threading.Event()
-
         ioc_a = _make_ioc(IOCType.IPV4, "10.0.0.1")
         ioc_b = _make_ioc(IOCType.IPV4, "10.0.0.2")
+        b_completed = threading.Event()
+        a_calls = [0]
 
         adapter = _make_keyed_adapter("VirusTotal", supported_types={IOCType.IPV4})
-        result_a = _make_result(ioc_a, provider="VirusTotal")
-        result_b = _make_result(ioc_b, provider="VirusTotal")
-
-        error_429 = _make_error(ioc_a, msg="HTTP 429", provider="VirusTotal")
-
-        call_count = {"a": 0, "b": 0}
-        call_lock = threading.Lock()
 
         def side_effect(ioc):
-            with call_lock:
-                if ioc.value == ioc_a.value:
-                    call_count["a"] += 1
-                    if call_count["a"] == 1:
-                        return error_429  # first call → 429
-                    return result_a      # retry → success
-                else:
-                    call_count["b"] += 1
-                    result = result_b
-                    b_completed_event.set()
-                    return result
+            if ioc.value == ioc_a.value:
+                a_calls[0] += 1
+                if a_calls[0] == 1:
+                    return _make_error(ioc, msg="HTTP 429", provider="VirusTotal")
+                return _make_result(ioc, provider="VirusTotal")
+            b_completed.set()
+            return _make_result(ioc, provider="VirusTotal")
 
         adapter.lookup.side_effect = side_effect
 
-        # Orchestrator with cap=1 so the behaviour is maximal — if sem were held
-        # during sleep, IOC-B could not proceed at all.
+        scheduler = _HeldScheduler()
         orchestrator = EnrichmentOrchestrator(
             adapters=[adapter],
-            max_workers=4,
+            max_workers=1,
             provider_concurrency={"VirusTotal": 1},
+            retry_scheduler=scheduler,
         )
+        job = threading.Thread(
+            target=orchestrator.enrich_all, args=("job-sem-sleep", [ioc_a, ioc_b])
+        )
+        job.start()
 
-        sleep_call_count = [0]
-
-        def fake_sleep(duration):
-            sleep_call_count[0] += 1
-            if sleep_call_count[0] == 1:
-                # Signal "about to sleep" — IOC-B can now try to acquire sem
-                sleeping_event.set()
-                # Wait briefly to give IOC-B a chance to acquire and complete
-                b_completed_event.wait(timeout=2.0)
-                if b_completed_event.is_set():
-                    b_completed_before_sleep_returns.set()
-
-        with patch("app.enrichment.orchestrator.time.sleep", side_effect=fake_sleep):
-            orchestrator.enrich_all("job-sem-sleep", [ioc_a, ioc_b])
+        assert b_completed.wait(2.0), (
+            "IOC-B should have completed while IOC-A's retry was pending (semaphore or "
+            "worker held during backoff)"
+        )
+        assert len(scheduler.held) == 1
+        assert scheduler.held[0][0] >= _BACKOFF_BASE
+        scheduler.release()
+        job.join(5)
 
         status = orchestrator.get_status("job-sem-sleep")
-        assert len(status["results"]) == 2, (
-            f"Expected 2 results, got {len(status['results'])}"
-        )
-        assert b_completed_before_sleep_returns.is_set(), (
-            "IOC-B should have completed while IOC-A was sleeping (semaphore was not released "
-            "before sleep — bug still present)"
-        )
+        assert len(status["results"]) == 2
+        assert all(isinstance(r, EnrichmentResult) for r in status["results"])
 
 
 class TestGetStatusListSnapshot:
@@ -788,15 +840,149 @@ class TestGetStatusListSnapshot:
         )
 
 
+class TestGetStatusSince:
+    """get_status_since() returns only the results after the caller's cursor."""
+
+    def test_returns_delta_and_next_cursor(self, mock_adapter):
+        iocs = [_make_ioc(IOCType.IPV4, f"10.1.0.{i}") for i in range(5)]
+        mock_adapter.lookup.side_effect = [_make_result(ioc) for ioc in iocs]
+        orchestrator = _make_orchestrator(mock_adapter)
+        orchestrator.enrich_all("job-since", iocs)
+        full = orchestrator.get_status("job-since")["results"]
+
+        status = orchestrator.get_status_since("job-since", 3)
+
+        assert status["results"] == full[3:]
+        assert status["next_since"] == 5
+        assert (status["total"], status["done"], status["complete"]) == (5, 5, True)
+        assert orchestrator.get_status_since("job-since", 5)["results"] == []
+        assert orchestrator.get_status_since("job-since", 99)["results"] == []
+        assert orchestrator.get_status_since("job-since", -2)["results"] == full
+
+    def test_cancelled_sliced_by_their_own_cursor(self):
+        from app.enrichment.policy import JobPolicy
+
+        vt = _make_mock_adapter({IOCType.IPV4})
+        vt.name = "VirusTotal"
+        vt.requires_api_key = True
+        vt.lookup.side_effect = lambda i: _make_result(i)
+        iocs = [_make_ioc(IOCType.IPV4, f"10.1.2.{i}") for i in range(5)]
+        orchestrator = EnrichmentOrchestrator(adapters=[vt])
+        orchestrator.enrich_all("job-since-cancel", iocs, policy=JobPolicy(max_quota_spend=2))
+        full = orchestrator.get_status("job-since-cancel")["cancelled"]
+
+        status = orchestrator.get_status_since("job-since-cancel", 0, cancelled_since=2)
+
+        assert status["cancelled"] == full[2:]
+        assert status["next_cancelled_since"] == 3
+        assert orchestrator.get_status_since("job-since-cancel", 0)["cancelled"] == full
+        assert orchestrator.get_status_since("job-since-cancel", 0, 3)["cancelled"] == []
+
+    def test_delta_is_a_copy(self, mock_adapter):
+        ioc = _make_ioc(IOCType.IPV4, "10.1.1.1")
+        mock_adapter.lookup.return_value = _make_result(ioc)
+        orchestrator = _make_orchestrator(mock_adapter)
+        orchestrator.enrich_all("job-since-copy", [ioc])
+
+        orchestrator.get_status_since("job-since-copy", 0)["results"].clear()
+
+        assert len(orchestrator.get_status("job-since-copy")["results"]) == 1
+
+    def test_unknown_job(self, mock_adapter):
+        assert _make_orchestrator(mock_adapter).get_status_since("nonexistent", 0) is None
+
+
+class TestResultLog:
+    """Each result is encoded once as it is recorded (result_log.py)."""
+
+    def test_each_result_encoded_once(self, mock_adapter):
+        import json
+
+        from app.enrichment import orchestrator as orchestrator_module
+        from app.enrichment.result_log import join_fragments, result_to_dict
+
+        iocs = [_make_ioc(IOCType.IPV4, f"10.2.0.{i}") for i in range(3)]
+        mock_adapter.lookup.side_effect = [_make_result(ioc) for ioc in iocs]
+        orchestrator = _make_orchestrator(mock_adapter)
+
+        with patch.object(
+            orchestrator_module, "encode_result", wraps=orchestrator_module.encode_result
+        ) as encode:
+            orchestrator.enrich_all("job-log", iocs)
+            for since in (0, 1, 0):
+                status = orchestrator.get_status_since("job-log", since)
+
+        assert encode.call_count == 3
+        assert json.loads(join_fragments(status["fragments"])) == [
+            result_to_dict(r) for r in status["results"]
+        ]
+        assert "fragments" not in orchestrator.get_status("job-log")
+
+    def test_cache_hit_fragment_carries_cached_at(self):
+        import json
+
+        ioc = _make_ioc(IOCType.IPV4, "10.2.1.1")
+        adapter = _make_public_adapter("DNS", supported_types={IOCType.IPV4})
+        cache = MagicMock()
+        cache.get_many.return_value = {
+            (ioc.value, "ipv4", "DNS"): {
+                "provider": "DNS", "verdict": "clean", "detection_count": 0,
+                "total_engines": 1, "scan_date": None, "raw_stats": {},
+                "cached_at": "2024-01-01T00:00:00+00:00",
+            },
+        }
+        cache.get_negative_many.return_value = {}
+        orchestrator = EnrichmentOrchestrator(adapters=[adapter], cache=cache)
+        orchestrator.enrich_all("job-log-cached", [ioc])
+
+        fragment = orchestrator.get_status_since("job-log-cached", 0)["fragments"][0]
+        assert json.loads(fragment)["cached_at"] == "2024-01-01T00:00:00+00:00"
+
+
+class TestCachedMarkersPerJob:
+    """Cached markers live in their job's record and are evicted with it."""
+
+    @staticmethod
+    def _cached_orchestrator(**kwargs) -> EnrichmentOrchestrator:
+        adapter = _make_public_adapter("DNS", supported_types={IOCType.IPV4})
+        cache = MagicMock()
+        cache.get_many.side_effect = lambda keys, ttl: {
+            key: {
+                "provider": "DNS", "verdict": "clean", "detection_count": 0,
+                "total_engines": 1, "scan_date": None, "raw_stats": {},
+                "cached_at": "2024-01-01T00:00:00+00:00",
+            }
+            for key in keys
+        }
+        cache.get_negative_many.return_value = {}
+        return EnrichmentOrchestrator(adapters=[adapter], cache=cache, **kwargs)
+
+    def test_markers_scoped_to_their_job(self):
+        orchestrator = self._cached_orchestrator()
+        orchestrator.enrich_all("job-a", [_make_ioc(IOCType.IPV4, "10.4.0.1")])
+        orchestrator.enrich_all("job-b", [_make_ioc(IOCType.IPV4, "10.4.0.2")])
+
+        assert set(orchestrator.cached_markers_for("job-a")) == {"10.4.0.1|DNS"}
+        assert set(orchestrator.cached_markers_for("job-b")) == {"10.4.0.2|DNS"}
+        assert orchestrator.cached_markers_for("nonexistent") == {}
+
+    def test_markers_evicted_with_job(self):
+        orchestrator = self._cached_orchestrator(max_jobs=2)
+        for i in range(5):
+            orchestrator.enrich_all(f"job-{i}", [_make_ioc(IOCType.IPV4, f"10.4.1.{i}")])
+
+        assert set(orchestrator.cached_markers) == {"10.4.1.3|DNS", "10.4.1.4|DNS"}
+
+
 class TestCachedMarkersLock:
     """Prove that _cached_markers reads and writes are protected by _lock."""
 
     def test_cached_markers_write_protected_by_lock(self):
-        """Concurrent cache hits must not corrupt _cached_markers.
+        """Bulk cache hits must all be recorded in _cached_markers.
 
-        Submits 8 IOCs concurrently to an adapter with a mock cache that always
-        returns hits. After completion, cached_markers must contain exactly 8 entries
-        (no missing entries, no KeyError).
+        Submits 8 IOCs to an adapter with a mock cache whose get_many() returns
+        hits for every key. After completion, cached_markers must contain exactly
+        8 entries (no missing entries, no KeyError).
         """
         iocs = [_make_ioc(IOCType.IPV4, f"10.0.0.{i}") for i in range(8)]
 
@@ -804,12 +990,15 @@ class TestCachedMarkersLock:
 
         # Build cache mock that returns hits for all IOCs
         cache_mock = MagicMock()
-        cache_mock.get.side_effect = lambda value, type_, provider, ttl: {
-            "provider": "VirusTotal",
-            "verdict": "clean",
-            "detection_count": 0,
-            "total_engines": 10,
-            "cached_at": "2024-01-01T00:00:00",
+        cache_mock.get_many.side_effect = lambda keys, ttl: {
+            key: {
+                "provider": "VirusTotal",
+                "verdict": "clean",
+                "detection_count": 0,
+                "total_engines": 10,
+                "cached_at": "2024-01-01T00:00:00",
+            }
+            for key in keys
         }
 
         orchestrator = EnrichmentOrchestrator(
@@ -829,3 +1018,611 @@ class TestCachedMarkersLock:
         for ioc in iocs:
             key = f"{ioc.value}|VirusTotal"
             assert key in markers, f"Missing cached_markers entry for {key}"
+
+
+class TestBulkCachePrepass:
+    """Prove that enrich_all resolves cache hits in one bulk pass before dispatch."""
+
+    def test_only_cache_misses_reach_adapter(self, tmp_path):
+        """Warm IOCs are served from one get_many() call; only the cold IOC is looked up."""
+        from app.cache.store import CacheStore
+
+        cache = CacheStore(db_path=tmp_path / "cache.db")
+        warm = [_make_ioc(IOCType.IPV4, f"10.0.2.{i}") for i in range(3)]
+        cold = _make_ioc(IOCType.IPV4, "10.0.2.99")
+        for ioc in warm:
+            cache.put(ioc.value, "ipv4", "DNS", {
+                "provider": "DNS",
+                "verdict": "clean",
+                "detection_count": 0,
+                "total_engines": 1,
+                "scan_date": None,
+                "raw_stats": {},
+            })
+
+        adapter = _make_public_adapter("DNS", supported_types={IOCType.IPV4})
+        adapter.lookup.side_effect = lambda ioc: _make_result(ioc, provider="DNS")
+
+        orchestrator = EnrichmentOrchestrator(adapters=[adapter], cache=cache)
+        with patch.object(cache, "get_many", wraps=cache.get_many) as spy:
+            orchestrator.enrich_all("job-prepass", warm + [cold])
+
+        assert spy.call_count == 1
+        adapter.lookup.assert_called_once_with(cold)
+        status = orchestrator.get_status("job-prepass")
+        assert status["done"] == status["total"] == 4
+        assert status["complete"] is True
+        assert set(orchestrator.cached_markers) == {f"{ioc.value}|DNS" for ioc in warm}
+
+    def test_fully_cached_job_submits_no_work(self):
+        """A job where every pair is a cache hit completes without calling lookup()."""
+        ioc = _make_ioc(IOCType.IPV4, "10.0.3.1")
+        adapter = _make_public_adapter("DNS", supported_types={IOCType.IPV4})
+        cache_mock = MagicMock()
+        cache_mock.get_many.return_value = {
+            (ioc.value, "ipv4", "DNS"): {
+                "provider": "DNS",
+                "verdict": "clean",
+                "detection_count": 0,
+                "total_engines": 1,
+                "cached_at": "2024-01-01T00:00:00",
+            }
+        }
+
+        orchestrator = EnrichmentOrchestrator(adapters=[adapter], cache=cache_mock)
+        orchestrator.enrich_all("job-all-cached", [ioc])
+
+        adapter.lookup.assert_not_called()
+        status = orchestrator.get_status("job-all-cached")
+        assert status["complete"] is True
+        assert len(status["results"]) == 1
+
+
+class TestNegativeCache:
+    """Deterministic errors are negatively cached and not retried."""
+
+    def test_deterministic_error_cached_and_served_without_lookup(self, tmp_path):
+        from app.cache.store import CacheStore
+
+        cache = CacheStore(db_path=tmp_path / "cache.db")
+        ioc = _make_ioc(IOCType.IPV4, "10.0.4.1")
+        adapter = _make_keyed_adapter("AbuseIPDB", supported_types={IOCType.IPV4})
+        adapter.lookup.return_value = _make_error(ioc, msg="HTTP 422", provider="AbuseIPDB")
+
+        scheduler = _ImmediateScheduler()
+        first = EnrichmentOrchestrator(adapters=[adapter], cache=cache, retry_scheduler=scheduler)
+        first.enrich_all("job-neg-1", [ioc])
+        assert adapter.lookup.call_count == 1  # no retry for a deterministic error
+        assert scheduler.delays == []
+
+        second = EnrichmentOrchestrator(adapters=[adapter], cache=cache)
+        second.enrich_all("job-neg-2", [ioc])
+        assert adapter.lookup.call_count == 1
+        (result,) = second.get_status("job-neg-2")["results"]
+        assert isinstance(result, EnrichmentError)
+        assert result.error == "HTTP 422"
+        assert cache.stats()["negative_hits"] == 1
+
+    def test_transient_error_not_cached(self, tmp_path):
+        from app.cache.store import CacheStore
+
+        cache = CacheStore(db_path=tmp_path / "cache.db")
+        ioc = _make_ioc(IOCType.IPV4, "10.0.4.2")
+        adapter = _make_keyed_adapter("AbuseIPDB", supported_types={IOCType.IPV4})
+        adapter.lookup.return_value = _make_error(ioc, msg="Request timed out", provider="AbuseIPDB")
+
+        EnrichmentOrchestrator(
+            adapters=[adapter], cache=cache, retry_scheduler=_ImmediateScheduler()
+        ).enrich_all("job-t", [ioc])
+        assert adapter.lookup.call_count == 2  # retried once
+        assert cache.stats()["negative_entries"] == 0
+
+
+class TestSingleFlight:
+    """Concurrent identical lookups across orchestrators issue one request."""
+
+    def test_two_jobs_share_one_lookup(self):
+        from app.enrichment.singleflight import SingleFlight
+
+        flights = SingleFlight()
+        ioc_a = _make_ioc(IOCType.IPV4, "10.0.5.1")
+        ioc_b = IOC(type=IOCType.IPV4, value="10.0.5.1", raw_match="10[.]0[.]5[.]1")
+        release = threading.Event()
+        adapter = _make_keyed_adapter("VirusTotal", supported_types={IOCType.IPV4})
+
+        def slow_lookup(ioc):
+            release.wait(5)
+            return _make_result(ioc)
+
+        adapter.lookup.side_effect = slow_lookup
+        first = EnrichmentOrchestrator(adapters=[adapter], singleflight=flights)
+        second = EnrichmentOrchestrator(adapters=[adapter], singleflight=flights)
+
+        t1 = threading.Thread(target=first.enrich_all, args=("job-sf-1", [ioc_a]))
+        t1.start()
+        while flights.in_flight() == 0:
+            time.sleep(0.001)
+        t2 = threading.Thread(target=second.enrich_all, args=("job-sf-2", [ioc_b]))
+        t2.start()
+        time.sleep(0.05)
+        release.set()
+        t1.join(5)
+        t2.join(5)
+
+        assert adapter.lookup.call_count == 1
+        (r1,) = first.get_status("job-sf-1")["results"]
+        (r2,) = second.get_status("job-sf-2")["results"]
+        assert r1.verdict == r2.verdict == "clean"
+        assert r2.ioc is ioc_b  # follower keeps its own IOC
+        assert "10.0.5.1|VirusTotal" in second.cached_markers
+        assert "10.0.5.1|VirusTotal" not in first.cached_markers
+
+
+class TestRateLimiter:
+    """Token-bucket pacing through the shared RateLimiter."""
+
+    def test_budget_exhausted_short_circuits_lookup(self):
+        from app.enrichment.orchestrator import BUDGET_EXHAUSTED_ERROR
+        from app.enrichment.rate_limit import RateLimit, RateLimiter
+
+        limiter = RateLimiter({"VirusTotal": RateLimit(6000, 10, daily_budget=2)})
+        iocs = [_make_ioc(IOCType.IPV4, f"10.0.6.{i}") for i in range(3)]
+        adapter = _make_keyed_adapter("VirusTotal", supported_types={IOCType.IPV4})
+        adapter.lookup.side_effect = lambda ioc: _make_result(ioc)
+
+        scheduler = _ImmediateScheduler()
+        orchestrator = EnrichmentOrchestrator(
+            adapters=[adapter], rate_limiter=limiter, retry_scheduler=scheduler
+        )
+        orchestrator.enrich_all("job-budget", iocs)
+
+        assert adapter.lookup.call_count == 2
+        errors = [r for r in orchestrator.get_status("job-budget")["results"]
+                  if isinstance(r, EnrichmentError)]
+        assert [e.error for e in errors] == [BUDGET_EXHAUSTED_ERROR]
+        assert scheduler.delays == []
+
+    def test_429_on_paced_provider_drains_bucket_without_blind_sleep(self):
+        from app.enrichment.rate_limit import RateLimit, RateLimiter
+
+        limiter = RateLimiter({"VirusTotal": RateLimit(60_000, 1)})  # 1 ms per token
+        ioc = _make_ioc(IOCType.IPV4, "10.0.6.9")
+        adapter = _make_keyed_adapter("VirusTotal", supported_types={IOCType.IPV4})
+        adapter.lookup.side_effect = [
+            _make_error(ioc, msg="HTTP 429", provider="VirusTotal"),
+            _make_result(ioc),
+        ]
+        scheduler = _ImmediateScheduler()
+        orchestrator = EnrichmentOrchestrator(
+            adapters=[adapter], rate_limiter=limiter, retry_scheduler=scheduler
+        )
+        with patch.object(limiter, "penalize", wraps=limiter.penalize) as penalize:
+            orchestrator.enrich_all("job-429-paced", [ioc])
+
+        assert all(delay < 1 for delay in scheduler.delays)  # token waits only
+        penalize.assert_called_once_with("VirusTotal")
+        (result,) = orchestrator.get_status("job-429-paced")["results"]
+        assert isinstance(result, EnrichmentResult)
+
+    def test_token_wait_does_not_hold_a_worker(self):
+        from app.enrichment.rate_limit import RateLimit, RateLimiter
+
+        clock = [1000.0]
+        limiter = RateLimiter({"VirusTotal": RateLimit(4, 1)}, clock=lambda: clock[0])
+        vt = _make_keyed_adapter("VirusTotal", supported_types={IOCType.IPV4})
+        vt.lookup.side_effect = lambda ioc: _make_result(ioc)
+        dns = _make_public_adapter("DNS", supported_types={IOCType.IPV4})
+        dns.lookup.side_effect = lambda ioc: _make_result(ioc, provider="DNS")
+        iocs = [_make_ioc(IOCType.IPV4, f"10.0.6.{i}") for i in (20, 21)]
+        scheduler = _HeldScheduler()
+        orchestrator = EnrichmentOrchestrator(
+            adapters=[vt, dns], max_workers=1, rate_limiter=limiter, retry_scheduler=scheduler
+        )
+
+        job = threading.Thread(target=orchestrator.enrich_all, args=("job-token-wait", iocs))
+        job.start()
+        deadline = time.monotonic() + 2
+        while orchestrator.get_status("job-token-wait")["done"] < 3:
+            assert time.monotonic() < deadline, "DNS lookups stuck behind a VT token wait"
+            time.sleep(0.005)
+
+        assert [round(delay) for delay, _, _ in scheduler.held] == [15]  # 4/min
+        clock[0] += 15
+        scheduler.release()
+        job.join(5)
+
+        assert orchestrator.get_status("job-token-wait")["done"] == 4
+        assert vt.lookup.call_count == 2
+
+
+class TestSharedExecutor:
+    """Orchestrators submit to a shared FairExecutor when one is given."""
+
+    def test_jobs_use_shared_executor(self):
+        from app.enrichment.executor import FairExecutor
+
+        executor = FairExecutor(max_workers=2)
+        adapter = _make_public_adapter("DNS", supported_types={IOCType.IPV4})
+        adapter.lookup.side_effect = lambda ioc: _make_result(ioc, provider="DNS")
+        iocs = [_make_ioc(IOCType.IPV4, f"10.0.7.{i}") for i in range(6)]
+
+        for n in range(2):
+            orchestrator = EnrichmentOrchestrator(adapters=[adapter], executor=executor)
+            orchestrator.enrich_all(f"job-shared-{n}", iocs)
+            assert orchestrator.get_status(f"job-shared-{n}")["done"] == 6
+
+        metrics = executor.metrics()
+        assert metrics["tasks_completed"] == 12
+        assert metrics["threads"] <= 2
+        executor.shutdown()
+
+
+class TestDispatchPriority:
+    """Cache misses are submitted fastest-provider first."""
+
+    def _adapter(self, name: str, calls: list):
+        adapter = _make_public_adapter(name, supported_types={IOCType.DOMAIN})
+        adapter.lookup.side_effect = lambda ioc: calls.append(name) or _make_result(ioc, provider=name)
+        return adapter
+
+    def test_slow_providers_dispatched_last(self):
+        from app.enrichment.executor import FairExecutor
+
+        calls: list[str] = []
+        adapters = [self._adapter(n, calls) for n in ("WHOIS", "Cert History", "DNS Records")]
+        executor = FairExecutor(max_workers=1)
+        orchestrator = EnrichmentOrchestrator(adapters=adapters, executor=executor)
+
+        orchestrator.enrich_all("job-priority", [_make_ioc(IOCType.DOMAIN, "evil.com")])
+        executor.shutdown()
+
+        assert calls == ["DNS Records", "WHOIS", "Cert History"]
+
+    def test_priority_override(self):
+        from app.enrichment.executor import FairExecutor
+
+        calls: list[str] = []
+        adapters = [self._adapter(n, calls) for n in ("DNS Records", "WHOIS")]
+        executor = FairExecutor(max_workers=1)
+        orchestrator = EnrichmentOrchestrator(
+            adapters=adapters, executor=executor, provider_priority={"DNS Records": 9}
+        )
+
+        orchestrator.enrich_all("job-priority", [_make_ioc(IOCType.DOMAIN, "evil.com")])
+        executor.shutdown()
+
+        assert calls == ["WHOIS", "DNS Records"]
+
+
+class TestJobPolicy:
+    """Early-termination policies passed to enrich_all."""
+
+    def _malicious(self, ioc, provider):
+        return EnrichmentResult(ioc=ioc, provider=provider, verdict="malicious",
+                                detection_count=5, total_engines=10, scan_date=None,
+                                raw_stats={})
+
+    def test_stop_on_first_malicious_cancels_rest_of_ioc(self):
+        from app.enrichment.executor import FairExecutor
+        from app.enrichment.policy import JobPolicy
+
+        ioc = _make_ioc(IOCType.DOMAIN, "evil.com")
+        dns = _make_public_adapter("DNS Records", supported_types={IOCType.DOMAIN})
+        dns.lookup.side_effect = lambda i: self._malicious(i, "DNS Records")
+        slow = [_make_public_adapter(n, supported_types={IOCType.DOMAIN})
+                for n in ("WHOIS", "Cert History")]
+        executor = FairExecutor(max_workers=1)
+        orchestrator = EnrichmentOrchestrator(adapters=[dns, *slow], executor=executor)
+
+        orchestrator.enrich_all(
+            "job-stop", [ioc], policy=JobPolicy(stop_on_first_malicious_per_ioc=True)
+        )
+        executor.shutdown()
+
+        status = orchestrator.get_status("job-stop")
+        assert status["done"] == status["total"] == 3
+        assert [r.provider for r in status["results"]] == ["DNS Records"]
+        assert sorted((c.provider, c.reason) for c in status["cancelled"]) == [
+            ("Cert History", "malicious_verdict"), ("WHOIS", "malicious_verdict"),
+        ]
+        for adapter in slow:
+            adapter.lookup.assert_not_called()
+
+    def test_deadline_completes_job_early(self):
+        from app.enrichment.executor import FairExecutor
+        from app.enrichment.policy import JobPolicy
+
+        release = threading.Event()
+        adapter = _make_public_adapter("WHOIS", supported_types={IOCType.DOMAIN})
+        adapter.lookup.side_effect = lambda i: release.wait(5) and _make_result(i, "WHOIS")
+        iocs = [_make_ioc(IOCType.DOMAIN, f"d{i}.com") for i in range(4)]
+        executor = FairExecutor(max_workers=1)
+        orchestrator = EnrichmentOrchestrator(adapters=[adapter], executor=executor)
+
+        started = time.monotonic()
+        orchestrator.enrich_all("job-deadline", iocs, policy=JobPolicy(deadline_seconds=0.2))
+        elapsed = time.monotonic() - started
+        release.set()
+        executor.shutdown()
+
+        status = orchestrator.get_status("job-deadline")
+        assert elapsed < 2
+        assert status["complete"] is True
+        assert status["done"] == 4
+        assert {c.reason for c in status["cancelled"]} == {"deadline"}
+        assert len(status["cancelled"]) == 4
+
+    def test_quota_budget_limits_key_provider_calls(self):
+        from app.enrichment.policy import JobPolicy
+
+        vt = _make_mock_adapter({IOCType.IPV4})
+        vt.name = "VirusTotal"
+        vt.requires_api_key = True
+        vt.lookup.side_effect = lambda i: _make_result(i)
+        iocs = [_make_ioc(IOCType.IPV4, f"10.9.0.{i}") for i in range(5)]
+        orchestrator = EnrichmentOrchestrator(adapters=[vt])
+
+        orchestrator.enrich_all("job-quota", iocs, policy=JobPolicy(max_quota_spend=2))
+
+        status = orchestrator.get_status("job-quota")
+        assert vt.lookup.call_count == 2
+        assert len(status["results"]) == 2
+        assert [c.reason for c in status["cancelled"]] == ["quota_budget"] * 3
+        assert status["done"] == 5
+
+
+class TestCircuitBreaker:
+    """Per-provider circuit breakers short-circuit lookups to a failing provider."""
+
+    def _failing_adapter(self, error: str) -> MagicMock:
+        adapter = _make_public_adapter("Cert History", supported_types={IOCType.DOMAIN})
+        adapter.lookup.side_effect = lambda i: EnrichmentError(
+            ioc=i, provider="Cert History", error=error
+        )
+        return adapter
+
+    def test_open_breaker_fails_fast(self):
+        from app.enrichment.circuit_breaker import CIRCUIT_OPEN_ERROR, CircuitBreakers
+        from app.enrichment.executor import FairExecutor
+
+        adapter = self._failing_adapter("Connection failed")
+        breakers = CircuitBreakers(min_calls=4, failure_rate=0.5)
+        executor = FairExecutor(max_workers=1)
+        orchestrator = EnrichmentOrchestrator(
+            adapters=[adapter], executor=executor, breakers=breakers,
+            retry_scheduler=_ImmediateScheduler(),
+        )
+        iocs = [_make_ioc(IOCType.DOMAIN, f"down{i}.com") for i in range(10)]
+
+        orchestrator.enrich_all("job-breaker", iocs)
+        executor.shutdown()
+
+        status = orchestrator.get_status("job-breaker")
+        # Retries queue behind the job's other lookups: the first four IOCs'
+        # attempts trip the breaker, then their retries and the rest fail fast.
+        assert adapter.lookup.call_count == 4
+        errors = [r.error for r in status["results"]]
+        assert errors.count(CIRCUIT_OPEN_ERROR) == 9  # the fourth IOC is not retried
+        assert status["providers"]["Cert History"]["state"] == "open"
+
+    def test_retry_skipped_once_breaker_opens(self):
+        from app.enrichment.circuit_breaker import CircuitBreakers
+
+        adapter = self._failing_adapter("Request timed out")
+        scheduler = _ImmediateScheduler()
+        orchestrator = EnrichmentOrchestrator(
+            adapters=[adapter], breakers=CircuitBreakers(consecutive_timeouts=1),
+            retry_scheduler=scheduler,
+        )
+
+        orchestrator.enrich_all("job-no-retry", [_make_ioc(IOCType.DOMAIN, "slow.com")])
+
+        assert scheduler.delays == []
+        assert adapter.lookup.call_count == 1
+        result = orchestrator.get_status("job-no-retry")["results"][0]
+        assert result.error == "Request timed out"
+
+    def test_open_breaker_spends_no_job_quota(self):
+        from app.enrichment.circuit_breaker import CIRCUIT_OPEN_ERROR, CircuitBreakers
+        from app.enrichment.policy import JobPolicy
+
+        adapter = self._failing_adapter("Request timed out")
+        adapter.requires_api_key = True
+        breakers = CircuitBreakers(consecutive_timeouts=1)
+        breakers.get("Cert History").record(
+            EnrichmentError(ioc=_make_ioc(IOCType.DOMAIN, "x.com"),
+                            provider="Cert History", error="Request timed out")
+        )
+        orchestrator = EnrichmentOrchestrator(
+            adapters=[adapter], breakers=breakers, retry_scheduler=_ImmediateScheduler(),
+        )
+        iocs = [_make_ioc(IOCType.DOMAIN, f"down{i}.com") for i in range(3)]
+
+        orchestrator.enrich_all("job-quota-open", iocs, policy=JobPolicy(max_quota_spend=1))
+
+        status = orchestrator.get_status("job-quota-open")
+        assert status["cancelled"] == []  # refused calls did not use up the budget
+        assert [r.error for r in status["results"]] == [CIRCUIT_OPEN_ERROR] * 3
+
+    def test_breakers_shared_across_orchestrators(self):
+        from app.enrichment.circuit_breaker import CIRCUIT_OPEN_ERROR, PROVIDER_BREAKERS
+
+        adapter = self._failing_adapter("Request timed out")
+        for _ in range(3):
+            PROVIDER_BREAKERS.get("Cert History").record(
+                EnrichmentError(ioc=_make_ioc(IOCType.DOMAIN, "x.com"),
+                                provider="Cert History", error="Request timed out")
+            )
+        orchestrator = EnrichmentOrchestrator(adapters=[adapter])
+        orchestrator.enrich_all("job-shared", [_make_ioc(IOCType.DOMAIN, "y.com")])
+
+        adapter.lookup.assert_not_called()
+        assert orchestrator.get_status("job-shared")["results"][0].error == CIRCUIT_OPEN_ERROR
+
+
+class _BatchAdapter:
+    """Bulk-capable adapter stub: records every lookup_batch call."""
+
+    name = "Bulk Hashes"
+    supported_types = frozenset({IOCType.MD5, IOCType.SHA256})
+    batch_types = frozenset({IOCType.MD5})
+    requires_api_key = False
+    max_batch_size = 100
+
+    def __init__(self, fail_first: set[str] | None = None) -> None:
+        self.batches: list[list[str]] = []
+        self.single: list[str] = []
+        self._fail_first = set(fail_first or ())
+        self._lock = threading.Lock()
+
+    def lookup(self, ioc):
+        with self._lock:
+            self.single.append(ioc.value)
+        return _make_result(ioc, provider=self.name)
+
+    def lookup_batch(self, iocs):
+        with self._lock:
+            self.batches.append([ioc.value for ioc in iocs])
+            failing = {ioc.value for ioc in iocs} & self._fail_first
+            self._fail_first -= failing
+        return [
+            _make_error(ioc, msg="HTTP 502", provider=self.name) if ioc.value in failing
+            else _make_result(ioc, provider=self.name)
+            for ioc in iocs
+        ]
+
+
+class TestBatching:
+    """Lookups for bulk-capable providers are sent as batches (batching.py)."""
+
+    @pytest.fixture()
+    def scheduler(self):
+        scheduler = RetryScheduler()
+        yield scheduler
+        scheduler.shutdown()
+
+    # Long enough that no partial batch expires while a job is still queueing
+    # its lookups (a GC pause can exceed the 50 ms default); the end-of-queue
+    # flush emits the remainder.  Expiry itself is tested in test_batching.py.
+    _WINDOW = 10.0
+
+    def _md5s(self, count: int, prefix: str = "a") -> list[IOC]:
+        return [_make_ioc(IOCType.MD5, f"{prefix}{i:031x}") for i in range(count)]
+
+    def test_lookups_grouped_by_max_batch_size(self, scheduler):
+        from app.enrichment.circuit_breaker import CircuitBreakers
+
+        adapter = _BatchAdapter()
+        orchestrator = EnrichmentOrchestrator(
+            adapters=[adapter], retry_scheduler=scheduler, batch_window=self._WINDOW,
+            breakers=CircuitBreakers(),
+        )
+        orchestrator.enrich_all("job-batch", self._md5s(250))
+
+        assert sorted(len(batch) for batch in adapter.batches) == [50, 100, 100]
+        assert adapter.single == []
+        status = orchestrator.get_status("job-batch")
+        assert status["done"] == 250
+        assert all(isinstance(r, EnrichmentResult) for r in status["results"])
+
+    def test_types_without_bulk_support_use_lookup(self, scheduler):
+        adapter = _BatchAdapter()
+        orchestrator = EnrichmentOrchestrator(
+            adapters=[adapter], retry_scheduler=scheduler, batch_window=self._WINDOW
+        )
+        sha256 = _make_ioc(IOCType.SHA256, "c" * 64)
+
+        orchestrator.enrich_all("job-mixed", [*self._md5s(3), sha256])
+
+        assert adapter.single == [sha256.value]
+        assert [len(batch) for batch in adapter.batches] == [3]
+        assert orchestrator.get_status("job-mixed")["done"] == 4
+
+    def test_failed_items_retried_in_a_later_batch(self, scheduler):
+        from app.enrichment.circuit_breaker import CircuitBreakers
+
+        iocs = self._md5s(5)
+        adapter = _BatchAdapter(fail_first={iocs[1].value, iocs[3].value})
+        orchestrator = EnrichmentOrchestrator(
+            adapters=[adapter], retry_scheduler=_ImmediateScheduler(),
+            breakers=CircuitBreakers(),
+        )
+        orchestrator.enrich_all("job-retry", iocs)
+
+        retried = [batch for batch in adapter.batches if iocs[1].value in batch]
+        assert len(retried) == 2  # first attempt, then the retry
+        status = orchestrator.get_status("job-retry")
+        assert status["done"] == 5
+        assert all(isinstance(r, EnrichmentResult) for r in status["results"])
+
+    def test_one_token_per_batch(self, scheduler):
+        from app.enrichment.rate_limit import RateLimit, RateLimiter
+
+        adapter = _BatchAdapter()
+        limiter = RateLimiter({"Bulk Hashes": RateLimit(6000, 10)})
+        orchestrator = EnrichmentOrchestrator(
+            adapters=[adapter], retry_scheduler=scheduler, batch_window=self._WINDOW,
+            rate_limiter=limiter,
+        )
+        orchestrator.enrich_all("job-tokens", self._md5s(250))
+
+        assert len(adapter.batches) == 3
+        assert limiter.bucket("Bulk Hashes").snapshot()["spent_today"] == 3
+
+    def test_policy_applies_per_item(self, scheduler):
+        from app.enrichment.policy import REASON_QUOTA, JobGuard, JobPolicy
+
+        adapter = _BatchAdapter()
+        orchestrator = EnrichmentOrchestrator(
+            adapters=[adapter], retry_scheduler=scheduler, batch_window=self._WINDOW
+        )
+        guard_policy = JobPolicy(deadline_seconds=30)
+
+        with patch.object(JobGuard, "admit", side_effect=lambda ioc, key: (
+            REASON_QUOTA if ioc.value.endswith("1") else None
+        )):
+            orchestrator.enrich_all("job-policy", self._md5s(3), policy=guard_policy)
+
+        assert [len(batch) for batch in adapter.batches] == [2]
+        status = orchestrator.get_status("job-policy")
+        assert [c.reason for c in status["cancelled"]] == [REASON_QUOTA]
+        assert status["done"] == 3
+
+    def test_unavailable_batch_falls_back_to_single_lookups(self, scheduler):
+        from app.enrichment.provider import BatchUnavailable
+        from app.enrichment.rate_limit import RateLimit, RateLimiter
+
+        adapter = _BatchAdapter()
+        adapter.lookup_batch = MagicMock(side_effect=BatchUnavailable("bulk endpoint down"))
+        limiter = RateLimiter({"Bulk Hashes": RateLimit(6000, 10)})
+        orchestrator = EnrichmentOrchestrator(
+            adapters=[adapter], retry_scheduler=scheduler, batch_window=self._WINDOW,
+            rate_limiter=limiter,
+        )
+        orchestrator.enrich_all("job-fallback", self._md5s(3))
+
+        adapter.lookup_batch.assert_called_once()
+        assert len(adapter.single) == 3
+        assert limiter.bucket("Bulk Hashes").snapshot()["spent_today"] == 3  # batch token refunded
+        status = orchestrator.get_status("job-fallback")
+        assert status["done"] == 3
+        assert all(isinstance(r, EnrichmentResult) for r in status["results"])
+
+    def test_batch_window_none_disables_batching(self, scheduler):
+        adapter = _BatchAdapter()
+        orchestrator = EnrichmentOrchestrator(
+            adapters=[adapter], retry_scheduler=scheduler, batch_window=None,
+        )
+        orchestrator.enrich_all("job-single", self._md5s(3))
+
+        assert adapter.batches == []
+        assert len(adapter.single) == 3
+
+    def test_mock_adapters_are_not_batched(self, mock_adapter, scheduler):
+        mock_adapter.lookup.side_effect = lambda ioc: _make_result(ioc)
+        orchestrator = EnrichmentOrchestrator(adapters=[mock_adapter], retry_scheduler=scheduler)
+
+        orchestrator.enrich_all("job-mock", self._md5s(2))
+
+        assert mock_adapter.lookup.call_count == 2
+        mock_adapter.lookup_batch.assert_not_called()
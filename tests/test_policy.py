@@ -0,0 +1,94 @@
+"""Tests for per-job short-circuit policies (app/enrichment/policy.py)."""
+from __future__ import annotations
+
+import pytest
+
+from app.enrichment.models import EnrichmentResult
+from app.enrichment.policy import (
+    REASON_DEADLINE,
+    REASON_MALICIOUS,
+    REASON_QUOTA,
+    JobGuard,
+    JobPolicy,
+)
+from app.pipeline.models import IOC, IOCType
+
+
+def _ioc(value: str = "1.2.3.4") -> IOC:
+    return IOC(type=IOCType.IPV4, value=value, raw_match=value)
+
+
+def _result(ioc: IOC, verdict: str) -> EnrichmentResult:
+    return EnrichmentResult(ioc=ioc, provider="P", verdict=verdict, detection_count=0,
+                            total_engines=0, scan_date=None, raw_stats={})
+
+
+class TestJobPolicyFromDict:
+    def test_none_is_default(self):
+        assert JobPolicy.from_dict(None).is_default
+
+    def test_all_fields(self):
+        policy = JobPolicy.from_dict({
+            "stop_on_first_malicious_per_ioc": True,
+            "deadline_seconds": 5,
+            "max_quota_spend": 0,
+        })
+        assert policy == JobPolicy(True, 5.0, 0)
+        assert not policy.is_default
+
+    @pytest.mark.parametrize("data", [
+        [], {"deadline_seconds": 0}, {"deadline_seconds": True},
+        {"max_quota_spend": -1}, {"stop_on_first_malicious_per_ioc": 1}, {"bogus": True},
+    ])
+    def test_invalid(self, data):
+        with pytest.raises(ValueError):
+            JobPolicy.from_dict(data)
+
+
+class TestJobGuard:
+    def test_malicious_verdict_blocks_same_ioc_only(self):
+        guard = JobGuard(JobPolicy(stop_on_first_malicious_per_ioc=True))
+        bad, other = _ioc("6.6.6.6"), _ioc("7.7.7.7")
+        assert guard.observe(_result(bad, "malicious")) is True
+        assert guard.observe(_result(bad, "malicious")) is False  # only the first
+        assert guard.admit(bad, requires_api_key=False) == REASON_MALICIOUS
+        assert guard.admit(other, requires_api_key=False) is None
+
+    def test_observe_ignored_without_stop_policy(self):
+        guard = JobGuard(JobPolicy(deadline_seconds=10))
+        assert guard.observe(_result(_ioc(), "malicious")) is False
+        assert guard.admit(_ioc(), requires_api_key=False) is None
+
+    def test_deadline(self):
+        now = [100.0]
+        guard = JobGuard(JobPolicy(deadline_seconds=5), clock=lambda: now[0])
+        assert guard.remaining() == 5.0
+        assert guard.admit(_ioc(), requires_api_key=False) is None
+        now[0] = 105.0
+        assert guard.remaining() == 0.0
+        assert guard.admit(_ioc(), requires_api_key=False) == REASON_DEADLINE
+
+    def test_quota_counts_key_providers_only(self):
+        guard = JobGuard(JobPolicy(max_quota_spend=2))
+        assert guard.admit(_ioc(), requires_api_key=False) is None
+        assert guard.admit(_ioc(), requires_api_key=True) is None
+        assert guard.admit(_ioc(), requires_api_key=True) is None
+        assert guard.admit(_ioc(), requires_api_key=True) == REASON_QUOTA
+        assert guard.admit(_ioc(), requires_api_key=False) is None
+        assert guard.quota_spent == 2
+
+    def test_refund_returns_spent_quota(self):
+        guard = JobGuard(JobPolicy(max_quota_spend=1))
+        assert guard.admit(_ioc(), requires_api_key=True) is None
+        guard.refund(requires_api_key=True)
+        assert guard.quota_spent == 0
+        assert guard.admit(_ioc(), requires_api_key=True) is None
+        guard.refund(requires_api_key=False)  # nothing was spent for a zero-auth call
+        assert guard.quota_spent == 1
+
+    def test_stopped(self):
+        guard = JobGuard(JobPolicy(stop_on_first_malicious_per_ioc=True))
+        ioc = _ioc("6.6.6.6")
+        assert guard.stopped(ioc) is False
+        guard.observe(_result(ioc, "malicious"))
+        assert guard.stopped(ioc) is True
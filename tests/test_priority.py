@@ -0,0 +1,85 @@
+"""Tests for dispatch priority ordering (app/enrichment/priority.py)."""
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.enrichment.priority import (
+    DEFAULT_PRIORITY,
+    dispatch_priority,
+    order_by_priority,
+    parse_priority_overrides,
+)
+from app.pipeline.models import IOC, IOCType
+
+
+def _ioc(type_: IOCType, value: str) -> IOC:
+    return IOC(type=type_, value=value, raw_match=value)
+
+
+def _adapter(name: str) -> SimpleNamespace:
+    return SimpleNamespace(name=name)
+
+
+def test_fast_providers_before_slow() -> None:
+    assert dispatch_priority("Shodan InternetDB", IOCType.IPV4) < dispatch_priority(
+        "VirusTotal", IOCType.IPV4
+    ) < dispatch_priority("WHOIS", IOCType.DOMAIN)
+
+
+def test_type_override_promotes_direct_verdicts() -> None:
+    assert dispatch_priority("MalwareBazaar", IOCType.SHA256) == 0
+    assert dispatch_priority("URLhaus", IOCType.URL) == 0
+    assert dispatch_priority("URLhaus", IOCType.DOMAIN) == 1
+
+
+def test_unknown_provider_gets_default() -> None:
+    assert dispatch_priority("Brand New Feed", IOCType.IPV4) == DEFAULT_PRIORITY
+
+
+def test_caller_overrides_win() -> None:
+    assert dispatch_priority("WHOIS", IOCType.DOMAIN, {"WHOIS": 0}) == 0
+
+
+def test_order_is_stable_within_a_priority() -> None:
+    domain_a, domain_b = _ioc(IOCType.DOMAIN, "a.com"), _ioc(IOCType.DOMAIN, "b.com")
+    whois, dns, vt = _adapter("WHOIS"), _adapter("DNS Records"), _adapter("VirusTotal")
+    pairs = [(whois, domain_a), (vt, domain_a), (dns, domain_a),
+             (whois, domain_b), (vt, domain_b), (dns, domain_b)]
+
+    ordered = order_by_priority(pairs)
+
+    assert [(a.name, i.value) for a, i in ordered] == [
+        ("DNS Records", "a.com"), ("DNS Records", "b.com"),
+        ("VirusTotal", "a.com"), ("VirusTotal", "b.com"),
+        ("WHOIS", "a.com"), ("WHOIS", "b.com"),
+    ]
+
+
+def test_parse_priority_overrides() -> None:
+    assert parse_priority_overrides("") == {}
+    assert parse_priority_overrides(" WHOIS=0, Shodan InternetDB = 3 ,") == {
+        "WHOIS": 0, "Shodan InternetDB": 3,
+    }
+
+
+@pytest.mark.parametrize("spec", ["WHOIS", "WHOIS=fast", "=1"])
+def test_parse_priority_overrides_rejects_malformed(spec: str) -> None:
+    with pytest.raises(ValueError, match="name=integer"):
+        parse_priority_overrides(spec)
+
+
+def test_configured_priority_reaches_orchestrator(monkeypatch) -> None:
+    """SENTINELX_PROVIDER_PRIORITY (via Config) is what route-built orchestrators use."""
+    from app import create_app
+    from app.config import Config
+    from app.routes._helpers import _make_orchestrator
+
+    monkeypatch.setattr(Config, "PROVIDER_PRIORITY", "WHOIS=0,VirusTotal=3")
+    app = create_app({"TESTING": True, "CACHE_MAINTENANCE_INTERVAL": 0})
+    assert app.config["PROVIDER_PRIORITY"] == {"WHOIS": 0, "VirusTotal": 3}
+
+    with app.app_context():
+        orchestrator = _make_orchestrator(None)
+    assert orchestrator._provider_priority == {"WHOIS": 0, "VirusTotal": 3}
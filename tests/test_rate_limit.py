@@ -0,0 +1,115 @@
+"""Tests for per-provider token-bucket rate limiting (app/enrichment/rate_limit.py)."""
+from __future__ import annotations
+
+import datetime
+from pathlib import Path
+
+from app.enrichment.config_store import ConfigStore
+from app.enrichment.rate_limit import (
+    DEFAULT_RATE_LIMITS,
+    RateLimit,
+    RateLimiter,
+    TokenBucket,
+    limits_from_config,
+)
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTokenBucket:
+    def test_burst_then_paced(self) -> None:
+        clock = _FakeClock()
+        bucket = TokenBucket(RateLimit(rate_per_minute=4, burst=4), clock=clock)
+        assert [bucket.try_acquire() for _ in range(4)] == [0.0] * 4
+        assert bucket.try_acquire() == 15.0  # 4/min -> one token per 15 s
+        clock.now += 15
+        assert bucket.try_acquire() == 0.0
+
+    def test_refill_capped_at_burst(self) -> None:
+        clock = _FakeClock()
+        bucket = TokenBucket(RateLimit(rate_per_minute=60, burst=2), clock=clock)
+        clock.now += 3600
+        assert bucket.snapshot()["tokens"] == 2
+
+    def test_daily_budget_and_reset(self) -> None:
+        clock = _FakeClock()
+        day = [datetime.date(2026, 1, 1)]
+        bucket = TokenBucket(
+            RateLimit(rate_per_minute=600, burst=10, daily_budget=3),
+            clock=clock,
+            today=lambda: day[0],
+        )
+        assert [bucket.try_acquire() for _ in range(3)] == [0.0] * 3
+        assert bucket.try_acquire() is None
+        assert bucket.acquire() is False  # fails fast, no waiting
+        day[0] = datetime.date(2026, 1, 2)
+        assert bucket.try_acquire() == 0.0
+
+    def test_acquire_waits_for_next_token(self) -> None:
+        bucket = TokenBucket(RateLimit(rate_per_minute=1200, burst=1))  # 50 ms per token
+        assert bucket.acquire() is True
+        assert bucket.acquire(timeout=1.0) is True
+        assert bucket.acquire(timeout=0.001) is False
+
+    def test_penalize_drains_tokens(self) -> None:
+        clock = _FakeClock()
+        bucket = TokenBucket(RateLimit(rate_per_minute=4, burst=4), clock=clock)
+        bucket.penalize()
+        assert bucket.try_acquire() == 15.0
+
+    def test_refund_returns_token_and_budget(self) -> None:
+        clock = _FakeClock()
+        bucket = TokenBucket(RateLimit(rate_per_minute=4, burst=1, daily_budget=1), clock=clock)
+        assert bucket.try_acquire() == 0.0
+        assert bucket.try_acquire() is None  # budget spent
+        bucket.refund()
+        assert bucket.snapshot()["spent_today"] == 0
+        assert bucket.try_acquire() == 0.0
+
+
+class TestRateLimiter:
+    def test_unpaced_provider_always_admitted(self) -> None:
+        limiter = RateLimiter({"VirusTotal": RateLimit(4, 4)})
+        assert limiter.bucket("Shodan InternetDB") is None
+        assert limiter.acquire("Shodan InternetDB") is True
+        assert limiter.try_acquire("Shodan InternetDB") == 0.0
+
+    def test_case_insensitive_lookup(self) -> None:
+        limiter = RateLimiter({"VirusTotal": RateLimit(4, 4)})
+        assert limiter.bucket("virustotal") is limiter.bucket("VirusTotal")
+
+    def test_configure_keeps_unchanged_buckets(self) -> None:
+        limiter = RateLimiter({"VirusTotal": RateLimit(4, 4, 500)})
+        limiter.acquire("VirusTotal")
+        limiter.configure({"VirusTotal": RateLimit(4, 4, 500), "AbuseIPDB": RateLimit(60, 10)})
+        assert limiter.snapshot()["virustotal"]["spent_today"] == 1
+        limiter.configure({"VirusTotal": RateLimit(8, 8, 1000)})
+        assert limiter.snapshot() == {"virustotal": limiter.bucket("VirusTotal").snapshot()}
+        assert limiter.snapshot()["virustotal"]["spent_today"] == 0
+
+    def test_defaults(self) -> None:
+        assert DEFAULT_RATE_LIMITS["VirusTotal"] == RateLimit(4, 4, 500)
+        assert DEFAULT_RATE_LIMITS["AbuseIPDB"].daily_budget == 1000
+
+
+class TestConfig:
+    def test_overrides_merge_with_defaults(self, tmp_path: Path) -> None:
+        store = ConfigStore(config_path=tmp_path / "config.ini")
+        store.set_rate_limit("VirusTotal", 500, 20, 0)      # premium key
+        store.set_rate_limit("GreyNoise", 10, 2, 50)
+        store.set_rate_limit("AbuseIPDB", 0, 0, 0)          # disable pacing
+        limits = limits_from_config(store)
+        assert limits["virustotal"] == RateLimit(500, 20, 0)
+        assert limits["greynoise"] == RateLimit(10, 2, 50)
+        assert "abuseipdb" not in limits
+
+    def test_malformed_entries_skipped(self, tmp_path: Path) -> None:
+        path = tmp_path / "config.ini"
+        path.write_text("[rate_limits]\nvirustotal = fast\ngreynoise = 1,2\notx = 5,1,-1\n")
+        assert ConfigStore(config_path=path).get_rate_limits() == {}
@@ -0,0 +1,69 @@
+"""Tests for the heap-scheduled retry delay queue (app/enrichment/retry_scheduler.py)."""
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from app.enrichment.retry_scheduler import RetryScheduler
+
+
+@pytest.fixture()
+def scheduler():
+    scheduler = RetryScheduler(name="test-retry")
+    yield scheduler
+    scheduler.shutdown()
+
+
+def test_callbacks_run_in_due_order(scheduler) -> None:
+    ran: list[str] = []
+    done = threading.Event()
+
+    def record(label: str) -> None:
+        ran.append(label)
+        if len(ran) == 3:
+            done.set()
+
+    scheduler.call_later(0.06, record, "late")
+    scheduler.call_later(0.02, record, "early")
+    scheduler.call_later(0.04, record, "middle")
+
+    assert done.wait(2)
+    assert ran == ["early", "middle", "late"]
+    assert scheduler.pending() == 0
+
+
+def test_callback_not_run_before_due(scheduler) -> None:
+    ran = threading.Event()
+    started = time.monotonic()
+    scheduler.call_later(0.1, ran.set)
+
+    assert scheduler.pending() == 1
+    assert ran.wait(2)
+    assert time.monotonic() - started >= 0.1
+
+
+def test_failing_callback_does_not_stop_the_timer(scheduler) -> None:
+    ran = threading.Event()
+
+    def boom() -> None:
+        raise RuntimeError("boom")
+
+    scheduler.call_later(0, boom)
+    scheduler.call_later(0.01, ran.set)
+
+    assert ran.wait(2)
+
+
+def test_shutdown_drops_pending_callbacks() -> None:
+    scheduler = RetryScheduler(name="test-retry")
+    ran = threading.Event()
+    scheduler.call_later(0.05, ran.set)
+
+    scheduler.shutdown()
+
+    assert scheduler.pending() == 0
+    assert not ran.wait(0.1)
+    with pytest.raises(RuntimeError):
+        scheduler.call_later(0, ran.set)
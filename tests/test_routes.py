@@ -8,8 +8,11 @@ Tests cover:
 - Polling endpoint: JSON structure, 404 for unknown jobs, result serialization
 - Edge cases: empty input, no IOCs, duplicate IOC deduplication
 """
+import json
 from unittest.mock import MagicMock, patch
 
+from tests.helpers import make_mock_orchestrator
+
 
 # ---------------------------------------------------------------------------
 # Functional tests
@@ -364,7 +367,7 @@ def test_enrichment_status_returns_json(client):
     """GET /enrichment/status/{job_id} returns correct JSON structure."""
     import app.routes._helpers as routes_module
 
-    mock_orchestrator = MagicMock()
+    mock_orchestrator = make_mock_orchestrator()
     mock_orchestrator.cached_markers = {}
     mock_orchestrator.get_status.return_value = {
         "total": 3,
@@ -406,7 +409,7 @@ def test_enrichment_result_serialization(client):
         raw_stats={"malicious": 5, "clean": 67},
     )
 
-    mock_orchestrator = MagicMock()
+    mock_orchestrator = make_mock_orchestrator()
     mock_orchestrator.cached_markers = {}
     mock_orchestrator.get_status.return_value = {
         "total": 1,
@@ -450,7 +453,7 @@ def test_enrichment_error_serialization(client):
         error="Timeout",
     )
 
-    mock_orchestrator = MagicMock()
+    mock_orchestrator = make_mock_orchestrator()
     mock_orchestrator.cached_markers = {}
     mock_orchestrator.get_status.return_value = {
         "total": 1,
@@ -499,7 +502,7 @@ def _make_three_result_orchestrator():
                          detection_count=0, total_engines=0,
                          scan_date=None, raw_stats={}),
     ]
-    mock_orch = MagicMock()
+    mock_orch = make_mock_orchestrator()
     mock_orch.cached_markers = {}
     mock_orch.get_status.return_value = {
         "total": 3,
@@ -561,6 +564,26 @@ def test_enrichment_status_no_since_returns_all(client):
         routes_module._orchestrators.pop(job_id, None)
 
 
+def test_enrichment_stream_pushes_status_event(client):
+    """GET /enrichment/stream/{job_id} is an SSE stream ending with the complete status."""
+    import app.routes._helpers as routes_module
+
+    mock_orch = _make_three_result_orchestrator()
+    job_id = "stream_html_job"
+    routes_module._orchestrators[job_id] = mock_orch
+    try:
+        response = client.get(f"/enrichment/stream/{job_id}?since=1")
+        assert response.mimetype == "text/event-stream"
+        body = response.get_data(as_text=True)
+    finally:
+        routes_module._orchestrators.pop(job_id, None)
+
+    assert "id: 3\nevent: status\n" in body
+    data = json.loads(body.split("data: ", 1)[1].split("\n", 1)[0])
+    assert len(data["results"]) == 2
+    assert data["complete"] is True
+
+
 def test_enrichment_status_since_beyond_length(client):
     """?since=99 with 3 results returns 0 results and next_since == 3."""
     import app.routes._helpers as routes_module
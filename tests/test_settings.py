@@ -264,6 +264,52 @@ def test_settings_page_masks_short_key(client):
         assert "abcd" not in data
 
 
+# ---------------------------------------------------------------------------
+# Cache maintenance and budget
+# ---------------------------------------------------------------------------
+
+
+def test_settings_page_shows_maintenance_status(client, app):
+    """GET /settings shows DB size and the last maintenance run's results."""
+    app.cache_maintenance.status = MagicMock(return_value={
+        "last_run": "2026-01-02T03:04:05+00:00",
+        "rows_purged": 7,
+        "rows_evicted": 42,
+        "db_size_bytes": 3 * 1048576,
+        "last_error": None,
+    })
+    response = client.get("/settings")
+    data = response.data.decode("utf-8")
+    assert "3.0 MB on disk" in data
+    assert "2026-01-02 03:04:05" in data
+    assert "42 evicted" in data
+
+
+def test_post_cache_budget_saves_limits(client):
+    """POST /settings/cache/budget stores both limits via ConfigStore."""
+    with patch("app.routes.settings.ConfigStore") as MockStore:
+        mock_instance = MagicMock()
+        MockStore.return_value = mock_instance
+        response = client.post(
+            "/settings/cache/budget", data={"cache_max_mb": "256", "cache_max_rows": "0"}
+        )
+    assert response.status_code == 302
+    mock_instance.set_cache_max_mb.assert_called_once_with(256)
+    mock_instance.set_cache_max_rows.assert_called_once_with(0)
+
+
+def test_post_cache_budget_rejects_negative(client):
+    """Negative limits are rejected without touching config."""
+    with patch("app.routes.settings.ConfigStore") as MockStore:
+        mock_instance = MagicMock()
+        MockStore.return_value = mock_instance
+        response = client.post(
+            "/settings/cache/budget", data={"cache_max_mb": "-1", "cache_max_rows": "10"}
+        )
+    assert response.status_code == 302
+    mock_instance.set_cache_max_mb.assert_not_called()
+
+
 # ---------------------------------------------------------------------------
 # Navigation
 # ---------------------------------------------------------------------------
@@ -0,0 +1,88 @@
+"""Tests for process-wide single-flight lookup deduplication."""
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from app.enrichment.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call() -> None:
+    flights = SingleFlight()
+    release = threading.Event()
+    calls: list[int] = []
+    outcomes: list = []
+
+    def slow() -> str:
+        calls.append(1)
+        release.wait(5)
+        return "value"
+
+    def caller() -> None:
+        outcomes.append(flights.do("key", slow))
+
+    threads = [threading.Thread(target=caller) for _ in range(5)]
+    threads[0].start()
+    while flights.in_flight() == 0:
+        pass
+    for t in threads[1:]:
+        t.start()
+    # Give followers a moment to block on the in-flight call.
+    threading.Event().wait(0.05)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert [o.value for o in outcomes] == ["value"] * 5
+    assert sum(not o.shared for o in outcomes) == 1
+    assert len({o.finished_at for o in outcomes}) == 1
+    assert flights.in_flight() == 0
+
+
+def test_sequential_calls_are_not_shared() -> None:
+    flights = SingleFlight()
+    assert flights.do("k", lambda: 1).shared is False
+    assert flights.do("k", lambda: 2).value == 2
+
+
+def test_leader_exception_propagates_and_clears_key() -> None:
+    flights = SingleFlight()
+
+    def boom() -> None:
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        flights.do("k", boom)
+    assert flights.in_flight() == 0
+    assert flights.do("k", lambda: "ok").value == "ok"
+
+
+def test_join_and_finish_release_followers_without_blocking() -> None:
+    flights = SingleFlight()
+    leader_future, leader = flights.join("k")
+    follower_future, follower_leads = flights.join("k")
+    seen: list = []
+    follower_future.add_done_callback(lambda f: seen.append(f.result()))
+
+    assert leader is True and follower_leads is False
+    assert follower_future is leader_future
+    assert seen == []
+
+    finished_at = flights.finish("k", "value")
+
+    assert [(f.value, f.shared, f.finished_at) for f in seen] == [("value", True, finished_at)]
+    assert flights.in_flight() == 0
+    assert flights.join("k")[1] is True  # a new call
+
+
+def test_finish_with_error_raises_for_followers() -> None:
+    flights = SingleFlight()
+    flights.join("k")
+    follower_future, _ = flights.join("k")
+
+    flights.finish("k", error=RuntimeError("boom"))
+
+    with pytest.raises(RuntimeError):
+        follower_future.result()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""SentinelX enrichment engine benchmark: thread pool vs asyncio.
+
+Runs N lookups through EnrichmentOrchestrator (lookups on a FairExecutor, one
+thread per in-flight request via requests) and AsyncEnrichmentOrchestrator
+(coroutines on one event-loop thread via AsyncHTTPClient) against a local
+HTTP/1.1 stub server, and reports per-request service latency (p50/p99, time
+holding a worker or connection slot), time-to-result since job start
+(p50/p99 "done", including queueing), wall time, throughput, peak RSS and
+peak thread count.
+
+The stub server runs in a separate process so it does not compete with the
+engine under test for the GIL; --delay-ms simulates provider latency.  Each
+engine runs in a fresh child process so peak RSS (ru_maxrss) is its own;
+tracemalloc is not used because its overhead distorts the threaded run.  Both
+engines use the same adapter class (an AsyncBaseHTTPAdapter subclass), the
+same per-host connection budget (--workers) and no cache.
+
+Usage:
+    python3 tools/bench_async_engine.py                     # 10k lookups
+    python3 tools/bench_async_engine.py --lookups 2000 --delay-ms 20
+    python3 tools/bench_async_engine.py --workers 64 --json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import resource
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import requests  # noqa: E402
+
+from app.enrichment.adapters.async_base import AsyncBaseHTTPAdapter  # noqa: E402
+from app.enrichment.async_engine import AsyncEnrichmentOrchestrator, EventLoopThread  # noqa: E402
+from app.enrichment.executor import FairExecutor  # noqa: E402
+from app.enrichment.models import EnrichmentResult  # noqa: E402
+from app.enrichment.orchestrator import EnrichmentOrchestrator  # noqa: E402
+from app.pipeline.models import IOC, IOCType  # noqa: E402
+
+
+def _serve(port_queue: multiprocessing.Queue, delay: float) -> None:
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    body = json.dumps({"ports": [22, 443], "tags": [], "vulns": []}).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args) -> None:
+            pass
+
+        def do_GET(self) -> None:
+            if delay:
+                time.sleep(delay)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    server.request_queue_size = 1024
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+
+class _StubAdapter(AsyncBaseHTTPAdapter):
+    name = "Stub"
+    supported_types = frozenset({IOCType.IPV4})
+    requires_api_key = False
+
+    def __init__(self, base_url: str, pool_size: int) -> None:
+        super().__init__(allowed_hosts=["127.0.0.1"])
+        self._base_url = base_url
+        self.latencies: list[float] = []
+        self._pool_size = pool_size
+        self._slot: asyncio.Semaphore | None = None
+        self._session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=pool_size))
+
+    def _build_url(self, ioc: IOC) -> str:
+        return f"{self._base_url}/ip/{ioc.value}"
+
+    def _parse_response(self, ioc: IOC, body: dict) -> EnrichmentResult:
+        return EnrichmentResult(
+            ioc=ioc, provider=self.name, verdict="clean", detection_count=0,
+            total_engines=0, scan_date=None, raw_stats=body,
+        )
+
+    def lookup(self, ioc: IOC):
+        start = time.perf_counter()
+        result = super().lookup(ioc)
+        self.latencies.append(time.perf_counter() - start)
+        return result
+
+    async def alookup(self, ioc: IOC, client=None):
+        # Wait for a connection slot before starting the clock, as a thread
+        # engine lookup waits for a worker; latency is then service time only.
+        if self._slot is None:
+            self._slot = asyncio.Semaphore(self._pool_size)
+        async with self._slot:
+            start = time.perf_counter()
+            result = await super().alookup(ioc, client)
+            self.latencies.append(time.perf_counter() - start)
+        return result
+
+
+def _iocs(count: int) -> list[IOC]:
+    return [
+        IOC(type=IOCType.IPV4, value=f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}",
+            raw_match="")
+        for i in range(count)
+    ]
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def _run(engine: str, base_url: str, iocs: list[IOC], workers: int) -> dict:
+    adapter = _StubAdapter(base_url, pool_size=workers)
+    executor = loop_thread = None
+    if engine == "thread":
+        executor = FairExecutor(max_workers=workers)
+        orchestrator = EnrichmentOrchestrator([adapter], executor=executor)
+    else:
+        loop_thread = EventLoopThread(max_per_host=workers)
+        orchestrator = AsyncEnrichmentOrchestrator([adapter], loop_thread=loop_thread)
+
+    peak_threads = threading.active_count()
+    stop = threading.Event()
+
+    def sample_threads() -> None:
+        nonlocal peak_threads
+        while not stop.wait(0.05):
+            peak_threads = max(peak_threads, threading.active_count())
+
+    sampler = threading.Thread(target=sample_threads, daemon=True)
+    sampler.start()
+    completions: list[float] = []
+    record_result = orchestrator._record_result
+
+    def timed_record(job_id, result):  # completion time since job start, incl. queueing
+        completions.append(time.perf_counter() - started)
+        record_result(job_id, result)
+
+    orchestrator._record_result = timed_record
+    started = time.perf_counter()
+    orchestrator.enrich_all("bench", iocs)
+    wall = time.perf_counter() - started
+    stop.set()
+    sampler.join()
+
+    status = orchestrator.get_status("bench")
+    errors = sum(1 for r in status["results"] if not isinstance(r, EnrichmentResult))
+    if executor is not None:
+        executor.shutdown()
+    if loop_thread is not None:
+        loop_thread.stop(timeout=5)
+
+    latencies = adapter.latencies
+    return {
+        "engine": engine,
+        "lookups": len(iocs),
+        "errors": errors,
+        "wall_s": round(wall, 2),
+        "lookups_per_s": round(len(iocs) / wall, 1),
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2),
+        "p50_done_s": round(_percentile(completions, 0.50), 2),
+        "p99_done_s": round(_percentile(completions, 0.99), 2),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "peak_threads": peak_threads,
+    }
+
+
+def _child(queue: multiprocessing.Queue, engine: str, base_url: str, lookups: int,
+           workers: int) -> None:
+    queue.put(_run(engine, base_url, _iocs(lookups), workers))
+
+
+def _run_isolated(engine: str, base_url: str, lookups: int, workers: int) -> dict:
+    queue: multiprocessing.Queue = multiprocessing.Queue()
+    child = multiprocessing.Process(
+        target=_child, args=(queue, engine, base_url, lookups, workers)
+    )
+    child.start()
+    result = queue.get()
+    child.join()
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lookups", type=int, default=10_000, help="lookups per engine")
+    parser.add_argument("--delay-ms", type=float, default=5.0, help="stub server latency")
+    parser.add_argument("--workers", type=int, default=32,
+                        help="thread-engine workers and async per-host connection cap")
+    parser.add_argument("--engines", nargs="+", default=["thread", "async"],
+                        choices=["thread", "async"])
+    parser.add_argument("--json", action="store_true", help="emit JSON instead of a table")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    port_queue: multiprocessing.Queue = multiprocessing.Queue()
+    server = multiprocessing.Process(
+        target=_serve, args=(port_queue, args.delay_ms / 1000), daemon=True
+    )
+    server.start()
+    base_url = f"http://127.0.0.1:{port_queue.get(timeout=10)}"
+    try:
+        report = [_run_isolated(engine, base_url, args.lookups, args.workers)
+                  for engine in args.engines]
+    finally:
+        server.terminate()
+        server.join()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print(f"{'engine':<8} {'lookups':>8} {'errors':>6} {'wall s':>7} {'per s':>8} "
+          f"{'p50 ms':>7} {'p99 ms':>7} {'p50 done':>8} {'p99 done':>8} "
+          f"{'RSS MB':>8} {'threads':>7}")
+    for row in report:
+        print(
+            f"{row['engine']:<8} {row['lookups']:>8,} {row['errors']:>6} {row['wall_s']:>7} "
+            f"{row['lookups_per_s']:>8} {row['p50_ms']:>7} {row['p99_ms']:>7} "
+            f"{row['p50_done_s']:>8} {row['p99_done_s']:>8} "
+            f"{row['peak_rss_mb']:>8} {row['peak_threads']:>7}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
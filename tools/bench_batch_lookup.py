@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""SentinelX bulk-lookup benchmark: per-IOC requests vs batched lookup_batch().
+
+Runs N MD5 lookups through EnrichmentOrchestrator with the real
+HashlookupAdapter twice — once with batching disabled (batch_window=None, one
+GET per hash) and once with batching on (one POST /bulk/md5 per
+max_batch_size hashes) — against a local stub of the CIRCL Hashlookup API,
+and reports wall time, IOCs resolved per second, HTTP requests sent and
+requests per second.
+
+The stub server runs in a separate process so it does not compete with the
+orchestrator for the GIL; --delay-ms simulates the provider's per-request
+latency and --per-hash-us its per-hash cost inside a bulk request.  Every
+other hash is "known" to the stub, the rest answer 404 / are left out of the
+bulk reply.  No cache is used.
+
+Usage:
+    python3 tools/bench_batch_lookup.py                     # 5k hashes
+    python3 tools/bench_batch_lookup.py --hashes 20000 --delay-ms 50
+    python3 tools/bench_batch_lookup.py --workers 8 --json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import multiprocessing
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import requests  # noqa: E402
+
+from app.enrichment.adapters import hashlookup  # noqa: E402
+from app.enrichment.adapters.hashlookup import HashlookupAdapter  # noqa: E402
+from app.enrichment.circuit_breaker import CircuitBreakers  # noqa: E402
+from app.enrichment.executor import FairExecutor  # noqa: E402
+from app.enrichment.models import EnrichmentResult  # noqa: E402
+from app.enrichment.orchestrator import EnrichmentOrchestrator  # noqa: E402
+from app.enrichment.singleflight import SingleFlight  # noqa: E402
+from app.pipeline.models import IOC, IOCType  # noqa: E402
+
+
+def _known(md5: str) -> bool:
+    return int(md5[-1], 16) % 2 == 0
+
+
+def _record(md5: str) -> dict:
+    return {"FileName": f"{md5[:8]}.dll", "MD5": md5.upper(), "source": "NSRL", "db": "bench"}
+
+
+def _serve(port_queue: multiprocessing.Queue, delay: float, per_hash: float) -> None:
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args) -> None:
+            pass
+
+        def _reply(self, status: int, payload) -> None:
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self) -> None:  # /lookup/md5/<hash>
+            time.sleep(delay + per_hash)
+            md5 = self.path.rsplit("/", 1)[-1]
+            if _known(md5):
+                self._reply(200, _record(md5))
+            else:
+                self._reply(404, {"message": "Non existing MD5", "query": md5})
+
+        def do_POST(self) -> None:  # /bulk/md5
+            length = int(self.headers.get("Content-Length", 0))
+            hashes = json.loads(self.rfile.read(length))["hashes"]
+            time.sleep(delay + per_hash * len(hashes))
+            self._reply(200, [_record(md5) for md5 in hashes if _known(md5)])
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    server.request_queue_size = 1024
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+
+class _CountingSession(requests.Session):
+    """Session that counts the HTTP requests it sends."""
+
+    def __init__(self, pool_size: int) -> None:
+        super().__init__()
+        self.requests_sent = 0
+        self._count_lock = threading.Lock()
+        self.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=pool_size))
+
+    def request(self, *args, **kwargs):
+        with self._count_lock:
+            self.requests_sent += 1
+        return super().request(*args, **kwargs)
+
+
+def _hashes(count: int) -> list[IOC]:
+    return [IOC(type=IOCType.MD5, value=f"{i:032x}", raw_match="") for i in range(count)]
+
+
+def _run(mode: str, iocs: list[IOC], workers: int) -> dict:
+    adapter = HashlookupAdapter(allowed_hosts=["127.0.0.1"])
+    session = adapter._session = _CountingSession(pool_size=workers)
+    executor = FairExecutor(max_workers=workers)
+    orchestrator = EnrichmentOrchestrator(
+        [adapter],
+        executor=executor,
+        singleflight=SingleFlight(),
+        breakers=CircuitBreakers(),
+        batch_window=None if mode == "per-ioc" else 0.05,
+    )
+
+    started = time.perf_counter()
+    orchestrator.enrich_all("bench", iocs)
+    wall = time.perf_counter() - started
+    executor.shutdown()
+
+    results = orchestrator.get_status("bench")["results"]
+    known = sum(1 for r in results if isinstance(r, EnrichmentResult) and r.verdict == "known_good")
+    errors = sum(1 for r in results if not isinstance(r, EnrichmentResult))
+    return {
+        "mode": mode,
+        "hashes": len(iocs),
+        "known_good": known,
+        "errors": errors,
+        "http_requests": session.requests_sent,
+        "wall_s": round(wall, 2),
+        "iocs_per_s": round(len(iocs) / wall, 1),
+        "requests_per_s": round(session.requests_sent / wall, 1),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hashes", type=int, default=5_000, help="MD5 lookups per mode")
+    parser.add_argument("--delay-ms", type=float, default=20.0,
+                        help="stub server latency per request")
+    parser.add_argument("--per-hash-us", type=float, default=50.0,
+                        help="stub server cost per hash in a request")
+    parser.add_argument("--workers", type=int, default=32, help="FairExecutor workers")
+    parser.add_argument("--modes", nargs="+", default=["per-ioc", "batch"],
+                        choices=["per-ioc", "batch"])
+    parser.add_argument("--json", action="store_true", help="emit JSON instead of a table")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    port_queue: multiprocessing.Queue = multiprocessing.Queue()
+    server = multiprocessing.Process(
+        target=_serve, args=(port_queue, args.delay_ms / 1000, args.per_hash_us / 1e6),
+        daemon=True,
+    )
+    server.start()
+    hashlookup.HASHLOOKUP_BASE = f"http://127.0.0.1:{port_queue.get(timeout=10)}"
+    try:
+        iocs = _hashes(args.hashes)
+        report = [_run(mode, iocs, args.workers) for mode in args.modes]
+    finally:
+        server.terminate()
+        server.join()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print(f"{'mode':<8} {'hashes':>7} {'known':>6} {'errors':>6} {'requests':>8} "
+          f"{'wall s':>7} {'IOCs/s':>9} {'req/s':>8}")
+    for row in report:
+        print(
+            f"{row['mode']:<8} {row['hashes']:>7,} {row['known_good']:>6} {row['errors']:>6} "
+            f"{row['http_requests']:>8,} {row['wall_s']:>7} {row['iocs_per_s']:>9} "
+            f"{row['requests_per_s']:>8}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""SentinelX payload codec benchmark.
+
+Reports on-disk size and encode/decode time for each registered payload
+codec (app/cache/codec.py) against synthetic result payloads shaped like the
+largest real ones: VirusTotal raw_stats, crt.sh subdomain lists (capped at
+50), ThreatMiner report lists and DNS TXT records.  "json-text" is the
+pre-codec baseline (plain json.dumps text).
+
+Sizes are measured by writing N copies of each payload into a SQLite table
+and reading the database file size, so page overhead is included.
+
+Usage:
+    python3 tools/bench_codecs.py
+    python3 tools/bench_codecs.py --rows 5000 --iterations 2000
+    python3 tools/bench_codecs.py --json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.cache.codec import CODECS, decode_payload, encode_payload  # noqa: E402
+
+
+def _virustotal() -> dict:
+    return {
+        "provider": "VirusTotal",
+        "verdict": "malicious",
+        "detection_count": 14,
+        "total_engines": 92,
+        "scan_date": "2026-01-12T08:14:00+00:00",
+        "raw_stats": {
+            "malicious": 14, "suspicious": 2, "undetected": 60, "harmless": 16,
+            "top_detections": [f"Trojan.GenericKD.{4000 + i}" for i in range(10)],
+            "tags": ["peexe", "signed", "overlay", "detect-debug-environment"],
+            "names": [f"invoice_{i:04d}.exe" for i in range(12)],
+            "last_analysis_date": 1736669640,
+            "reputation": -41,
+        },
+    }
+
+
+def _crtsh() -> dict:
+    return {
+        "provider": "crt.sh",
+        "verdict": "no_data",
+        "detection_count": 0,
+        "total_engines": 0,
+        "scan_date": None,
+        "raw_stats": {
+            "cert_count": 312,
+            "earliest": "2019-03-02",
+            "latest": "2026-01-09",
+            "subdomains": [f"svc-{i:02d}.internal.example-corp.com" for i in range(50)],
+        },
+    }
+
+
+def _threatminer() -> dict:
+    return {
+        "provider": "ThreatMiner",
+        "verdict": "suspicious",
+        "detection_count": 0,
+        "total_engines": 0,
+        "scan_date": None,
+        "raw_stats": {
+            "passive_dns": [
+                {"domain": f"cdn{i}.badhost.net",
+                 "first_seen": "2024-05-01", "last_seen": "2025-11-30"}
+                for i in range(25)
+            ],
+            "reports": [
+                {"filename": f"APT_report_{i}.pdf", "year": 2020 + i % 6,
+                 "URL": f"https://reports.example.org/{i}/APT_report_{i}.pdf"}
+                for i in range(15)
+            ],
+        },
+    }
+
+
+def _dns_txt() -> dict:
+    return {
+        "provider": "DNS Records",
+        "verdict": "no_data",
+        "detection_count": 0,
+        "total_engines": 0,
+        "scan_date": None,
+        "raw_stats": {
+            "a": ["93.184.216.34"],
+            "mx": ["10 mail.example.com"],
+            "ns": ["a.iana-servers.net", "b.iana-servers.net"],
+            "txt": [
+                "v=spf1 include:_spf.google.com include:mailgun.org ~all",
+                "google-site-verification=" + "x" * 43,
+                "MS=ms" + "1" * 8,
+            ] + [f"verification-token-{i}=" + "ab" * 20 for i in range(6)],
+        },
+    }
+
+
+_PAYLOADS = {
+    "virustotal": _virustotal,
+    "crtsh": _crtsh,
+    "threatminer": _threatminer,
+    "dns_txt": _dns_txt,
+}
+
+
+def _disk_bytes(values: list[str | bytes]) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.db"
+        conn = sqlite3.connect(str(path))
+        conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, payload TEXT NOT NULL)")
+        conn.executemany("INSERT INTO t (payload) VALUES (?)", [(v,) for v in values])
+        conn.commit()
+        conn.execute("VACUUM")
+        conn.close()
+        return path.stat().st_size
+
+
+def _time_per_op(fn, iterations: int) -> float:
+    """Return mean microseconds per call."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000, help="rows written per size measurement")
+    parser.add_argument("--iterations", type=int, default=1000, help="encode/decode calls timed")
+    parser.add_argument("--json", action="store_true", help="emit JSON instead of a table")
+    args = parser.parse_args()
+
+    report = []
+    for payload_name, factory in _PAYLOADS.items():
+        obj = factory()
+        variants: dict[str, tuple] = {
+            "json-text": (lambda o=obj: json.dumps(o), json.loads),
+        }
+        for codec in sorted(CODECS):
+            variants[codec] = (lambda o=obj, c=codec: encode_payload(o, c), decode_payload)
+        for name, (encode, decode) in variants.items():
+            encoded = encode()
+            report.append({
+                "payload": payload_name,
+                "codec": name,
+                "payload_bytes": len(encoded),
+                "disk_bytes": _disk_bytes([encode() for _ in range(args.rows)]),
+                "encode_us": round(_time_per_op(encode, args.iterations), 2),
+                "decode_us": round(
+                    _time_per_op(lambda e=encoded, d=decode: d(e), args.iterations), 2
+                ),
+            })
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print(
+        f"{'payload':<12} {'codec':<10} {'bytes':>7} {'disk (KB)':>10} "
+        f"{'enc us':>8} {'dec us':>8}"
+    )
+    for row in report:
+        print(
+            f"{row['payload']:<12} {row['codec']:<10} {row['payload_bytes']:>7,} "
+            f"{row['disk_bytes'] / 1024:>10,.0f} {row['encode_us']:>8} {row['decode_us']:>8}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""SentinelX response-read microbenchmark: joined chunks vs preallocated buffer vs incremental.
+
+Parses near-1 MB provider payloads the way http_safety used to (8 KB chunks
+collected in a list, joined, then json.loads), with the current
+read_limited() (one preallocated bytearray decoded in place) and, for crt.sh,
+with the adapter's incremental reader, which stops once _SUBDOMAIN_CAP
+subdomains are known.  Reports mean time per parse and the tracemalloc peak
+of one parse (the parsed result plus the reader's transient copies).
+
+Payloads are synthetic by default: a VirusTotal file report with ~1 MB of
+per-engine results and a crt.sh answer listing ~1 MB of certificates.  Pass
+--fixture PATH (repeatable) to add captured responses; a fixture whose name
+contains "crtsh" is also run through the incremental reader.
+
+Usage:
+    python3 tools/bench_read_limited.py
+    python3 tools/bench_read_limited.py --fixture captured/crtsh_google.com.json --json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.enrichment.adapters.crtsh import _read_certs  # noqa: E402
+from app.enrichment.http_safety import MAX_RESPONSE_BYTES, read_limited  # noqa: E402
+
+TARGET_BYTES = 1_000_000
+
+
+class _Response:
+    """Stand-in for a streaming requests.Response over an in-memory body."""
+
+    def __init__(self, raw: bytes, content_length: bool) -> None:
+        self._raw = raw
+        self.headers = {"Content-Length": str(len(raw))} if content_length else {}
+
+    def iter_content(self, chunk_size: int = 1) -> Iterator[bytes]:
+        raw = self._raw
+        for start in range(0, len(raw), chunk_size):
+            yield raw[start:start + chunk_size]
+
+    def close(self) -> None:
+        pass
+
+
+def _joined_read(resp: _Response) -> Any:
+    """http_safety.read_limited() before the preallocated buffer."""
+    chunks: list[bytes] = []
+    total = 0
+    for chunk in resp.iter_content(chunk_size=8192):
+        total += len(chunk)
+        if total > MAX_RESPONSE_BYTES:
+            raise ValueError("Response exceeded size limit")
+        chunks.append(chunk)
+    return json.loads(b"".join(chunks))
+
+
+def _vt_payload() -> bytes:
+    engines: dict[str, dict] = {}
+    report = {"data": {"id": "0" * 64, "type": "file", "attributes": {
+        "last_analysis_stats": {"malicious": 3, "undetected": 60},
+        "last_analysis_results": engines,
+    }}}
+    i = 0
+    while len(json.dumps(report)) < TARGET_BYTES:
+        for j in range(200):
+            engines[f"Engine{i + j:05d}"] = {
+                "category": "undetected", "engine_name": f"Engine{i + j:05d}",
+                "engine_version": "1.0.0.123", "result": None, "method": "blacklist",
+                "engine_update": "20240101",
+            }
+        i += 200
+    return json.dumps(report).encode()
+
+
+def _crtsh_payload() -> bytes:
+    certs = []
+    size = 2
+    i = 0
+    while size < TARGET_BYTES:
+        cert = {
+            "issuer_ca_id": 183267, "issuer_name": "C=US, O=Let's Encrypt, CN=R3",
+            "common_name": f"host{i % 400}.example.com",
+            "name_value": f"host{i % 400}.example.com\n*.host{i % 400}.example.com",
+            "id": 10_000_000_000 + i, "entry_timestamp": "2024-01-01T00:00:00.000",
+            "not_before": "2024-01-01T00:00:00", "not_after": "2024-04-01T00:00:00",
+            "serial_number": f"{i:040x}", "result_count": 3,
+        }
+        certs.append(cert)
+        size += len(json.dumps(cert)) + 2
+        i += 1
+    return json.dumps(certs).encode()
+
+
+def _measure(read: Callable[[_Response], Any], raw: bytes, content_length: bool,
+             repeat: int) -> dict:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        read(_Response(raw, content_length))
+    per_parse = (time.perf_counter() - started) / repeat
+
+    tracemalloc.start()
+    result = read(_Response(raw, content_length))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return {"ms_per_parse": round(per_parse * 1000, 2), "peak_kib": round(peak / 1024)}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fixture", action="append", default=[], type=Path,
+                        help="captured JSON response to add (repeatable)")
+    parser.add_argument("--repeat", type=int, default=20, help="parses per measurement")
+    parser.add_argument("--no-content-length", action="store_true",
+                        help="omit Content-Length (chunked or compressed responses)")
+    parser.add_argument("--json", action="store_true", help="emit JSON instead of a table")
+    args = parser.parse_args()
+
+    payloads = [("virustotal (synthetic)", _vt_payload()), ("crtsh (synthetic)", _crtsh_payload())]
+    payloads += [(path.name, path.read_bytes()) for path in args.fixture]
+
+    report = []
+    for name, raw in payloads:
+        readers: list[tuple[str, Callable[[_Response], Any]]] = [
+            ("joined", _joined_read), ("prealloc", read_limited),
+        ]
+        if "crtsh" in name:
+            readers.append(("incremental", _read_certs))
+        for reader_name, read in readers:
+            row = {"payload": name, "bytes": len(raw), "reader": reader_name}
+            row.update(_measure(read, raw, not args.no_content_length, args.repeat))
+            report.append(row)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print(f"{'payload':<28} {'bytes':>9} {'reader':<12} {'ms/parse':>9} {'peak KiB':>9}")
+    for row in report:
+        print(f"{row['payload']:<28} {row['bytes']:>9,} {row['reader']:<12} "
+              f"{row['ms_per_parse']:>9} {row['peak_kib']:>9,}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
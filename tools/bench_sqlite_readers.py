@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""SentinelX SQLite read-concurrency benchmark.
+
+Measures CacheStore.get() throughput as reader threads are added, comparing
+the per-thread read-only connections (ConnectionPool) against the original
+design: one shared connection serialized behind a threading.Lock.
+
+Each thread repeatedly looks up random keys from a pre-populated cache for a
+fixed duration.  With WAL and separate connections, sqlite3 releases the GIL
+while stepping queries, so on a multi-core host throughput grows with thread
+count while the shared-connection baseline stays flat.  On a single-core host
+both curves are bound by the GIL and stay flat.  --with-writer adds a thread
+doing continuous puts (as enrichment workers do) so reads are measured while
+commits are in flight.
+
+Usage:
+    python3 tools/bench_sqlite_readers.py                  # default sweep
+    python3 tools/bench_sqlite_readers.py --threads 1 4 20 --seconds 2
+    python3 tools/bench_sqlite_readers.py --rows 50000 --json
+    python3 tools/bench_sqlite_readers.py --with-writer
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.cache.store import CacheStore  # noqa: E402
+
+_PROVIDERS = ("VirusTotal", "AbuseIPDB", "GreyNoise", "Shodan InternetDB")
+
+
+def _populate(cache: CacheStore, rows: int) -> list[tuple[str, str, str]]:
+    keys = []
+    for i in range(rows):
+        key = (f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}", "ipv4", _PROVIDERS[i % 4])
+        keys.append(key)
+        cache.put(*key, {
+            "provider": key[2],
+            "verdict": "clean",
+            "detection_count": 0,
+            "total_engines": 70,
+            "scan_date": None,
+            "raw_stats": {"harmless": 60, "undetected": 10},
+        })
+    return keys
+
+
+class _SharedConnectionReader:
+    """Baseline: the pre-pool read path (one connection, one lock)."""
+
+    def __init__(self, db_path: Path) -> None:
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+
+    def get(self, ioc_value: str, ioc_type: str, provider: str, ttl_seconds: int) -> object:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result_json, cached_at FROM enrichment_cache "
+                "WHERE ioc_value = ? AND ioc_type = ? AND provider = ?",
+                (ioc_value, ioc_type, provider),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, ioc_value: str, ioc_type: str, provider: str, result_dict: dict) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO enrichment_cache "
+                "(ioc_value, ioc_type, provider, result_json, cached_at) "
+                "VALUES (?, ?, ?, ?, datetime('now'))",
+                (ioc_value, ioc_type, provider, json.dumps(result_dict)),
+            )
+            self._conn.commit()
+
+
+def _run(
+    reader: object, keys: list, threads: int, seconds: float, with_writer: bool
+) -> float:
+    """Return total lookups/second across *threads* threads."""
+    counts = [0] * threads
+    start = threading.Barrier(threads + 1)
+    stop_at = [0.0]
+    writer_done = threading.Event()
+
+    def writer() -> None:
+        i = 0
+        while not writer_done.is_set():
+            reader.put(  # type: ignore[attr-defined]
+                f"172.16.0.{i % 256}", "ipv4", "VirusTotal", {"i": i}
+            )
+            i += 1
+
+    def worker(slot: int) -> None:
+        rng = random.Random(slot)  # noqa: S311 — benchmark key selection
+        start.wait()
+        n = 0
+        while time.perf_counter() < stop_at[0]:
+            key = keys[rng.randrange(len(keys))]
+            reader.get(*key, ttl_seconds=86400)  # type: ignore[attr-defined]
+            n += 1
+        counts[slot] = n
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    write_thread = threading.Thread(target=writer) if with_writer else None
+    for t in pool:
+        t.start()
+    if write_thread is not None:
+        write_thread.start()
+    stop_at[0] = time.perf_counter() + seconds
+    start.wait()
+    for t in pool:
+        t.join()
+    writer_done.set()
+    if write_thread is not None:
+        write_thread.join()
+    return sum(counts) / seconds
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20_000, help="cache rows to populate")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16, 20])
+    parser.add_argument("--seconds", type=float, default=1.0, help="duration per measurement")
+    parser.add_argument("--with-writer", action="store_true", help="run a concurrent put() thread")
+    parser.add_argument("--json", action="store_true", help="emit JSON instead of a table")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "cache.db"
+        cache = CacheStore(db_path=db_path)
+        keys = _populate(cache, args.rows)
+        baseline = _SharedConnectionReader(db_path)
+
+        report = []
+        for n in args.threads:
+            report.append({
+                "threads": n,
+                "pooled_ops_per_sec": round(
+                    _run(cache, keys, n, args.seconds, args.with_writer)
+                ),
+                "shared_ops_per_sec": round(
+                    _run(baseline, keys, n, args.seconds, args.with_writer)
+                ),
+            })
+        cache.close()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    base = report[0]["pooled_ops_per_sec"] or 1
+    print(f"{'threads':>7}  {'pooled ops/s':>13}  {'scaling':>7}  {'shared-lock ops/s':>17}")
+    for row in report:
+        print(
+            f"{row['threads']:>7}  {row['pooled_ops_per_sec']:>13,}  "
+            f"{row['pooled_ops_per_sec'] / base:>6.2f}x  {row['shared_ops_per_sec']:>17,}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())